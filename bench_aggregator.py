@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Agregator uchun yuk generatori
+
+Bitta asyncio tsiklida N ta soxta agent ochiladi: har biri binary/1 formatida
+salomlashadi va har `interval` soniyada bitta namuna yuboradi. Namuna
+yuborilgandan tasdig'i (shard qoidalarni baholab bo'lgach) kelguncha o'tgan
+vaqt o'lchanadi; oxirida o'tkazuvchanlik va p50/p99 kechikish chiqariladi.
+
+Agregator alohida jarayonda ishga tushiriladi (generator bilan bitta GIL ni
+bo'lishmasligi uchun); --connect bilan tashqi agregatorga ham yuborish mumkin.
+10k ulanish uchun ochiq fayllar chegarasi (ulimit -n) yetarli bo'lishi kerak.
+
+Ishga tushirish: python bench_aggregator.py [--agents N] [--interval s] [--duration s]
+                 [--workers N] [--connect host:port --token T]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import resource
+import tempfile
+import multiprocessing
+
+# Modullarni import qilish
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from config.config_loader import ConfigLoader
+from utils.stream import PROTOCOL_VERSION, encode_message
+from utils.wire import (FORMAT_BINARY, SCHEMA, SCALE, FRAME_HEADER, FRAME_ACK, ACK, SampleEncoder)
+
+TOKEN = 'bench'
+
+# Bir vaqtda ochilayotgan ulanishlar (listen navbati to'lib ketmasligi uchun)
+CONNECT_CONCURRENCY = 200
+
+
+def serve(config, pipe):
+    """
+    Agregator jarayoni: portni yuboradi va to'xtash buyrug'ini kutadi
+    """
+    from core.aggregator import Aggregator
+
+    logger = logging.getLogger('bench_aggregator')
+    aggregator = Aggregator(config, logger)
+    pipe.send(aggregator.port)
+    pipe.recv()
+    stats = {'samples': aggregator.samples, 'duplicates': aggregator.duplicates,
+             'backpressure': aggregator.backpressure, 'hosts': len(aggregator.hosts)}
+    aggregator.close()
+    pipe.send(stats)
+
+
+class FakeAgent:
+    def __init__(self, index, interval, latencies):
+        self.host = f'bench-{index:05d}'
+        self.interval = interval
+        self.latencies = latencies
+        self.encoder = SampleEncoder()
+        self.system_info = {'hostname': self.host, 'ip': f'10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}'}
+        self.metrics = {'ram': random.uniform(20, 60), 'cpu': random.uniform(1, 30), 'disk': random.uniform(30, 70),
+                        'swap': 0.0, 'load': random.uniform(1, 20), 'network': [1.0, 0.5]}
+        self.sent = {}
+        self.seq = 0
+        self.acked = 0
+        self.first_sent = None
+        self.last_acked = None
+
+    def sample(self):
+        metrics = self.metrics
+        metrics['ram'] = min(70.0, max(5.0, metrics['ram'] + random.gauss(0, 0.5)))
+        metrics['cpu'] = min(80.0, max(0.0, metrics['cpu'] + random.gauss(0, 2)))
+        metrics['load'] = max(0.0, metrics['load'] + random.gauss(0, 0.5))
+        self.seq += 1
+        return self.encoder.encode(self.seq, time.time(), metrics, self.system_info)
+
+    async def connect(self, host, port, token):
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(encode_message({'type': 'hello', 'version': PROTOCOL_VERSION, 'host': self.host,
+                                     'session': f'{self.host}-{os.getpid()}', 'token': token,
+                                     'formats': [FORMAT_BINARY], 'schema': list(SCHEMA), 'scale': SCALE}))
+        welcome = json.loads(await reader.readline() or b'{}')
+        if welcome.get('format') != FORMAT_BINARY:
+            raise ConnectionError(welcome.get('error', "agregator binary/1 ni tanlamadi"))
+        return reader, writer
+
+    async def read_acks(self, reader):
+        while True:
+            length, kind = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+            body = await reader.readexactly(length)
+            if kind == FRAME_ACK:
+                sent = self.sent.pop(ACK.unpack(body)[0], None)
+                if sent is not None:
+                    self.last_acked = time.perf_counter()
+                    self.latencies.append(self.last_acked - sent)
+                    self.acked += 1
+
+    async def run(self, reader, writer, deadline):
+        acks = asyncio.ensure_future(self.read_acks(reader))
+        # Agentlar interval bo'ylab tekis tarqaladi
+        await asyncio.sleep(random.uniform(0, self.interval))
+        try:
+            while time.perf_counter() < deadline:
+                frame = self.sample()
+                self.sent[self.seq] = time.perf_counter()
+                if self.first_sent is None:
+                    self.first_sent = self.sent[self.seq]
+                writer.write(frame)
+                await writer.drain()
+                await asyncio.sleep(self.interval)
+            # Oxirgi tasdiqlarni kutish
+            for _ in range(50):
+                if not self.sent:
+                    break
+                await asyncio.sleep(0.1)
+        finally:
+            acks.cancel()
+            writer.close()
+
+
+def percentile(values, fraction):
+    if not values:
+        return float('nan')
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def generate(args, host, port, token):
+    latencies = []
+    agents = [FakeAgent(index, args.interval, latencies) for index in range(args.agents)]
+    limit = asyncio.Semaphore(CONNECT_CONCURRENCY)
+
+    async def connect(agent):
+        async with limit:
+            return await agent.connect(host, port, token)
+
+    started = time.perf_counter()
+    streams = await asyncio.gather(*(connect(agent) for agent in agents), return_exceptions=True)
+    connected = [(agent, stream) for agent, stream in zip(agents, streams) if not isinstance(stream, BaseException)]
+    failed = [stream for stream in streams if isinstance(stream, BaseException)]
+    connect_time = time.perf_counter() - started
+    print(f"Ulandi: {len(connected)}/{args.agents} agent, {connect_time:.2f}s"
+          + (f" (birinchi xatolik: {failed[0]!r})" if failed else ""))
+
+    deadline = time.perf_counter() + args.duration
+    await asyncio.gather(*(agent.run(reader, writer, deadline) for agent, (reader, writer) in connected),
+                         return_exceptions=True)
+
+    # O'tkazuvchanlik birinchi yuborishdan oxirgi tasdiqqacha hisoblanadi: agentlarning
+    # oxirgi interval kutishi va tasdiqlarni kutish vaqti kiritilmaydi
+    sent = sum(agent.seq for agent, _ in connected)
+    acked = sum(agent.acked for agent, _ in connected)
+    first = min((agent.first_sent for agent, _ in connected if agent.first_sent is not None), default=0.0)
+    last = max((agent.last_acked for agent, _ in connected if agent.last_acked is not None), default=first)
+    elapsed = max(last - first, 1e-9)
+    offered = len(connected) / args.interval
+    latencies.sort()
+    print(f"Namunalar: {sent} yuborildi, {acked} tasdiqlandi ({acked / elapsed:,.0f} namuna/s, {elapsed:.1f}s; "
+          f"taklif qilingan yuk {offered:,.0f} namuna/s)")
+    print(f"Kechikish (yuborish -> tasdiq): p50 {percentile(latencies, 0.5) * 1000:.2f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.2f} ms, max {percentile(latencies, 1.0) * 1000:.2f} ms")
+
+
+def raise_file_limit(needed):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        target = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+        soft = target
+    return soft
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agregator uchun yuk generatori")
+    parser.add_argument('--agents', type=int, default=1000, help="Soxta agentlar soni")
+    parser.add_argument('--interval', type=float, default=1.0, help="Har bir agentning yuborish oralig'i (s)")
+    parser.add_argument('--duration', type=float, default=20.0, help="O'lchash davomiyligi (s)")
+    parser.add_argument('--workers', type=int, default=2, help="aggregator_workers (0 - bitta oqim)")
+    parser.add_argument('--connect', help="Tashqi agregator (host:port)")
+    parser.add_argument('--token', default=TOKEN, help="Tashqi agregator tokeni")
+    args = parser.parse_args()
+
+    # Generator va agregator jarayonlarining har biri agentlar soni qadar ulanish ochadi
+    limit = raise_file_limit(args.agents + 256)
+    if limit < args.agents + 64:
+        print(f"Ochiq fayllar chegarasi ({limit}) {args.agents} agent uchun yetarli emas")
+        return 1
+
+    if args.connect:
+        host, port = args.connect.rsplit(':', 1)
+        asyncio.run(generate(args, host, int(port), args.token))
+        return 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = ConfigLoader(os.path.join(tmp, 'missing.conf'), logging.getLogger('bench_aggregator')).get_config()
+        config.update({'aggregator_address': '127.0.0.1', 'aggregator_port': 0, 'aggregator_token': TOKEN,
+                       'aggregator_workers': args.workers, 'anomaly_state_path': '', 'db_enabled': False,
+                       'notifiers': [{'name': 'file', 'type': 'file', 'path': os.path.join(tmp, 'alerts.ndjson')}]})
+        context = multiprocessing.get_context('fork')
+        parent, child = context.Pipe()
+        process = context.Process(target=serve, args=(config, child))
+        process.start()
+        port = parent.recv()
+        print(f"Agregator: 127.0.0.1:{port}, aggregator_workers = {args.workers}")
+        try:
+            asyncio.run(generate(args, '127.0.0.1', port, TOKEN))
+        finally:
+            parent.send('stop')
+            stats = parent.recv()
+            process.join()
+        print(f"Agregator: {stats['hosts']} xost, {stats['samples']} namuna, {stats['duplicates']} takror, "
+              f"{stats['backpressure']} backpressure")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
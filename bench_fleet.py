@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Park qoidalarini baholash benchmarki: har bir xost uchun alohida
+AlertWindows.check() (avvalgi yo'l) va NumPy ustunlaridagi FleetState
+(update + har tickda bitta vektorli evaluate) taqqoslanadi. Har bir tickda
+barcha xostlar bittadan namuna yuboradi; oxirida park bo'yicha persentillar va
+CPU bo'yicha top-N hisoblash vaqti ham o'lchanadi.
+
+Ishga tushirish: python bench_fleet.py [xostlar soni ...] (standart: 10000 100000)
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+
+# Modullarni import qilish
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from core.rules import metric_checks, metric_threshold, metric_value
+from core.windows import AlertWindows
+
+TICKS = 5
+
+CONFIG = {'check_interval': 60, 'monitor_cpu': True, 'monitor_disk': True, 'monitor_swap': True,
+          'monitor_load': True, 'monitor_network': True, 'network_separate_alert': True,
+          'cpu_condition': 'avg 5m', 'ram_condition': 'ratio 80% 5 samples', 'load_condition': 'max 10m'}
+
+
+def clamp(value):
+    return min(100.0, max(0.0, value))
+
+
+def generate(hosts, ticks):
+    # Odatiy park: ko'pchilik xostlar chegaradan past, bir necha foizi alert holatida
+    random.seed(1)
+    return [[{'ram': clamp(random.gauss(55, 15)), 'cpu': clamp(random.gauss(40, 20)), 'disk': clamp(random.gauss(60, 15)),
+              'swap': clamp(random.expovariate(1 / 5)), 'load': clamp(random.gauss(30, 20)),
+              'network': [random.expovariate(1 / 20), random.expovariate(1 / 15)]} for _ in range(hosts)]
+            for _ in range(ticks)]
+
+
+def bench_per_host(names, samples, logger):
+    checks = metric_checks(CONFIG)
+    thresholds = {key: metric_threshold(CONFIG, key) for _, key, _ in checks}
+    windows = [AlertWindows(CONFIG, logger) for _ in names]
+    triggered = 0
+    started = time.perf_counter()
+    for tick, batch in enumerate(samples):
+        timestamp = 1000.0 + tick * CONFIG['check_interval']
+        for host_windows, metrics in zip(windows, batch):
+            for _, key, _ in checks:
+                triggered += host_windows.check(key, metric_value(metrics, key), thresholds[key], timestamp)[0]
+    return time.perf_counter() - started, triggered
+
+
+def bench_fleet(names, samples, logger):
+    from core.fleet import FleetState
+
+    fleet = FleetState(CONFIG, logger, capacity=len(names))
+    triggered = 0
+    update_time = evaluate_time = 0.0
+    for tick, batch in enumerate(samples):
+        timestamp = 1000.0 + tick * CONFIG['check_interval']
+        started = time.perf_counter()
+        for host, metrics in zip(names, batch):
+            fleet.update(host, metrics, timestamp)
+        update_time += time.perf_counter() - started
+        started = time.perf_counter()
+        triggered += sum(1 for decision in fleet.evaluate() if decision[5])
+        evaluate_time += time.perf_counter() - started
+
+    started = time.perf_counter()
+    summary = fleet.summary(top=5)
+    summary_time = time.perf_counter() - started
+    return update_time, evaluate_time, triggered, summary_time, summary
+
+
+def main():
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print("numpy o'rnatilmagan: pip install numpy")
+        return 1
+
+    logger = logging.getLogger('bench_fleet')
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000, 100000]
+    for hosts in sizes:
+        names = [f"host-{index:06d}" for index in range(hosts)]
+        samples = generate(hosts, TICKS)
+        total = hosts * TICKS
+
+        per_host, expected = bench_per_host(names, samples, logger)
+        update_time, evaluate_time, triggered, summary_time, summary = bench_fleet(names, samples, logger)
+        assert triggered == expected, (triggered, expected)
+        vectorized = update_time + evaluate_time
+
+        cpu = summary['percentiles']['cpu']
+        print(f"{hosts:,} xost x {TICKS} tick ({triggered:,} alert holati):")
+        print(f"  Har xost alohida: {per_host:8.3f}s ({per_host / total * 1e6:6.2f} us/namuna)")
+        print(f"  FleetState:       {vectorized:8.3f}s ({vectorized / total * 1e6:6.2f} us/namuna; "
+              f"update {update_time:.3f}s, evaluate {evaluate_time / TICKS * 1000:.1f} ms/tick) - "
+              f"{per_host / vectorized:.1f}x")
+        print(f"  Park ko'rsatkichlari: {summary_time * 1000:.1f} ms "
+              f"(CPU p50 {cpu['p50']:.1f}% / p90 {cpu['p90']:.1f}% / p99 {cpu['p99']:.1f}%, "
+              f"top: {summary['top_cpu'][0][0]} {summary['top_cpu'][0][1]:.1f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
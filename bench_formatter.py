@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+AlertFormatter render tezligini o'lchash uchun mikro-benchmark
+
+O'zgarishdan oldingi AlertFormatter (har chaqiriqda alert_format_* kalitlarini
+o'qish va ramkani qayta qurish; LegacyAlertFormatter - o'sha koddan aynan nusxa)
+bilan kompilyatsiya qilingan shablon solishtiriladi. Tizim chaqiriqlari natijaga
+ta'sir qilmasligi uchun monitor o'rniga soxta obyekt ishlatiladi.
+
+O'lchangan natija (CPU alerti, top jarayonlar bilan): to'liq format_metric_alert
+mashinaga qarab ~1.2-1.5x tezroq. Asosiy yutuq tezlik emas, emoji kengligini
+hisobga olgan to'g'ri tekislashni oldingi len() dan qimmatroq qilmaslik.
+
+Ishga tushirish: python bench_formatter.py [takrorlar soni]
+"""
+
+import os
+import sys
+import logging
+import timeit
+import datetime
+
+# Modullarni import qilish
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from core.formatter import AlertFormatter
+
+SYSTEM_INFO = {
+    'hostname': 'web-01.example.com', 'ip': '10.0.0.12', 'uptime': '12 days, 4:05:11',
+    'os': 'Ubuntu 22.04.4 LTS', 'kernel': '5.15.0-105-generic',
+    'total_ram': '15.6G', 'total_cpu': '8 cores', 'total_disk': '100G',
+}
+
+
+class StubMonitor:
+    def get_system_info(self):
+        return SYSTEM_INFO
+
+    def check_cpu_usage(self):
+        return 93.5
+
+    def get_top_processes(self, metric):
+        return "│ 1. python3  (1234) - 41.2%\n│ 2. mysqld  (987) - 20.1%"
+
+
+class LegacyAlertFormatter:
+    """
+    O'zgarishdan oldingi AlertFormatter ning HTML render qismi (taqqoslash uchun, o'zgartirilmagan)
+    """
+
+    def __init__(self, config, logger, monitor, forecaster=None):
+        self.config = config
+        self.logger = logger
+        self.monitor = monitor
+        self.forecaster = forecaster
+
+    def _disk_eta_lines(self):
+        return []
+
+    def format_metric_alert(self, metric_type, usage_value, alert_format='HTML', alert_title=None, system_info=None):
+        """
+        Metrika turiga qarab xabarni formatlash
+        
+        Args:
+            metric_type (str): Metrika turi (RAM, CPU, Disk, va h.k.)
+            usage_value (str): Metrika qiymati
+            alert_format (str): Xabar formati (HTML yoki TEXT)
+            alert_title (str, optional): Xabar sarlavhasi
+            system_info (dict, optional): Tizim ma'lumotlari
+            
+        Returns:
+            str: Formatlangan xabar
+        """
+        metric_key = metric_type.lower()
+        
+        # Tizim ma'lumotlarini olish
+        if system_info is None:
+            system_info = self.monitor.get_system_info()
+            
+        date_str = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        
+        # Metrika qiymatini olish
+        metric_value = None
+        if metric_key == 'ram':
+            metric_value = self.monitor.check_ram_usage()
+            metric_emoji = self.config.get('alert_format_ram_emoji', '🧠')
+            metric_total = system_info.get('total_ram', 'N/A')
+        elif metric_key == 'cpu':
+            metric_value = self.monitor.check_cpu_usage()
+            metric_emoji = self.config.get('alert_format_cpu_emoji', '🔥')
+            metric_total = system_info.get('total_cpu', 'N/A')
+        elif metric_key == 'disk':
+            metric_value = self.monitor.check_disk_usage()
+            metric_emoji = self.config.get('alert_format_disk_emoji', '💾')
+            metric_total = system_info.get('total_disk', 'N/A')
+        elif metric_key == 'swap':
+            metric_value = self.monitor.check_swap_usage()
+            metric_emoji = self.config.get('alert_format_swap_emoji', '💾')
+            metric_total = "N/A"
+        elif metric_key == 'load':
+            metric_value = self.monitor.check_load_average()
+            metric_emoji = self.config.get('alert_format_load_emoji', '⚖️')
+            metric_total = "N/A"
+        elif metric_key == 'network rx':
+            network_usage = self.monitor.check_network_usage()
+            metric_value = network_usage[0]
+            metric_emoji = self.config.get('alert_format_network_emoji', '🌐')
+            metric_total = "N/A"
+        elif metric_key == 'network tx':
+            network_usage = self.monitor.check_network_usage()
+            metric_value = network_usage[1]
+            metric_emoji = self.config.get('alert_format_network_emoji', '🌐')
+            metric_total = "N/A"
+        else:
+            metric_emoji = "🚨"
+            metric_total = "N/A"
+        
+        # Sarlavhani o'rnatish
+        if not alert_title:
+            alert_title = f'{metric_emoji} {metric_type} ALERT: {usage_value}'
+        
+        # Xabar formatini tanlash
+        if alert_format.upper() == 'HTML':
+            return self._format_html_metric_alert(metric_type, usage_value, metric_value, metric_emoji, metric_total, system_info, date_str, alert_title)
+        else:
+            return self._format_text_metric_alert(metric_type, usage_value, metric_value, metric_emoji, metric_total, system_info, date_str, alert_title)
+
+    def _format_html_metric_alert(self, metric_type, usage_value, metric_value, metric_emoji, metric_total, system_info, date_str, alert_title):
+        """
+        HTML formatida metrika xabarini formatlash
+        
+        Args:
+            metric_type (str): Metrika turi
+            usage_value (str): Metrika qiymati
+            metric_value (float): Metrika qiymati (son)
+            metric_emoji (str): Metrika emojisi
+            metric_total (str): Metrika umumiy qiymati
+            system_info (dict): Tizim ma'lumotlari
+            date_str (str): Sana va vaqt
+            alert_title (str): Xabar sarlavhasi
+            
+        Returns:
+            str: HTML formatida xabar
+        """
+        use_box_drawing = self.config.get('alert_format_use_box_drawing', True)
+        width = self.config.get('alert_format_width', 44)
+        
+        if use_box_drawing:
+            line_prefix = self.config.get('alert_format_line_prefix', '│ ')
+            line_suffix = self.config.get('alert_format_line_suffix', ' │')
+            top_border = self.config.get('alert_format_top_border', '┌' + '─' * (width - 2) + '┐')
+            title_border = self.config.get('alert_format_title_border', '├' + '─' * (width - 2) + '┤')
+            section_border = self.config.get('alert_format_section_border', '├' + '─' * (width - 2) + '┤')
+            bottom_border = self.config.get('alert_format_bottom_border', '└' + '─' * (width - 2) + '┘')
+        else:
+            line_prefix = ""
+            line_suffix = ""
+            top_border = ""
+            title_border = "─" * width
+            section_border = "─" * width
+            bottom_border = ""
+        
+        content_width = width - len(line_prefix) - len(line_suffix)
+        
+        message = [f"<pre>{top_border}"]
+        
+        # Sarlavha
+        title_align = self.config.get('alert_format_title_align', 'center')
+        if title_align == 'center':
+            title_line = alert_title.center(content_width)
+        elif title_align == 'right':
+            title_line = alert_title.rjust(content_width)
+        else:
+            title_line = alert_title.ljust(content_width)
+        message.append(f"{line_prefix}{title_line}{line_suffix}")
+        message.append(title_border)
+        
+        # Tizim ma'lumotlari
+        emojis = {
+            'date': self.config.get('alert_format_date_emoji', '🗓️'),
+            'hostname': self.config.get('alert_format_hostname_emoji', '🖥️'),
+            'ip': self.config.get('alert_format_ip_emoji', '🌐'),
+            'uptime': self.config.get('alert_format_uptime_emoji', '⏳')
+        }
+        
+        fields = [
+            (f"{emojis['date']} Date:", date_str),
+            (f"{emojis['hostname']} Hostname:", system_info.get('hostname', 'N/A')),
+            (f"{emojis['ip']} IP Address:", system_info.get('ip', 'N/A')),
+            (f"{emojis['uptime']} Uptime:", system_info.get('uptime', 'N/A'))
+        ]
+        
+        for label, value in fields:
+            line = f"{label} {value}"
+            message.append(f"{line_prefix}{line:<{content_width}}{line_suffix}")
+        
+        message.append(section_border)
+        
+        # Metrika ma'lumotlari
+        metric_text = f"{metric_emoji} {metric_type}: {usage_value}"
+        if metric_total != "N/A":
+            metric_text += f" of {metric_total}"
+        
+        message.append(f"{line_prefix}{metric_text:<{content_width}}{line_suffix}")
+        
+        # Metrika turiga qarab qo'shimcha ma'lumotlar
+        metric_key = metric_type.lower()
+        
+        if metric_key == 'disk':
+            for line in self._disk_eta_lines():
+                message.append(f"{line_prefix}{line:<{content_width}}{line_suffix}")
+        
+        if metric_key == 'cpu' and self.config.get('include_top_processes', False):
+            message.append(section_border)
+            top_processes = self.monitor.get_top_processes('CPU')
+            top_processes_lines = top_processes.split('\n')
+            
+            header = f"{self.config.get('alert_format_top_processes_emoji', '🧾')} Top CPU Consumers:"
+            message.append(f"{line_prefix}{header:<{content_width}}{line_suffix}")
+            
+            for line in top_processes_lines:
+                if line.strip():
+                    message.append(f"{line_prefix}{line:<{content_width}}{line_suffix}")
+        
+        elif metric_key == 'ram' and self.config.get('include_top_processes', False):
+            message.append(section_border)
+            top_processes = self.monitor.get_top_processes('RAM')
+            top_processes_lines = top_processes.split('\n')
+            
+            header = f"{self.config.get('alert_format_top_processes_emoji', '🧾')} Top RAM Consumers:"
+            message.append(f"{line_prefix}{header:<{content_width}}{line_suffix}")
+            
+            for line in top_processes_lines:
+                if line.strip():
+                    message.append(f"{line_prefix}{line:<{content_width}}{line_suffix}")
+        
+        elif metric_key == 'disk' and self.config.get('alert_format_include_disk_breakdown', False):
+            message.append(section_border)
+            disk_breakdown = self.monitor.get_disk_breakdown() if hasattr(self.monitor, 'get_disk_breakdown') else None
+            
+            header = f"{self.config.get('alert_format_disk_breakdown_emoji', '📁')} Disk Usage Breakdown:"
+            message.append(f"{line_prefix}{header:<{content_width}}{line_suffix}")
+            
+            if disk_breakdown:
+                for path, size in disk_breakdown.items():
+                    line = f"  - {path:<15} {size}"
+                    message.append(f"{line_prefix}{line:<{content_width}}{line_suffix}")
+            else:
+                message.append(f"{line_prefix}  - Ma'lumot topilmadi{' ' * (content_width - 22)}{line_suffix}")
+        
+        message.append(bottom_border)
+        message.append("</pre>")
+        
+        return "\n".join(message)
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    config = {'alert_format_width': 44, 'include_top_processes': True}
+    logger = logging.getLogger('bench')
+    legacy = LegacyAlertFormatter(config, logger, StubMonitor())
+    formatter = AlertFormatter(config, logger, StubMonitor())
+
+    date_str = '2024-01-01 12:00:00'
+    title = '🔥 CPU ALERT: 93.5%'
+    render_args = ('CPU', '93.5%', 93.5, '🔥', '8 cores', SYSTEM_INFO, date_str, title)
+
+    def best(function):
+        # Shovqinni kamaytirish uchun 5 o'lchovning eng yaxshisi
+        return min(timeit.repeat(function, number=number, repeat=5))
+
+    legacy_render = best(lambda: legacy._format_html_metric_alert(*render_args))
+    compiled_render = best(lambda: formatter._format_html_metric_alert(*render_args))
+    legacy_full = best(lambda: legacy.format_metric_alert('CPU', '93.5%', 'HTML', title, SYSTEM_INFO))
+    compiled_full = best(lambda: formatter.format_metric_alert('CPU', '93.5%', 'HTML', title, SYSTEM_INFO))
+
+    print(f"Takrorlar:                        {number}")
+    print(f"Oldingi render:                   {legacy_render / number * 1e6:8.2f} us/xabar")
+    print(f"Kompilyatsiya qilingan shablon:   {compiled_render / number * 1e6:8.2f} us/xabar "
+          f"({legacy_render / compiled_render:.2f}x)")
+    print(f"Oldingi format_metric_alert:      {legacy_full / number * 1e6:8.2f} us/xabar")
+    print(f"Yangi format_metric_alert:        {compiled_full / number * 1e6:8.2f} us/xabar "
+          f"({legacy_full / compiled_full:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+tsdb ombori va SQLite ni solishtirish uchun benchmark
+
+Bir xil sintetik metrikalar (sekin o'zgaruvchi qiymatlar, 10 soniyalik oraliq)
+ikkala backendga yoziladi; namunaga to'g'ri keladigan baytlar va bitta
+qatorni to'liq o'qish tezligi o'lchanadi. Adolatli solishtirish uchun SQLite
+rollup jadvallari o'chiriladi.
+
+Ishga tushirish: python bench_tsdb.py [qatorlar soni]
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import datetime
+import tempfile
+
+# Modullarni import qilish
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from utils.database import Database
+from utils.rollups import ROLLUP_METRICS
+
+logger = logging.getLogger('bench')
+
+
+def generate_rows(count, interval=10):
+    """
+    Sekin o'zgaruvchi sintetik metrika qatorlari
+    """
+    random.seed(42)
+    start = datetime.datetime(2024, 1, 1)
+    ram, cpu, disk, load = 55.0, 20.0, 61.0, 1.5
+    rows = []
+    for i in range(count):
+        ram = min(99.0, max(1.0, round(ram + random.choice((0, 0, 0, 0.1, -0.1)), 1)))
+        cpu = min(100.0, max(0.0, round(cpu + random.gauss(0, 2), 1)))
+        if i % 360 == 0:
+            disk = round(disk + 0.1, 1)
+        load = round(max(0.0, load + random.gauss(0, 0.05)), 2)
+        timestamp = (start + datetime.timedelta(seconds=i * interval)).strftime('%Y-%m-%d %H:%M:%S')
+        rows.append((timestamp, 'web-01', '10.0.0.12', ram, cpu, disk, 0.0, load,
+                     round(random.uniform(0, 5), 1), round(random.uniform(0, 2), 1), None))
+    return rows
+
+
+def directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def write(database, rows, batch=500):
+    started = time.perf_counter()
+    for i in range(0, len(rows), batch):
+        database._write_metrics(rows[i:i + batch])
+    return time.perf_counter() - started
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rows = generate_rows(count)
+    samples = count * len(ROLLUP_METRICS)
+    start = datetime.datetime(2024, 1, 1)
+    end = start + datetime.timedelta(seconds=count * 10)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_db = Database({'db_enabled': True, 'db_type': 'sqlite', 'db_path': os.path.join(tmp, 'metrics.db'),
+                              'db_rollups_enabled': False, 'db_retention_raw': '0'}, logger)
+        tsdb_db = Database({'db_enabled': True, 'db_type': 'tsdb', 'db_tsdb_path': os.path.join(tmp, 'tsdb'),
+                            'db_retention_raw': '0'}, logger)
+
+        sqlite_write = write(sqlite_db, rows)
+        tsdb_write = write(tsdb_db, rows)
+        sqlite_db.db_conn.execute("VACUUM")
+        sqlite_bytes = os.path.getsize(os.path.join(tmp, 'metrics.db'))
+        tsdb_bytes = directory_size(os.path.join(tmp, 'tsdb'))
+
+        # Bitta qatorni (cpu) to'liq o'qish
+        started = time.perf_counter()
+        sqlite_count = sum(1 for _ in sqlite_db.query(
+            "SELECT timestamp, cpu_usage FROM metrics WHERE hostname = ? AND timestamp >= ? AND timestamp < ? "
+            "ORDER BY timestamp", ('web-01', str(start), str(end))))
+        sqlite_scan = time.perf_counter() - started
+
+        started = time.perf_counter()
+        tsdb_count = sum(1 for _ in tsdb_db.store.scan('cpu', 'web-01', 0, 2 ** 40))
+        tsdb_scan = time.perf_counter() - started
+        assert sqlite_count == tsdb_count == count
+
+        # Soatlik o'rtacha
+        started = time.perf_counter()
+        sqlite_hourly = list(sqlite_db.query_range('cpu', 'web-01', start, end, 3600, 'avg'))
+        sqlite_query = time.perf_counter() - started
+        started = time.perf_counter()
+        tsdb_hourly = list(tsdb_db.query_range('cpu', 'web-01', start, end, 3600, 'avg'))
+        tsdb_query = time.perf_counter() - started
+        assert len(sqlite_hourly) == len(tsdb_hourly)
+
+        sqlite_db.close()
+        tsdb_db.close()
+
+    print(f"Qatorlar: {count} ({samples} namuna, {len(ROLLUP_METRICS)} metrika)")
+    print(f"{'':24}{'SQLite':>12}{'tsdb':>12}")
+    print(f"{'Bayt / namuna':24}{sqlite_bytes / samples:12.2f}{tsdb_bytes / samples:12.2f}")
+    print(f"{'Yozish (s)':24}{sqlite_write:12.3f}{tsdb_write:12.3f}")
+    print(f"{'cpu qatorini o`qish (s)':24}{sqlite_scan:12.3f}{tsdb_scan:12.3f}")
+    print(f"{'Soatlik avg (s)':24}{sqlite_query:12.3f}{tsdb_query:12.3f}")
+
+
+if __name__ == "__main__":
+    main()
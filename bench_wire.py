@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Agent oqimi formatlari (json va binary/1) uchun benchmark
+
+Sekin o'zgaruvchi sintetik namunalar ikkala formatda kodlanadi; namunaga
+to'g'ri keladigan baytlar va agregator tomonida o'qish (dekodlash) tezligi
+o'lchanadi.
+
+Ishga tushirish: python bench_wire.py [namunalar soni]
+"""
+
+import io
+import os
+import sys
+import time
+import random
+
+# Modullarni import qilish
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from utils.stream import encode_message, read_message
+from utils.wire import FrameReader, SampleDecoder, SampleEncoder
+
+SYSTEM_INFO = {'hostname': 'web-01', 'ip': '10.0.0.12', 'os': 'Ubuntu 22.04.4 LTS', 'kernel': '5.15.0-105-generic',
+               'cpu': 'Intel(R) Xeon(R) CPU E5-2680 v4 @ 2.40GHz (8 cores)', 'uptime': '12d 4h 10m',
+               'total_ram': '31.3Gi', 'total_disk': '195.8G', 'total_cpu': '8 cores'}
+
+
+def generate_samples(count, interval=10):
+    """
+    Sekin o'zgaruvchi sintetik namunalar (seq, vaqt, metrikalar, system_info)
+    """
+    random.seed(42)
+    ram, cpu, disk, load = 55.0, 20.0, 61.0, 12.5
+    samples = []
+    for i in range(count):
+        ram = min(99.0, max(1.0, round(ram + random.choice((0, 0, 0, 0.1, -0.1)), 1)))
+        cpu = min(100.0, max(0.0, round(cpu + random.gauss(0, 2), 1)))
+        if i % 360 == 0:
+            disk = round(disk + 0.1, 1)
+        load = round(max(0.0, load + random.gauss(0, 0.5)), 1)
+        minutes = 10 + i * interval // 60
+        info = dict(SYSTEM_INFO, uptime=f'12d {4 + minutes // 60}h {minutes % 60}m')
+        metrics = {'ram': ram, 'cpu': cpu, 'disk': disk, 'swap': 0.0, 'load': load,
+                   'network': [round(random.uniform(0, 5), 1), round(random.uniform(0, 2), 1)]}
+        samples.append((i + 1, 1700000000 + i * interval, metrics, info))
+    return samples
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    samples = generate_samples(count)
+
+    started = time.perf_counter()
+    json_stream = b''.join(encode_message({'type': 'sample', 'seq': seq, 'ts': ts, 'metrics': metrics,
+                                           'system_info': info}) for seq, ts, metrics, info in samples)
+    json_encode = time.perf_counter() - started
+
+    encoder = SampleEncoder()
+    started = time.perf_counter()
+    binary_stream = b''.join(encoder.encode(*sample) for sample in samples)
+    binary_encode = time.perf_counter() - started
+
+    rfile = io.BufferedReader(io.BytesIO(json_stream))
+    started = time.perf_counter()
+    while read_message(rfile) is not None:
+        pass
+    json_decode = time.perf_counter() - started
+
+    reader = FrameReader(io.BufferedReader(io.BytesIO(binary_stream)))
+    decoder = SampleDecoder()
+    started = time.perf_counter()
+    while True:
+        item = reader.read()
+        if item is None:
+            break
+        decoder.decode(item[1])
+    binary_decode = time.perf_counter() - started
+
+    print(f"Namunalar: {count}")
+    print(f"{'format':<10}{'bayt/namuna':>14}{'kodlash namuna/s':>20}{'dekodlash namuna/s':>22}")
+    for name, size, encode_time, decode_time in (('json', len(json_stream), json_encode, json_decode),
+                                                 ('binary/1', len(binary_stream), binary_encode, binary_decode)):
+        print(f"{name:<10}{size / count:>14.1f}{count / encode_time:>20,.0f}{count / decode_time:>22,.0f}")
+    print(f"Hajm nisbati: {len(json_stream) / len(binary_stream):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
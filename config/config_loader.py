@@ -49,6 +49,12 @@ class ConfigLoader:
             'monitor_disk': True,
             'disk_threshold': 90,
             'disk_path': "/",
+            # Disk to'lish bashorati (ETA)
+            'disk_forecast_enabled': False,
+            'disk_forecast_mounts': "",
+            'disk_forecast_horizon': 21600,
+            'disk_forecast_hours': 24,
+            'disk_forecast_min_samples': 10,
             'monitor_swap': True,
             'swap_threshold': 80,
             'monitor_load': True,
@@ -56,6 +62,32 @@ class ConfigLoader:
             'monitor_network': True,
             'network_interface': "",
             'network_threshold': 90,
+            # Oyna (sliding window) qoidalari, masalan "avg 5m" (bo'sh - bitta namuna bo'yicha)
+            'ram_condition': "",
+            'cpu_condition': "",
+            'disk_condition': "",
+            'swap_condition': "",
+            'load_condition': "",
+            'network_condition': "",
+            # Anomaliya aniqlash sozlamalari
+            'anomaly_enabled': False,
+            'anomaly_metrics': "ram,cpu",
+            'anomaly_alpha': 0.05,
+            'anomaly_z_threshold': 3.0,
+            'anomaly_min_samples': 30,
+            'anomaly_min_std': 1.0,
+            'anomaly_direction': "up",
+            'anomaly_seasonal': False,
+            'anomaly_state_path': "/var/lib/system-monitor/anomaly_state.json",
+            'anomaly_save_interval': 300,
+            # Alert rejimi va intervallari
+            'alert_mode': "threshold_cross",
+            'min_alert_interval': 300,
+            'alert_interval': 1800,
+            # continuous rejimda faol incident xabarini editMessageText bilan yangilash
+            'telegram_edit_in_place': True,
+            # Alert yuborish backendlari (bo'sh - faqat Telegram)
+            'notifiers': [],
             # Ma'lumotlar bazasi sozlamalari
             'db_enabled': False,
             'db_type': "sqlite",
@@ -65,9 +97,102 @@ class ConfigLoader:
             'db_name': "system_monitor",
             'db_user': "",
             'db_password': "",
+            # Write-behind batch yozish sozlamalari
+            'db_batch_size': 100,
+            'db_flush_interval': 30,
+            'db_buffer_max_rows': 10000,
+            'db_overflow_policy': "drop_oldest",
+            'db_spill_path': "/var/lib/system-monitor/metrics_spill.ndjson",
+            # MySQL/PostgreSQL ulanishlar puli va qayta ulanish
+            'db_pool_size': 2,
+            'db_pool_timeout': 10,
+            'db_pool_ping_interval': 30,
+            'db_reconnect_initial': 1,
+            'db_reconnect_max': 300,
+            # Ommaviy yozish (PostgreSQL COPY, MySQL ko'p qatorli INSERT)
+            'db_insert_chunk_rows': 500,
+            'db_pg_copy': True,
+            # Jadval tuzilishi: legacy yoki normalized (hosts jadvali, epoch vaqt)
+            'db_schema': "legacy",
+            # SQLite performance rejimi (WAL, yozuvchi oqim, o'qish puli)
+            'db_sqlite_mode': "default",
+            'db_sqlite_synchronous': "NORMAL",
+            'db_sqlite_cache_size_kb': 65536,
+            'db_sqlite_mmap_size': 268435456,
+            'db_read_pool_size': 4,
+            # Rollup jadvallari va saqlash muddatlari (0 - cheksiz)
+            'db_rollups_enabled': True,
+            'db_retention_raw': "0",
+            'db_retention_1m': "90d",
+            'db_retention_1h': "730d",
+            'db_retention_1d': "0",
+            'db_retention_interval': 3600,
+            'db_purge_batch_size': 1000,
+            'db_purge_max_batches': 50,
+            # Siqilgan vaqt qatorlari ombori (db_type = tsdb)
+            'db_tsdb_path': "/var/lib/system-monitor/tsdb",
+            'db_tsdb_block_seconds': 7200,
+            # Doimiy hajmli aylanma arxiv (db_type = rrd)
+            'db_rrd_path': "/var/lib/system-monitor/rrd",
+            'db_rrd_archives': "1m:1d, 5m:7d, 1h:90d, 1d:1825d",
+            'db_rrd_alert_log_bytes': 1048576,
+            # Oxirgi namunalar halqa fayli (mahalliy o'quvchilar uchun mmap)
+            'ring_enabled': False,
+            'ring_path': "/dev/shm/system-monitor.ring",
+            'ring_slots': 1024,
             # Prometheus sozlamalari
             'prometheus_enabled': False,
             'prometheus_port': 9090,
+            'prometheus_address': "0.0.0.0",
+            # interval - check_interval da tekshirish, scrape - scrape boshlaganda
+            'prometheus_collect': "interval",
+            'prometheus_min_age': 5,
+            'prometheus_idle_interval': 300,
+            # Push chiqishi (StatsD, Graphite, InfluxDB line protocol)
+            'push_enabled': False,
+            'push_protocol': "statsd",
+            'push_transport': "udp",
+            'push_host': "127.0.0.1",
+            # 0 - protokolning standart porti (8125, 2003, 8089)
+            'push_port': 0,
+            'push_prefix': "",
+            'push_mtu': 1432,
+            'push_flush_interval': 1.0,
+            'push_batch_bytes': 65536,
+            'push_queue_lines': 100000,
+            'push_timeout': 5,
+            # Agent rejimi: namunalar markaziy agregatorga yuboriladi
+            'agent_enabled': False,
+            'agent_aggregator_host': "127.0.0.1",
+            'agent_aggregator_port': 9700,
+            'agent_token': "",
+            'agent_hostname': "",
+            'agent_backlog': 10000,
+            'agent_timeout': 10,
+            # binary/1 (ixcham, farqlar bilan) yoki json
+            'agent_wire_format': "binary/1",
+            'agent_tls': False,
+            'agent_tls_ca_file': "",
+            'agent_tls_cert_file': "",
+            'agent_tls_key_file': "",
+            # Agregator (main.py aggregate)
+            'aggregator_address': "0.0.0.0",
+            'aggregator_port': 9700,
+            'aggregator_token': "",
+            'aggregator_max_alert_age': 300,
+            'aggregator_timeout': 30,
+            'aggregator_workers': 0,
+            'aggregator_queue_size': 10000,
+            'aggregator_buffer_bytes': 65536,
+            'aggregator_max_inflight': 256,
+            'aggregator_silence_timeout': 180,
+            'aggregator_vectorized': True,
+            'aggregator_eval_interval': 1,
+            'aggregator_sample_interval': 0,
+            'aggregator_tls': False,
+            'aggregator_tls_ca_file': "",
+            'aggregator_tls_cert_file': "",
+            'aggregator_tls_key_file': "",
             # Alert format sozlamalari
             'alert_format_enabled': True,
             'alert_format_use_box_drawing': True,
@@ -118,9 +243,15 @@ class ConfigLoader:
                 for key in ['check_interval', 'top_processes_count']:
                     if key in config['General']:
                         result[key] = int(config['General'][key])
-                for key in ['include_top_processes', 'show_total_cpu_usage_in_list', 'show_top_processes_cpu_sum']:
+                for key in ['include_top_processes', 'show_total_cpu_usage_in_list', 'show_top_processes_cpu_sum',
+                            'telegram_edit_in_place']:
                     if key in config['General']:
                         result[key] = config['General'].getboolean(key)
+                if 'alert_mode' in config['General']:
+                    result['alert_mode'] = config['General']['alert_mode']
+                for key in ['min_alert_interval', 'alert_interval']:
+                    if key in config['General']:
+                        result[key] = int(config['General'][key])
             
             # RAM monitoring
             if 'RAM' in config:
@@ -142,6 +273,15 @@ class ConfigLoader:
                     result['disk_threshold'] = int(config['Disk']['disk_threshold'])
                 if 'disk_path' in config['Disk']:
                     result['disk_path'] = config['Disk']['disk_path']
+                if 'disk_forecast_enabled' in config['Disk']:
+                    result['disk_forecast_enabled'] = config['Disk'].getboolean('disk_forecast_enabled')
+                if 'disk_forecast_mounts' in config['Disk']:
+                    result['disk_forecast_mounts'] = config['Disk']['disk_forecast_mounts']
+                for key in ['disk_forecast_horizon', 'disk_forecast_min_samples']:
+                    if key in config['Disk']:
+                        result[key] = int(config['Disk'][key])
+                if 'disk_forecast_hours' in config['Disk']:
+                    result['disk_forecast_hours'] = float(config['Disk']['disk_forecast_hours'])
             
             # Swap monitoring
             if 'Swap' in config:
@@ -166,15 +306,74 @@ class ConfigLoader:
                 if 'network_threshold' in config['Network']:
                     result['network_threshold'] = int(config['Network']['network_threshold'])
             
+            # Critical jiddiylik chegaralari (notifier marshrutlash uchun)
+            for section in ['RAM', 'CPU', 'Disk', 'Swap', 'Load', 'Network']:
+                key = f"{section.lower()}_critical_threshold"
+                if section in config and key in config[section]:
+                    result[key] = float(config[section][key])
+            
+            # Alert yuborish backendlari: [Notifier:<nom>] bo'limlari
+            for section in config.sections():
+                if section.startswith('Notifier:'):
+                    options = dict(config[section])
+                    options['name'] = section.split(':', 1)[1].strip()
+                    result['notifiers'].append(options)
+            
+            # Oyna (sliding window) qoidalari
+            for section, key in [('RAM', 'ram_condition'), ('CPU', 'cpu_condition'),
+                                 ('Disk', 'disk_condition'), ('Swap', 'swap_condition'),
+                                 ('Load', 'load_condition'), ('Network', 'network_condition')]:
+                if section in config and key in config[section]:
+                    result[key] = config[section][key].strip()
+            
+            # Anomaliya aniqlash sozlamalari
+            if 'Anomaly' in config:
+                for key in ['anomaly_enabled', 'anomaly_seasonal']:
+                    if key in config['Anomaly']:
+                        result[key] = config['Anomaly'].getboolean(key)
+                for key in ['anomaly_metrics', 'anomaly_direction', 'anomaly_state_path']:
+                    if key in config['Anomaly']:
+                        result[key] = config['Anomaly'][key]
+                for key in ['anomaly_alpha', 'anomaly_z_threshold', 'anomaly_min_std']:
+                    if key in config['Anomaly']:
+                        result[key] = float(config['Anomaly'][key])
+                for key in ['anomaly_min_samples', 'anomaly_save_interval']:
+                    if key in config['Anomaly']:
+                        result[key] = int(config['Anomaly'][key])
+            
             # Ma'lumotlar bazasi sozlamalari
             if 'Database' in config:
                 if 'db_enabled' in config['Database']:
                     result['db_enabled'] = config['Database'].getboolean('db_enabled')
-                for key in ['db_type', 'db_path', 'db_host', 'db_name', 'db_user', 'db_password']:
+                for key in ['db_type', 'db_path', 'db_host', 'db_name', 'db_user', 'db_password', 'db_overflow_policy',
+                            'db_spill_path', 'db_schema',
+                            'db_sqlite_mode', 'db_sqlite_synchronous', 'db_retention_raw',
+                            'db_retention_1m', 'db_retention_1h', 'db_retention_1d', 'db_tsdb_path',
+                            'db_rrd_path', 'db_rrd_archives']:
                     if key in config['Database']:
                         result[key] = config['Database'][key]
-                if 'db_port' in config['Database']:
-                    result['db_port'] = int(config['Database']['db_port'])
+                for key in ['db_port', 'db_batch_size', 'db_buffer_max_rows', 'db_sqlite_cache_size_kb',
+                            'db_sqlite_mmap_size', 'db_read_pool_size', 'db_retention_interval',
+                            'db_purge_batch_size', 'db_purge_max_batches', 'db_tsdb_block_seconds',
+                            'db_rrd_alert_log_bytes', 'db_pool_size', 'db_insert_chunk_rows']:
+                    if key in config['Database']:
+                        result[key] = int(config['Database'][key])
+                for key in ['db_flush_interval', 'db_pool_timeout', 'db_pool_ping_interval',
+                            'db_reconnect_initial', 'db_reconnect_max']:
+                    if key in config['Database']:
+                        result[key] = float(config['Database'][key])
+                for key in ['db_rollups_enabled', 'db_pg_copy']:
+                    if key in config['Database']:
+                        result[key] = config['Database'].getboolean(key)
+            
+            # Halqa fayli sozlamalari
+            if 'Ring' in config:
+                if 'ring_enabled' in config['Ring']:
+                    result['ring_enabled'] = config['Ring'].getboolean('ring_enabled')
+                if 'ring_path' in config['Ring']:
+                    result['ring_path'] = config['Ring']['ring_path']
+                if 'ring_slots' in config['Ring']:
+                    result['ring_slots'] = int(config['Ring']['ring_slots'])
             
             # Prometheus sozlamalari
             if 'Prometheus' in config:
@@ -182,6 +381,46 @@ class ConfigLoader:
                     result['prometheus_enabled'] = config['Prometheus'].getboolean('prometheus_enabled')
                 if 'prometheus_port' in config['Prometheus']:
                     result['prometheus_port'] = int(config['Prometheus']['prometheus_port'])
+                if 'prometheus_address' in config['Prometheus']:
+                    result['prometheus_address'] = config['Prometheus']['prometheus_address']
+                if 'prometheus_collect' in config['Prometheus']:
+                    result['prometheus_collect'] = config['Prometheus']['prometheus_collect']
+                for key in ['prometheus_min_age', 'prometheus_idle_interval']:
+                    if key in config['Prometheus']:
+                        result[key] = float(config['Prometheus'][key])
+            
+            # Push chiqishi sozlamalari
+            if 'Push' in config:
+                if 'push_enabled' in config['Push']:
+                    result['push_enabled'] = config['Push'].getboolean('push_enabled')
+                for key in ['push_protocol', 'push_transport', 'push_host', 'push_prefix']:
+                    if key in config['Push']:
+                        result[key] = config['Push'][key]
+                for key in ['push_port', 'push_mtu', 'push_batch_bytes', 'push_queue_lines']:
+                    if key in config['Push']:
+                        result[key] = int(config['Push'][key])
+                for key in ['push_flush_interval', 'push_timeout']:
+                    if key in config['Push']:
+                        result[key] = float(config['Push'][key])
+            
+            # Agent va agregator sozlamalari
+            for section, prefix in (('Agent', 'agent'), ('Aggregator', 'aggregator')):
+                if section not in config:
+                    continue
+                for key, value in config[section].items():
+                    if not key.startswith(prefix + '_'):
+                        continue
+                    if key in (f'{prefix}_enabled', f'{prefix}_tls', 'aggregator_vectorized'):
+                        result[key] = config[section].getboolean(key)
+                    elif key in ('agent_aggregator_port', 'agent_backlog', 'aggregator_port', 'aggregator_workers',
+                                 'aggregator_queue_size', 'aggregator_buffer_bytes', 'aggregator_max_inflight',
+                                 'aggregator_sample_interval'):
+                        result[key] = int(value)
+                    elif key in ('agent_timeout', 'aggregator_max_alert_age', 'aggregator_timeout', 'aggregator_silence_timeout',
+                                 'aggregator_eval_interval'):
+                        result[key] = float(value)
+                    else:
+                        result[key] = value
             
             # Alert format sozlamalari
             if 'AlertFormat' in config:
@@ -0,0 +1,742 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Markaziy alert agregatori
+Agent rejimidagi xostlar namunalarini doimiy TCP (ixtiyoriy TLS) ulanish
+orqali qabul qiladi va butun park uchun alert qoidalarini baholaydi: har bir
+xost o'z oyna, anomaliya va incident holatiga ega, alertlar esa bitta umumiy
+notifier to'plami orqali yuboriladi (bot token faqat agregatorda turadi).
+
+Ulanishlar bitta asyncio tsiklida (minglab doimiy ulanish uchun) o'qiladi,
+qoidalarni baholash esa shard ishchilarida bajariladi: xost nomi izchil
+xesh (consistent hash) halqasi orqali bitta shardga biriktiriladi, shuning
+uchun uning holati faqat shu ishchida turadi. aggregator_workers = 0 bo'lsa
+bitta ishchi oqim, N bo'lsa N ta alohida jarayon (GIL dan tashqarida).
+Har bir ulanishning o'qish buferi va tasdiqlanmagan namunalari soni
+cheklangan; shard navbati to'lsa ulanish o'qilmay turadi va TCP orqali
+agentga backpressure beriladi
+"""
+
+import hmac
+import time
+import datetime
+import queue
+import bisect
+import asyncio
+import hashlib
+import threading
+import multiprocessing
+
+from core.alerts import AlertManager
+from core.anomaly import AnomalyDetector
+from core.formatter import AlertFormatter
+from core.notifiers import NotifierDispatcher
+from core.rules import evaluate_alerts, evaluate_anomaly, format_usage, metric_value
+from core.windows import AlertWindows
+from utils.timerwheel import TimerWheel
+from utils.stream import PROTOCOL_VERSION, MAX_MESSAGE_BYTES, encode_message, parse_message, tls_context
+from utils.wire import (FORMAT_BINARY, FORMAT_JSON, SCALE, FRAME_HEADER, FRAME_SAMPLE, MAX_FRAME_BYTES,
+                        SampleDecoder, ack_frame)
+
+# Xesh halqasida har bir shardning virtual tugunlari soni
+RING_REPLICAS = 64
+
+# "Xost jim" alerti (agent namuna yuborishni to'xtatgan)
+SILENT_METRIC = 'Heartbeat'
+SILENT_TITLE = "💀 HOST SILENT"
+
+# listen() navbati: ko'p agent bir vaqtda qayta ulanganda SYN lar tashlanmasligi uchun
+LISTEN_BACKLOG = 4096
+
+
+
+class HashRing:
+    def __init__(self, nodes, replicas=RING_REPLICAS):
+        """
+        Izchil xesh halqasi: shardlar soni o'zgarganda xostlarning faqat kichik qismi ko'chadi
+
+        Args:
+            nodes (list): Tugunlar (shard indekslari)
+            replicas (int): Har bir tugunning virtual nuqtalari soni
+        """
+        points = sorted((self._hash(f"{node}#{replica}"), node) for node in nodes for replica in range(replicas))
+        self._keys = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    @staticmethod
+    def _hash(key):
+        # Python hash() jarayonlar orasida tasodifiy - barqaror xesh kerak
+        return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+    def node(self, key):
+        """
+        Kalit biriktirilgan tugun
+
+        Args:
+            key (str): Xost nomi
+
+        Returns:
+            Tugun (halqadagi soat yo'nalishidagi birinchi nuqta)
+        """
+        index = bisect.bisect(self._keys, self._hash(key)) % len(self._keys)
+        return self._nodes[index]
+
+
+class RemoteMonitor:
+    """
+    Agentning oxirgi namunasini SystemMonitor interfeysi orqali beruvchi obyekt
+    (formatter xabardagi qiymatlarni shu yerdan oladi)
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.system_info = {}
+
+    def update(self, metrics, system_info):
+        self.metrics = metrics
+        self.system_info = system_info
+
+    def get_system_info(self):
+        return self.system_info
+
+    def check_ram_usage(self):
+        return self.metrics.get('ram', 0)
+
+    def check_cpu_usage(self):
+        return self.metrics.get('cpu', 0)
+
+    def check_disk_usage(self):
+        return self.metrics.get('disk', 0)
+
+    def check_swap_usage(self):
+        return self.metrics.get('swap', 0)
+
+    def check_load_average(self):
+        return self.metrics.get('load', 0)
+
+    def check_network_usage(self):
+        return self.metrics.get('network') or [0, 0]
+
+    def get_top_processes(self, metric="CPU"):
+        # Jarayonlar ro'yxati agentda qoladi
+        return ""
+
+
+class HostContext:
+    def __init__(self, host, config, logger, notifiers):
+        """
+        Bitta xostning alert holati
+
+        Args:
+            host (str): Xost nomi (agent salomlashuvidagi)
+            config (dict): Konfiguratsiya sozlamalari
+            logger (logging.Logger): Log yozish uchun logger obyekti
+            notifiers (NotifierDispatcher): Umumiy alert backendlari
+        """
+        self.host = host
+        self.config = dict(config)
+        if config.get('anomaly_state_path'):
+            # Har bir xostning bazaviy qiymatlari alohida faylda
+            self.config['anomaly_state_path'] = f"{config['anomaly_state_path']}.{host}"
+        self.monitor = RemoteMonitor()
+        formatter = AlertFormatter(self.config, logger, self.monitor)
+        self.alert_manager = AlertManager(self.config, logger, formatter, self.monitor, notifiers)
+        # Oynalar agent namunalari orasidagi kuzatilgan oraliq bo'yicha kengayadi va to'ladi;
+        # boshlang'ich sig'im aggregator_sample_interval dan (0 - agregatorning check_interval i)
+        sample_interval = config.get('aggregator_sample_interval') or config.get('check_interval', 60)
+        self.alert_windows = AlertWindows(dict(self.config, check_interval=sample_interval), logger)
+        self.anomaly_detector = AnomalyDetector(self.config, logger)
+        self.last_seen = None
+        # "Xost jim" alerti yuborilgan bo'lsa - oxirgi namuna vaqti
+        self.silent_since = None
+
+
+class HostState:
+    """
+    Xostning asyncio tsiklidagi holati: takrorlarni aniqlash uchun agent
+    sessiyasi, shardga uzatilgan va shard qayta ishlagan oxirgi seq
+    """
+
+    __slots__ = ('host', 'shard', 'session', 'dispatched', 'last_seq', 'last_seen')
+
+    def __init__(self, host, shard):
+        self.host = host
+        self.shard = shard
+        self.session = None
+        self.dispatched = 0
+        self.last_seq = 0
+        self.last_seen = None
+
+
+class Connection:
+    def __init__(self, conn_id, host, session, writer, wire_format):
+        """
+        Bitta agent ulanishi
+
+        Args:
+            conn_id (int): Ulanish raqami (shard tasdiqlarini yo'naltirish uchun)
+            host (str): Agent xosti
+            session (str): Agent sessiyasi
+            writer (asyncio.StreamWriter): Yozish oqimi
+            wire_format (str): Kelishilgan format
+        """
+        self.id = conn_id
+        self.host = host
+        self.session = session
+        self.writer = writer
+        self.binary = wire_format == FORMAT_BINARY
+        # Shardga uzatilgan, ammo hali tasdiqlanmagan namunalar
+        self.inflight = 0
+        self.window = asyncio.Event()
+
+    def ack(self, seq):
+        if self.writer.is_closing():
+            return
+        self.writer.write(ack_frame(seq) if self.binary else encode_message({'type': 'ack', 'seq': seq}))
+
+
+class Shard:
+    def __init__(self, index, config, logger, outbox, database=None, process=False, vectorized=False):
+        """
+        Xostlar holatini yurituvchi va ular bo'yicha qoidalarni baholovchi ishchi
+
+        Args:
+            index (int): Shard raqami
+            config (dict): Konfiguratsiya sozlamalari
+            logger (logging.Logger): Log yozish uchun logger obyekti
+            outbox: Qayta ishlangan namunalar navbati (umumiy)
+            database (Database, optional): Oqim rejimida umumiy baza
+            process (bool): Alohida jarayonda ishlash (o'z bazasi va notifier'lari bilan)
+            vectorized (bool): Threshold va oyna qoidalarini har tickda NumPy ustunlarida baholash
+        """
+        self.index = index
+        self.config = config
+        self.logger = logger
+        self.outbox = outbox
+        self.database = database
+        self.max_alert_age = float(config.get('aggregator_max_alert_age', 300))
+        self.silent_title = config.get('heartbeat_alert_title', SILENT_TITLE)
+        self.vectorized = vectorized
+        self.eval_interval = float(config.get('aggregator_eval_interval', 1))
+        # Park ustunlari (core/fleet.py) - ishchi ichida yaratiladi
+        self.fleet = None
+        # Faqat oqim rejimida shu jarayondan ko'rinadi
+        self.hosts = {}
+        # Navbat namunalar ro'yxati (paket) bilan ishlaydi: jarayonlar orasida har
+        # namuna uchun alohida pickle va pipe yozuvi bo'lmasligi uchun. Hajm
+        # chegarasini agregator tsikli pending bo'yicha kuzatadi
+        if process:
+            context = multiprocessing.get_context('fork')
+            self.inbox = context.Queue()
+            self.worker = context.Process(target=self.run, name=f'aggregator-shard-{index}', daemon=True)
+        else:
+            self.inbox = queue.Queue()
+            self.worker = threading.Thread(target=self.run, name=f'aggregator-shard-{index}', daemon=True)
+        self.process = process
+        # Quyidagilar faqat agregator tsiklida ishlatiladi
+        self.batch = []
+        self.pending = 0
+        self.window = asyncio.Event()
+
+    def start(self):
+        self.worker.start()
+
+    def run(self):
+        """
+        Ishchi sikli: [(ulanish, xost, sessiya, namuna)] -> [(ulanish, xost, sessiya, seq, eski)]
+        ("xost jim" hodisalari ulanishsiz keladi va natija qaytarmaydi). Vektorli
+        rejimda har eval_interval da qoidalar baholanadi va ustunlar nusxasi
+        ('fleet', shard, snapshot) ko'rinishida agregatorga yuboriladi
+        """
+        database = self.database
+        if self.process and self.config.get('db_enabled', False):
+            from utils.database import Database
+            config = dict(self.config)
+            # Yozilmagan qatorlar har bir shardning o'z spill fayliga tushadi
+            config['db_spill_path'] = f"{config.get('db_spill_path', '/var/lib/system-monitor/metrics_spill.ndjson')}.{self.index}"
+            try:
+                database = Database(config, self.logger)
+            except Exception as e:
+                self.logger.error(f"Shard {self.index}: ma'lumotlar bazasiga ulanishda xatolik: {e}")
+        if self.vectorized:
+            from core.fleet import FleetState
+            self.fleet = FleetState(self.config, self.logger)
+        notifiers = NotifierDispatcher(self.config, self.logger)
+        next_tick = time.monotonic() + self.eval_interval
+        try:
+            while True:
+                try:
+                    batch = self.inbox.get(timeout=max(0, next_tick - time.monotonic()) if self.fleet else None)
+                except queue.Empty:
+                    batch = []
+                if batch is None:
+                    break
+                results = []
+                for conn_id, host, session, message in batch:
+                    context = self.hosts.get(host)
+                    if context is None:
+                        context = self.hosts[host] = HostContext(host, self.config, self.logger, notifiers)
+                        self.logger.info(f"Yangi agent xosti: {host} (shard {self.index})")
+                    if message.get('type') == 'silent':
+                        self.silent(context, message, database)
+                        continue
+                    stale = self.ingest(context, message, database)
+                    results.append((conn_id, host, session, int(message['seq']), stale))
+                if results:
+                    self.outbox.put(results)
+                if self.fleet is not None and time.monotonic() >= next_tick:
+                    if self.evaluate(database):
+                        self.outbox.put(('fleet', self.index, self.fleet.snapshot()))
+                    next_tick = time.monotonic() + self.eval_interval
+        finally:
+            for context in self.hosts.values():
+                context.anomaly_detector.save_state()
+            notifiers.close()
+            if database is not None and database is not self.database:
+                database.close()
+
+    def ingest(self, context, message, database=None):
+        """
+        Agent namunasini saqlash va uning bo'yicha alertlarni baholash
+
+        Backfill paytida kelgan eski namunalar bazaga yoziladi, ammo
+        aggregator_max_alert_age dan eski bo'lsa alert berilmaydi.
+
+        Args:
+            context (HostContext): Xost holati
+            message (dict): sample xabari
+            database (Database, optional): Metrikalar yoziladigan baza
+
+        Returns:
+            bool: Namuna alert uchun juda eski bo'lsa True
+        """
+        timestamp = float(message.get('ts') or time.time())
+        metrics = message.get('metrics') or {}
+        system_info = dict(message.get('system_info') or {})
+        system_info.setdefault('hostname', context.host)
+        system_info.setdefault('ip', '')
+
+        context.last_seen = time.time()
+        context.monitor.update(metrics, system_info)
+        try:
+            if context.silent_since is not None:
+                silence = int(context.last_seen - context.silent_since)
+                context.alert_manager.send_recovery_alert(SILENT_METRIC, f"namunalar qayta kelmoqda ({silence}s jim turdi)",
+                                                          self.silent_title, database, system_info)
+                context.silent_since = None
+
+            if database:
+                database.store_metrics(metrics, system_info, timestamp)
+
+            if time.time() - timestamp > self.max_alert_age:
+                return True
+
+            if self.fleet is None:
+                evaluate_alerts(context.config, metrics, system_info, context.alert_manager, context.alert_windows,
+                                context.anomaly_detector, database, timestamp=timestamp)
+                return False
+
+            # Threshold va oynalar keyingi tickda butun shard uchun baholanadi;
+            # anomaliya bazaviy qiymatlari esa har bir namunada yangilanadi
+            self.fleet.update(context.host, metrics, timestamp)
+            if context.anomaly_detector.enabled:
+                for metric_type, metric_key, unit in self.fleet.checks:
+                    value = metric_value(metrics, metric_key)
+                    evaluate_anomaly(metric_type, metric_key, value, unit, format_usage(metric_key, value, unit),
+                                     context.alert_manager, context.anomaly_detector, database, system_info, timestamp)
+        except Exception as e:
+            self.logger.error(f"{context.host} namunasini qayta ishlashda xatolik: {e}", exc_info=True)
+        return False
+
+    def evaluate(self, database=None):
+        """
+        Tick: shard xostlari qoidalarini vektorli baholash; alert faqat shart
+        bajarilgan xostlarga yuboriladi, shart bajarilmay qolganlarniki yopiladi
+
+        Args:
+            database (Database, optional): Alertlar yoziladigan baza
+
+        Returns:
+            bool: Oxirgi tickdan keyin namuna kelgan bo'lsa True
+        """
+        if not self.fleet.changed():
+            return False
+        for host, metric_type, metric_key, unit, value, triggered, compared, required in \
+                self.fleet.evaluate(max_age=self.max_alert_age):
+            context = self.hosts[host]
+            system_info = context.monitor.system_info
+            usage_value = format_usage(metric_key, value, unit)
+            try:
+                if triggered:
+                    usage_value += self.fleet.windows.describe(metric_key, compared, unit)
+                    context.alert_manager.format_and_send_metric_alert(metric_type, usage_value, database, system_info,
+                                                                       compared, required)
+                else:
+                    context.alert_manager.resolve_metric_alert(metric_type, usage_value, system_info)
+            except Exception as e:
+                self.logger.error(f"{host} alertlarini baholashda xatolik: {e}", exc_info=True)
+        return True
+
+    def silent(self, context, message, database=None):
+        """
+        Agregator timeout ichida namuna olmagan xost uchun "xost jim" alertini yuborish
+
+        Args:
+            context (HostContext): Xost holati
+            message (dict): silent hodisasi (last_seen - oxirgi namuna vaqti, epoch)
+            database (Database, optional): Alertlar yoziladigan baza
+        """
+        if context.silent_since is not None:
+            return
+        last_seen = float(message.get('last_seen') or time.time())
+        context.silent_since = last_seen
+        system_info = dict(context.monitor.system_info or {})
+        system_info.setdefault('hostname', context.host)
+        system_info.setdefault('ip', '')
+        seen = datetime.datetime.fromtimestamp(last_seen).strftime('%Y-%m-%d %H:%M:%S')
+        usage_value = f"{int(time.time() - last_seen)}s dan beri namuna yo'q (oxirgi: {seen})"
+        self.logger.warning(f"{context.host} jim: {usage_value}")
+        try:
+            context.alert_manager.format_and_send_metric_alert(SILENT_METRIC, usage_value, database, system_info,
+                                                               alert_title=self.silent_title, severity='critical')
+        except Exception as e:
+            self.logger.error(f"{context.host} jim xost alertini yuborishda xatolik: {e}", exc_info=True)
+
+    def stop(self, timeout):
+        """
+        Navbatdagi namunalarni qayta ishlab bo'lgach ishchini to'xtatish
+        """
+        self.inbox.put(None)
+        self.worker.join(timeout)
+        if self.process:
+            if self.worker.is_alive():
+                self.worker.terminate()
+            self.inbox.close()
+
+
+class Aggregator:
+    def __init__(self, config, logger, database=None):
+        """
+        Agregator serverini fon oqimidagi asyncio tsiklida ishga tushirish
+
+        Args:
+            config (dict): Konfiguratsiya sozlamalari
+            logger (logging.Logger): Log yozish uchun logger obyekti
+            database (Database, optional): Barcha xostlar metrikalari yoziladigan baza
+                (faqat aggregator_workers = 0 da; jarayon shardlari o'z ulanishini ochadi)
+
+        Raises:
+            OSError: Portni band qilib bo'lmadi
+        """
+        self.config = config
+        self.logger = logger
+        self.address = config.get('aggregator_address', '0.0.0.0')
+        self.port = int(config.get('aggregator_port', 9700))
+        self.token = config.get('aggregator_token', '')
+        self.timeout = float(config.get('aggregator_timeout', 30))
+        self.buffer_bytes = max(4096, int(config.get('aggregator_buffer_bytes', 65536)))
+        self.max_inflight = max(1, int(config.get('aggregator_max_inflight', 256)))
+        # Shuncha soniya namuna yubormagan xost uchun "xost jim" alerti (0 - o'chirilgan)
+        self.silence_timeout = float(config.get('aggregator_silence_timeout', 180))
+        # Threshold/oyna qoidalarini NumPy ustunlarida baholash (numpy bo'lmasa har namuna alohida)
+        self.vectorized = config.get('aggregator_vectorized', True)
+        if self.vectorized:
+            try:
+                import numpy  # noqa: F401
+            except ImportError:
+                self.logger.warning("numpy o'rnatilmagan: qoidalar har bir namuna uchun alohida baholanadi")
+                self.vectorized = False
+        self.context = tls_context(config, 'aggregator', server_side=True)
+
+        workers = max(0, int(config.get('aggregator_workers', 0)))
+        self.queue_size = max(1, int(config.get('aggregator_queue_size', 10000)))
+        # Jarayonlar fork qilinishi uchun shardlar boshqa oqimlardan oldin ishga tushadi
+        self._outbox = multiprocessing.get_context('fork').Queue() if workers else queue.Queue()
+        self.shards = [Shard(index, config, logger, self._outbox, None if workers else database,
+                             process=bool(workers), vectorized=self.vectorized)
+                       for index in range(max(1, workers))]
+        self.ring = HashRing(range(len(self.shards)))
+        for shard in self.shards:
+            shard.start()
+
+        self.hosts = {}
+        self._connections = {}
+        self._conn_ids = 0
+        self._flush_scheduled = False
+        # Xostlar jimlik muddatlari (tsikl vaqti bo'yicha); _listen da yaratiladi
+        self.wheel = None
+
+        self.samples = 0
+        self.duplicates = 0
+        self.stale = 0
+        self.connections = 0
+        self.backpressure = 0
+        self.silences = 0
+        # Shardlar ustunlarining oxirgi nusxalari (fleet_summary uchun)
+        self._fleet = {}
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='aggregator', daemon=True)
+        self._thread.start()
+        try:
+            self._server = asyncio.run_coroutine_threadsafe(self._listen(), self._loop).result()
+        except Exception:
+            self._shutdown()
+            self._loop.close()
+            raise
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._acks = threading.Thread(target=self._deliver, name='aggregator-acks', daemon=True)
+        self._acks.start()
+        self.logger.info(f"Agregator ishga tushdi: {self.address}:{self.port}{' (TLS)' if self.context else ''}, "
+                         f"{len(self.shards)} shard ({'jarayon' if workers else 'oqim'})")
+
+    async def _listen(self):
+        if self.silence_timeout > 0:
+            self.wheel = TimerWheel(self._loop.time())
+            self._loop.create_task(self._watch())
+        return await asyncio.start_server(self._serve, self.address, self.port, ssl=self.context,
+                                          ssl_handshake_timeout=self.timeout if self.context else None,
+                                          limit=self.buffer_bytes, backlog=LISTEN_BACKLOG, reuse_address=True)
+
+    def _host(self, host):
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = HostState(host, self.ring.node(host))
+        return state
+
+    async def _serve(self, reader, writer):
+        peer = (writer.get_extra_info('peername') or ('?',))[0]
+        connection = None
+        try:
+            line = await asyncio.wait_for(reader.readline(), self.timeout)
+            if not line:
+                return
+            hello = parse_message(line)
+            if hello.get('type') != 'hello' or hello.get('version') != PROTOCOL_VERSION or not hello.get('host'):
+                writer.write(encode_message({'type': 'error', 'error': "kutilgan hello xabari emas"}))
+                return
+            if not hmac.compare_digest(str(hello.get('token', '')).encode(), self.token.encode()):
+                self.logger.warning(f"Agent {peer} noto'g'ri token bilan ulandi")
+                writer.write(encode_message({'type': 'error', 'error': "noto'g'ri token"}))
+                return
+
+            host, session = str(hello['host']), str(hello.get('session', ''))
+            state = self._host(host)
+            if state.session != session:
+                # Agent qayta ishga tushgan - seq yangidan boshlanadi
+                state.session = session
+                state.dispatched = state.last_seq = 0
+            # Shardda navbatda turganlar ham tasdiqlanmagan hisoblanadi: agent ularni
+            # qayta yuboradi va dispatched bo'yicha takror sifatida darhol tasdiqlanadi
+            last_seq = state.last_seq
+            # Format kelishuvi: agent sxemasi shu agregator aniqligida bo'lsa binary
+            schema = hello.get('schema')
+            wire_format = FORMAT_JSON
+            if FORMAT_BINARY in (hello.get('formats') or []) and schema and hello.get('scale') == SCALE:
+                wire_format = FORMAT_BINARY
+            writer.write(encode_message({'type': 'welcome', 'last_seq': last_seq, 'format': wire_format}))
+
+            self._conn_ids += 1
+            connection = self._connections[self._conn_ids] = Connection(self._conn_ids, host, session, writer,
+                                                                        wire_format)
+            self.connections += 1
+            self.logger.info(f"Agent ulandi: {host} ({peer}, {wire_format}), oxirgi seq {last_seq}")
+
+            decoder = SampleDecoder(schema) if wire_format == FORMAT_BINARY else None
+            while True:
+                if decoder:
+                    try:
+                        header = await reader.readexactly(FRAME_HEADER.size)
+                    except asyncio.IncompleteReadError as e:
+                        if e.partial:
+                            raise ValueError("Ramka to'liq emas")
+                        break
+                    length, kind = FRAME_HEADER.unpack(header)
+                    if length > MAX_FRAME_BYTES:
+                        raise ValueError(f"Ramka juda katta: {length} bayt")
+                    try:
+                        body = await reader.readexactly(length)
+                    except asyncio.IncompleteReadError:
+                        raise ValueError("Ramka to'liq emas")
+                    if kind != FRAME_SAMPLE:
+                        continue
+                    message = decoder.decode(memoryview(body))
+                else:
+                    # Qator aggregator_buffer_bytes dan uzun bo'lsa readline ValueError beradi
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    if len(line) > MAX_MESSAGE_BYTES or not line.endswith(b'\n'):
+                        raise ValueError("Xabar juda katta yoki to'liq emas")
+                    message = parse_message(line)
+                    if message.get('type') != 'sample':
+                        continue
+                await self._dispatch(connection, state, message)
+                # Agent tasdiqlarni o'qimayotgan bo'lsa yozish buferi ham cheksiz o'smaydi
+                await writer.drain()
+            self.logger.info(f"Agent uzildi: {host} ({peer})")
+        except (OSError, ValueError, KeyError, asyncio.TimeoutError) as e:
+            self.logger.warning(f"Agent {peer} ulanishida xatolik: {e}")
+        except asyncio.CancelledError:
+            # Agregator yopilmoqda
+            pass
+        finally:
+            if connection is not None:
+                self._connections.pop(connection.id, None)
+            writer.close()
+
+    async def _dispatch(self, connection, state, message):
+        """
+        Namunani xost shardiga uzatish (takrorlar shardga yetmaydi)
+
+        Ulanishning tasdiqlanmagan namunalari aggregator_max_inflight ga yoki
+        shardda navbatdagilar aggregator_queue_size ga yetsa, ulanish o'qilmay kutadi.
+        """
+        seq = int(message['seq'])
+        if state.session != connection.session or seq <= state.dispatched:
+            self.duplicates += 1
+            connection.ack(seq)
+            return
+        state.dispatched = seq
+        state.last_seen = time.time()
+        if self.wheel is not None:
+            # Har namunada O(1): faqat shu xost muddati ko'chiriladi
+            self.wheel.schedule(state.host, self._loop.time() + self.silence_timeout)
+
+        while connection.inflight >= self.max_inflight:
+            connection.window.clear()
+            await connection.window.wait()
+        shard = self.shards[state.shard]
+        while shard.pending >= self.queue_size:
+            self.backpressure += 1
+            shard.window.clear()
+            await shard.window.wait()
+        connection.inflight += 1
+        shard.pending += 1
+        self._enqueue(shard, (connection.id, state.host, connection.session, message))
+
+    async def _watch(self):
+        """
+        Jim xostlarni aniqlash: g'ildirak har tickda suriladi, muddati o'tgan
+        xostlar uchun shardga silent hodisasi yuboriladi (bir marta - keyingi
+        namunagacha xost g'ildirakda bo'lmaydi)
+        """
+        while True:
+            await asyncio.sleep(self.wheel.resolution)
+            for host in self.wheel.advance(self._loop.time()):
+                state = self.hosts.get(host)
+                if state is None:
+                    continue
+                self.silences += 1
+                self._enqueue(self.shards[state.shard],
+                              (None, host, state.session, {'type': 'silent', 'last_seen': state.last_seen}))
+
+    def _enqueue(self, shard, item):
+        # Shu tsikl aylanishida kelgan elementlar bitta paket bo'lib uzatiladi
+        shard.batch.append(item)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._loop.call_soon(self._flush)
+
+    def _flush(self):
+        self._flush_scheduled = False
+        for shard in self.shards:
+            if shard.batch:
+                shard.inbox.put(shard.batch)
+                shard.batch = []
+
+    def _processed(self, batches):
+        """
+        Shardlar qayta ishlagan namunalarni tasdiqlash (tsikl oqimida)
+        """
+        for results in batches:
+            if isinstance(results, tuple):
+                _, index, snapshot = results
+                self._fleet[index] = snapshot
+                continue
+            for conn_id, host, session, seq, stale in results:
+                self.samples += 1
+                if stale:
+                    self.stale += 1
+                state = self.hosts.get(host)
+                if state is not None:
+                    shard = self.shards[state.shard]
+                    shard.pending -= 1
+                    shard.window.set()
+                    if state.session == session and seq > state.last_seq:
+                        state.last_seq = seq
+                connection = self._connections.get(conn_id)
+                if connection is not None:
+                    connection.inflight -= 1
+                    connection.window.set()
+                    connection.ack(seq)
+
+    def fleet_summary(self, top=5):
+        """
+        Park bo'yicha umumiy ko'rsatkichlar: barcha shardlar ustunlari
+        birlashtirilib, persentillar va CPU bo'yicha top-N vektorli hisoblanadi
+
+        Args:
+            top (int): CPU bo'yicha eng yuklangan xostlar soni
+
+        Returns:
+            dict: core.fleet.summarize() natijasi (vektorli rejim o'chirilgan bo'lsa None)
+        """
+        if not self.vectorized:
+            return None
+        from core.fleet import summarize_snapshots
+        return summarize_snapshots(list(self._fleet.values()), top)
+
+    def _deliver(self):
+        # Shardlar natijalarini to'plab, tsiklga bitta chaqiruv bilan uzatish
+        while True:
+            batches = [self._outbox.get()]
+            while batches[-1] is not None:
+                try:
+                    batches.append(self._outbox.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batches[-1] is None
+            if stop:
+                batches.pop()
+            if batches:
+                try:
+                    self._loop.call_soon_threadsafe(self._processed, batches)
+                except RuntimeError:
+                    # Tsikl yopilgan
+                    return
+            if stop:
+                return
+
+    async def _close_server(self):
+        self._server.close()
+        # Navbat yoki tasdiq kutayotgan ulanishlar ham yopiladi
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            await asyncio.wait_for(self._server.wait_closed(), self.timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _shutdown(self):
+        for shard in self.shards:
+            shard.stop(self.timeout)
+        self._outbox.put(None)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(self.timeout)
+
+    def close(self):
+        """
+        Serverni to'xtatish; shardlar navbatdagi namunalarni qayta ishlab,
+        bazaviy qiymatlarni saqlaydi va navbatdagi alertlarni yuboradi
+        """
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_server(), self._loop).result(self.timeout)
+        except Exception as e:
+            self.logger.error(f"Agregatorni to'xtatishda xatolik: {e}")
+        self._shutdown()
+        self._acks.join(self.timeout)
+        self._loop.close()
@@ -7,12 +7,18 @@ Alert xabarlarini yuborish moduli - tez-tez xabar yuborish uchun o'zgartirilgan
 
 import time
 import json
+import html
+import socket
 import logging
+import threading
 import requests
 from datetime import datetime
+from concurrent.futures import Future
+
+from core.notifiers import NotifierDispatcher, TelegramNotifier, SEVERITIES
 
 class AlertManager:
-    def __init__(self, config, logger, formatter, monitor=None):
+    def __init__(self, config, logger, formatter, monitor=None, notifiers=None):
         """
         Alert managerini ishga tushirish
         
@@ -21,6 +27,8 @@ class AlertManager:
             logger (logging.Logger): Log yozish uchun logger obyekti
             formatter (AlertFormatter): Alert xabarlarini formatlash uchun formatter obyekti
             monitor (SystemMonitor, optional): Tizim monitoring obyekti
+            notifiers (NotifierDispatcher, optional): Umumiy backendlar (agregatorda barcha
+                xostlar uchun bitta); berilmasa konfiguratsiyadan yaratiladi
         """
         self.config = config
         self.logger = logger
@@ -44,8 +52,17 @@ class AlertManager:
         # Prometheus metrikalarini saqlash uchun lug'at
         self.prometheus_metrics = {}
         
-        # Telegram bog'lanishini tekshirish
-        self._check_telegram_connection()
+        # Alert yuborish backendlari (Telegram, webhook, SMTP, syslog, fayl)
+        shared = notifiers is not None
+        self.notifiers = notifiers if shared else NotifierDispatcher(config, logger)
+        
+        # Faol incidentlar: continuous rejimda bitta Telegram xabari joyida yangilanadi
+        self.edit_in_place = config.get('telegram_edit_in_place', True)
+        self.incidents = {}
+        
+        # Telegram bog'lanishini tekshirish (umumiy backendlarni yaratgan tomon tekshiradi)
+        if not shared and self.notifiers.find_type('telegram'):
+            self._check_telegram_connection()
     
     def _check_telegram_connection(self):
         """
@@ -231,7 +248,7 @@ class AlertManager:
     
     def _send_telegram_message(self, message, parse_mode='HTML'):
         """
-        Telegram xabarini yuborish
+        Telegram xabarini sinxron yuborish (Telegram backendi orqali)
         
         Args:
             message (str): Xabar matni
@@ -244,43 +261,301 @@ class AlertManager:
             self.logger.warning("Telegram bot token yoki chat ID ko'rsatilmagan")
             return False
         
-        url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
+        telegram = self.notifiers.find_type('telegram') or TelegramNotifier(
+            'telegram', {'bot_token': self.bot_token, 'chat_id': self.chat_id}, self.logger)
+        
+        return bool(telegram.deliver({'message': message, 'parse_mode': parse_mode}))
+    
+    def _classify_severity(self, metric_key, current_value):
+        """
+        Alert jiddiyligini aniqlash
+        
+        `<metrika>_critical_threshold` ko'rsatilgan va qiymat undan oshgan bo'lsa
+        critical, aks holda warning.
+        
+        Args:
+            metric_key (str): Standartlashtirilgan metrika kaliti
+            current_value (float): Joriy qiymat
+            
+        Returns:
+            str: Jiddiylik darajasi
+        """
+        critical_threshold = self.config.get(f"{metric_key}_critical_threshold")
+        if critical_threshold is not None and current_value is not None and current_value >= critical_threshold:
+            return 'critical'
+        return 'warning'
+    
+    def _build_alert(self, metric_type, usage_value, title, message, severity, system_info, parse_mode):
+        """
+        Backendlarga uzatiladigan alert ma'lumotlarini tayyorlash
         
-        data = {
-            'chat_id': self.chat_id,
-            'text': message,
-            'parse_mode': parse_mode
+        Returns:
+            dict: Alert ma'lumotlari
+        """
+        system_info = system_info or {}
+        return {
+            'hostname': system_info.get('hostname', socket.gethostname()),
+            'ip': system_info.get('ip', ''),
+            'metric': metric_type,
+            'value': usage_value,
+            'severity': severity,
+            'title': title,
+            'message': message,
+            'parse_mode': parse_mode,
+            'timestamp': time.time(),
         }
+    
+    def _dispatch(self, alert, database=None, system_info=None):
+        """
+        Alertni backendlarga tarqatish va ma'lumotlar bazasiga yozish
+        
+        Backendlar o'z oqimlarida ishlaydi, shuning uchun bu metod kutmaydi.
+        Alert bazaga oxirgi backend tugaganda haqiqiy yuborilish natijasi bilan
+        yoziladi (hech bo'lmaganda bittasi yetkazgan bo'lsa True).
+        
+        Args:
+            alert (dict): Alert ma'lumotlari
+            database (Database, optional): Ma'lumotlar bazasi obyekti
+            system_info (dict, optional): Tizim ma'lumotlari
+            
+        Returns:
+            tuple: ({backend nomi: Future}, Future) - backendlar (hech biri qabul qilmasa
+                   bo'sh) va umumiy yetkazilish natijasi (bool)
+        """
+        futures = self.notifiers.dispatch(alert)
+        if not futures:
+            self.logger.warning(f"{alert['metric']} alerti uchun mos backend topilmadi ({alert['severity']})")
         
-        max_retries = 3
-        retry_delay = 2
-        
-        for attempt in range(1, max_retries + 1):
-            try:
-                response = requests.post(url, data=data, timeout=10)
-                
-                if response.status_code == 200:
-                    return True
-                else:
-                    self.logger.warning(f"Telegramga xabar yuborishda xatolik (urinish {attempt}/{max_retries}): {response.reason}")
-                    
-                    if attempt < max_retries:
-                        time.sleep(retry_delay)
-                        retry_delay *= 2
-            except Exception as e:
-                self.logger.warning(f"Telegramga xabar yuborishda xatolik (urinish {attempt}/{max_retries}): {str(e)}")
-                
-                if attempt < max_retries:
-                    time.sleep(retry_delay)
-                    retry_delay *= 2
-        
-        self.logger.error(f"Telegramga xabar yuborib bo'lmadi ({max_retries} urinishdan so'ng)")
-        self.logger.error(f"BOT_TOKEN: {self.bot_token[:3]}...")
-        self.logger.error(f"CHAT_ID: {self.chat_id}")
-        
-        return False
+        delivered = Future()
+        if database and hasattr(database, 'store_alert'):
+            system_info = system_info or {'hostname': alert['hostname']}
+            
+            def store(done):
+                # Oxirgi backend oqimida chaqiriladi
+                try:
+                    database.store_alert(alert['metric'], alert['value'], alert['message'], done.result(), system_info)
+                except Exception as e:
+                    self.logger.error(f"Ma'lumotlar bazasiga saqlashda xatolik: {str(e)}")
+            
+            delivered.add_done_callback(store)
+        
+        if not futures:
+            delivered.set_result(False)
+            return futures, delivered
+        
+        lock = threading.Lock()
+        pending = [len(futures)]
+        
+        def finished(_):
+            with lock:
+                pending[0] -= 1
+                if pending[0]:
+                    return
+            ok = any(future.exception() is None and future.result() for future in futures.values())
+            if not ok:
+                self.logger.error(f"{alert['metric']} alerti hech bir backendga yetkazilmadi")
+            delivered.set_result(ok)
+        
+        for future in list(futures.values()):
+            future.add_done_callback(finished)
+        return futures, delivered
+    
+    def _release_interval(self, delivered, alert_key):
+        """
+        Alert hech bir backendga yetkazilmasa, keyingi tekshiruv qayta yuborishi
+        uchun alert vaqtini bekor qilish
+        
+        Args:
+            delivered (Future): _dispatch() qaytargan yetkazilish natijasi
+            alert_key (str): Standartlashtirilgan alert kaliti
+        """
+        sent_at = self.last_alert_times.get(alert_key)
+        
+        def release(done):
+            # Shu orada yangi alert yuborilgan bo'lsa, uning vaqti saqlanadi
+            if not done.result() and self.last_alert_times.get(alert_key) == sent_at:
+                self.last_alert_times.pop(alert_key, None)
+        
+        delivered.add_done_callback(release)
+    
+    def close(self):
+        """
+        Navbatdagi alertlarni yuborib, backendlarni to'xtatish
+        """
+        self.notifiers.close()
+    
+    def _incidents_enabled(self):
+        """
+        Incident xabarlarini joyida tahrirlash yoqilganligi
+        
+        Returns:
+            bool: continuous rejimda va telegram_edit_in_place yoqilgan bo'lsa True
+        """
+        return self.alert_mode == 'continuous' and self.edit_in_place and self.notifiers.find_type('telegram') is not None
+    
+    def _incident_key(self, metric_key, alert_title):
+        return f"{metric_key}:{alert_title}"
+    
+    def _format_incident_update(self, incident, usage_value, hostname):
+        """
+        Incident xabarining qisqa (tahrirlanadigan) ko'rinishi
+        
+        Args:
+            incident (dict): Incident holati
+            usage_value (str): Joriy qiymat matni
+            hostname (str): Server nomi
+            
+        Returns:
+            str: HTML xabar
+        """
+        now = time.time()
+        duration = int(now - incident['started'])
+        hours, remainder = divmod(duration, 3600)
+        minutes, seconds = divmod(remainder, 60)
+        duration_str = f"{hours}h {minutes}m" if hours else f"{minutes}m {seconds}s"
+        
+        return (
+            f"<b>{html.escape(incident['title'])}</b> ({incident['severity']})\n"
+            f"{self.config.get('alert_format_hostname_emoji', '🖥️')} Hostname: {html.escape(hostname)}\n"
+            f"📍 Current: {html.escape(usage_value)}\n"
+            f"⛰️ Peak: {html.escape(incident['peak_text'])}\n"
+            f"{self.config.get('alert_format_uptime_emoji', '⏳')} Duration: {duration_str}\n"
+            f"🔄 Updated: {datetime.fromtimestamp(now).strftime('%H:%M:%S')}"
+        )
     
-    def format_and_send_metric_alert(self, metric_type, usage_value, database=None, system_info=None, current_value=None, threshold=None):
+    def _update_incident(self, incident, usage_value, current_value, system_info):
+        """
+        Faol incidentning Telegram xabarini editMessageText bilan yangilash
+        
+        Tahrirlash muvaffaqiyatsiz tugasa incident tashlanadi, shuning uchun keyingi
+        alert yangi xabar yuboradi.
+        
+        Args:
+            incident (dict): Incident holati
+            usage_value (str): Joriy qiymat matni
+            current_value (float): Joriy qiymat (peak uchun)
+            system_info (dict): Tizim ma'lumotlari
+            
+        Returns:
+            bool: Yangilash navbatga qo'yilgan bo'lsa True; asl xabar yuborilmagan
+                  bo'lsa None (yangi xabar yuborish kerak)
+        """
+        if current_value is not None and (incident['peak_value'] is None or current_value >= incident['peak_value']):
+            incident['peak_value'] = current_value
+            incident['peak_text'] = usage_value
+        
+        future = incident['future']
+        if not future.done():
+            # Asl xabar hali yuborilmoqda - keyingi safar yangilanadi
+            self.logger.debug(f"{incident['title']} incident xabari hali yuborilmagan, yangilash o'tkazib yuborildi")
+            return False
+        
+        message_id = future.result() if future.exception() is None else None
+        if not isinstance(message_id, int) or isinstance(message_id, bool):
+            return None
+        
+        telegram = self.notifiers.find_type('telegram')
+        hostname = (system_info or {}).get('hostname', socket.gethostname())
+        update = {
+            'metric': incident['metric'],
+            'severity': incident['severity'],
+            'message': self._format_incident_update(incident, usage_value, hostname),
+            'parse_mode': 'HTML',
+            'edit_message_id': message_id,
+        }
+        edit = telegram.submit(update)
+        if edit is None:
+            return False
+        
+        metric_key = incident['key']
+        incident_key = self._incident_key(metric_key, incident['title'])
+        sent_at = self.last_alert_times.get(metric_key)
+        
+        def edited(done):
+            # Tahrirlab bo'lmadi (masalan, xabar o'chirilgan) - incident tashlanadi va
+            # interval tiklanadi, keyingi tekshiruv yangi xabar yuboradi
+            if done.exception() is None and done.result():
+                return
+            if self.incidents.get(incident_key) is incident:
+                self.incidents.pop(incident_key, None)
+                if self.last_alert_times.get(metric_key) == sent_at:
+                    self.last_alert_times.pop(metric_key, None)
+                self.logger.warning(f"{incident['title']} incident xabarini tahrirlab bo'lmadi, yangi xabar yuboriladi")
+        
+        edit.add_done_callback(edited)
+        self.logger.info(f"{incident['title']} incident xabari yangilanmoqda (message_id={message_id})")
+        return True
+    
+    def resolve_metric_alert(self, metric_type, usage_value, system_info=None, alert_title=None, alert_key=None):
+        """
+        Metrika normal holatga qaytganda faol incidentni yopish
+        
+        Incident bo'lmasa hech narsa qilinmaydi, shuning uchun har bir tekshiruvda
+        chaqirish arzon.
+        
+        Args:
+            metric_type (str): Metrika turi
+            usage_value (str): Joriy qiymat matni
+            system_info (dict, optional): Tizim ma'lumotlari
+            alert_title (str, optional): Incidentni ochgan alert sarlavhasi
+            alert_key (str, optional): Incidentni ochgan alertning interval kaliti
+            
+        Returns:
+            bool: Incident yopilgan bo'lsa True
+        """
+        metric_key = self._standardize_alert_key(metric_type)
+        if not alert_title:
+            alert_title = self.config.get(f"{metric_key}_alert_title", f"🚨 {metric_type} ALERT")
+        
+        rate_key = self._standardize_alert_key(alert_key or metric_type)
+        incident = self.incidents.pop(self._incident_key(rate_key, alert_title), None)
+        if incident is None:
+            return False
+        
+        # Keyingi incident darhol xabar yuborishi uchun interval tiklanadi
+        self.last_alert_times.pop(rate_key, None)
+        
+        hostname = (system_info or {}).get('hostname', socket.gethostname())
+        message = self._format_incident_update(incident, usage_value, hostname).replace(
+            f"<b>{html.escape(incident['title'])}</b> ({incident['severity']})",
+            f"✅ <b>RESOLVED: {html.escape(incident['title'])}</b>", 1)
+        alert = self._build_alert(metric_type, usage_value, f"RESOLVED: {incident['title']}", message, 'info', system_info, 'HTML')
+        
+        self.logger.info(f"{incident['title']} incident yopildi")
+        return bool(self.notifiers.dispatch(alert))
+    
+    def send_recovery_alert(self, metric_type, usage_value, alert_title, database=None, system_info=None):
+        """
+        Bir martalik alert holati (masalan, jim qolgan xost) tugaganini xabar qilish
+
+        Telegram incidenti bo'lsa u yopiladi; aks holda RESOLVED xabari barcha
+        backendlarga alohida yuboriladi.
+
+        Args:
+            metric_type (str): Metrika turi
+            usage_value (str): Joriy holat matni
+            alert_title (str): Holatni ochgan alert sarlavhasi
+            database (Database, optional): Ma'lumotlar bazasi obyekti
+            system_info (dict, optional): Tizim ma'lumotlari
+
+        Returns:
+            bool | Future: Incident yopilgan bo'lsa True; aks holda yetkazilish natijasi
+                (Future, bool) yoki hech bir backend qabul qilmasa False
+        """
+        metric_key = self._standardize_alert_key(metric_type)
+        if self._incident_key(metric_key, alert_title) in self.incidents:
+            return self.resolve_metric_alert(metric_type, usage_value, system_info, alert_title)
+
+        # Keyingi holat darhol xabar yuborishi uchun interval tiklanadi
+        self.last_alert_times.pop(metric_key, None)
+
+        message = self.formatter.format_metric_alert(metric_type, usage_value, 'HTML', f"✅ RESOLVED: {alert_title}", system_info)
+        alert = self._build_alert(metric_type, usage_value, f"RESOLVED: {alert_title}", message, 'info', system_info, 'HTML')
+        self.logger.info(f"{alert_title} holati tugadi")
+        futures, delivered = self._dispatch(alert, database, system_info)
+        return delivered if futures else False
+
+    def format_and_send_metric_alert(self, metric_type, usage_value, database=None, system_info=None, current_value=None, threshold=None, alert_title=None, severity=None, alert_key=None, mount=None):
         """
         Metrika uchun alohida xabar formatlab yuborish
         
@@ -291,9 +566,16 @@ class AlertManager:
             system_info (dict, optional): Tizim ma'lumotlari
             current_value (float, optional): Joriy qiymat
             threshold (float, optional): Chegara qiymati
+            alert_title (str, optional): Xabar sarlavhasi (standart: <metrika>_alert_title)
+            severity (str, optional): Jiddiylik (info, warning, critical); standart: qiymatdan aniqlanadi
+            alert_key (str, optional): Interval va incident kaliti (standart: metrika turi);
+                bitta metrikaning mustaqil alertlari (anomaliya, har bir disk) uchun
+            mount (str, optional): Disk alerti uchun mount (xabarda faqat shu mount bashorati)
             
         Returns:
-            bool: Xabar yuborilganligi
+            bool | Future: Yuborilmagan bo'lsa False; incident yangilanishi navbatga qo'yilsa
+                True; aks holda yetkazilish natijasi (Future, bool - hech bir backend
+                yetkazmasa False)
         """
         # Metrika turiga qarab alohida xabar yuborishni tekshirish
         metric_key = self._standardize_alert_key(metric_type)
@@ -303,14 +585,17 @@ class AlertManager:
             self.logger.debug(f"{metric_type} uchun alohida xabar yuborish o'chirilgan")
             return False
         
+        # Interval kaliti: boshqa alertlar bilan umumiy bo'lmasligi uchun alohida berilishi mumkin
+        rate_key = self._standardize_alert_key(alert_key or metric_type)
+        
         # Chegara qiymatidan oshganligini tekshirish
         if current_value is not None and threshold is not None:
-            if not self._check_threshold_crossing(metric_type, current_value, threshold):
+            if not self._check_threshold_crossing(rate_key, current_value, threshold):
                 self.logger.debug(f"{metric_type} alert yuborilmadi (threshold qiymatidan oshmagan)")
                 return False
         
         # Alert yuborish intervalini tekshirish
-        if not self.check_alert_interval(metric_type):
+        if not self.check_alert_interval(rate_key):
             return False
         
         # Metrika turiga qarab xabar formatini tanlash
@@ -318,11 +603,25 @@ class AlertManager:
         alert_format = self.config.get(alert_format_key, 'HTML')
         
         # Metrika turiga qarab xabar sarlavhasini tanlash
-        alert_title_key = f"{metric_key}_alert_title"
-        alert_title = self.config.get(alert_title_key, f"🚨 {metric_type} ALERT")
+        if not alert_title:
+            alert_title_key = f"{metric_key}_alert_title"
+            alert_title = self.config.get(alert_title_key, f"🚨 {metric_type} ALERT")
+        
+        if severity is None:
+            severity = self._classify_severity(metric_key, current_value)
+        
+        # Faol incident bo'lsa va jiddiylik oshmagan bo'lsa, mavjud xabar yangilanadi
+        incident_key = self._incident_key(rate_key, alert_title)
+        incident = self.incidents.get(incident_key) if self._incidents_enabled() else None
+        if incident and SEVERITIES.index(severity) <= SEVERITIES.index(incident['severity']):
+            updated = self._update_incident(incident, usage_value, current_value, system_info)
+            if updated is not None:
+                return updated
+            # Asl xabar yuborilmagan - yangi xabar yuboriladi
+            self.incidents.pop(incident_key, None)
         
         # Xabarni formatlash
-        message = self.formatter.format_metric_alert(metric_type, usage_value, alert_format, alert_title, system_info)
+        message = self.formatter.format_metric_alert(metric_type, usage_value, alert_format, alert_title, system_info, mount)
         
         if not message:
             self.logger.error(f"{metric_type} xabarini formatlashda xatolik")
@@ -333,20 +632,34 @@ class AlertManager:
         self.logger.info(f"----------------------------------------")
         self.logger.info(message)
         
-        # Xabarni yuborish
-        self.logger.debug(f"Telegramga xabar yuborilmoqda: {metric_type}")
+        # Xabarni backendlarga tarqatish
+        alert = self._build_alert(metric_type, usage_value, alert_title, message, severity, system_info,
+                                  'HTML' if alert_format.upper() == 'HTML' else 'Markdown')
         
-        if self._send_telegram_message(message, 'HTML' if alert_format.upper() == 'HTML' else 'Markdown'):
-            self.logger.info(f"{metric_type} alert xabari Telegramga muvaffaqiyatli yuborildi")
-            
-            # Ma'lumotlar bazasiga saqlash
-            if database and hasattr(database, 'store_alert'):
-                try:
-                    database.store_alert(metric_type, usage_value, message)
-                except Exception as e:
-                    self.logger.error(f"Ma'lumotlar bazasiga saqlashda xatolik: {str(e)}")
+        self.logger.debug(f"Alert backendlarga yuborilmoqda: {metric_type} ({severity})")
+        
+        futures, delivered = self._dispatch(alert, database, system_info)
+        self._release_interval(delivered, rate_key)
+        if futures:
+            self.logger.info(f"{metric_type} alert xabari yuborish navbatiga qo'yildi")
             
-            return True
+            # Yangi yoki kuchaygan incident: keyingi alertlar shu Telegram xabarini tahrirlaydi
+            telegram = self.notifiers.find_type('telegram')
+            if self._incidents_enabled() and telegram.name in futures:
+                self.incidents[incident_key] = {
+                    'metric': metric_type,
+                    'key': rate_key,
+                    'title': alert_title,
+                    'severity': severity,
+                    'started': incident['started'] if incident else time.time(),
+                    'peak_value': current_value,
+                    'peak_text': usage_value,
+                    'future': futures.get(telegram.name),
+                }
+                if incident and incident['peak_value'] is not None and (current_value is None or incident['peak_value'] > current_value):
+                    self.incidents[incident_key]['peak_value'] = incident['peak_value']
+                    self.incidents[incident_key]['peak_text'] = incident['peak_text']
+            return delivered
         else:
             self.logger.error(f"{metric_type} alert xabarini yuborishda xatolik")
             return False
@@ -364,7 +677,7 @@ class AlertManager:
             threshold (float, optional): Chegara qiymati
             
         Returns:
-            bool: Xabar yuborilganligi
+            bool | Future: Yuborilmagan bo'lsa False; aks holda yetkazilish natijasi (Future, bool)
         """
         # Umumiy xabar yuborishni tekshirish
         if not self.config.get('send_general_alert', True):
@@ -393,27 +706,23 @@ class AlertManager:
         self.logger.info(f"----------------------------------------")
         self.logger.info(message)
         
-        # Xabarni yuborish
-        self.logger.debug(f"Telegramga xabar yuborilmoqda: {alert_type if alert_type else 'SYSTEM STATUS'}")
+        # Xabarni backendlarga tarqatish
+        self.logger.debug(f"Alert backendlarga yuborilmoqda: {alert_type if alert_type else 'SYSTEM STATUS'}")
         
-        if self._send_telegram_message(message, 'HTML'):
-            self.logger.info(f"{alert_type if alert_type else 'SYSTEM STATUS'} alert xabari Telegramga muvaffaqiyatli yuborildi")
+        alert_key = self._standardize_alert_key(alert_type) if alert_type else None
+        alert = self._build_alert(alert_type or 'SYSTEM STATUS', usage_value, alert_type or 'SYSTEM STATUS', message,
+                                  self._classify_severity(alert_key, current_value), system_info, 'HTML')
+        
+        futures, delivered = self._dispatch(alert, database, system_info)
+        if futures:
+            self.logger.info(f"{alert_type if alert_type else 'SYSTEM STATUS'} alert xabari yuborish navbatiga qo'yildi")
             
-            # Alert turini standartlashtirish
-            if alert_type:
-                alert_key = self._standardize_alert_key(alert_type)
-                
-                # Alert vaqtini yangilash
+            # Alert vaqtini yangilash
+            if alert_key:
                 self.last_alert_times[alert_key] = time.time()
+                self._release_interval(delivered, alert_key)
             
-            # Ma'lumotlar bazasiga saqlash
-            if database and hasattr(database, 'store_alert'):
-                try:
-                    database.store_alert(alert_type, usage_value, message)
-                except Exception as e:
-                    self.logger.error(f"Ma'lumotlar bazasiga saqlashda xatolik: {str(e)}")
-            
-            return True
+            return delivered
         else:
             self.logger.error(f"{alert_type if alert_type else 'SYSTEM STATUS'} alert xabarini yuborishda xatolik")
             return False
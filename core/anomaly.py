@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Oqimli anomaliya aniqlash moduli
+EWMA o'rtacha/dispersiya va ixtiyoriy hafta soatlari (hour-of-week) bo'yicha
+mavsumiy bazaviy qiymatlar - doimiy xotira, z-score bo'yicha og'ishlarni aniqlash
+"""
+
+import os
+import json
+import math
+import time
+import datetime
+
+# Haftadagi soatlar soni (mavsumiy savatchalar)
+HOURS_PER_WEEK = 7 * 24
+
+
+class EWMAStats:
+    __slots__ = ('mean', 'var', 'count')
+
+    def __init__(self, mean=0.0, var=0.0, count=0):
+        """
+        Eksponensial og'irlikdagi o'rtacha va dispersiya
+
+        Args:
+            mean (float): Boshlang'ich o'rtacha
+            var (float): Boshlang'ich dispersiya
+            count (int): Ko'rilgan namunalar soni
+        """
+        self.mean = mean
+        self.var = var
+        self.count = count
+
+    def update(self, value, alpha):
+        """
+        Yangi namunani statistikaga qo'shish (O(1))
+
+        Args:
+            value (float): Namuna qiymati
+            alpha (float): Silliqlash koeffitsienti (0-1)
+        """
+        if self.count == 0:
+            self.mean = value
+            self.var = 0.0
+        else:
+            diff = value - self.mean
+            increment = alpha * diff
+            self.mean += increment
+            self.var = (1 - alpha) * (self.var + diff * increment)
+        self.count += 1
+
+    def zscore(self, value, min_std):
+        """
+        Qiymatning bazaviy qiymatdan og'ishi (z-score)
+
+        Args:
+            value (float): Namuna qiymati
+            min_std (float): Standart og'ishning quyi chegarasi
+
+        Returns:
+            float: z-score
+        """
+        std = max(math.sqrt(max(self.var, 0.0)), min_std)
+        return (value - self.mean) / std
+
+    def to_list(self):
+        return [self.mean, self.var, self.count]
+
+    @classmethod
+    def from_list(cls, data):
+        return cls(float(data[0]), float(data[1]), int(data[2]))
+
+
+class MetricBaseline:
+    def __init__(self, seasonal=False):
+        """
+        Bitta metrika uchun bazaviy qiymatlar
+
+        Args:
+            seasonal (bool): Hafta soatlari bo'yicha savatchalarni yuritish
+        """
+        self.global_stats = EWMAStats()
+        self.buckets = [EWMAStats() for _ in range(HOURS_PER_WEEK)] if seasonal else None
+
+
+class AnomalyDetector:
+    def __init__(self, config, logger):
+        """
+        Anomaliya detektorini ishga tushirish
+
+        Args:
+            config (dict): Konfiguratsiya sozlamalari
+            logger (logging.Logger): Log yozish uchun logger obyekti
+        """
+        self.config = config
+        self.logger = logger
+
+        self.enabled = config.get('anomaly_enabled', False)
+        self.metrics = [m.strip().lower() for m in config.get('anomaly_metrics', '').split(',') if m.strip()]
+        self.alpha = float(config.get('anomaly_alpha', 0.05))
+        self.z_threshold = float(config.get('anomaly_z_threshold', 3.0))
+        self.min_samples = int(config.get('anomaly_min_samples', 30))
+        self.min_std = float(config.get('anomaly_min_std', 1.0))
+        self.direction = config.get('anomaly_direction', 'up').lower()
+        self.seasonal = config.get('anomaly_seasonal', False)
+        self.state_path = config.get('anomaly_state_path', '')
+        self.save_interval = int(config.get('anomaly_save_interval', 300))
+
+        self.baselines = {key: MetricBaseline(self.seasonal) for key in self.metrics}
+        self._last_save_time = time.time()
+
+        if self.enabled:
+            self._load_state()
+            self.logger.info(f"Anomaliya aniqlash yoqilgan: {', '.join(self.metrics) or '-'} (z >= {self.z_threshold})")
+
+    @staticmethod
+    def _bucket_index(timestamp):
+        """
+        Vaqt uchun hafta soati indeksini hisoblash
+
+        Args:
+            timestamp (float): Unix vaqti
+
+        Returns:
+            int: 0..167 oralig'idagi indeks
+        """
+        moment = datetime.datetime.fromtimestamp(timestamp)
+        return moment.weekday() * 24 + moment.hour
+
+    def _is_anomalous(self, z):
+        """
+        z-score yo'nalish sozlamasiga ko'ra anomaliyami
+
+        Args:
+            z (float): z-score
+
+        Returns:
+            bool: Anomaliya ekanligi
+        """
+        if self.direction == 'down':
+            return z <= -self.z_threshold
+        if self.direction == 'both':
+            return abs(z) >= self.z_threshold
+        return z >= self.z_threshold
+
+    def update(self, metric_key, value, timestamp=None):
+        """
+        Namunani baholash va bazaviy qiymatni yangilash
+
+        Namuna avval joriy bazaviy qiymatga nisbatan baholanadi, keyin
+        statistikaga qo'shiladi.
+
+        Args:
+            metric_key (str): Metrika kaliti (ram, cpu, ...)
+            value (float): Joriy qiymat
+            timestamp (float, optional): Namuna vaqti (standart: joriy vaqt)
+
+        Returns:
+            dict: Anomaliya bo'lsa {'z', 'mean', 'std', 'seasonal'}, aks holda None
+        """
+        if not self.enabled or metric_key not in self.baselines:
+            return None
+
+        now = time.time() if timestamp is None else timestamp
+        value = float(value)
+        baseline = self.baselines[metric_key]
+
+        # Mavsumiy savatchada yetarli ma'lumot bo'lsa, o'shani ishlatish
+        stats = baseline.global_stats
+        bucket = None
+        if baseline.buckets is not None:
+            bucket = baseline.buckets[self._bucket_index(now)]
+            if bucket.count >= self.min_samples:
+                stats = bucket
+
+        result = None
+        if stats.count >= self.min_samples:
+            z = stats.zscore(value, self.min_std)
+            if self._is_anomalous(z):
+                result = {
+                    'z': z,
+                    'mean': stats.mean,
+                    'std': max(math.sqrt(max(stats.var, 0.0)), self.min_std),
+                    'seasonal': stats is bucket,
+                }
+                self.logger.debug(f"{metric_key} anomaliya: {value:.1f} (bazaviy {stats.mean:.1f}, z={z:.1f})")
+
+        baseline.global_stats.update(value, self.alpha)
+        if bucket is not None:
+            bucket.update(value, self.alpha)
+
+        if self.state_path and now - self._last_save_time >= self.save_interval:
+            self.save_state()
+
+        return result
+
+    def describe(self, anomaly, unit='%'):
+        """
+        Xabarga qo'shiladigan anomaliya izohi
+
+        Args:
+            anomaly (dict): update() qaytargan natija
+            unit (str): Metrika birligi
+
+        Returns:
+            str: Izoh
+        """
+        separator = "" if unit == '%' else " "
+        kind = "seasonal baseline" if anomaly['seasonal'] else "baseline"
+        return f" (anomaly z={anomaly['z']:.1f}, {kind} {anomaly['mean']:.1f}{separator}{unit})"
+
+    def _load_state(self):
+        """
+        Saqlangan bazaviy qiymatlarni fayldan yuklash
+        """
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+
+            for key, data in state.get('metrics', {}).items():
+                if key not in self.baselines:
+                    continue
+                baseline = self.baselines[key]
+                baseline.global_stats = EWMAStats.from_list(data['global'])
+                if baseline.buckets is not None and data.get('buckets'):
+                    baseline.buckets = [EWMAStats.from_list(item) for item in data['buckets']]
+
+            self.logger.info(f"Anomaliya bazaviy qiymatlari yuklandi: {self.state_path}")
+        except Exception as e:
+            self.logger.error(f"Anomaliya holatini yuklashda xatolik: {e}")
+
+    def save_state(self):
+        """
+        Bazaviy qiymatlarni faylga saqlash (atomar almashtirish bilan)
+
+        Returns:
+            bool: Saqlanganligi
+        """
+        self._last_save_time = time.time()
+        if not self.enabled or not self.state_path:
+            return False
+
+        state = {'saved_at': self._last_save_time, 'alpha': self.alpha, 'metrics': {}}
+        for key, baseline in self.baselines.items():
+            state['metrics'][key] = {
+                'global': baseline.global_stats.to_list(),
+                'buckets': [b.to_list() for b in baseline.buckets] if baseline.buckets is not None else None,
+            }
+
+        try:
+            state_dir = os.path.dirname(self.state_path)
+            if state_dir and not os.path.exists(state_dir):
+                os.makedirs(state_dir, exist_ok=True)
+
+            tmp_path = f"{self.state_path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_path)
+            self.logger.debug(f"Anomaliya holati saqlandi: {self.state_path}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Anomaliya holatini saqlashda xatolik: {e}")
+            return False
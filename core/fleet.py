@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Park (fleet) holatining ustunli ko'rinishi
+Agregator shardidagi barcha xostlarning oxirgi namunalari NumPy ustunlarida
+(har bir metrika uchun bitta massiv, indeks - xost raqami) saqlanadi. Threshold
+va oyna qoidalari har tickda bitta vektorli o'tishda baholanadi; Python
+darajasida faqat alert yuborilishi yoki yopilishi kerak bo'lgan xostlar
+ko'riladi. Park bo'yicha umumiy ko'rsatkichlar (persentillar, CPU bo'yicha
+top-N) ham shu ustunlardan hisoblanadi.
+numpy ixtiyoriy bog'liqlik: bu modul faqat u o'rnatilganda import qilinadi
+"""
+
+import time
+
+import numpy as np
+
+from core.rules import metric_checks, metric_threshold
+from core.windows import AlertWindows, SlidingWindow
+
+# Ustunlar (AlertWindows kalitlari bilan bir xil)
+METRICS = AlertWindows.METRIC_KEYS
+
+# network_rx/tx dan oldingi oddiy ustunlar (qiymati to'g'ridan-to'g'ri metrikalar lug'atida)
+SCALAR_METRICS = METRICS[:METRICS.index('network_rx')]
+
+# Umumiy ko'rsatkichlardagi persentillar
+PERCENTILES = (50, 90, 99)
+
+
+class FleetState:
+    def __init__(self, config, logger, capacity=1024):
+        """
+        Bo'sh park holatini yaratish
+
+        Args:
+            config (dict): Konfiguratsiya sozlamalari (threshold va oyna qoidalari)
+            logger (logging.Logger): Log yozish uchun logger obyekti
+            capacity (int): Boshlang'ich xostlar sig'imi (kerak bo'lsa ikki baravar oshadi)
+        """
+        self.config = config
+        self.logger = logger
+        self.checks = metric_checks(config)
+        self.thresholds = {metric_key: metric_threshold(config, metric_key) for _, metric_key, _ in self.checks}
+        # Agentlarning namuna yuborish oralig'i: matritsalarning boshlang'ich kengligi va
+        # xost oralig'i hali kuzatilmaganda oyna to'lishi shu bo'yicha (0 - check_interval)
+        self.sample_interval = max(1, config.get('aggregator_sample_interval') or config.get('check_interval', 60))
+        # Qoidalar va xabar izohlari uchun (oynalarning o'zi quyidagi matritsalarda)
+        self.windows = AlertWindows(dict(config, check_interval=self.sample_interval), logger)
+
+        self.hosts = {}
+        self.names = []
+        self.capacity = max(1, int(capacity))
+        # Xost qatori bitta yozuvda yangilanadi; ustunlar shu matritsaning ko'rinishlari (view)
+        self.matrix = np.full((self.capacity, len(METRICS)), np.nan)
+        self.columns = {key: self.matrix[:, index] for index, key in enumerate(METRICS)}
+        self.timestamps = np.full(self.capacity, np.nan)
+        # Xost namunalari orasidagi kuzatilgan oraliq (SlidingWindow.interval bilan bir xil:
+        # oxirgi ikki oraliqning kichigi); oyna to'lganini aniqlash uchun
+        self.intervals = np.full(self.capacity, np.nan)
+        # Oxirgi baholashdan keyin namuna kelgan xostlar
+        self.dirty = np.zeros(self.capacity, dtype=bool)
+        # Alert holatidagi xostlar (qaytganda yopish uchun)
+        self.active = {key: np.zeros(self.capacity, dtype=bool) for _, key, _ in self.checks}
+        # Oyna qoidalari: har bir xost uchun ring buffer qatori (qiymat, vaqt); har namuna
+        # barcha oynalarga yoziladi, shuning uchun yozish joyi - xost namunalari soni
+        self.counts = []
+        # Matritsalarga yozilgan namunalar soni (ring kengaytirilganda joylarni ko'chirish uchun)
+        self.written = np.zeros(self.capacity, dtype=np.int64)
+        # Oraliqni hisoblash uchun xostning oxirgi namuna vaqti va oxirgi oralig'i
+        self._last_times = []
+        self._last_gaps = []
+        self._intervals = []
+        # Massivlarga hali yozilmagan namunalar: (qator, yozish joyi, vaqt, oraliq, qiymatlar)
+        self._pending = []
+        self.rings = {}
+        for _, key, _ in self.checks:
+            rule = self.windows.rules.get(key)
+            if rule is None:
+                continue
+            slots = self.windows.windows[key].capacity
+            self.rings[key] = (METRICS.index(key), np.full((self.capacity, slots), np.nan),
+                               np.full((self.capacity, slots), np.nan))
+
+    def __len__(self):
+        return len(self.names)
+
+    def _grow(self):
+        capacity = self.capacity * 2
+
+        def extend(array, fill):
+            grown = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+            grown[:self.capacity] = array
+            return grown
+
+        self.matrix = extend(self.matrix, np.nan)
+        self.columns = {key: self.matrix[:, index] for index, key in enumerate(METRICS)}
+        self.timestamps = extend(self.timestamps, np.nan)
+        self.intervals = extend(self.intervals, np.nan)
+        self.written = extend(self.written, 0)
+        self.dirty = extend(self.dirty, False)
+        self.active = {key: extend(active, False) for key, active in self.active.items()}
+        self.rings = {key: (index, extend(values, np.nan), extend(times, np.nan))
+                      for key, (index, values, times) in self.rings.items()}
+        self.capacity = capacity
+
+    def _widen(self, key, width):
+        """
+        Oyna matritsasi kengligini (xost uchun namunalar sonini) oshirish; har bir
+        xostning namunalari yangi kenglikdagi joylariga ko'chiriladi
+
+        Args:
+            key (str): Metrika kaliti
+            width (int): Yangi kenglik
+        """
+        index, values, times = self.rings[key]
+        slots = values.shape[1]
+        grown_values = np.full((self.capacity, width), np.nan)
+        grown_times = np.full((self.capacity, width), np.nan)
+        for back in range(1, slots + 1):
+            rows = np.flatnonzero(self.written >= back)
+            count = self.written[rows] - back
+            grown_values[rows, count % width] = values[rows, count % slots]
+            grown_times[rows, count % width] = times[rows, count % slots]
+        self.rings[key] = (index, grown_values, grown_times)
+
+    def host_id(self, host):
+        """
+        Xost raqami (ustunlardagi indeks); yangi xost oxiriga qo'shiladi
+
+        Args:
+            host (str): Xost nomi
+
+        Returns:
+            int: Indeks
+        """
+        row = self.hosts.get(host)
+        if row is None:
+            if len(self.names) == self.capacity:
+                self._grow()
+            row = self.hosts[host] = len(self.names)
+            self.names.append(host)
+            self.counts.append(0)
+            self._last_times.append(None)
+            self._last_gaps.append(None)
+            self._intervals.append(np.nan)
+        return row
+
+    def update(self, host, metrics, timestamp=None):
+        """
+        Xost namunasini qabul qilish (O(1), faqat Python ro'yxatiga qo'shiladi;
+        massivlarga keyingi baholashda bitta vektorli yozuv bilan tushadi)
+
+        Args:
+            host (str): Xost nomi
+            metrics (dict): Metrikalar (network - [rx, tx])
+            timestamp (float, optional): Namuna vaqti (standart: joriy vaqt)
+        """
+        row = self.host_id(host)
+        timestamp = time.time() if timestamp is None else timestamp
+        # core.rules.metric_value bilan bir xil, lekin har bir kalit uchun chaqiruvsiz
+        get = metrics.get
+        sample = [get(key, 0) for key in SCALAR_METRICS]
+        sample.extend((get('network') or (0, 0))[:2])
+        count = self.counts[row]
+        self.counts[row] = count + 1
+        last = self._last_times[row]
+        if last is not None and timestamp > last:
+            gap = timestamp - last
+            if self._last_gaps[row] is not None:
+                self._intervals[row] = min(gap, self._last_gaps[row])
+            self._last_gaps[row] = gap
+        self._last_times[row] = timestamp
+        self._pending.append((row, count, timestamp, self._intervals[row], sample))
+
+    def changed(self):
+        """
+        Oxirgi baholashdan keyin namuna kelganmi
+
+        Returns:
+            bool: Baholanmagan namunalar bo'lsa True
+        """
+        return bool(self._pending) or bool(self.dirty.any())
+
+    def _flush(self):
+        """
+        Kutayotgan namunalarni ustunlar va oyna matritsalariga yozish
+        (bir xostning bir nechta namunasi bo'lsa ustunda oxirgisi qoladi)
+        """
+        if not self._pending:
+            return
+        rows, counts, timestamps, intervals, samples = zip(*self._pending)
+        self._pending = []
+        rows = np.array(rows, dtype=np.intp)
+        counts = np.array(counts, dtype=np.int64)
+        timestamps = np.array(timestamps, dtype=float)
+        samples = np.array(samples, dtype=float)
+
+        self.matrix[rows] = samples
+        self.timestamps[rows] = timestamps
+        self.intervals[rows] = intervals
+        self.dirty[rows] = True
+        batch = np.bincount(rows).max()
+        for key in list(self.rings):
+            rule = self.windows.rules[key]
+            # SlidingWindow kabi: vaqt oynasidagi namuna ustiga yozilmasligi uchun kengaytirish
+            while rule.window_seconds:
+                width = self.rings[key][1].shape[1]
+                if width >= SlidingWindow.MAX_CAPACITY:
+                    break
+                existing = self.rings[key][2][rows, counts % width]
+                if batch <= width and not (existing > timestamps - rule.window_seconds).any():
+                    break
+                self._widen(key, min(width * 2, SlidingWindow.MAX_CAPACITY))
+
+            index, values, times = self.rings[key]
+            slots = counts % values.shape[1]
+            values[rows, slots] = samples[:, index]
+            times[rows, slots] = timestamps
+        self.written[rows] = counts + 1
+
+    def _window(self, key, rule, rows, threshold):
+        """
+        Oyna qoidasini tanlangan xostlar uchun vektorli baholash (SlidingWindow bilan bir xil natija)
+
+        Returns:
+            tuple: (shart bajarildimi, solishtirilgan qiymat, solishtirilgan chegara) massivlari
+        """
+        _, values, times = self.rings[key]
+        window_values, window_times = values[rows], times[rows]
+        valid = ~np.isnan(window_values)
+        newest = self.timestamps[rows]
+        if rule.window_seconds:
+            # Eng yangi namunadan window_seconds dan eski namunalar oynada emas
+            valid &= window_times > (newest - rule.window_seconds)[:, None]
+        count = valid.sum(axis=1)
+        divisor = np.maximum(count, 1)
+
+        if rule.agg == 'ratio':
+            above = (valid & (window_values >= threshold)).sum(axis=1)
+            compared = above / divisor * 100
+            required = np.full(len(rows), rule.ratio * 100)
+        else:
+            if rule.agg == 'avg':
+                compared = np.where(valid, window_values, 0.0).sum(axis=1) / divisor
+            elif rule.agg == 'min':
+                compared = np.where(valid, window_values, np.inf).min(axis=1)
+            else:
+                compared = np.where(valid, window_values, -np.inf).max(axis=1)
+            compared[count == 0] = 0.0
+            required = np.full(len(rows), float(threshold))
+
+        if rule.samples:
+            warm = count >= rule.samples
+        else:
+            oldest = np.where(valid, window_times, np.inf).min(axis=1)
+            span = np.where(count > 0, newest - oldest, 0.0)
+            interval = self.intervals[rows]
+            interval = np.where(np.isnan(interval), self.sample_interval, interval)
+            warm = span + interval >= rule.window_seconds
+        return warm & (compared >= required), compared, required
+
+    def evaluate(self, now=None, max_age=None):
+        """
+        Oxirgi baholashdan keyin namuna kelgan xostlar uchun qoidalarni vektorli baholash
+
+        Args:
+            now (float, optional): Joriy vaqt (epoch)
+            max_age (float, optional): Oxirgi namunasi bundan eski xostlar baholanmaydi (backfill)
+
+        Returns:
+            list: Python darajasida ishlanadigan holatlar -
+                (xost, metrika turi, kalit, birlik, qiymat, shart bajarildimi, solishtirilgan qiymat, chegara);
+                faqat shart bajarilgan yoki avval bajarilgan (yopilishi kerak) xostlar
+        """
+        self._flush()
+        rows = np.flatnonzero(self.dirty[:len(self.names)])
+        self.dirty[rows] = False
+        if max_age is not None and len(rows):
+            now = time.time() if now is None else now
+            rows = rows[now - self.timestamps[rows] <= max_age]
+
+        decisions = []
+        if not len(rows):
+            return decisions
+        for metric_type, key, unit in self.checks:
+            values = self.columns[key][rows]
+            threshold = self.thresholds[key]
+            rule = self.windows.rules.get(key)
+            if rule is None:
+                triggered, compared, required = values >= threshold, values, np.full(len(rows), float(threshold))
+            else:
+                triggered, compared, required = self._window(key, rule, rows, threshold)
+
+            active = self.active[key]
+            changed = np.flatnonzero(triggered | active[rows])
+            active[rows] = triggered
+            for index in changed:
+                decisions.append((self.names[rows[index]], metric_type, key, unit, float(values[index]),
+                                  bool(triggered[index]), float(compared[index]), float(required[index])))
+        return decisions
+
+    def snapshot(self):
+        """
+        Ustunlar nusxasi (boshqa shardlar bilan birlashtirish uchun)
+
+        Returns:
+            tuple: (xost nomlari, {metrika: massiv})
+        """
+        self._flush()
+        count = len(self.names)
+        return list(self.names), {key: column[:count].copy() for key, column in self.columns.items()}
+
+    def summary(self, top=5):
+        """
+        Park bo'yicha umumiy ko'rsatkichlar
+
+        Args:
+            top (int): CPU bo'yicha eng yuklangan xostlar soni
+
+        Returns:
+            dict: summarize() natijasi
+        """
+        return summarize(*self.snapshot(), top=top)
+
+
+def summarize(names, columns, top=5):
+    """
+    Ustunlardan park ko'rsatkichlarini vektorli hisoblash
+
+    Args:
+        names (list): Xost nomlari (ustunlar indeksi bo'yicha)
+        columns (dict): {metrika: massiv}
+        top (int): CPU bo'yicha eng yuklangan xostlar soni
+
+    Returns:
+        dict: {'hosts': soni, 'percentiles': {metrika: {'p50': .., 'p90': .., 'p99': ..}},
+               'top_cpu': [(xost, qiymat), ...]}
+    """
+    result = {'hosts': len(names), 'percentiles': {}, 'top_cpu': []}
+    if not names:
+        return result
+    for key, column in columns.items():
+        points = np.nanpercentile(column, PERCENTILES) if not np.isnan(column).all() else [np.nan] * len(PERCENTILES)
+        result['percentiles'][key] = {f"p{q}": float(value) for q, value in zip(PERCENTILES, points)}
+
+    cpu = np.nan_to_num(columns['cpu'], nan=-np.inf)
+    count = min(top, len(cpu))
+    if count:
+        # argpartition - to'liq saralashsiz O(n)
+        indexes = np.argpartition(-cpu, count - 1)[:count]
+        indexes = indexes[np.argsort(-cpu[indexes], kind='stable')]
+        result['top_cpu'] = [(names[index], float(cpu[index])) for index in indexes if np.isfinite(cpu[index])]
+    return result
+
+
+def summarize_snapshots(snapshots, top=5):
+    """
+    Bir nechta shard ustunlarini birlashtirib, park ko'rsatkichlarini hisoblash
+
+    Args:
+        snapshots (list): FleetState.snapshot() natijalari
+        top (int): CPU bo'yicha eng yuklangan xostlar soni
+
+    Returns:
+        dict: summarize() natijasi
+    """
+    names = [name for shard_names, _ in snapshots for name in shard_names]
+    columns = {key: np.concatenate([shard_columns[key] for _, shard_columns in snapshots]) if snapshots
+               else np.empty(0) for key in METRICS}
+    return summarize(names, columns, top)
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Disk to'lish vaqtini (ETA) bashorat qilish moduli
+Har bir mount uchun sirpanuvchi gorizontda inkremental eng kichik kvadratlar usuli
+"""
+
+import time
+
+
+def format_eta(seconds):
+    """
+    ETA ni o'qiladigan ko'rinishga keltirish
+
+    Args:
+        seconds (float): Soniyalar
+
+    Returns:
+        str: Masalan "2d 5h", "5h 12m" yoki "14m"
+    """
+    seconds = max(0, int(seconds))
+    days = seconds // 86400
+    hours = (seconds % 86400) // 3600
+    minutes = (seconds % 3600) // 60
+
+    if days > 0:
+        return f"{days}d {hours}h"
+    if hours > 0:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m"
+
+
+class LinearTrend:
+    # Suzuvchi nuqta xatolari to'planmasligi uchun yig'indilarni qayta hisoblash oralig'i
+    RECOMPUTE_EVERY = 1024
+    # Ring buffer sig'imining yuqori chegarasi (namunalar soni)
+    MAX_CAPACITY = 65536
+
+    def __init__(self, horizon_seconds, capacity):
+        """
+        Sirpanuvchi gorizontdagi chiziqli regressiya (used = a + b * t)
+
+        Yig'indilar (n, Σt, Σy, Σt², Σty) har bir namunada inkremental yangilanadi,
+        gorizontdan chiqqan namunalar yig'indilardan ayiriladi. Namunalar sig'imi
+        cheklangan ring bufferda saqlanadi, shuning uchun xotira doimiy. Namunalar
+        kutilganidan tez kelsa (scrape rejimi), bufer gorizontni yo'qotmasdan
+        ikki baravar kengayadi (MAX_CAPACITY gacha).
+
+        Args:
+            horizon_seconds (float): Regressiya gorizonti (soniya)
+            capacity (int): Ring bufferning boshlang'ich sig'imi
+        """
+        self.horizon_seconds = horizon_seconds
+        self.capacity = max(2, int(capacity))
+
+        self._ring = [None] * self.capacity
+        self._head = 0
+        self._count = 0
+        self._origin = None  # vaqt sanoq boshi (katta sonlar bilan ishlamaslik uchun)
+        self._updates = 0
+
+        self._sum_t = 0.0
+        self._sum_y = 0.0
+        self._sum_tt = 0.0
+        self._sum_ty = 0.0
+
+        self.last_value = None
+        self.last_time = None
+
+    def __len__(self):
+        return self._count
+
+    def _remove_oldest(self):
+        t, y = self._ring[self._head]
+        self._ring[self._head] = None
+        self._head = (self._head + 1) % self.capacity
+        self._count -= 1
+
+        self._sum_t -= t
+        self._sum_y -= y
+        self._sum_tt -= t * t
+        self._sum_ty -= t * y
+
+    def _grow(self):
+        capacity = min(self.capacity * 2, self.MAX_CAPACITY)
+        ring = [self._ring[(self._head + i) % self.capacity] for i in range(self._count)]
+        self._ring = ring + [None] * (capacity - self._count)
+        self._head = 0
+        self.capacity = capacity
+
+    def _recompute(self):
+        self._sum_t = self._sum_y = self._sum_tt = self._sum_ty = 0.0
+        for i in range(self._count):
+            t, y = self._ring[(self._head + i) % self.capacity]
+            self._sum_t += t
+            self._sum_y += y
+            self._sum_tt += t * t
+            self._sum_ty += t * y
+
+    def add(self, value, timestamp):
+        """
+        Yangi namunani qo'shish
+
+        Args:
+            value (float): O'lchangan qiymat (masalan, band baytlar)
+            timestamp (float): Namuna vaqti
+        """
+        if self._origin is None:
+            self._origin = timestamp
+
+        t = timestamp - self._origin
+        y = float(value)
+
+        cutoff = t - self.horizon_seconds
+        while self._count and self._ring[self._head][0] <= cutoff:
+            self._remove_oldest()
+        if self._count == self.capacity:
+            if self.capacity < self.MAX_CAPACITY:
+                self._grow()
+            else:
+                self._remove_oldest()
+
+        self._ring[(self._head + self._count) % self.capacity] = (t, y)
+        self._count += 1
+
+        self._sum_t += t
+        self._sum_y += y
+        self._sum_tt += t * t
+        self._sum_ty += t * y
+
+        self._updates += 1
+        if self._updates % self.RECOMPUTE_EVERY == 0:
+            self._recompute()
+
+        self.last_value = y
+        self.last_time = timestamp
+
+    def span(self):
+        """
+        Gorizontdagi namunalar qamrab olgan vaqt
+
+        Returns:
+            float: Soniyalar
+        """
+        if self._count < 2:
+            return 0.0
+        newest = self._ring[(self._head + self._count - 1) % self.capacity]
+        return newest[0] - self._ring[self._head][0]
+
+    def slope(self):
+        """
+        Regressiya qiyaligi (birlik / soniya)
+
+        Returns:
+            float: Qiyalik (namunalar yetarli bo'lmasa None)
+        """
+        n = self._count
+        if n < 2:
+            return None
+        denominator = n * self._sum_tt - self._sum_t * self._sum_t
+        if denominator <= 0:
+            return None
+        return (n * self._sum_ty - self._sum_t * self._sum_y) / denominator
+
+
+class DiskForecaster:
+    def __init__(self, config, logger):
+        """
+        Mount'lar bo'yicha disk to'lish bashoratchisini ishga tushirish
+
+        Args:
+            config (dict): Konfiguratsiya sozlamalari
+            logger (logging.Logger): Log yozish uchun logger obyekti
+        """
+        self.config = config
+        self.logger = logger
+
+        self.enabled = config.get('disk_forecast_enabled', False)
+        mounts = [m.strip() for m in config.get('disk_forecast_mounts', '').split(',') if m.strip()]
+        self.mounts = mounts or [config.get('disk_path', '/')]
+        self.horizon = int(config.get('disk_forecast_horizon', 21600))
+        self.alert_hours = float(config.get('disk_forecast_hours', 24))
+        self.min_samples = int(config.get('disk_forecast_min_samples', 10))
+
+        # Boshlang'ich sig'im; scrape rejimida namunalar tezroq kelsa trend o'zi kengayadi
+        check_interval = max(1, config.get('check_interval', 60))
+        capacity = self.horizon // check_interval + 2
+        self.trends = {mount: LinearTrend(self.horizon, capacity) for mount in self.mounts}
+        # Oxirgi o'lchovdagi bo'sh joy (root uchun ajratilgan bloklarsiz, psutil `free`)
+        self.free = {}
+
+        if self.enabled:
+            self.logger.info(f"Disk to'lish bashorati yoqilgan: {', '.join(self.mounts)} (< {self.alert_hours:g} soat)")
+
+    def update(self, mount, used_bytes, free_bytes, timestamp=None):
+        """
+        Mount uchun yangi o'lchovni qo'shish
+
+        Args:
+            mount (str): Mount yo'li
+            used_bytes (int): Band baytlar
+            free_bytes (int): Oddiy foydalanuvchiga bo'sh hajm (bayt)
+            timestamp (float, optional): O'lchov vaqti (standart: joriy vaqt)
+        """
+        if mount not in self.trends:
+            return
+        self.trends[mount].add(used_bytes, time.time() if timestamp is None else timestamp)
+        self.free[mount] = free_bytes
+
+    def forecast(self, mount):
+        """
+        Mount to'lishigacha qolgan vaqtni hisoblash
+
+        Args:
+            mount (str): Mount yo'li
+
+        Returns:
+            dict: {'eta_seconds', 'rate_bytes_per_hour'} yoki to'lish kutilmasa None
+        """
+        trend = self.trends.get(mount)
+        if trend is None or len(trend) < self.min_samples:
+            return None
+
+        slope = trend.slope()
+        if slope is None or slope <= 0:
+            return None
+
+        # total - used emas: ext4 kabi FS larda root uchun ajratilgan bloklar band
+        # bo'lmasa ham oddiy foydalanuvchilarga yozib bo'lmaydi
+        remaining = self.free.get(mount, 0)
+        return {
+            'eta_seconds': max(0.0, remaining / slope),
+            'rate_bytes_per_hour': slope * 3600,
+        }
+
+    def usage_percent(self, mount):
+        """
+        Mount'ning oxirgi o'lchovdagi band foizi (psutil percent bilan bir xil)
+
+        Args:
+            mount (str): Mount yo'li
+
+        Returns:
+            float: Foiz (o'lchov bo'lmasa None)
+        """
+        trend = self.trends.get(mount)
+        if trend is None or trend.last_value is None:
+            return None
+        capacity = trend.last_value + self.free.get(mount, 0)
+        return round(trend.last_value / capacity * 100, 1) if capacity else 0.0
+
+    def due_alerts(self):
+        """
+        ETA alert chegarasidan kichik bo'lgan mount'lar
+
+        Returns:
+            list: [(mount, forecast dict)] ro'yxati
+        """
+        if not self.enabled:
+            return []
+
+        result = []
+        for mount in self.mounts:
+            prediction = self.forecast(mount)
+            if prediction and prediction['eta_seconds'] < self.alert_hours * 3600:
+                result.append((mount, prediction))
+        return result
+
+    def describe(self, mount):
+        """
+        Mount uchun ETA tavsifi (xabarlar uchun)
+
+        Args:
+            mount (str): Mount yo'li
+
+        Returns:
+            str: Masalan "full in 5h 12m (+1.2G/h)" yoki bashorat bo'lmasa None
+        """
+        prediction = self.forecast(mount)
+        if not prediction:
+            return None
+        rate_gb = prediction['rate_bytes_per_hour'] / (1024 ** 3)
+        return f"full in {format_eta(prediction['eta_seconds'])} (+{rate_gb:.1f}G/h)"
@@ -7,8 +7,10 @@ Alert xabarlarini formatlash moduli - har bir metrika uchun alohida xabar format
 
 import datetime
 
+from core.templates import AlertTemplate
+
 class AlertFormatter:
-    def __init__(self, config, logger, monitor):
+    def __init__(self, config, logger, monitor, forecaster=None):
         """
         Alert formatlovchini ishga tushirish
         
@@ -16,12 +18,88 @@ class AlertFormatter:
             config (dict): Konfiguratsiya sozlamalari
             logger (logging.Logger): Log yozish uchun logger obyekti
             monitor (SystemMonitor): Tizim monitoring obyekti
+            forecaster (DiskForecaster, optional): Disk to'lish bashoratchisi
         """
         self.config = config
         self.logger = logger
         self.monitor = monitor
+        self.forecaster = forecaster
+        self.compile_templates()
+
+    def compile_templates(self):
+        """
+        Xabar shablonini konfiguratsiyadan qayta kompilyatsiya qilish
+
+        Konfiguratsiya qayta yuklanganda chaqiriladi: ramkalar, kengliklar va
+        statik qatorlar keshi yangilanadi.
+        """
+        self.template = AlertTemplate(self.config)
 
-    def format_metric_alert(self, metric_type, usage_value, alert_format='HTML', alert_title=None, system_info=None):
+    def _process_lines(self, top_processes, total_prefix):
+        """
+        Top jarayonlar ro'yxatini ramka qatorlariga aylantirish (umumiy qiymat oxirida)
+        
+        Args:
+            top_processes (str): get_top_processes() natijasi
+            total_prefix (str): Umumiy qiymat qatorining boshlanishi
+            
+        Returns:
+            list: Ramka qatorlari
+        """
+        t = self.template
+        lines = []
+        total_line = ""
+        for proc in top_processes.split('\n'):
+            if not proc.strip():
+                continue
+            if proc.startswith(total_prefix):
+                total_line = proc
+            elif proc.startswith('│'):
+                lines.append(proc)
+            else:
+                lines.append(t.line(proc))
+        if total_line:
+            lines.append(t.line(total_line))
+        return lines
+
+    def _disk_breakdown_lines(self):
+        """
+        Disk breakdown bo'limi qatorlari (sarlavha bilan)
+        
+        Returns:
+            list: Ramka qatorlari
+        """
+        t = self.template
+        disk_breakdown = self.monitor.get_disk_breakdown() if hasattr(self.monitor, 'get_disk_breakdown') else None
+        
+        lines = [t.disk_breakdown_header]
+        if disk_breakdown:
+            for path, size in disk_breakdown.items():
+                lines.append(t.line(f"  - {path:<15} {size}"))
+        else:
+            lines.append(t.no_data_line)
+        return lines
+
+    def _disk_eta_lines(self, mount=None):
+        """
+        Disk alerti uchun alert berayotgan mount'ning to'lish bashorati qatori
+        
+        Args:
+            mount (str, optional): Mount yo'li (standart: disk_path)
+        
+        Returns:
+            list: "⏱️ / full in 5h 12m (+1.2G/h)" ko'rinishidagi qator (bashorat bo'lmasa bo'sh)
+        """
+        if not self.forecaster or not self.forecaster.enabled:
+            return []
+        
+        mount = mount or self.config.get('disk_path', '/')
+        description = self.forecaster.describe(mount)
+        if not description:
+            return []
+        return [f"{self.config.get('alert_format_eta_emoji', '⏱️')} {mount} {description}"]
+
+    def format_metric_alert(self, metric_type, usage_value, alert_format='HTML', alert_title=None, system_info=None, mount=None):
         """
         Metrika turiga qarab xabarni formatlash
         
@@ -31,6 +109,7 @@ class AlertFormatter:
             alert_format (str): Xabar formati (HTML yoki TEXT)
             alert_title (str, optional): Xabar sarlavhasi
             system_info (dict, optional): Tizim ma'lumotlari
+            mount (str, optional): Disk alerti uchun mount (standart: disk_path)
             
         Returns:
             str: Formatlangan xabar
@@ -47,33 +126,33 @@ class AlertFormatter:
         metric_value = None
         if metric_key == 'ram':
             metric_value = self.monitor.check_ram_usage()
-            metric_emoji = self.config.get('alert_format_ram_emoji', '🧠')
+            metric_emoji = self.template.emojis['ram']
             metric_total = system_info.get('total_ram', 'N/A')
         elif metric_key == 'cpu':
             metric_value = self.monitor.check_cpu_usage()
-            metric_emoji = self.config.get('alert_format_cpu_emoji', '🔥')
+            metric_emoji = self.template.emojis['cpu']
             metric_total = system_info.get('total_cpu', 'N/A')
         elif metric_key == 'disk':
             metric_value = self.monitor.check_disk_usage()
-            metric_emoji = self.config.get('alert_format_disk_emoji', '💾')
+            metric_emoji = self.template.emojis['disk']
             metric_total = system_info.get('total_disk', 'N/A')
         elif metric_key == 'swap':
             metric_value = self.monitor.check_swap_usage()
-            metric_emoji = self.config.get('alert_format_swap_emoji', '💾')
+            metric_emoji = self.template.emojis['swap']
             metric_total = "N/A"
         elif metric_key == 'load':
             metric_value = self.monitor.check_load_average()
-            metric_emoji = self.config.get('alert_format_load_emoji', '⚖️')
+            metric_emoji = self.template.emojis['load']
             metric_total = "N/A"
         elif metric_key == 'network rx':
             network_usage = self.monitor.check_network_usage()
             metric_value = network_usage[0]
-            metric_emoji = self.config.get('alert_format_network_emoji', '🌐')
+            metric_emoji = self.template.emojis['network']
             metric_total = "N/A"
         elif metric_key == 'network tx':
             network_usage = self.monitor.check_network_usage()
             metric_value = network_usage[1]
-            metric_emoji = self.config.get('alert_format_network_emoji', '🌐')
+            metric_emoji = self.template.emojis['network']
             metric_total = "N/A"
         else:
             metric_emoji = "🚨"
@@ -85,11 +164,11 @@ class AlertFormatter:
         
         # Xabar formatini tanlash
         if alert_format.upper() == 'HTML':
-            return self._format_html_metric_alert(metric_type, usage_value, metric_value, metric_emoji, metric_total, system_info, date_str, alert_title)
+            return self._format_html_metric_alert(metric_type, usage_value, metric_value, metric_emoji, metric_total, system_info, date_str, alert_title, mount)
         else:
-            return self._format_text_metric_alert(metric_type, usage_value, metric_value, metric_emoji, metric_total, system_info, date_str, alert_title)
+            return self._format_text_metric_alert(metric_type, usage_value, metric_value, metric_emoji, metric_total, system_info, date_str, alert_title, mount)
 
-    def _format_html_metric_alert(self, metric_type, usage_value, metric_value, metric_emoji, metric_total, system_info, date_str, alert_title):
+    def _format_html_metric_alert(self, metric_type, usage_value, metric_value, metric_emoji, metric_total, system_info, date_str, alert_title, mount=None):
         """
         HTML formatida metrika xabarini formatlash
         
@@ -102,118 +181,54 @@ class AlertFormatter:
             system_info (dict): Tizim ma'lumotlari
             date_str (str): Sana va vaqt
             alert_title (str): Xabar sarlavhasi
+            mount (str, optional): Disk alerti uchun mount
             
         Returns:
             str: HTML formatida xabar
         """
-        use_box_drawing = self.config.get('alert_format_use_box_drawing', True)
-        width = self.config.get('alert_format_width', 44)
-        
-        if use_box_drawing:
-            line_prefix = self.config.get('alert_format_line_prefix', '│ ')
-            line_suffix = self.config.get('alert_format_line_suffix', ' │')
-            top_border = self.config.get('alert_format_top_border', '┌' + '─' * (width - 2) + '┐')
-            title_border = self.config.get('alert_format_title_border', '├' + '─' * (width - 2) + '┤')
-            section_border = self.config.get('alert_format_section_border', '├' + '─' * (width - 2) + '┤')
-            bottom_border = self.config.get('alert_format_bottom_border', '└' + '─' * (width - 2) + '┘')
-        else:
-            line_prefix = ""
-            line_suffix = ""
-            top_border = ""
-            title_border = "─" * width
-            section_border = "─" * width
-            bottom_border = ""
-        
-        content_width = width - len(line_prefix) - len(line_suffix)
-        
-        message = [f"<pre>{top_border}"]
-        
-        # Sarlavha
-        title_align = self.config.get('alert_format_title_align', 'center')
-        if title_align == 'center':
-            title_line = alert_title.center(content_width)
-        elif title_align == 'right':
-            title_line = alert_title.rjust(content_width)
-        else:
-            title_line = alert_title.ljust(content_width)
-        message.append(f"{line_prefix}{title_line}{line_suffix}")
-        message.append(title_border)
+        t = self.template
+        message = [t.header, t.title(alert_title), t.title_border]
         
-        # Tizim ma'lumotlari
-        emojis = {
-            'date': self.config.get('alert_format_date_emoji', '🗓️'),
-            'hostname': self.config.get('alert_format_hostname_emoji', '🖥️'),
-            'ip': self.config.get('alert_format_ip_emoji', '🌐'),
-            'uptime': self.config.get('alert_format_uptime_emoji', '⏳')
-        }
-        
-        fields = [
-            (f"{emojis['date']} Date:", date_str),
-            (f"{emojis['hostname']} Hostname:", system_info.get('hostname', 'N/A')),
-            (f"{emojis['ip']} IP Address:", system_info.get('ip', 'N/A')),
-            (f"{emojis['uptime']} Uptime:", system_info.get('uptime', 'N/A'))
-        ]
-        
-        for label, value in fields:
-            line = f"{label} {value}"
-            message.append(f"{line_prefix}{line:<{content_width}}{line_suffix}")
-        
-        message.append(section_border)
+        # Tizim ma'lumotlari (hostname va IP qatorlari keshdan olinadi)
+        message.append(t.field('date', date_str))
+        message.append(t.static_field('hostname', system_info.get('hostname', 'N/A')))
+        message.append(t.static_field('ip', system_info.get('ip', 'N/A')))
+        message.append(t.field('uptime', system_info.get('uptime', 'N/A')))
+        message.append(t.section_border)
         
         # Metrika ma'lumotlari
         metric_text = f"{metric_emoji} {metric_type}: {usage_value}"
         if metric_total != "N/A":
             metric_text += f" of {metric_total}"
         
-        message.append(f"{line_prefix}{metric_text:<{content_width}}{line_suffix}")
+        message.append(t.line(metric_text))
         
         # Metrika turiga qarab qo'shimcha ma'lumotlar
         metric_key = metric_type.lower()
         
-        if metric_key == 'cpu' and self.config.get('include_top_processes', False):
-            message.append(section_border)
-            top_processes = self.monitor.get_top_processes('CPU')
-            top_processes_lines = top_processes.split('\n')
-            
-            header = f"{self.config.get('alert_format_top_processes_emoji', '🧾')} Top CPU Consumers:"
-            message.append(f"{line_prefix}{header:<{content_width}}{line_suffix}")
-            
-            for line in top_processes_lines:
-                if line.strip():
-                    message.append(f"{line_prefix}{line:<{content_width}}{line_suffix}")
+        if metric_key == 'disk':
+            for line in self._disk_eta_lines(mount):
+                message.append(t.line(line))
         
-        elif metric_key == 'ram' and self.config.get('include_top_processes', False):
-            message.append(section_border)
-            top_processes = self.monitor.get_top_processes('RAM')
-            top_processes_lines = top_processes.split('\n')
+        if metric_key in ('cpu', 'ram') and self.config.get('include_top_processes', False):
+            message.append(t.section_border)
+            top_processes = self.monitor.get_top_processes(metric_type.upper())
+            message.append(t.top_cpu_header if metric_key == 'cpu' else t.top_ram_header)
             
-            header = f"{self.config.get('alert_format_top_processes_emoji', '🧾')} Top RAM Consumers:"
-            message.append(f"{line_prefix}{header:<{content_width}}{line_suffix}")
-            
-            for line in top_processes_lines:
+            for line in top_processes.split('\n'):
                 if line.strip():
-                    message.append(f"{line_prefix}{line:<{content_width}}{line_suffix}")
+                    message.append(t.line(line))
         
         elif metric_key == 'disk' and self.config.get('alert_format_include_disk_breakdown', False):
-            message.append(section_border)
-            disk_breakdown = self.monitor.get_disk_breakdown() if hasattr(self.monitor, 'get_disk_breakdown') else None
-            
-            header = f"{self.config.get('alert_format_disk_breakdown_emoji', '📁')} Disk Usage Breakdown:"
-            message.append(f"{line_prefix}{header:<{content_width}}{line_suffix}")
-            
-            if disk_breakdown:
-                for path, size in disk_breakdown.items():
-                    line = f"  - {path:<15} {size}"
-                    message.append(f"{line_prefix}{line:<{content_width}}{line_suffix}")
-            else:
-                message.append(f"{line_prefix}  - Ma'lumot topilmadi{' ' * (content_width - 22)}{line_suffix}")
+            message.append(t.section_border)
+            message.extend(self._disk_breakdown_lines())
         
-        message.append(bottom_border)
+        message.append(t.bottom_border)
         message.append("</pre>")
         
         return "\n".join(message)
 
-    def _format_text_metric_alert(self, metric_type, usage_value, metric_value, metric_emoji, metric_total, system_info, date_str, alert_title):
+    def _format_text_metric_alert(self, metric_type, usage_value, metric_value, metric_emoji, metric_total, system_info, date_str, alert_title, mount=None):
         """
         Oddiy matn formatida metrika xabarini formatlash
         
@@ -226,6 +241,7 @@ class AlertFormatter:
             system_info (dict): Tizim ma'lumotlari
             date_str (str): Sana va vaqt
             alert_title (str): Xabar sarlavhasi
+            mount (str, optional): Disk alerti uchun mount
             
         Returns:
             str: Oddiy matn formatida xabar
@@ -233,12 +249,7 @@ class AlertFormatter:
         message = f"{alert_title}\n\n"
         
         # Tizim ma'lumotlari
-        emojis = {
-            'date': self.config.get('alert_format_date_emoji', '🗓️'),
-            'hostname': self.config.get('alert_format_hostname_emoji', '🖥️'),
-            'ip': self.config.get('alert_format_ip_emoji', '🌐'),
-            'uptime': self.config.get('alert_format_uptime_emoji', '⏳')
-        }
+        emojis = self.template.emojis
         
         message += f"{emojis['date']} Date: {date_str}\n"
         message += f"{emojis['hostname']} Hostname: {system_info.get('hostname', 'N/A')}\n"
@@ -249,11 +260,16 @@ class AlertFormatter:
         message += f"{metric_emoji} {metric_type}: {usage_value}"
         if metric_total != "N/A":
             message += f" of {metric_total}"
-        message += "\n\n"
+        message += "\n"
         
         # Metrika turiga qarab qo'shimcha ma'lumotlar
         metric_key = metric_type.lower()
         
+        if metric_key == 'disk':
+            for line in self._disk_eta_lines(mount):
+                message += f"{line}\n"
+        message += "\n"
+        
         if metric_key == 'cpu' and self.config.get('include_top_processes', False):
             top_processes = self.monitor.get_top_processes('CPU')
             message += f"{self.config.get('alert_format_top_processes_emoji', '🧾')} Top CPU Consumers:\n{top_processes}\n"
@@ -387,26 +403,7 @@ class AlertFormatter:
             str: Formatlangan xabar
         """
         try:
-            use_box_drawing = self.config.get('alert_format_use_box_drawing', True)
-            width = self.config.get('alert_format_width', 44)
-            
-            if use_box_drawing:
-                line_prefix = self.config.get('alert_format_line_prefix', '│ ')
-                line_suffix = self.config.get('alert_format_line_suffix', ' │')
-                top_border = self.config.get('alert_format_top_border', '┌' + '─' * (width - 2) + '┐')
-                title_border = self.config.get('alert_format_title_border', '├' + '─' * (width - 2) + '┤')
-                section_border = self.config.get('alert_format_section_border', '├' + '─' * (width - 2) + '┤')
-                bottom_border = self.config.get('alert_format_bottom_border', '└' + '─' * (width - 2) + '┘')
-            else:
-                line_prefix = ""
-                line_suffix = ""
-                top_border = ""
-                title_border = "─" * width
-                section_border = "─" * width
-                bottom_border = ""
-            
-            content_width = width - len(line_prefix) - len(line_suffix)
-
+            t = self.template
             date_str = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             system_info = self.monitor.get_system_info()
             
@@ -418,157 +415,65 @@ class AlertFormatter:
             load_average = self.monitor.check_load_average() if self.config.get('monitor_load', False) else 0
             network_usage = self.monitor.check_network_usage() if self.config.get('monitor_network', False) else [0, 0]
 
-            message = [f"<pre>{top_border}"]
-
             # Sarlavha
             if alert_type and usage_value:
                 title = f"🚨 {alert_type} ALERT: {usage_value}"
             else:
                 title = self.config.get('alert_message_title', '🖥️ SYSTEM STATUS ALERT')
-                
-            title_align = self.config.get('alert_format_title_align', 'center')
-            if title_align == 'center':
-                title_line = title.center(content_width)
-            elif title_align == 'right':
-                title_line = title.rjust(content_width)
-            else:
-                title_line = title.ljust(content_width)
-            message.append(f"{line_prefix}{title_line}{line_suffix}")
-            message.append(title_border)
+            message = [t.header, t.title(title), t.title_border]
 
-            # Tizim ma'lumotlari
+            # Tizim ma'lumotlari (statik maydonlar keshdan olinadi)
             if self.config.get('alert_format_include_system_info', True):
-                emojis = {
-                    'date': self.config.get('alert_format_date_emoji', '🗓️'),
-                    'hostname': self.config.get('alert_format_hostname_emoji', '🖥️'),
-                    'ip': self.config.get('alert_format_ip_emoji', '🌐'),
-                    'uptime': self.config.get('alert_format_uptime_emoji', '⏳'),
-                    'os': self.config.get('alert_format_os_emoji', '🐧'),
-                    'kernel': self.config.get('alert_format_kernel_emoji', '⚙️')
-                }
-                fields = [
-                    (f"{emojis['date']} Date:", date_str),
-                    (f"{emojis['hostname']} Hostname:", system_info.get('hostname', 'N/A')),
-                    (f"{emojis['ip']} IP Address:", system_info.get('ip', 'N/A')),
-                    (f"{emojis['uptime']} Uptime:", system_info.get('uptime', 'N/A')),
-                    (f"{emojis['os']} OS:", system_info.get('os', 'N/A')),
-                    (f"{emojis['kernel']} Kernel:", system_info.get('kernel', 'N/A'))
-                ]
-                for label, value in fields:
-                    line = f"{label} {value}"
-                    message.append(f"{line_prefix}{line:<{content_width}}{line_suffix}")
-                message.append(section_border)
+                message.append(t.field('date', date_str))
+                message.append(t.static_field('hostname', system_info.get('hostname', 'N/A')))
+                message.append(t.static_field('ip', system_info.get('ip', 'N/A')))
+                message.append(t.field('uptime', system_info.get('uptime', 'N/A')))
+                message.append(t.static_field('os', system_info.get('os', 'N/A')))
+                message.append(t.static_field('kernel', system_info.get('kernel', 'N/A')))
+                message.append(t.section_border)
 
             # Resurslar
             if self.config.get('alert_format_include_resources', True):
-                # RAM va CPU
-                ram_text = f"{self.config.get('alert_format_ram_emoji', '🧠')} RAM Usage: {ram_usage}% of {system_info.get('total_ram', 'N/A')}"
-                cpu_text = f"{self.config.get('alert_format_cpu_emoji', '🔥')} CPU Usage: {cpu_usage}% of {system_info.get('total_cpu', 'N/A')}"
-                
-                message.append(f"{line_prefix}{ram_text:<{content_width}}{line_suffix}")
-                message.append(f"{line_prefix}{cpu_text:<{content_width}}{line_suffix}")
+                emojis = t.emojis
+                message.append(t.line(f"{emojis['ram']} RAM Usage: {ram_usage}% of {system_info.get('total_ram', 'N/A')}"))
+                message.append(t.line(f"{emojis['cpu']} CPU Usage: {cpu_usage}% of {system_info.get('total_cpu', 'N/A')}"))
                 
                 # Disk
                 if self.config.get('monitor_disk', False):
-                    disk_text = f"{self.config.get('alert_format_disk_emoji', '💾')} Disk Usage: {disk_usage}% of {system_info.get('total_disk', 'N/A')}"
-                    message.append(f"{line_prefix}{disk_text:<{content_width}}{line_suffix}")
+                    message.append(t.line(f"{emojis['disk']} Disk Usage: {disk_usage}% of {system_info.get('total_disk', 'N/A')}"))
                 
                 # Swap
                 if self.config.get('monitor_swap', False) and self.config.get('include_swap_details', True) and self.config.get('alert_format_include_swap_details', True):
-                    swap_text = f"{self.config.get('alert_format_swap_emoji', '💾')} Swap Usage: {swap_usage}%"
-                    message.append(f"{line_prefix}{swap_text:<{content_width}}{line_suffix}")
+                    message.append(t.line(f"{emojis['swap']} Swap Usage: {swap_usage}%"))
                 
                 # Load Average
                 if self.config.get('monitor_load', False) and self.config.get('include_load_details', True) and self.config.get('alert_format_include_load_details', True):
-                    load_text = f"{self.config.get('alert_format_load_emoji', '⚖️')} Load Average: {load_average:.1f}%"
-                    message.append(f"{line_prefix}{load_text:<{content_width}}{line_suffix}")
+                    message.append(t.line(f"{emojis['load']} Load Average: {load_average:.1f}%"))
                 
                 # Network
                 if self.config.get('monitor_network', False) and self.config.get('include_network_details', True) and self.config.get('alert_format_include_network_details', True):
-                    network_text = f"{self.config.get('alert_format_network_emoji', '🌐')} Network: RX {network_usage[0]:.1f} Mbps, TX {network_usage[1]:.1f} Mbps"
-                    message.append(f"{line_prefix}{network_text:<{content_width}}{line_suffix}")
+                    message.append(t.line(f"{emojis['network']} Network: RX {network_usage[0]:.1f} Mbps, TX {network_usage[1]:.1f} Mbps"))
                 
-                message.append(section_border)
+                message.append(t.section_border)
 
-            # Top jarayonlar (RAM)
+            # Top jarayonlar (RAM va CPU)
             if self.config.get('alert_format_include_top_processes', True) and self.config.get('include_top_processes', False):
                 # Umumiy qiymatlarni ko'rsatish uchun show_total=True
                 self.config['show_total_cpu_usage_in_list'] = True
                 
-                header = f"{self.config.get('alert_format_top_processes_emoji', '🧾')} Top RAM Consumers:"
-                message.append(f"{line_prefix}{header:<{content_width}}{line_suffix}")
-                
-                top_processes = self.monitor.get_top_processes('RAM')
-                top_processes_lines = top_processes.split('\n')
-                
-                # Jarayonlar va umumiy qiymatni alohida ajratish
-                process_lines = []
-                total_line = ""
-                
-                for proc in top_processes_lines:
-                    if proc.strip():
-                        if proc.startswith('Umumiy RAM:'):
-                            total_line = proc
-                        elif proc.startswith('│'):
-                            process_lines.append(proc)
-                        else:
-                            process_lines.append(f"{line_prefix}{proc:<{content_width}}{line_suffix}")
-                
-                # Jarayonlarni qo'shish
-                for line in process_lines:
-                    message.append(line)
-                
-                # Umumiy qiymatni qo'shish
-                if total_line:
-                    message.append(f"{line_prefix}{total_line:<{content_width}}{line_suffix}")
-                
-                message.append(section_border)
+                message.append(t.top_ram_header)
+                message.extend(self._process_lines(self.monitor.get_top_processes('RAM'), 'Umumiy RAM:'))
+                message.append(t.section_border)
 
-                # Top jarayonlar (CPU)
-                header = f"{self.config.get('alert_format_top_processes_emoji', '🧾')} Top CPU Consumers:"
-                message.append(f"{line_prefix}{header:<{content_width}}{line_suffix}")
-                
-                top_cpu_processes = self.monitor.get_top_processes('CPU')
-                top_cpu_processes_lines = top_cpu_processes.split('\n')
-                
-                # Jarayonlar va umumiy qiymatni alohida ajratish
-                process_lines = []
-                total_line = ""
-                
-                for proc in top_cpu_processes_lines:
-                    if proc.strip():
-                        if proc.startswith('Umumiy CPU usage'):
-                            total_line = proc
-                        elif proc.startswith('│'):
-                            process_lines.append(proc)
-                        else:
-                            process_lines.append(f"{line_prefix}{proc:<{content_width}}{line_suffix}")
-                
-                # Jarayonlarni qo'shish
-                for line in process_lines:
-                    message.append(line)
-                
-                # Umumiy qiymatni qo'shish
-                if total_line:
-                    message.append(f"{line_prefix}{total_line:<{content_width}}{line_suffix}")
-                
-                message.append(section_border)
+                message.append(t.top_cpu_header)
+                message.extend(self._process_lines(self.monitor.get_top_processes('CPU'), 'Umumiy CPU usage'))
+                message.append(t.section_border)
 
             # Disk breakdown
             if self.config.get('alert_format_include_disk_breakdown', True) and self.config.get('monitor_disk', False) and self.config.get('include_disk_details', True):
-                disk_breakdown = self.monitor.get_disk_breakdown() if hasattr(self.monitor, 'get_disk_breakdown') else None
-                
-                header = f"{self.config.get('alert_format_disk_breakdown_emoji', '📁')} Disk Usage Breakdown:"
-                message.append(f"{line_prefix}{header:<{content_width}}{line_suffix}")
-                
-                if disk_breakdown:
-                    for path, size in disk_breakdown.items():
-                        line = f"  - {path:<15} {size}"
-                        message.append(f"{line_prefix}{line:<{content_width}}{line_suffix}")
-                else:
-                    message.append(f"{line_prefix}  - Ma'lumot topilmadi{' ' * (content_width - 22)}{line_suffix}")
+                message.extend(self._disk_breakdown_lines())
             
-            message.append(bottom_border)
+            message.append(t.bottom_border)
             message.append("</pre>")
             
             return "\n".join(message)
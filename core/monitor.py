@@ -14,6 +14,8 @@ import time
 import os
 import re
 
+from utils.histogram import COLLECTOR_SECONDS, timed
+
 class SystemMonitor:
     def __init__(self, config, logger):
         """
@@ -40,6 +42,7 @@ class SystemMonitor:
         self._last_network_bytes_sent = 0
         self._last_network_rates = [0, 0]  # [rx_rate, tx_rate]
 
+    @timed(COLLECTOR_SECONDS, 'system_info')
     def get_system_info(self):
         """
         Tizim haqida umumiy ma'lumotlarni olish
@@ -133,6 +136,7 @@ class SystemMonitor:
     #     """
     #     mem = psutil.virtual_memory()
     #     return mem.percent
+    @timed(COLLECTOR_SECONDS, 'ram')
     def check_ram_usage(self):
         try:
             mem = psutil.virtual_memory()
@@ -192,6 +196,7 @@ class SystemMonitor:
     #     except Exception as e:
     #         self.logger.error(f"CPU foydalanishini olishda xatolik (top orqali): {e}")
     #         return 0
+    @timed(COLLECTOR_SECONDS, 'cpu')
     def check_cpu_usage(self):
         if not self.config.get('monitor_cpu', False):
             return 0
@@ -203,6 +208,7 @@ class SystemMonitor:
             self.logger.error(f"CPU foydalanishini olishda xatolik: {e}")
             return 0
         
+    @timed(COLLECTOR_SECONDS, 'disk')
     def check_disk_usage(self):
         """
         Disk foydalanish foizini tekshirish
@@ -219,6 +225,76 @@ class SystemMonitor:
             self.logger.error(f"Disk foydalanishini tekshirishda xatolik: {e}")
             return 0
     
+    def get_disk_bytes(self, path=None):
+        """
+        Mount uchun band va bo'sh hajmni baytlarda olish
+        
+        Args:
+            path (str, optional): Mount yo'li (standart: disk_path)
+            
+        Returns:
+            tuple: (band baytlar, bo'sh baytlar) yoki xatolikda None
+        """
+        try:
+            disk_usage = psutil.disk_usage(path or self.config['disk_path'])
+            return disk_usage.used, disk_usage.free
+        except Exception as e:
+            self.logger.error(f"Disk hajmini olishda xatolik ({path}): {e}")
+            return None
+    
+    @timed(COLLECTOR_SECONDS, 'cpu_per_core')
+    def get_cpu_per_core(self):
+        """
+        Har bir yadro bo'yicha CPU foizi (oldingi chaqiruvdan beri, bloklashsiz)
+        
+        Returns:
+            list: Yadrolar foizlari (xatolikda bo'sh ro'yxat)
+        """
+        try:
+            return psutil.cpu_percent(interval=None, percpu=True)
+        except Exception as e:
+            self.logger.error(f"Yadrolar bo'yicha CPU ni olishda xatolik: {e}")
+            return []
+    
+    @timed(COLLECTOR_SECONDS, 'filesystems')
+    def get_filesystems(self):
+        """
+        Ulangan fayl tizimlarining hajmlari
+        
+        Returns:
+            list: (mount, qurilma, fstype, umumiy, band, bo'sh baytlar) ro'yxati
+        """
+        filesystems = []
+        try:
+            partitions = psutil.disk_partitions(all=False)
+        except Exception as e:
+            self.logger.error(f"Disk bo'linmalarini olishda xatolik: {e}")
+            return filesystems
+        for partition in partitions:
+            try:
+                usage = psutil.disk_usage(partition.mountpoint)
+            except Exception:
+                # Ruxsat yo'q yoki bo'shatilgan qurilma (CD-ROM, uzilgan NFS)
+                continue
+            filesystems.append((partition.mountpoint, partition.device, partition.fstype,
+                                usage.total, usage.used, usage.free))
+        return filesystems
+    
+    @timed(COLLECTOR_SECONDS, 'interfaces')
+    def get_interface_counters(self):
+        """
+        Tarmoq interfeyslari hisoblagichlari (ishga tushgandan beri)
+        
+        Returns:
+            dict: interfeys -> psutil snetio (bytes_recv, bytes_sent, errin, errout, ...)
+        """
+        try:
+            return psutil.net_io_counters(pernic=True)
+        except Exception as e:
+            self.logger.error(f"Tarmoq hisoblagichlarini olishda xatolik: {e}")
+            return {}
+    
+    @timed(COLLECTOR_SECONDS, 'swap')
     def check_swap_usage(self):
         """
         Swap xotira foydalanish foizini tekshirish
@@ -237,6 +313,7 @@ class SystemMonitor:
             self.logger.error(f"Swap foydalanishini tekshirishda xatolik: {e}")
             return 0
 
+    @timed(COLLECTOR_SECONDS, 'load')
     def check_load_average(self):
         """
         Tizim yuklanishini tekshirish (core boshiga)
@@ -255,6 +332,7 @@ class SystemMonitor:
             self.logger.error(f"Yuklanishni tekshirishda xatolik: {e}")
             return 0
 
+    @timed(COLLECTOR_SECONDS, 'network')
     def check_network_usage(self):
         """
         Tarmoq foydalanishini tekshirish (Mbps) - bloklashsiz usulda
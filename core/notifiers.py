@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Alert yuborish backendlari (notifier) moduli
+Telegram, JSON webhook, SMTP, syslog va fayl (NDJSON) backendlari
+Har bir backend o'z navbati, timeout va qayta urinish siyosatiga ega,
+alert barcha backendlarga parallel tarqatiladi (fan-out)
+"""
+
+import re
+import html
+import json
+import time
+import queue
+import socket
+import smtplib
+import threading
+import logging.handlers
+from concurrent.futures import Future
+from email.message import EmailMessage
+
+import requests
+
+from utils.histogram import NOTIFY_SECONDS
+
+# Jiddiylik darajalari
+SEVERITIES = ('info', 'warning', 'critical')
+
+
+def plain_text(message):
+    """
+    HTML (<pre>) xabarni oddiy matnga aylantirish
+
+    Args:
+        message (str): Telegram uchun formatlangan xabar
+
+    Returns:
+        str: Oddiy matn
+    """
+    return html.unescape(re.sub(r'</?[a-zA-Z][^>]*>', '', message or '')).strip()
+
+
+class Notifier:
+    # Backend turi (konfiguratsiyadagi `type`)
+    TYPE = None
+
+    def __init__(self, name, options, logger):
+        """
+        Backendni ishga tushirish
+
+        Args:
+            name (str): Backend nomi (konfiguratsiya bo'limidan)
+            options (dict): Backend sozlamalari
+            logger (logging.Logger): Log yozish uchun logger obyekti
+        """
+        self.name = name
+        self.options = options
+        self.logger = logger
+
+        self.timeout = float(options.get('timeout', 10))
+        self.max_retries = max(1, int(options.get('max_retries', 3)))
+        self.retry_delay = float(options.get('retry_delay', 2))
+        self.queue_size = int(options.get('queue_size', 100))
+
+        severities = options.get('severities', ','.join(SEVERITIES))
+        self.severities = {s.strip().lower() for s in severities.split(',') if s.strip()}
+
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._thread = None
+        self.dropped = 0
+
+    def accepts(self, alert):
+        """
+        Marshrutlash qoidasi: alert shu backendga yuboriladimi
+
+        Args:
+            alert (dict): Alert ma'lumotlari
+
+        Returns:
+            bool: Yuborilishi kerakligi
+        """
+        return alert.get('severity', 'warning') in self.severities
+
+    def send(self, alert):
+        """
+        Alertni bir marta yuborish (backendlar qayta aniqlaydi)
+
+        Args:
+            alert (dict): Alert ma'lumotlari
+
+        Returns:
+            object: Muvaffaqiyatda truthy natija (masalan, message_id yoki True)
+        """
+        raise NotImplementedError
+
+    def deliver(self, alert):
+        """
+        Qayta urinish siyosati bilan alertni yuborish
+
+        Args:
+            alert (dict): Alert ma'lumotlari
+
+        Returns:
+            object: send() natijasi yoki muvaffaqiyatsiz bo'lsa None
+        """
+        retry_delay = self.retry_delay
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                with NOTIFY_SECONDS.time(self.TYPE or self.name):
+                    result = self.send(alert)
+                if result:
+                    return result
+                self.logger.warning(f"[{self.name}] alert yuborilmadi (urinish {attempt}/{self.max_retries})")
+            except Exception as e:
+                self.logger.warning(f"[{self.name}] alert yuborishda xatolik (urinish {attempt}/{self.max_retries}): {e}")
+
+            if attempt < self.max_retries:
+                time.sleep(retry_delay)
+                retry_delay *= 2
+
+        self.logger.error(f"[{self.name}] alert yuborib bo'lmadi ({self.max_retries} urinishdan so'ng)")
+        return None
+
+    def start(self):
+        """
+        Backend navbatini qayta ishlovchi oqimni ishga tushirish
+        """
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, name=f"notifier-{self.name}", daemon=True)
+            self._thread.start()
+
+    def submit(self, alert):
+        """
+        Alertni backend navbatiga qo'yish (bloklamaydi)
+
+        Args:
+            alert (dict): Alert ma'lumotlari
+
+        Returns:
+            Future: Yuborish natijasi (navbat to'lgan bo'lsa None)
+        """
+        future = Future()
+        try:
+            self._queue.put_nowait((alert, future))
+        except queue.Full:
+            self.dropped += 1
+            self.logger.error(f"[{self.name}] navbat to'lgan, alert tashlab yuborildi (jami {self.dropped})")
+            return None
+        return future
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+            alert, future = item
+            try:
+                future.set_result(self.deliver(alert))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    def close(self, timeout=5):
+        """
+        Navbatdagi alertlarni yuborib, oqimni to'xtatish
+
+        Args:
+            timeout (float): Kutish vaqti (soniya)
+        """
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+        self._thread = None
+
+
+class TelegramNotifier(Notifier):
+    TYPE = 'telegram'
+
+    def __init__(self, name, options, logger):
+        super().__init__(name, options, logger)
+        self.bot_token = options.get('bot_token', '')
+        self.chat_id = options.get('chat_id', '')
+        self.api_url = f"https://api.telegram.org/bot{self.bot_token}"
+
+    def send(self, alert):
+        if not self.bot_token or not self.chat_id:
+            self.logger.warning("Telegram bot token yoki chat ID ko'rsatilmagan")
+            return None
+
+        data = {
+            'chat_id': self.chat_id,
+            'text': alert['message'],
+            'parse_mode': alert.get('parse_mode', 'HTML')
+        }
+
+        # Faol incident xabarini joyida yangilash
+        if alert.get('edit_message_id'):
+            data['message_id'] = alert['edit_message_id']
+            response = requests.post(f"{self.api_url}/editMessageText", data=data, timeout=self.timeout)
+            if response.status_code == 400 and 'not modified' in response.text:
+                return alert['edit_message_id']
+            if response.status_code != 200:
+                self.logger.warning(f"Telegram xabarini tahrirlashda xatolik: {response.reason}")
+                return None
+            return alert['edit_message_id']
+
+        response = requests.post(f"{self.api_url}/sendMessage", data=data, timeout=self.timeout)
+        if response.status_code != 200:
+            self.logger.warning(f"Telegramga xabar yuborishda xatolik: {response.reason}")
+            return None
+
+        # message_id keyinchalik xabarni tahrirlash uchun qaytariladi
+        try:
+            return response.json().get('result', {}).get('message_id') or True
+        except ValueError:
+            return True
+
+
+class WebhookNotifier(Notifier):
+    TYPE = 'webhook'
+
+    def __init__(self, name, options, logger):
+        super().__init__(name, options, logger)
+        self.url = options.get('url', '')
+        self.headers = {'Content-Type': 'application/json'}
+        if options.get('auth_header'):
+            self.headers['Authorization'] = options['auth_header']
+
+    def send(self, alert):
+        payload = {key: value for key, value in alert.items() if key != 'message'}
+        payload['text'] = plain_text(alert['message'])
+        response = requests.post(self.url, data=json.dumps(payload), headers=self.headers, timeout=self.timeout)
+        return 200 <= response.status_code < 300
+
+
+class SMTPNotifier(Notifier):
+    TYPE = 'smtp'
+
+    def __init__(self, name, options, logger):
+        super().__init__(name, options, logger)
+        self.host = options.get('host', 'localhost')
+        self.port = int(options.get('port', 25))
+        self.sender = options.get('from', f"system-monitor@{socket.gethostname()}")
+        self.recipients = [r.strip() for r in options.get('to', '').split(',') if r.strip()]
+        self.username = options.get('username', '')
+        self.password = options.get('password', '')
+        self.starttls = str(options.get('starttls', 'false')).lower() in ('1', 'true', 'yes', 'on')
+
+    def send(self, alert):
+        if not self.recipients:
+            self.logger.warning(f"[{self.name}] SMTP qabul qiluvchilari ko'rsatilmagan")
+            return None
+
+        email = EmailMessage()
+        email['Subject'] = f"[{alert.get('severity', 'warning').upper()}] {alert.get('hostname', '')}: {alert.get('title', '')}"
+        email['From'] = self.sender
+        email['To'] = ', '.join(self.recipients)
+        email.set_content(plain_text(alert['message']))
+
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            smtp.send_message(email)
+        return True
+
+
+class SyslogNotifier(Notifier):
+    TYPE = 'syslog'
+
+    # Jiddiylik -> syslog darajasi
+    LEVELS = {'info': logging.INFO, 'warning': logging.WARNING, 'critical': logging.CRITICAL}
+
+    def __init__(self, name, options, logger):
+        super().__init__(name, options, logger)
+        address = options.get('address', '/dev/log')
+        if ':' in address:
+            host, port = address.rsplit(':', 1)
+            address = (host, int(port))
+        facility = logging.handlers.SysLogHandler.facility_names.get(options.get('facility', 'daemon'), logging.handlers.SysLogHandler.LOG_DAEMON)
+
+        self.handler = logging.handlers.SysLogHandler(address=address, facility=facility)
+        self.handler.setFormatter(logging.Formatter('system-monitor: %(message)s'))
+
+    def send(self, alert):
+        text = f"{alert.get('title', '')} - {alert.get('value', '')} ({alert.get('hostname', '')})"
+        record = logging.LogRecord('system_monitor', self.LEVELS.get(alert.get('severity'), logging.WARNING),
+                                   __file__, 0, text, None, None)
+        self.handler.emit(record)
+        return True
+
+    def close(self, timeout=5):
+        super().close(timeout)
+        self.handler.close()
+
+
+class FileNotifier(Notifier):
+    TYPE = 'file'
+
+    def __init__(self, name, options, logger):
+        super().__init__(name, options, logger)
+        self.path = options.get('path', '/var/log/system_monitor_alerts.ndjson')
+
+    def send(self, alert):
+        record = {key: value for key, value in alert.items() if key != 'message'}
+        record['text'] = plain_text(alert['message'])
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        return True
+
+
+# Konfiguratsiyadagi `type` -> backend klassi
+NOTIFIER_TYPES = {cls.TYPE: cls for cls in (TelegramNotifier, WebhookNotifier, SMTPNotifier, SyslogNotifier, FileNotifier)}
+
+
+class NotifierDispatcher:
+    def __init__(self, config, logger):
+        """
+        Konfiguratsiyadan backendlarni yaratish
+
+        `[Notifier:<nom>]` bo'limlari bo'lmasa, General bo'limidagi bot_token va
+        chat_id bilan yagona Telegram backendi ishlatiladi.
+
+        Args:
+            config (dict): Konfiguratsiya sozlamalari
+            logger (logging.Logger): Log yozish uchun logger obyekti
+        """
+        self.config = config
+        self.logger = logger
+        self.notifiers = []
+
+        definitions = config.get('notifiers') or [{'name': 'telegram', 'type': 'telegram'}]
+        for options in definitions:
+            options = dict(options)
+            notifier_type = options.get('type', 'telegram').lower()
+            notifier_class = NOTIFIER_TYPES.get(notifier_type)
+            if notifier_class is None:
+                self.logger.error(f"Noma'lum notifier turi: {notifier_type}")
+                continue
+
+            if notifier_type == 'telegram':
+                options.setdefault('bot_token', config.get('bot_token', ''))
+                options.setdefault('chat_id', config.get('chat_id', ''))
+
+            try:
+                notifier = notifier_class(options.get('name', notifier_type), options, logger)
+            except Exception as e:
+                self.logger.error(f"{notifier_type} notifierini yaratishda xatolik: {e}")
+                continue
+
+            notifier.start()
+            self.notifiers.append(notifier)
+            self.logger.info(f"Notifier yoqildi: {notifier.name} ({notifier_type}, {', '.join(sorted(notifier.severities))})")
+
+    def get(self, name):
+        """
+        Nomi bo'yicha backendni olish
+
+        Args:
+            name (str): Backend nomi
+
+        Returns:
+            Notifier: Backend yoki None
+        """
+        for notifier in self.notifiers:
+            if notifier.name == name:
+                return notifier
+        return None
+
+    def find_type(self, notifier_type):
+        """
+        Turi bo'yicha birinchi backendni olish
+
+        Args:
+            notifier_type (str): Backend turi (masalan, 'telegram')
+
+        Returns:
+            Notifier: Backend yoki None
+        """
+        for notifier in self.notifiers:
+            if notifier.TYPE == notifier_type:
+                return notifier
+        return None
+
+    def dispatch(self, alert):
+        """
+        Alertni marshrut qoidalariga mos barcha backendlarga parallel tarqatish
+
+        Har bir backend o'z oqimida ishlaydi, shuning uchun sekin backend
+        (masalan, SMTP relay) boshqalarini kechiktirmaydi.
+
+        Args:
+            alert (dict): Alert ma'lumotlari
+
+        Returns:
+            dict: {backend nomi: Future} - navbatga qo'yilgan backendlar
+        """
+        futures = {}
+        for notifier in self.notifiers:
+            if not notifier.accepts(alert):
+                continue
+            future = notifier.submit(alert)
+            if future is not None:
+                futures[notifier.name] = future
+        return futures
+
+    def close(self, timeout=5):
+        """
+        Barcha backendlarni to'xtatish
+
+        Args:
+            timeout (float): Har bir backend uchun kutish vaqti
+        """
+        for notifier in self.notifiers:
+            notifier.close(timeout)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Alert qoidalarini baholash moduli
+Bitta tekshiruv natijasi (metrikalar lug'ati) bo'yicha threshold, oyna,
+anomaliya va disk bashorati alertlarini yuborish yoki yopish. Mahalliy
+tekshiruv sikli ham, agentlardan namuna qabul qiluvchi agregator ham
+shu funksiyadan foydalanadi
+"""
+
+# Konfiguratsiyada ko'rsatilmagan threshold'lar uchun standart qiymatlar
+DEFAULT_THRESHOLDS = {
+    'ram_threshold': 80,
+    'cpu_threshold': 90,
+    'disk_threshold': 90,
+    'swap_threshold': 80,
+    'load_threshold': 80,
+    'network_threshold': 90,
+}
+
+
+def metric_checks(config, forecasting=False):
+    """
+    Tekshiriladigan metrikalar ro'yxati
+
+    Args:
+        config (dict): Konfiguratsiya sozlamalari
+        forecasting (bool): Disk bashorati yoqilgan (Disk alerti foiz bo'yicha emas, ETA bo'yicha)
+
+    Returns:
+        list: (metrika turi, kalit, birlik) lar
+    """
+    # (metrika turi, kalit, birlik, tekshirilsinmi)
+    checks = [
+        ('RAM', 'ram', '%', True),
+        ('CPU', 'cpu', '%', config.get('monitor_cpu', False)),
+        ('Disk', 'disk', '%', config.get('monitor_disk', False) and not forecasting),
+        ('Swap', 'swap', '%', config.get('monitor_swap', False)),
+        ('Load', 'load', '%', config.get('monitor_load', False)),
+    ]
+
+    # Network alertlari faqat network_separate_alert yoqilganda yuboriladi
+    if config.get('monitor_network', False) and config.get('network_separate_alert', False):
+        checks.append(('Network RX', 'network_rx', 'Mbps', True))
+        checks.append(('Network TX', 'network_tx', 'Mbps', True))
+
+    return [(metric_type, metric_key, unit) for metric_type, metric_key, unit, enabled in checks if enabled]
+
+
+def metric_value(metrics, metric_key):
+    """
+    Metrikalar lug'atidan kalit qiymati (network_rx/tx - network [rx, tx] dan)
+    """
+    if metric_key.startswith('network'):
+        network_usage = metrics.get('network') or [0, 0]
+        return network_usage[0 if metric_key == 'network_rx' else 1]
+    return metrics.get(metric_key, 0)
+
+
+def metric_threshold(config, metric_key):
+    """
+    Metrika chegarasi (konfiguratsiyadan yoki standart)
+    """
+    threshold_key = 'network_threshold' if metric_key.startswith('network') else f"{metric_key}_threshold"
+    return config.get(threshold_key, DEFAULT_THRESHOLDS.get(threshold_key, 90))
+
+
+def format_usage(metric_key, value, unit):
+    """
+    Xabardagi qiymat matni ("85.5%", "12.3 Mbps")
+    """
+    if unit == '%':
+        return f"{value:.1f}%" if metric_key == 'load' else f"{value}%"
+    return f"{value:.1f} {unit}"
+
+
+def evaluate_anomaly(metric_type, metric_key, value, unit, usage_value, alert_manager, anomaly_detector,
+                     database=None, system_info=None, timestamp=None):
+    """
+    Bazaviy qiymatdan og'ish (anomaliya) tekshiruvi - alert yuborish yoki yopish
+
+    Args:
+        metric_type (str): Metrika turi
+        metric_key (str): Metrika kaliti
+        value (float): Joriy qiymat
+        unit (str): Metrika birligi
+        usage_value (str): Qiymat matni
+        alert_manager (AlertManager): Alert yuboruvchi
+        anomaly_detector (AnomalyDetector): Anomaliya detektori
+        database (Database, optional): Alertlar yoziladigan baza
+        system_info (dict, optional): Xost ma'lumotlari
+        timestamp (float, optional): Namuna vaqti
+    """
+    anomaly = anomaly_detector.update(metric_key, value, timestamp)
+    anomaly_title = f"📈 {metric_type} ANOMALY"
+    # Threshold alerti bilan umumiy interval bo'lmasligi uchun alohida kalit
+    anomaly_key = f"{metric_key}_anomaly"
+    if anomaly:
+        alert_manager.format_and_send_metric_alert(metric_type, usage_value + anomaly_detector.describe(anomaly, unit),
+                                                   database, system_info, alert_title=anomaly_title, alert_key=anomaly_key)
+    elif metric_key in anomaly_detector.baselines:
+        alert_manager.resolve_metric_alert(metric_type, usage_value, system_info, alert_title=anomaly_title,
+                                           alert_key=anomaly_key)
+
+
+def evaluate_alerts(config, metrics, system_info, alert_manager, alert_windows, anomaly_detector,
+                    database=None, disk_forecaster=None, timestamp=None):
+    """
+    Metrikalar bo'yicha alertlarni baholash - har bir metrika uchun alohida xabar
+
+    Args:
+        config (dict): Konfiguratsiya sozlamalari
+        metrics (dict): Tekshiruv metrikalari (network - [rx, tx] Mbps)
+        system_info (dict): Xost ma'lumotlari
+        alert_manager (AlertManager): Alert yuboruvchi
+        alert_windows (AlertWindows): Oyna qoidalari
+        anomaly_detector (AnomalyDetector): Anomaliya detektori
+        database (Database, optional): Alertlar yoziladigan baza
+        disk_forecaster (DiskForecaster, optional): Disk to'lish bashoratchisi
+        timestamp (float, optional): Namuna vaqti (standart: joriy vaqt)
+    """
+    forecasting = disk_forecaster is not None and disk_forecaster.enabled
+
+    for metric_type, metric_key, unit in metric_checks(config, forecasting):
+        value = metric_value(metrics, metric_key)
+        threshold = metric_threshold(config, metric_key)
+        usage_value = format_usage(metric_key, value, unit)
+
+        # Oyna qoidasi bo'lsa, qiymat oyna bo'yicha baholanadi
+        triggered, compared_value, compared_threshold = alert_windows.check(metric_key, value, threshold, timestamp)
+        if triggered:
+            alert_manager.format_and_send_metric_alert(metric_type, usage_value + alert_windows.describe(metric_key, compared_value, unit),
+                                                       database, system_info, compared_value, compared_threshold)
+        else:
+            alert_manager.resolve_metric_alert(metric_type, usage_value, system_info)
+
+        evaluate_anomaly(metric_type, metric_key, value, unit, usage_value, alert_manager, anomaly_detector,
+                         database, system_info, timestamp)
+
+    # "N soatdan kam vaqtda to'ladi" alertlari - har bir mount o'z interval kaliti va
+    # band foizi bilan (bir mount alerti boshqasini cheklamaydi)
+    if forecasting:
+        due_mounts = {mount for mount, _ in disk_forecaster.due_alerts()}
+        for mount in disk_forecaster.mounts:
+            usage = disk_forecaster.usage_percent(mount)
+            usage_value = f"{usage}%" if usage is not None else "N/A"
+            if mount in due_mounts:
+                alert_manager.format_and_send_metric_alert('Disk', f"{usage_value} ({mount} {disk_forecaster.describe(mount)})",
+                                                           database, system_info, alert_key=f"disk_{mount}", mount=mount)
+            else:
+                alert_manager.resolve_metric_alert('Disk', usage_value, system_info, alert_key=f"disk_{mount}")
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Alert xabarlari uchun oldindan kompilyatsiya qilingan shablonlar moduli
+Ramka chegaralari, ustun kengliklari va statik qatorlar konfiguratsiya
+yuklanganda bir marta hisoblanadi; emoji va keng belgilar kengligi keshlanadi
+"""
+
+import unicodedata
+from functools import lru_cache
+
+# Emoji ko'rinishini beruvchi variation selector va nol kenglikdagi birlashtiruvchi
+_VARIATION_SELECTOR_16 = '️'
+_ZERO_WIDTH_JOINER = '‍'
+
+# Tayyor qatorlar keshi hajmi (to'lganda tozalanadi)
+_LINE_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=4096)
+def _char_width(char):
+    """
+    Bitta belgining terminaldagi kengligi
+
+    Args:
+        char (str): Belgi
+
+    Returns:
+        int: 0, 1 yoki 2
+    """
+    if char in (_VARIATION_SELECTOR_16, _ZERO_WIDTH_JOINER) or unicodedata.combining(char):
+        return 0
+    if unicodedata.category(char) in ('Mn', 'Me', 'Cf'):
+        return 0
+    if unicodedata.east_asian_width(char) in ('W', 'F'):
+        return 2
+    return 1
+
+
+@lru_cache(maxsize=4096)
+def _wide_text_width(text):
+    width = 0
+    previous = ''
+    for char in text:
+        if char == _VARIATION_SELECTOR_16 and previous and _char_width(previous) == 1:
+            # "🗓️" kabi emoji + VS16 ikki ustun egallaydi
+            width += 1
+        width += _char_width(char)
+        previous = char
+    return width
+
+
+def display_width(text):
+    """
+    Matnning ekrandagi kengligi (emoji va keng belgilarni hisobga olgan holda)
+
+    ASCII matnlar uchun oddiy len() ishlatiladi, qolganlari keshlanadi.
+
+    Args:
+        text (str): Matn
+
+    Returns:
+        int: Ustunlar soni
+    """
+    if text.isascii():
+        return len(text)
+    return _wide_text_width(text)
+
+
+def pad(text, width):
+    """
+    Matnni ekran kengligi bo'yicha o'ngdan bo'shliq bilan to'ldirish
+
+    Args:
+        text (str): Matn
+        width (int): Kerakli kenglik
+
+    Returns:
+        str: To'ldirilgan matn
+    """
+    return text + ' ' * max(0, width - display_width(text))
+
+
+class AlertTemplate:
+    def __init__(self, config):
+        """
+        Konfiguratsiyadan xabar shablonini kompilyatsiya qilish
+
+        Barcha alert_format_* kalitlari shu yerda bir marta o'qiladi, ramka va
+        kengliklar oldindan hisoblanadi. Render paytida faqat dinamik qiymatlar
+        qo'yiladi.
+
+        Args:
+            config (dict): Konfiguratsiya sozlamalari
+        """
+        width = config.get('alert_format_width', 44)
+        self.use_box_drawing = config.get('alert_format_use_box_drawing', True)
+
+        if self.use_box_drawing:
+            self.line_prefix = config.get('alert_format_line_prefix', '│ ')
+            self.line_suffix = config.get('alert_format_line_suffix', ' │')
+            self.top_border = config.get('alert_format_top_border', '┌' + '─' * (width - 2) + '┐')
+            self.title_border = config.get('alert_format_title_border', '├' + '─' * (width - 2) + '┤')
+            self.section_border = config.get('alert_format_section_border', '├' + '─' * (width - 2) + '┤')
+            self.bottom_border = config.get('alert_format_bottom_border', '└' + '─' * (width - 2) + '┘')
+        else:
+            self.line_prefix = ""
+            self.line_suffix = ""
+            self.top_border = ""
+            self.title_border = "─" * width
+            self.section_border = "─" * width
+            self.bottom_border = ""
+
+        self.content_width = width - len(self.line_prefix) - len(self.line_suffix)
+        self.title_align = config.get('alert_format_title_align', 'center')
+        self.header = f"<pre>{self.top_border}"
+
+        self.emojis = {
+            'date': config.get('alert_format_date_emoji', '🗓️'),
+            'hostname': config.get('alert_format_hostname_emoji', '🖥️'),
+            'ip': config.get('alert_format_ip_emoji', '🌐'),
+            'uptime': config.get('alert_format_uptime_emoji', '⏳'),
+            'os': config.get('alert_format_os_emoji', '🐧'),
+            'kernel': config.get('alert_format_kernel_emoji', '⚙️'),
+            'ram': config.get('alert_format_ram_emoji', '🧠'),
+            'cpu': config.get('alert_format_cpu_emoji', '🔥'),
+            'disk': config.get('alert_format_disk_emoji', '💾'),
+            'swap': config.get('alert_format_swap_emoji', '💾'),
+            'load': config.get('alert_format_load_emoji', '⚖️'),
+            'network': config.get('alert_format_network_emoji', '🌐'),
+            'top_processes': config.get('alert_format_top_processes_emoji', '🧾'),
+            'disk_breakdown': config.get('alert_format_disk_breakdown_emoji', '📁'),
+        }
+
+        # Maydon yorliqlari: (yorliq, ekran kengligi) - bir marta hisoblanadi
+        labels = {
+            'date': 'Date:', 'hostname': 'Hostname:', 'ip': 'IP Address:',
+            'uptime': 'Uptime:', 'os': 'OS:', 'kernel': 'Kernel:',
+        }
+        self.labels = {}
+        for key, label in labels.items():
+            text = f"{self.emojis[key]} {label} "
+            self.labels[key] = (text, display_width(text))
+
+        # Tayyor qatorlar keshi: matn yoki (maydon, qiymat) -> qator
+        self._line_cache = {}
+
+        # Statik sarlavhalar
+        self.top_ram_header = self.line(f"{self.emojis['top_processes']} Top RAM Consumers:")
+        self.top_cpu_header = self.line(f"{self.emojis['top_processes']} Top CPU Consumers:")
+        self.disk_breakdown_header = self.line(f"{self.emojis['disk_breakdown']} Disk Usage Breakdown:")
+        self.no_data_line = f"{self.line_prefix}  - Ma'lumot topilmadi{' ' * (self.content_width - 22)}{self.line_suffix}"
+
+    def line(self, text):
+        """
+        Matnni ramka qatoriga joylash (tayyor qatorlar keshlanadi)
+
+        Args:
+            text (str): Qator matni
+
+        Returns:
+            str: Prefiks, to'ldirilgan matn va suffiksdan iborat qator
+        """
+        line = self._line_cache.get(text)
+        if line is None:
+            if len(self._line_cache) >= _LINE_CACHE_SIZE:
+                self._line_cache.clear()
+            line = self._line_cache[text] = f"{self.line_prefix}{pad(text, self.content_width)}{self.line_suffix}"
+        return line
+
+    def title(self, text):
+        """
+        Sarlavha qatorini tekislash
+
+        Args:
+            text (str): Sarlavha
+
+        Returns:
+            str: Ramka ichidagi sarlavha qatori
+        """
+        free = max(0, self.content_width - display_width(text))
+        if self.title_align == 'center':
+            left = free // 2
+            aligned = ' ' * left + text + ' ' * (free - left)
+        elif self.title_align == 'right':
+            aligned = ' ' * free + text
+        else:
+            aligned = text + ' ' * free
+        return f"{self.line_prefix}{aligned}{self.line_suffix}"
+
+    def field(self, key, value):
+        """
+        "emoji Yorliq: qiymat" qatorini yaratish (yorliq kengligi oldindan hisoblangan)
+
+        Args:
+            key (str): Maydon kaliti (date, hostname, ip, uptime, os, kernel)
+            value (str): Qiymat
+
+        Returns:
+            str: Ramka qatori
+        """
+        label, label_width = self.labels[key]
+        value = str(value)
+        spaces = max(0, self.content_width - label_width - display_width(value))
+        return f"{self.line_prefix}{label}{value}{' ' * spaces}{self.line_suffix}"
+
+    def static_field(self, key, value):
+        """
+        Kamdan-kam o'zgaradigan maydon (hostname, IP, OS, kernel) - tayyor qator keshlanadi
+
+        Args:
+            key (str): Maydon kaliti
+            value (str): Qiymat
+
+        Returns:
+            str: Ramka qatori
+        """
+        cache_key = (key, value)
+        line = self._line_cache.get(cache_key)
+        if line is None:
+            if len(self._line_cache) >= _LINE_CACHE_SIZE:
+                self._line_cache.clear()
+            line = self._line_cache[cache_key] = self.field(key, value)
+        return line
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sirpanuvchi oyna (sliding window) shartlari moduli
+"avg 5m", "max 2m", "ratio 80% 10 samples" kabi barqaror holat qoidalari
+Har bir metrika uchun ring buffer va monoton deque'lar - har bir namuna O(1)
+"""
+
+import re
+import time
+from collections import deque
+
+# Davomiylik birliklari (soniyada)
+_DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+# Qo'llab-quvvatlanadigan agregatsiyalar
+WINDOW_AGGREGATIONS = ('avg', 'min', 'max', 'ratio')
+
+
+def parse_duration(text):
+    """
+    Davomiylik matnini soniyaga aylantirish ("300", "30s", "5m", "1h", "1d")
+
+    Args:
+        text (str): Davomiylik matni
+
+    Returns:
+        int: Soniyalar soni
+    """
+    match = re.fullmatch(r'(\d+)\s*([smhd]?)', text.strip().lower())
+    if not match:
+        raise ValueError(f"Noto'g'ri davomiylik: {text}")
+    return int(match.group(1)) * _DURATION_UNITS.get(match.group(2) or 's')
+
+
+class SlidingWindow:
+    # Vaqt oynasi ring bufferining yuqori chegarasi (namunalar soni)
+    MAX_CAPACITY = 65536
+
+    def __init__(self, window_seconds=None, max_samples=None):
+        """
+        Sirpanuvchi oynani ishga tushirish
+
+        Oyna vaqt (window_seconds) yoki namunalar soni (max_samples) bo'yicha
+        cheklanadi. Namunalar oldindan ajratilgan ring bufferda saqlanadi, yig'indi
+        va "threshold dan yuqori" hisoblagichi inkremental yangilanadi, min/max esa
+        monoton deque'lar orqali amortizatsiyalangan O(1) da topiladi.
+
+        Vaqt oynasida max_samples faqat boshlang'ich sig'im: namunalar kutilganidan
+        tez kelsa (masalan, scrape rejimi), bufer oynadagi namunalarni yo'qotmasdan
+        ikki baravar kengayadi (MAX_CAPACITY gacha).
+
+        Args:
+            window_seconds (float, optional): Oyna uzunligi (soniya)
+            max_samples (int, optional): Ring buffer sig'imi (namunalar soni)
+        """
+        if not window_seconds and not max_samples:
+            raise ValueError("window_seconds yoki max_samples ko'rsatilishi kerak")
+
+        self.window_seconds = window_seconds
+        self.capacity = max(1, int(max_samples or 1024))
+
+        # Ring buffer: (tartib raqami, vaqt, qiymat, threshold dan yuqorimi)
+        self._ring = [None] * self.capacity
+        self._head = 0  # eng eski namuna indeksi
+        self._count = 0
+        self._seq = 0  # keyingi namuna tartib raqami
+
+        # Kuzatilgan namunalar oralig'i: oxirgi ikki oraliqning kichigi
+        self.interval = None
+        self._last_time = None
+        self._last_gap = None
+
+        # Inkremental statistikalar
+        self._sum = 0.0
+        self._above = 0
+
+        # Monoton deque'lar: (tartib raqami, qiymat)
+        self._min_deque = deque()
+        self._max_deque = deque()
+
+    def __len__(self):
+        return self._count
+
+    def _evict_oldest(self):
+        """
+        Eng eski namunani oynadan chiqarish
+        """
+        seq, _, value, above = self._ring[self._head]
+        self._ring[self._head] = None
+        self._head = (self._head + 1) % self.capacity
+        self._count -= 1
+
+        self._sum -= value
+        if above:
+            self._above -= 1
+
+        if self._min_deque and self._min_deque[0][0] == seq:
+            self._min_deque.popleft()
+        if self._max_deque and self._max_deque[0][0] == seq:
+            self._max_deque.popleft()
+
+    def _grow(self):
+        """
+        Ring bufferni ikki baravar kengaytirish (namunalar tartibi saqlanadi)
+        """
+        capacity = min(self.capacity * 2, self.MAX_CAPACITY)
+        ring = [self._ring[(self._head + i) % self.capacity] for i in range(self._count)]
+        self._ring = ring + [None] * (capacity - self._count)
+        self._head = 0
+        self.capacity = capacity
+
+    def _observe(self, now):
+        """
+        Namunalar orasidagi oraliqni yangilash
+
+        Bitta uzun uzilish (agent to'xtab qolgani) oynani darhol "to'lgan" qilib
+        qo'ymasligi uchun oxirgi ikki oraliqning kichigi olinadi.
+
+        Args:
+            now (float): Namuna vaqti
+        """
+        if self._last_time is not None and now > self._last_time:
+            gap = now - self._last_time
+            if self._last_gap is not None:
+                self.interval = min(gap, self._last_gap)
+            self._last_gap = gap
+        self._last_time = now
+
+    def _expire(self, now):
+        """
+        Vaqt oynasidan tashqarida qolgan namunalarni chiqarish
+
+        Args:
+            now (float): Joriy vaqt
+        """
+        if not self.window_seconds:
+            return
+
+        cutoff = now - self.window_seconds
+        while self._count and self._ring[self._head][1] <= cutoff:
+            self._evict_oldest()
+
+    def add(self, value, threshold=None, timestamp=None):
+        """
+        Yangi namunani qo'shish
+
+        Args:
+            value (float): Metrika qiymati
+            threshold (float, optional): "Yuqori" hisoblash uchun chegara qiymati
+            timestamp (float, optional): Namuna vaqti (standart: joriy vaqt)
+        """
+        now = time.time() if timestamp is None else timestamp
+        value = float(value)
+
+        self._observe(now)
+        self._expire(now)
+        if self._count == self.capacity:
+            if self.window_seconds and self.capacity < self.MAX_CAPACITY:
+                self._grow()
+            else:
+                self._evict_oldest()
+
+        above = threshold is not None and value >= threshold
+        seq = self._seq
+        self._seq += 1
+
+        self._ring[(self._head + self._count) % self.capacity] = (seq, now, value, above)
+        self._count += 1
+
+        self._sum += value
+        if above:
+            self._above += 1
+
+        while self._min_deque and self._min_deque[-1][1] >= value:
+            self._min_deque.pop()
+        self._min_deque.append((seq, value))
+
+        while self._max_deque and self._max_deque[-1][1] <= value:
+            self._max_deque.pop()
+        self._max_deque.append((seq, value))
+
+    def avg(self):
+        """
+        Oynadagi o'rtacha qiymat
+
+        Returns:
+            float: O'rtacha qiymat (bo'sh bo'lsa 0)
+        """
+        return self._sum / self._count if self._count else 0.0
+
+    def min(self):
+        """
+        Oynadagi eng kichik qiymat
+
+        Returns:
+            float: Eng kichik qiymat (bo'sh bo'lsa 0)
+        """
+        return self._min_deque[0][1] if self._min_deque else 0.0
+
+    def max(self):
+        """
+        Oynadagi eng katta qiymat
+
+        Returns:
+            float: Eng katta qiymat (bo'sh bo'lsa 0)
+        """
+        return self._max_deque[0][1] if self._max_deque else 0.0
+
+    def ratio_above(self):
+        """
+        Oynadagi threshold dan yuqori namunalar ulushi
+
+        Returns:
+            float: Ulush (0.0 - 1.0)
+        """
+        return self._above / self._count if self._count else 0.0
+
+    def span(self):
+        """
+        Oynadagi eng eski va eng yangi namunalar orasidagi vaqt
+
+        Returns:
+            float: Soniyalar
+        """
+        if not self._count:
+            return 0.0
+        newest = self._ring[(self._head + self._count - 1) % self.capacity]
+        return newest[1] - self._ring[self._head][1]
+
+
+class WindowRule:
+    def __init__(self, agg, window_seconds=None, samples=None, ratio=None):
+        """
+        Oyna qoidasini yaratish
+
+        Args:
+            agg (str): Agregatsiya turi (avg, min, max, ratio)
+            window_seconds (int, optional): Vaqt oynasi (soniya)
+            samples (int, optional): Namunalar soni bo'yicha oyna
+            ratio (float, optional): ratio qoidasi uchun talab qilinadigan ulush (0-1)
+        """
+        if agg not in WINDOW_AGGREGATIONS:
+            raise ValueError(f"Noma'lum agregatsiya: {agg}")
+        if agg == 'ratio' and ratio is None:
+            raise ValueError("ratio qoidasi uchun ulush ko'rsatilishi kerak")
+
+        self.agg = agg
+        self.window_seconds = window_seconds
+        self.samples = samples
+        self.ratio = ratio
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Qoida matnini tahlil qilish
+
+        Misollar: "avg 5m", "max 2m", "min 10 samples", "ratio 80% 10 samples", "ratio 0.8 5m"
+
+        Args:
+            text (str): Qoida matni
+
+        Returns:
+            WindowRule: Qoida obyekti
+        """
+        parts = text.strip().lower().split()
+        if not parts:
+            raise ValueError("Bo'sh qoida")
+
+        agg = parts.pop(0)
+        ratio = None
+        if agg == 'ratio':
+            if not parts:
+                raise ValueError(f"ratio qoidasida ulush yo'q: {text}")
+            raw = parts.pop(0)
+            ratio = float(raw.rstrip('%')) / 100 if raw.endswith('%') else float(raw)
+            if not 0 < ratio <= 1:
+                raise ValueError(f"Ulush 0 va 1 orasida bo'lishi kerak: {text}")
+
+        # Ixtiyoriy "over" / "of" so'zlari
+        parts = [p for p in parts if p not in ('over', 'of', 'last')]
+        if not parts:
+            raise ValueError(f"Qoidada oyna uzunligi yo'q: {text}")
+
+        if len(parts) == 2 and parts[1] in ('samples', 'sample', 'n'):
+            return cls(agg, samples=int(parts[0]), ratio=ratio)
+        if len(parts) == 1:
+            return cls(agg, window_seconds=parse_duration(parts[0]), ratio=ratio)
+        raise ValueError(f"Noto'g'ri qoida: {text}")
+
+    def describe(self):
+        """
+        Qoidaning qisqa tavsifi (xabarlar uchun)
+
+        Returns:
+            str: Tavsif, masalan "avg 5m" yoki "80% of 10 samples"
+        """
+        if self.samples:
+            span = f"{self.samples} samples"
+        elif self.window_seconds % 3600 == 0:
+            span = f"{self.window_seconds // 3600}h"
+        elif self.window_seconds % 60 == 0:
+            span = f"{self.window_seconds // 60}m"
+        else:
+            span = f"{self.window_seconds}s"
+
+        if self.agg == 'ratio':
+            return f"{self.ratio * 100:.0f}% of {span}"
+        return f"{self.agg} {span}"
+
+
+class AlertWindows:
+    # Konfiguratsiyadagi metrika kalitlari va ularning qoida kalitlari
+    METRIC_KEYS = ('ram', 'cpu', 'disk', 'swap', 'load', 'network_rx', 'network_tx')
+
+    def __init__(self, config, logger):
+        """
+        Metrikalar uchun oyna qoidalarini ishga tushirish
+
+        Qoidalar konfiguratsiyadagi `<metrika>_condition` kalitlaridan olinadi
+        (Network uchun `network_condition` RX va TX ga birdek qo'llanadi).
+        Qoida ko'rsatilmagan metrikalar avvalgidek bitta namuna bo'yicha tekshiriladi.
+
+        Args:
+            config (dict): Konfiguratsiya sozlamalari
+            logger (logging.Logger): Log yozish uchun logger obyekti
+        """
+        self.config = config
+        self.logger = logger
+        self.rules = {}
+        self.windows = {}
+
+        check_interval = max(1, config.get('check_interval', 60))
+
+        for key in self.METRIC_KEYS:
+            config_key = 'network_condition' if key.startswith('network') else f"{key}_condition"
+            text = config.get(config_key, '')
+            if not text:
+                continue
+            try:
+                rule = WindowRule.parse(text)
+            except ValueError as e:
+                self.logger.error(f"{config_key} qoidasini o'qishda xatolik: {e}")
+                continue
+
+            # Vaqt oynasi uchun boshlang'ich sig'im: oynaga sig'adigan namunalar + zaxira
+            # (namunalar tezroq kelsa oyna o'zi kengayadi)
+            capacity = rule.samples or (rule.window_seconds // check_interval + 2)
+            self.rules[key] = rule
+            self.windows[key] = SlidingWindow(rule.window_seconds, capacity)
+            self.logger.info(f"{key} uchun oyna qoidasi: {rule.describe()}")
+
+    def _is_warm(self, rule, window):
+        """
+        Oynada qaror qabul qilish uchun yetarli namuna borligini tekshirish
+
+        Vaqt oynasi uchun namunalar orasidagi kuzatilgan oraliq ishlatiladi:
+        pull rejimida tekshiruvlar check_interval emas, scrape'lar tezligida
+        keladi. Oraliq hali ma'lum bo'lmasa check_interval olinadi.
+
+        Args:
+            rule (WindowRule): Qoida
+            window (SlidingWindow): Oyna
+
+        Returns:
+            bool: Oyna to'lganligi
+        """
+        if rule.samples:
+            return len(window) >= rule.samples
+        interval = window.interval or max(1, self.config.get('check_interval', 60))
+        return window.span() + interval >= rule.window_seconds
+
+    def check(self, metric_key, value, threshold, timestamp=None):
+        """
+        Metrika qiymatini oynaga qo'shish va shartni baholash
+
+        Args:
+            metric_key (str): Metrika kaliti (ram, cpu, network_rx, ...)
+            value (float): Joriy qiymat
+            threshold (float): Chegara qiymati
+            timestamp (float, optional): Namuna vaqti (standart: joriy vaqt)
+
+        Returns:
+            tuple: (shart bajarildimi, solishtirilgan qiymat, solishtirilgan chegara)
+                   ratio qoidasi uchun qiymat va chegara foizda qaytariladi
+        """
+        rule = self.rules.get(metric_key)
+        if rule is None:
+            return value >= threshold, value, threshold
+
+        window = self.windows[metric_key]
+        window.add(value, threshold, timestamp)
+
+        if rule.agg == 'ratio':
+            compared, required = window.ratio_above() * 100, rule.ratio * 100
+        else:
+            compared, required = getattr(window, rule.agg)(), threshold
+
+        if not self._is_warm(rule, window):
+            self.logger.debug(f"{metric_key} oynasi hali to'lmagan ({len(window)} namuna)")
+            return False, compared, required
+
+        return compared >= required, compared, required
+
+    def describe(self, metric_key, compared_value, unit='%'):
+        """
+        Xabarga qo'shiladigan oyna izohi
+
+        Args:
+            metric_key (str): Metrika kaliti
+            compared_value (float): check() qaytargan solishtirilgan qiymat
+            unit (str): Metrika birligi
+
+        Returns:
+            str: Izoh (qoida bo'lmasa bo'sh satr)
+        """
+        rule = self.rules.get(metric_key)
+        if rule is None:
+            return ""
+        if rule.agg == 'ratio':
+            return f" ({compared_value:.0f}% of samples, {rule.describe()})"
+        separator = "" if unit == '%' else " "
+        return f" ({rule.describe()}: {compared_value:.1f}{separator}{unit})"
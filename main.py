@@ -12,6 +12,7 @@ import time
 import argparse
 import logging
 import fcntl
+import signal
 from datetime import datetime
 
 # Modullarni import qilish
@@ -19,6 +20,10 @@ from config.config_loader import ConfigLoader
 from core.monitor import SystemMonitor
 from core.alerts import AlertManager
 from core.formatter import AlertFormatter
+from core.windows import AlertWindows
+from core.anomaly import AnomalyDetector
+from core.forecast import DiskForecaster
+from core.rules import evaluate_alerts
 
 def setup_logger(log_file, log_level):
     """
@@ -67,22 +72,230 @@ def setup_logger(log_file, log_level):
     
     return logger
 
-def main():
+def run_query(args, config, logger):
     """
-    Asosiy dastur
+    "query" buyrug'i: metrikani vaqt oralig'i bo'yicha CSV ko'rinishida chiqarish
+    
+    Args:
+        args (argparse.Namespace): Buyruq argumentlari
+        config (dict): Konfiguratsiya sozlamalari
+        logger (logging.Logger): Logger obyekti
+        
+    Returns:
+        int: Chiqish kodi
     """
-    # Lock faylini yaratish
-    lock_file = '/tmp/system_monitor.lock'
-    lock_fd = open(lock_file, 'w')
+    from utils.database import Database
+    from utils.query import parse_time
+    from core.windows import parse_duration
+    
+    if not config.get('db_enabled', False):
+        logger.error("Ma'lumotlar bazasi o'chirilgan (db_enabled = false)")
+        return 1
+    
     try:
-        fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
-    except IOError:
-        logger.error("Boshqa System Monitor jarayoni ishlamoqda. Dastur to'xtatiladi.")
-        sys.exit(1)
+        start = parse_time(args.start)
+        end = parse_time(args.end)
+        step = parse_duration(args.step) if args.step else None
+    except ValueError as e:
+        logger.error(str(e))
+        return 1
+    
+    # So'rov bufferga tegmaydi: ishlab turgan agentning spill fayli o'qilmaydi va o'chirilmaydi
+    database = Database(dict(config, db_spill_path=''), logger)
+    try:
+        print("timestamp,value")
+        for bucket, value in database.query_range(args.metric, args.host, start, end, step, args.agg):
+            print(f"{bucket.strftime('%Y-%m-%d %H:%M:%S')},{'' if value is None else value}")
+    except ValueError as e:
+        logger.error(str(e))
+        return 1
+    finally:
+        database.close()
+    return 0
+
+def run_migrate(args, config, logger):
+    """
+    "migrate" buyrug'i: eski metrics/alerts jadvallarini normallashtirilgan sxemaga ko'chirish
+    
+    Args:
+        args (argparse.Namespace): Buyruq argumentlari
+        config (dict): Konfiguratsiya sozlamalari
+        logger (logging.Logger): Logger obyekti
+        
+    Returns:
+        int: Chiqish kodi
+    """
+    from utils.database import Database, DIALECTS
+    from utils.schema import migrate_to_normalized
+    
+    db_type = config.get('db_type')
+    if db_type not in DIALECTS:
+        logger.error(f"migrate faqat SQL backendlar uchun: {', '.join(DIALECTS)}")
+        return 1
+    
+    # Ko'chirish alohida, oddiy ulanish bilan bajariladi (spill fayliga tegilmaydi)
+    migrate_config = dict(config, db_enabled=True, db_schema='normalized',
+                          db_sqlite_mode='default', db_spill_path='')
+    database = Database(migrate_config, logger)
+    if not migrate_config['db_enabled']:
+        return 1
+    try:
+        with database._connection() as conn:
+            migrated = migrate_to_normalized(conn, db_type, DIALECTS[db_type], logger,
+                                             args.batch_size, args.drop_legacy)
+    except Exception as e:
+        logger.error(f"Ko'chirishda xatolik (qayta ishga tushirilsa davom etadi): {e}")
+        return 1
+    finally:
+        database.close()
+    
+    print(f"Ko'chirildi: metrics - {migrated['metrics']}, alerts - {migrated['alerts']} ta qator")
+    print("Konfiguratsiyada 'db_schema = normalized' ni o'rnating")
+    return 0
 
+def run_export(args, config, logger):
+    """
+    "export" buyrug'i: metrikalar tarixini NDJSON/CSV/Parquet fayliga oqim bilan yozish
+    
+    Args:
+        args (argparse.Namespace): Buyruq argumentlari
+        config (dict): Konfiguratsiya sozlamalari
+        logger (logging.Logger): Logger obyekti
+        
+    Returns:
+        int: Chiqish kodi
+    """
+    from utils.database import Database, DIALECTS
+    from utils.export import export_metrics
+    from utils.query import parse_time
+    
+    if not config.get('db_enabled', False):
+        logger.error("Ma'lumotlar bazasi o'chirilgan (db_enabled = false)")
+        return 1
+    if config.get('db_type') not in DIALECTS:
+        logger.error(f"export faqat SQL backendlar uchun: {', '.join(DIALECTS)}")
+        return 1
+    if (os.path.exists(args.output) and not os.path.exists(args.output + '.checkpoint')
+            and not args.force):
+        logger.error(f"{args.output} mavjud (ustidan yozish uchun --force)")
+        return 1
+    
+    try:
+        start = parse_time(args.start)
+        end = parse_time(args.end)
+    except ValueError as e:
+        logger.error(str(e))
+        return 1
+    
+    # Eksport bufferga tegmaydi: spill fayli agentning o'zida qoladi
+    database = Database(dict(config, db_spill_path=''), logger)
+    try:
+        rows = export_metrics(database, logger, args.output, args.format, args.compress, start, end,
+                              args.host, args.chunk_rows, args.checkpoint_rows)
+    except (ValueError, ImportError) as e:
+        logger.error(f"Eksport qilib bo'lmadi: {e}")
+        return 1
+    except Exception as e:
+        logger.error(f"Eksport to'xtadi (qayta ishga tushirilsa checkpoint'dan davom etadi): {e}")
+        return 1
+    finally:
+        database.close()
+    
+    logger.info(f"{rows} ta qator eksport qilindi: {args.output}")
+    return 0
+
+def run_aggregate(args, config):
+    """
+    "aggregate" buyrug'i: agentlar namunalarini qabul qilib, butun park uchun alertlarni baholash
+    
+    Args:
+        args (argparse.Namespace): Buyruq argumentlari
+        config (dict): Konfiguratsiya sozlamalari
+        
+    Returns:
+        int: Chiqish kodi
+    """
+    from core.aggregator import Aggregator
+    
+    logger = setup_logger(config['log_file'], config['log_level'])
+    logger.info(f"Agregator ishga tushirilmoqda (konfiguratsiya: {args.config})")
+    
+    # Jarayon shardlari (aggregator_workers > 0) bazaga o'z ulanishini ochadi
+    database = None
+    if config.get('db_enabled', False) and not config.get('aggregator_workers', 0):
+        try:
+            from utils.database import Database
+            database = Database(config, logger)
+        except Exception as e:
+            logger.error(f"Ma'lumotlar bazasiga ulanishda xatolik: {e}")
+    
+    try:
+        aggregator = Aggregator(config, logger, database)
+    except Exception as e:
+        logger.error(f"Agregatorni ishga tushirishda xatolik: {e}")
+        if database:
+            database.close()
+        return 1
+    
+    def handle_sigterm(signum, frame):
+        logger.info("SIGTERM qabul qilindi, agregator to'xtatilmoqda")
+        sys.exit(0)
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    
+    try:
+        while True:
+            time.sleep(60)
+            logger.debug(f"Agregator: {len(aggregator.hosts)} xost, {aggregator.samples} namuna, "
+                         f"{aggregator.duplicates} takror, {aggregator.stale} eski, "
+                         f"{aggregator.backpressure} backpressure, {aggregator.silences} jim")
+            summary = aggregator.fleet_summary()
+            if summary and summary['hosts']:
+                cpu = summary['percentiles']['cpu']
+                top = ', '.join(f"{host} {value:.1f}%" for host, value in summary['top_cpu'])
+                logger.debug(f"Park: {summary['hosts']} xost, CPU p50 {cpu['p50']:.1f}% / p90 {cpu['p90']:.1f}% / "
+                             f"p99 {cpu['p99']:.1f}%, eng yuklangan: {top}")
+    except KeyboardInterrupt:
+        logger.info("Agregator to'xtatildi (Ctrl+C)")
+    finally:
+        aggregator.close()
+        if database:
+            database.close()
+    return 0
+
+def main():
+    """
+    Asosiy dastur
+    """
     # Argumentlarni tahlil qilish
     parser = argparse.ArgumentParser(description='Tizim monitoringi')
     parser.add_argument('--config', type=str, default='./config.conf', help='Konfiguratsiya fayli yo\'li')
+    subparsers = parser.add_subparsers(dest='command')
+    
+    query_parser = subparsers.add_parser('query', help="Saqlangan metrikalarni vaqt oralig'i bo'yicha olish (CSV)")
+    query_parser.add_argument('--metric', required=True, help='ram, cpu, disk, swap, load, network_rx, network_tx')
+    query_parser.add_argument('--host', default=None, help='Xost nomi (standart: barcha xostlar)')
+    query_parser.add_argument('--start', default='1d', help='Boshlanish: "YYYY-MM-DD HH:MM", "now" yoki "7d" (7 kun oldin)')
+    query_parser.add_argument('--end', default='now', help='Tugash (standart: now)')
+    query_parser.add_argument('--step', default=None, help='Qadam: 60, 5m, 1h (standart: avtomatik)')
+    query_parser.add_argument('--agg', default='avg', help='avg, min, max, sum, count, last')
+    
+    migrate_parser = subparsers.add_parser('migrate', help="Eski jadvallarni normallashtirilgan sxemaga ko'chirish")
+    migrate_parser.add_argument('--batch-size', type=int, default=5000, help='Bitta batch qatorlari (standart: 5000)')
+    migrate_parser.add_argument('--drop-legacy', action='store_true', help="Tugagach eski metrics/alerts jadvallarini o'chirish")
+    
+    export_parser = subparsers.add_parser('export', help="Metrikalar tarixini faylga eksport qilish (NDJSON, CSV, Parquet)")
+    export_parser.add_argument('--output', '-o', required=True, help="Chiqish fayli (parquet uchun direktoriya)")
+    export_parser.add_argument('--format', default='ndjson', choices=('ndjson', 'csv', 'parquet'), help='Fayl formati (standart: ndjson)')
+    export_parser.add_argument('--compress', default='none', choices=('none', 'gzip', 'zstd'), help='Siqish (standart: none)')
+    export_parser.add_argument('--host', default=None, help='Xost nomi (standart: barcha xostlar)')
+    export_parser.add_argument('--start', default='30d', help='Boshlanish: "YYYY-MM-DD HH:MM", "now" yoki "30d" (30 kun oldin)')
+    export_parser.add_argument('--end', default='now', help='Tugash (standart: now)')
+    export_parser.add_argument('--chunk-rows', type=int, default=5000, help="Bitta so'rovdagi qatorlar (standart: 5000)")
+    export_parser.add_argument('--checkpoint-rows', type=int, default=100000, help="Checkpoint'lar orasidagi qatorlar (standart: 100000)")
+    export_parser.add_argument('--force', action='store_true', help="Mavjud faylning ustidan yozish")
+    
+    subparsers.add_parser('aggregate', help="Agentlardan namunalarni qabul qilib, alertlarni markazda baholash")
+    
     args = parser.parse_args()
     
     # Boshlang'ich logger
@@ -95,6 +308,24 @@ def main():
     config_loader = ConfigLoader(args.config, temp_logger)
     config = config_loader.get_config()
     
+    if args.command == 'query':
+        return run_query(args, config, temp_logger)
+    if args.command == 'migrate':
+        return run_migrate(args, config, temp_logger)
+    if args.command == 'export':
+        return run_export(args, config, temp_logger)
+    if args.command == 'aggregate':
+        return run_aggregate(args, config)
+    
+    # Lock faylini yaratish
+    lock_file = '/tmp/system_monitor.lock'
+    lock_fd = open(lock_file, 'w')
+    try:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except IOError:
+        temp_logger.error("Boshqa System Monitor jarayoni ishlamoqda. Dastur to'xtatiladi.")
+        sys.exit(1)
+    
     # Asosiy loggerni sozlash
     logger = setup_logger(config['log_file'], config['log_level'])
     logger.info(f"System Monitor ishga tushirilmoqda...")
@@ -102,8 +333,13 @@ def main():
     
     # Monitoring obyektlarini yaratish
     monitor = SystemMonitor(config, logger)
-    formatter = AlertFormatter(config, logger, monitor)
-    alert_manager = AlertManager(config, logger, formatter, monitor)
+    disk_forecaster = DiskForecaster(config, logger)
+    formatter = AlertFormatter(config, logger, monitor, disk_forecaster)
+    # Agent rejimida alertlar agregatorda baholanadi - notifier'lar ishga tushirilmaydi
+    agent_mode = config.get('agent_enabled', False)
+    alert_manager = None if agent_mode else AlertManager(config, logger, formatter, monitor)
+    alert_windows = AlertWindows(config, logger)
+    anomaly_detector = AnomalyDetector(config, logger)
     
     # Database obyektini yaratish (agar kerak bo'lsa)
     database = None
@@ -119,78 +355,156 @@ def main():
             logger.error(f"Ma'lumotlar bazasiga ulanishda xatolik: {e}")
             config['db_enabled'] = False
     
+    # Oxirgi namunalar halqa fayli (mahalliy o'quvchilar uchun)
+    ring = None
+    if config.get('ring_enabled', False):
+        try:
+            from utils.ring import RingWriter
+            ring = RingWriter(config, logger)
+        except Exception as e:
+            logger.error(f"Halqa faylini yaratishda xatolik: {e}")
+    
+    # Prometheus /metrics eksporteri (fon oqimida, tayyor matnni beradi);
+    # prometheus_collect = scrape bo'lsa tekshiruvlarni scrape'lar boshlaydi
+    exporter = None
+    if config.get('prometheus_enabled', False):
+        collect = None
+        if config.get('prometheus_collect', 'interval') == 'scrape':
+            collect = lambda: run_check(time.time())
+        try:
+            from utils.exporter import PrometheusExporter
+            exporter = PrometheusExporter(config, logger, collect)
+        except Exception as e:
+            logger.error(f"Prometheus eksporterini ishga tushirishda xatolik: {e}")
+    pull_mode = exporter is not None and exporter.collect is not None
+    
+    # StatsD/Graphite/InfluxDB push chiqishi
+    pusher = None
+    if config.get('push_enabled', False):
+        try:
+            from utils.push import PushEmitter
+            pusher = PushEmitter(config, logger)
+        except Exception as e:
+            logger.error(f"Push chiqishini ishga tushirishda xatolik: {e}")
+    
+    # Namunalarni markaziy agregatorga yuboruvchi agent
+    agent = None
+    if agent_mode:
+        from utils.stream import StreamAgent
+        agent = StreamAgent(config, logger)
+    
+    # SIGTERM da finally bloki ishlashi (buffer yozilishi) uchun chiqish,
+    # SIGUSR1 da metrika bufferini keyingi tickda yozish
+    def handle_sigterm(signum, frame):
+        logger.info("SIGTERM qabul qilindi, dastur to'xtatilmoqda")
+        sys.exit(0)
+    
+    signal.signal(signal.SIGTERM, handle_sigterm)
+    if database:
+        signal.signal(signal.SIGUSR1, lambda signum, frame: database.request_flush())
+    
+    def run_check(start_time):
+        """
+        Bitta tekshiruv: metrikalarni yig'ish, saqlash, chop etish va alertlarni baholash
+        
+        Args:
+            start_time (float): Tekshiruv boshlangan vaqt (epoch)
+        """
+        # Tizim ma'lumotlarini olish
+        system_info = monitor.get_system_info()
+        
+        # Resurslarni tekshirish
+        ram_usage = monitor.check_ram_usage()
+        cpu_usage = monitor.check_cpu_usage() if config.get('monitor_cpu', False) else 0
+        disk_usage = monitor.check_disk_usage() if config.get('monitor_disk', False) else 0
+        swap_usage = monitor.check_swap_usage() if config.get('monitor_swap', False) else 0
+        load_average = monitor.check_load_average() if config.get('monitor_load', False) else 0
+        network_usage = monitor.check_network_usage() if config.get('monitor_network', False) else [0, 0]
+        
+        # Metrikalarni saqlash
+        metrics = {
+            'ram': ram_usage,
+            'cpu': cpu_usage,
+            'disk': disk_usage,
+            'swap': swap_usage,
+            'load': load_average,
+            'network': network_usage
+        }
+        
+        # Mahalliy o'quvchilar uchun halqa fayliga chop etish
+        if ring:
+            ring.publish(metrics, start_time)
+        
+        # Eksporter va push uchun metrika oilalari (tekshiruvga bir marta yig'iladi)
+        families = None
+        if exporter or pusher:
+            from utils.exporter import build_families
+            families = build_families(metrics, system_info, monitor, start_time)
+            if pusher:
+                families += pusher.families()
+        
+        # Prometheus metrikalarini yangilash
+        if config.get('prometheus_enabled', False):
+            if alert_manager:
+                alert_manager.update_prometheus_metrics(metrics)
+            if exporter:
+                exporter.update(families)
+        
+        # Push chiqishiga yuborish
+        if pusher:
+            pusher.emit(families, system_info.get('hostname', ''), start_time)
+        
+        # Ma'lumotlar bazasiga saqlash
+        if config.get('db_enabled', False) and database:
+            database.store_metrics(metrics, system_info)
+        
+        # Disk to'lish bashorati uchun mount'lar hajmini yangilash
+        if disk_forecaster.enabled:
+            for mount in disk_forecaster.mounts:
+                disk_bytes = monitor.get_disk_bytes(mount)
+                if disk_bytes:
+                    disk_forecaster.update(mount, *disk_bytes, timestamp=start_time)
+        
+        # Agent rejimi: namuna agregatorga yuboriladi, alertlar o'sha yerda baholanadi
+        if agent:
+            agent.send(metrics, system_info, start_time)
+            return
+        
+        # Alertlarni tekshirish - har bir metrika uchun alohida xabar yuborish
+        # Umumiy xabar yuborish o'chirilgan
+        evaluate_alerts(config, metrics, system_info, alert_manager, alert_windows, anomaly_detector,
+                        database, disk_forecaster, start_time)
+    
     # Asosiy monitoring sikli
     logger.info("Monitoring sikli boshlandi")
     
     try:
+        if pull_mode:
+            # Tekshiruvlar scrape'lar tomonidan boshlanadi; uzoq vaqt scrape
+            # bo'lmasa, alertlar to'xtab qolmasligi uchun shu yerda bajariladi
+            idle_interval = float(config.get('prometheus_idle_interval', 300))
+            exporter.refresh(0)
+            while True:
+                age = exporter.age()
+                if idle_interval and age >= idle_interval:
+                    exporter.refresh(idle_interval)
+                    continue
+                time.sleep(idle_interval - age if idle_interval else 3600)
+        
+        from utils.histogram import TICK_JITTER_SECONDS
+        
+        scheduled_time = None
         while True:
             start_time = time.time()
-            
-            # Tizim ma'lumotlarini olish
-            system_info = monitor.get_system_info()
-            
-            # Resurslarni tekshirish
-            ram_usage = monitor.check_ram_usage()
-            cpu_usage = monitor.check_cpu_usage() if config.get('monitor_cpu', False) else 0
-            disk_usage = monitor.check_disk_usage() if config.get('monitor_disk', False) else 0
-            swap_usage = monitor.check_swap_usage() if config.get('monitor_swap', False) else 0
-            load_average = monitor.check_load_average() if config.get('monitor_load', False) else 0
-            network_usage = monitor.check_network_usage() if config.get('monitor_network', False) else [0, 0]
-            
-            # Metrikalarni saqlash
-            metrics = {
-                'ram': ram_usage,
-                'cpu': cpu_usage,
-                'disk': disk_usage,
-                'swap': swap_usage,
-                'load': load_average,
-                'network': network_usage
-            }
-            
-            # Prometheus metrikalarini yangilash
-            if config.get('prometheus_enabled', False):
-                alert_manager.update_prometheus_metrics(metrics)
-            
-            # Ma'lumotlar bazasiga saqlash
-            if config.get('db_enabled', False) and database:
-                database.store_metrics(metrics, system_info)
-            
-            # Alertlarni tekshirish - har bir metrika uchun alohida xabar yuborish
-            # Umumiy xabar yuborish o'chirilgan
-            
-            ram_threshold = config.get('ram_threshold', 80)
-            if ram_usage >= ram_threshold:
-                alert_manager.format_and_send_metric_alert('RAM', f"{ram_usage}%", database, system_info, ram_usage, ram_threshold)
-            
-            cpu_threshold = config.get('cpu_threshold', 90)
-            if config.get('monitor_cpu', False) and cpu_usage >= cpu_threshold:
-                alert_manager.format_and_send_metric_alert('CPU', f"{cpu_usage}%", database, system_info, cpu_usage, cpu_threshold)
-            
-            disk_threshold = config.get('disk_threshold', 90)
-            if config.get('monitor_disk', False) and disk_usage >= disk_threshold:
-                alert_manager.format_and_send_metric_alert('Disk', f"{disk_usage}%", database, system_info, disk_usage, disk_threshold)
-            
-            swap_threshold = config.get('swap_threshold', 80)
-            if config.get('monitor_swap', False) and swap_usage >= swap_threshold:
-                alert_manager.format_and_send_metric_alert('Swap', f"{swap_usage}%", database, system_info, swap_usage, swap_threshold)
-            
-            load_threshold = config.get('load_threshold', 80)
-            if config.get('monitor_load', False) and load_average >= load_threshold:
-                alert_manager.format_and_send_metric_alert('Load', f"{load_average:.1f}%", database, system_info, load_average, load_threshold)
-            
-            # Network alertlari o'chirilgan
-            if config.get('monitor_network', False):
-                network_threshold = config.get('network_threshold', 90)
-                network_rx = network_usage[0]
-                network_tx = network_usage[1]
-                if network_rx >= network_threshold and config.get('network_separate_alert', False):
-                    alert_manager.format_and_send_metric_alert('Network RX', f"{network_rx:.1f} Mbps", database, system_info, network_rx, network_threshold)
-                if network_tx >= network_threshold and config.get('network_separate_alert', False):
-                    alert_manager.format_and_send_metric_alert('Network TX', f"{network_tx:.1f} Mbps", database, system_info, network_tx, network_threshold)
+            if scheduled_time is not None:
+                # Oldingi tekshiruv cho'zilgani yoki uyg'onish kechikkani
+                TICK_JITTER_SECONDS.observe(max(0.0, start_time - scheduled_time))
+            run_check(start_time)
             
             # Keyingi tekshirishgacha kutish
             execution_time = time.time() - start_time
             sleep_time = max(1, config.get('check_interval', 60) - execution_time)
+            scheduled_time = start_time + config.get('check_interval', 60)
             
             logger.debug(f"Tekshirish tugadi. Keyingi tekshirishgacha {sleep_time:.1f} soniya")
             time.sleep(sleep_time)
@@ -200,6 +514,24 @@ def main():
     except Exception as e:
         logger.error(f"Kutilmagan xatolik: {e}", exc_info=True)
         return 1
+    finally:
+        # O'rganilgan bazaviy qiymatlar qayta ishga tushirishda yo'qolmasligi uchun
+        anomaly_detector.save_state()
+        # Navbatdagi alertlarni yuborib chiqish
+        if alert_manager:
+            alert_manager.close()
+        # Tasdiqlanmagan namunalarni agregatorga yetkazish
+        if agent:
+            agent.close()
+        # Bufferdagi metrikalarni yozib, ulanishni yopish
+        if database:
+            database.close()
+        if ring:
+            ring.close()
+        if exporter:
+            exporter.close()
+        if pusher:
+            pusher.close()
     
     return 0
 
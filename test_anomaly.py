@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Anomaliya detektorini test qilish uchun skript
+"""
+
+import os
+import sys
+import logging
+import tempfile
+
+# Modullarni import qilish
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from core.anomaly import AnomalyDetector
+
+logger = logging.getLogger('anomaly_test')
+
+
+def _make_config(state_path):
+    return {
+        'anomaly_enabled': True,
+        'anomaly_metrics': 'ram',
+        'anomaly_alpha': 0.1,
+        'anomaly_z_threshold': 3.0,
+        'anomaly_min_samples': 20,
+        'anomaly_min_std': 1.0,
+        'anomaly_state_path': state_path,
+    }
+
+
+def test_anomaly_detection_and_persistence():
+    """
+    Barqaror fonda sakrash aniqlanishini va holat saqlanishini tekshirish
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        state_path = os.path.join(tmp_dir, 'anomaly_state.json')
+        detector = AnomalyDetector(_make_config(state_path), logger)
+
+        # Oddiy holatda 85% atrofida ishlaydigan server
+        for i in range(50):
+            assert detector.update('ram', 85 + (i % 3) - 1, timestamp=i * 60) is None
+
+        anomaly = detector.update('ram', 99, timestamp=50 * 60)
+        assert anomaly is not None and anomaly['z'] >= 3.0
+
+        # Kuzatilmaydigan metrika baholanmaydi
+        assert detector.update('cpu', 100) is None
+
+        assert detector.save_state()
+        restored = AnomalyDetector(_make_config(state_path), logger)
+        saved_mean = detector.baselines['ram'].global_stats.mean
+        assert abs(restored.baselines['ram'].global_stats.mean - saved_mean) < 1e-9
+        assert restored.baselines['ram'].global_stats.count == 51
+
+
+if __name__ == "__main__":
+    test_anomaly_detection_and_persistence()
+    print("Anomaliya testi muvaffaqiyatli yakunlandi!")
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ma'lumotlar bazasiga batch yozishni test qilish uchun skript
+"""
+
+import os
+import sys
+import sqlite3
+import logging
+import datetime
+import tempfile
+import threading
+
+# Modullarni import qilish
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from utils.database import Database
+from utils.write_buffer import WriteBuffer
+from utils.rollups import RetentionPolicy
+from utils.query import choose_resolution
+from utils.sqlite_writer import SQLiteWriter
+from config.config_loader import ConfigLoader
+
+logger = logging.getLogger('database_test')
+
+SYSTEM_INFO = {'hostname': 'test-host', 'ip': '127.0.0.1'}
+
+
+def count_metrics(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM metrics").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_sqlite_batched_writes():
+    """
+    Metrikalar batch_size ga yetganda va yopilganda yozilishini tekshirish
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'metrics.db')
+        config = {
+            'db_enabled': True, 'db_type': 'sqlite', 'db_path': db_path,
+            'db_batch_size': 3, 'db_flush_interval': 3600,
+        }
+        database = Database(config, logger)
+        metrics = {'ram': 50.0, 'cpu': 10.0, 'network': [1.0, 2.0]}
+
+        database.store_metrics(metrics, SYSTEM_INFO)
+        database.store_metrics(metrics, SYSTEM_INFO)
+        assert count_metrics(db_path) == 0
+
+        database.store_metrics(metrics, SYSTEM_INFO)
+        assert count_metrics(db_path) == 3
+
+        database.store_metrics(metrics, SYSTEM_INFO)
+        assert database.store_alert('RAM', '91%', 'test', True, SYSTEM_INFO)
+        database.close()
+        assert count_metrics(db_path) == 4
+
+
+def test_sqlite_performance_mode():
+    """
+    WAL rejimi, yozuvchi oqim va faqat o'qish pulidan so'rov
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'metrics.db')
+        config = {
+            'db_enabled': True, 'db_type': 'sqlite', 'db_path': db_path,
+            'db_sqlite_mode': 'performance', 'db_batch_size': 2, 'db_read_pool_size': 2,
+        }
+        database = Database(config, logger)
+        for _ in range(4):
+            database.store_metrics({'ram': 42.0}, SYSTEM_INFO)
+        database.store_alert('RAM', '91%', 'test', True, SYSTEM_INFO)
+
+        # Navbatdagi yozishlar tugashini kutish
+        database.sqlite_writer.execute("SELECT 1").result()
+        assert database.query("SELECT COUNT(*) FROM metrics")[0][0] == 4
+        assert database.query("SELECT COUNT(*) FROM alerts")[0][0] == 1
+        assert database.query("PRAGMA journal_mode")[0][0] == 'wal'
+
+        # O'qish ulanishi yozishga ruxsat bermaydi
+        try:
+            database.query("DELETE FROM metrics")
+            assert False, "faqat o'qish ulanishi yozdi"
+        except sqlite3.OperationalError:
+            pass
+
+        database.store_metrics({'ram': 43.0}, SYSTEM_INFO)
+        database.close()
+        assert count_metrics(db_path) == 5
+
+
+def test_sqlite_performance_write_failure():
+    """
+    Performance rejimida yozuvchi oqimdagi xatolik qatorlarni yo'qotmaydi - ular bufferda qoladi
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'metrics.db')
+        config = {
+            'db_enabled': True, 'db_type': 'sqlite', 'db_path': db_path, 'db_sqlite_mode': 'performance',
+            'db_batch_size': 100, 'db_flush_interval': 3600, 'db_spill_path': os.path.join(tmp, 'spill.ndjson'),
+        }
+        database = Database(config, logger)
+        database.store_metrics({'ram': 42.0}, SYSTEM_INFO)
+
+        # Jadval yo'q - yozish yozuvchi oqimda xato beradi
+        database.sqlite_writer.execute("ALTER TABLE metrics RENAME TO metrics_moved").result()
+        assert not database.flush()
+        assert len(database.metrics_buffer) == 1
+
+        database.sqlite_writer.execute("ALTER TABLE metrics_moved RENAME TO metrics").result()
+        assert database.flush()
+        assert len(database.metrics_buffer) == 0
+        database.close()
+        assert count_metrics(db_path) == 1
+
+
+def test_writer_exclusive_job():
+    """
+    O'zi commit qiladigan vazifa (purge) navbatdagi boshqa vazifalar tranzaksiyasini
+    commit qilib yubormaydi: keyingi vazifa xato bersa ham qatorlar takrorlanmaydi
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = SQLiteWriter({}, logger, os.path.join(tmp, 'writer.db'))
+        writer.execute("CREATE TABLE t (name TEXT)").result()
+        release = threading.Event()
+
+        def purge(conn):
+            conn.execute("INSERT INTO t VALUES ('purge')")
+            conn.commit()
+
+        def broken(conn):
+            raise sqlite3.OperationalError("buzuq vazifa")
+
+        # Yozuvchi band - keyingi vazifalar bitta guruhga yig'iladi
+        writer.submit(lambda conn: release.wait(5))
+        first = writer.execute("INSERT INTO t VALUES ('a')")
+        writer.submit(purge, exclusive=True)
+        writer.execute("INSERT INTO t VALUES ('b')")
+        failed = writer.submit(broken)
+        release.set()
+
+        assert first.result() == 1
+        assert isinstance(failed.exception(), sqlite3.OperationalError)
+        names = sorted(row[0] for row in writer.submit(lambda conn: conn.execute("SELECT name FROM t").fetchall()).result())
+        writer.close()
+        assert names == ['a', 'b', 'purge']
+
+
+def test_rollups_and_retention():
+    """
+    Rollup jadvallarining batch'lar orasida birlashishi va eski qatorlarni o'chirish
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'metrics.db')
+        config = {
+            'db_enabled': True, 'db_type': 'sqlite', 'db_path': db_path,
+            'db_retention_raw': '0', 'db_retention_1m': '0', 'db_retention_1h': '0',
+        }
+        database = Database(config, logger)
+
+        def row(timestamp, cpu):
+            return (timestamp, 'host-a', '10.0.0.1', 50.0, cpu, 0.0, 0.0, 0.0, 0.0, 0.0, None)
+
+        database._write_metrics([row('2024-01-01 10:00:10', 10.0), row('2024-01-01 10:00:50', 30.0)])
+        database._write_metrics([row('2024-01-01 10:01:05', 20.0), row('2024-01-01 10:00:59', 5.0)])
+
+        minute = database.query(
+            "SELECT min_value, max_value, sum_value, sample_count, last_value FROM metrics_1m "
+            "WHERE metric = 'cpu' AND bucket = '2024-01-01 10:00:00'")
+        assert minute == [(5.0, 30.0, 45.0, 3, 5.0)]
+        hour = database.query("SELECT sum_value / sample_count FROM metrics_1h WHERE metric = 'cpu'")
+        assert hour == [(16.25,)]
+
+        retention = RetentionPolicy({'db_retention_raw': '1d', 'db_retention_1m': '2d', 'db_purge_batch_size': 2},
+                                    logger, 'sqlite')
+        deleted = retention.purge(database.db_conn, now=datetime.datetime(2024, 1, 3, 11, 0))
+        # 4 ta xom qator va 2 ta daqiqa x 7 ta metrika
+        assert deleted == 4 + 2 * 7
+        assert count_metrics(db_path) == 0
+        assert database.query("SELECT COUNT(*) FROM metrics_1h")[0][0] == 7
+        database.close()
+
+
+def test_retention_defaults():
+    """
+    Standart konfiguratsiya xom tarixni o'chirmaydi; db_purge_max_batches o'qiladi
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'config.conf')
+        with open(path, 'w') as f:
+            f.write("[Database]\ndb_purge_max_batches = 3\n")
+        config = ConfigLoader(path, logger).get_config()
+    assert config['db_purge_max_batches'] == 3
+    retention = RetentionPolicy(config, logger, 'sqlite')
+    assert retention.max_batches == 3
+    assert 'metrics' not in [table for table, _, _ in retention.targets]
+
+
+def test_query_range():
+    """
+    Mos darajani tanlash va qadamlar bo'yicha agregatsiya
+    """
+    start = datetime.datetime(2024, 1, 1)
+    assert choose_resolution(start, start + datetime.timedelta(hours=1))[0] == 'raw'
+    assert choose_resolution(start, start + datetime.timedelta(days=7))[0] == '1m'
+    assert choose_resolution(start, start + datetime.timedelta(days=7), step=6 * 3600)[:2] == ('1h', 'metrics_1h')
+    # Xom qatorlar saqlash muddatidan tashqarida bo'lsa, rollup ishlatiladi
+    assert choose_resolution(start, start + datetime.timedelta(minutes=10), retention={'raw': 86400},
+                             now=start + datetime.timedelta(days=2))[0] == '1m'
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = {'db_enabled': True, 'db_type': 'sqlite', 'db_path': os.path.join(tmp, 'metrics.db'),
+                  'db_retention_raw': '0'}
+        database = Database(config, logger)
+        rows = []
+        for minute in range(120):
+            timestamp = (start + datetime.timedelta(minutes=minute)).strftime('%Y-%m-%d %H:%M:%S')
+            rows.append((timestamp, 'host-a', '10.0.0.1', 0.0, float(minute), 0.0, 0.0, 0.0, 0.0, 0.0, None))
+        database._write_metrics(rows)
+
+        hourly = list(database.query_range('cpu', 'host-a', start, start + datetime.timedelta(hours=2), 3600, 'avg'))
+        assert hourly == [(start, 29.5), (start + datetime.timedelta(hours=1), 89.5)]
+        last = list(database.query_range('cpu', 'host-a', start, start + datetime.timedelta(hours=2), 1800, 'last'))
+        assert [value for _, value in last] == [29.0, 59.0, 89.0, 119.0]
+        assert list(database.query_range('cpu', 'other', start, start + datetime.timedelta(hours=2), 3600)) == []
+        database.close()
+
+
+def test_buffer_overflow_policy():
+    """
+    Yozish ishlamaganda bufferning chegaralanishi va qatorlar saqlanib qolishi
+    """
+    written = []
+    failing = [True]
+
+    def flush_callback(rows):
+        if failing[0]:
+            raise RuntimeError("baza ishlamayapti")
+        written.extend(rows)
+
+    config = {'db_batch_size': 2, 'db_buffer_max_rows': 4, 'db_overflow_policy': 'drop_oldest'}
+    buffer = WriteBuffer(config, logger, flush_callback)
+    for i in range(6):
+        buffer.add((i,), now=0)
+
+    assert len(buffer) == 4 and buffer.dropped == 2
+    failing[0] = False
+    assert buffer.flush()
+    assert written == [(2,), (3,), (4,), (5,)]
+
+    config['db_overflow_policy'] = 'drop_newest'
+    failing[0] = True
+    buffer = WriteBuffer(config, logger, flush_callback)
+    results = [buffer.add((i,), now=0) for i in range(6)]
+    assert results == [True] * 4 + [False] * 2
+
+
+def test_spill_file_roundtrip():
+    """
+    Yozilmagan qatorlar to'xtashda spill fayliga saqlanib, keyingi ishga tushishda qayta yuklanishi
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        spill_path = os.path.join(tmp, 'spill', 'metrics.ndjson')
+        buffer = WriteBuffer({'db_batch_size': 100}, logger, lambda rows: None)
+        for minute in range(2):
+            buffer.add((f'2024-01-01 00:0{minute}:00', 'test-host', '127.0.0.1',
+                        1.5, 2.0, 3.0, 0.0, 0.1, 0.0, 0.0, None), now=0)
+        assert buffer.save(spill_path) == 2
+
+        db_path = os.path.join(tmp, 'metrics.db')
+        database = Database({'db_enabled': True, 'db_type': 'sqlite', 'db_path': db_path,
+                             'db_spill_path': spill_path, 'db_batch_size': 100, 'db_retention_raw': '0'}, logger)
+        assert len(database.metrics_buffer) == 2 and not os.path.exists(spill_path)
+        database.close()
+        assert count_metrics(db_path) == 2
+
+
+if __name__ == "__main__":
+    test_sqlite_batched_writes()
+    test_sqlite_performance_mode()
+    test_sqlite_performance_write_failure()
+    test_writer_exclusive_job()
+    test_rollups_and_retention()
+    test_retention_defaults()
+    test_query_range()
+    test_buffer_overflow_policy()
+    test_spill_file_roundtrip()
+    print("Ma'lumotlar bazasi testlari muvaffaqiyatli yakunlandi!")
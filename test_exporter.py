@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Prometheus eksporterini test qilish uchun skript
+"""
+
+import os
+import sys
+import gzip
+import time
+import sqlite3
+import logging
+import tempfile
+import threading
+import urllib.request
+from collections import namedtuple
+
+# Modullarni import qilish
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from utils.exporter import PrometheusExporter, build_families, render
+from utils.database import Database
+
+logger = logging.getLogger('exporter_test')
+
+NetIO = namedtuple('NetIO', 'bytes_recv bytes_sent errin errout')
+
+
+class FakeMonitor:
+    def __init__(self):
+        self.calls = 0
+
+    def get_cpu_per_core(self):
+        self.calls += 1
+        return [10.0, 30.5]
+
+    def get_filesystems(self):
+        return [('/', '/dev/sda1', 'ext4', 1000, 400, 600), ('/mnt/"x"', '/dev/sdb1', 'xfs', 10, 1, 9)]
+
+    def get_interface_counters(self):
+        return {'lo': NetIO(5, 5, 0, 0), 'eth0': NetIO(1234, 4321, 1, 0)}
+
+
+def test_render_families():
+    """
+    HELP/TYPE qatorlari, label'lar va ekranlash
+    """
+    metrics = {'ram': 51.5, 'cpu': 20.0, 'disk': 40, 'swap': 0.0, 'load': 12.25, 'network': [1.5, 0.25]}
+    text = render(build_families(metrics, {'hostname': 'web-01', 'ip': '10.0.0.1'}, FakeMonitor(), 1700000000)).decode()
+
+    assert '# HELP system_monitor_ram_usage_percent RAM foydalanish foizi\n' in text
+    assert '# TYPE system_monitor_ram_usage_percent gauge\nsystem_monitor_ram_usage_percent 51.5\n' in text
+    assert 'system_monitor_disk_usage_percent 40\n' in text
+    assert 'system_monitor_info{hostname="web-01",ip="10.0.0.1"} 1\n' in text
+    assert 'system_monitor_cpu_core_usage_percent{core="1"} 30.5\n' in text
+    assert 'system_monitor_filesystem_free_bytes{mountpoint="/mnt/\\"x\\"",device="/dev/sdb1",fstype="xfs"} 9\n' in text
+    assert '# TYPE system_monitor_network_receive_bytes_total counter\n' in text
+    assert 'system_monitor_network_receive_bytes_total{interface="eth0"} 1234\n' in text
+    assert text.index('interface="eth0"') < text.index('interface="lo"')
+    assert text.endswith('\n') and text.count('# TYPE system_monitor_ram_usage_percent') == 1
+
+
+def test_http_scrape_serves_cached_buffer():
+    """
+    Scrape'lar tayyor buferdan xizmat qiladi (oddiy va gzip), metrikalar qayta yig'ilmaydi
+    """
+    exporter = PrometheusExporter({'prometheus_address': '127.0.0.1', 'prometheus_port': 0}, logger)
+    try:
+        monitor = FakeMonitor()
+        exporter.update(build_families({'ram': 10.0}, {'hostname': 'h', 'ip': '1'}, monitor))
+        url = f'http://127.0.0.1:{exporter.port}/metrics'
+
+        for _ in range(3):
+            with urllib.request.urlopen(url) as response:
+                plain = response.read()
+                assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+        request = urllib.request.Request(url, headers={'Accept-Encoding': 'gzip'})
+        with urllib.request.urlopen(request) as response:
+            assert response.headers['Content-Encoding'] == 'gzip'
+            assert gzip.decompress(response.read()) == plain
+        request = urllib.request.Request(url, headers={'Accept': 'application/openmetrics-text; version=1.0.0'})
+        with urllib.request.urlopen(request) as response:
+            assert response.headers['Content-Type'].startswith('application/openmetrics-text')
+            assert response.read().endswith(b'# EOF\n')
+        assert b'system_monitor_ram_usage_percent 10\n' in plain
+        assert monitor.calls == 1 and exporter.scrapes == 5
+
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{exporter.port}/other')
+            assert False, "404 kutilgan edi"
+        except urllib.error.HTTPError as e:
+            assert e.code == 404
+    finally:
+        exporter.close()
+
+
+def test_pull_mode_single_flight():
+    """
+    Pull rejimi: bir vaqtdagi scrape'lar bitta yig'ishni kutadi, yangi kesh qayta yig'ilmaydi
+    """
+    calls = []
+    release = threading.Event()
+    exporter = None
+
+    def collect():
+        calls.append(time.monotonic())
+        release.wait(5)
+        exporter.update(build_families({'cpu': float(len(calls))}, {'hostname': 'h', 'ip': '1'}, FakeMonitor()))
+
+    exporter = PrometheusExporter({'prometheus_address': '127.0.0.1', 'prometheus_port': 0,
+                                   'prometheus_min_age': 60}, logger, collect)
+    try:
+        url = f'http://127.0.0.1:{exporter.port}/metrics'
+        bodies = []
+
+        def scrape():
+            with urllib.request.urlopen(url, timeout=10) as response:
+                bodies.append(response.read())
+
+        threads = [threading.Thread(target=scrape) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1 and exporter.collections == 1
+        assert len(bodies) == 5 and all(b'system_monitor_cpu_usage_percent 1\n' in body for body in bodies)
+
+        # Kesh min_age dan yosh - scrape yig'ish boshlamaydi, majburiy yangilash boshlaydi
+        scrape()
+        assert len(calls) == 1
+        assert exporter.refresh(0) and len(calls) == 2 and exporter.age() < 1
+    finally:
+        exporter.close()
+
+
+def test_pull_mode_stores_from_scrape_thread():
+    """
+    Pull rejimi: scrape oqimida boshlangan tekshiruv asosiy oqimda ochilgan
+    SQLite bazasiga metrika va alert yoza oladi
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'metrics.db')
+        database = Database({'db_enabled': True, 'db_type': 'sqlite', 'db_path': db_path,
+                             'db_batch_size': 1, 'db_flush_interval': 3600,
+                             'db_spill_path': os.path.join(tmp, 'spill.ndjson')}, logger)
+        system_info = {'hostname': 'h', 'ip': '1'}
+        stored = []
+
+        def collect():
+            stored.append(database.store_metrics({'ram': 50.0, 'cpu': 10.0, 'network': [1.0, 2.0]}, system_info))
+            stored.append(database.store_alert('RAM', '91%', 'test', True, system_info))
+            exporter.update(build_families({'cpu': 10.0}, system_info, FakeMonitor()))
+
+        exporter = PrometheusExporter({'prometheus_address': '127.0.0.1', 'prometheus_port': 0,
+                                       'prometheus_min_age': 0}, logger, collect)
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{exporter.port}/metrics', timeout=10) as response:
+                response.read()
+        finally:
+            exporter.close()
+
+        assert stored == [True, True]
+        # Qator bufferda qolmagan - scrape oqimida yozilgan
+        assert len(database.metrics_buffer) == 0
+        database.close()
+        conn = sqlite3.connect(db_path)
+        try:
+            assert conn.execute("SELECT COUNT(*) FROM metrics").fetchone()[0] == 1
+            assert conn.execute("SELECT COUNT(*) FROM alerts").fetchone()[0] == 1
+        finally:
+            conn.close()
+        assert not os.path.exists(os.path.join(tmp, 'spill.ndjson'))
+
+
+if __name__ == "__main__":
+    test_render_families()
+    test_http_scrape_serves_cached_buffer()
+    test_pull_mode_single_flight()
+    test_pull_mode_stores_from_scrape_thread()
+    print("Prometheus eksporteri testlari muvaffaqiyatli yakunlandi!")
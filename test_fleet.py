@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Park holatining ustunli (NumPy) ko'rinishini test qilish uchun skript
+"""
+
+import os
+import sys
+import random
+import logging
+
+# Modullarni import qilish
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from core.rules import metric_checks, metric_threshold, metric_value
+from core.windows import AlertWindows
+
+logger = logging.getLogger('fleet_test')
+
+
+def make_config(**overrides):
+    config = {'check_interval': 10, 'monitor_cpu': True, 'monitor_disk': True, 'monitor_swap': True,
+              'monitor_load': True, 'monitor_network': True, 'network_separate_alert': True,
+              'ram_threshold': 80, 'cpu_threshold': 70, 'disk_threshold': 90, 'swap_threshold': 50,
+              'load_threshold': 60, 'network_threshold': 100,
+              'cpu_condition': 'avg 1m', 'ram_condition': 'ratio 60% 5 samples', 'load_condition': 'max 30s',
+              'swap_condition': 'min 3 samples'}
+    config.update(overrides)
+    return config
+
+
+def random_metrics():
+    return {'ram': random.uniform(50, 100), 'cpu': random.uniform(40, 100), 'disk': random.uniform(70, 100),
+            'swap': random.uniform(0, 100), 'load': random.uniform(20, 100),
+            'network': [random.uniform(0, 200), random.uniform(0, 200)]}
+
+
+def test_matches_per_host_windows():
+    """
+    Vektorli baholash har bir xost uchun alohida AlertWindows.check() bilan bir xil
+    qaror, solishtirilgan qiymat va chegarani beradi (threshold, avg/max vaqt
+    oynasi, ratio va min namunalar oynasi)
+    """
+    try:
+        from core.fleet import FleetState
+    except ImportError:
+        return
+
+    random.seed(11)
+    config = make_config()
+    # Kichik sig'im: xostlar qo'shilganda ustunlar kengaytiriladi
+    fleet = FleetState(config, logger, capacity=4)
+    hosts = [f"web-{index:02d}" for index in range(40)]
+    windows = {host: AlertWindows(config, logger) for host in hosts}
+    active = {host: set() for host in hosts}
+
+    now = 1000.0
+    for _ in range(30):
+        now += random.choice((5, 10, 10, 20))
+        expected = {}
+        for host in random.sample(hosts, 25):
+            metrics = random_metrics()
+            timestamp = now + random.uniform(0, 1)
+            fleet.update(host, metrics, timestamp)
+            for metric_type, key, unit in metric_checks(config):
+                value = metric_value(metrics, key)
+                triggered, compared, required = windows[host].check(key, value, metric_threshold(config, key), timestamp)
+                if triggered or key in active[host]:
+                    expected[(host, key)] = (triggered, compared, required)
+                if triggered:
+                    active[host].add(key)
+                else:
+                    active[host].discard(key)
+
+        decisions = fleet.evaluate()
+        assert len(decisions) == len(expected)
+        for host, metric_type, key, unit, value, triggered, compared, required in decisions:
+            want = expected[(host, key)]
+            assert triggered == want[0], (host, key)
+            assert abs(compared - want[1]) < 1e-6 and abs(required - want[2]) < 1e-6, (host, key)
+
+    assert len(fleet) == len(hosts) and fleet.capacity >= len(hosts)
+    # Yangi namunasiz tick hech narsa qaytarmaydi
+    assert fleet.evaluate() == []
+
+
+def test_max_age_skips_backfill():
+    """
+    Oxirgi namunasi max_age dan eski xostlar baholanmaydi
+    """
+    try:
+        from core.fleet import FleetState
+    except ImportError:
+        return
+
+    fleet = FleetState(make_config(cpu_condition=''), logger)
+    fleet.update('old-01', {'cpu': 99}, timestamp=100.0)
+    fleet.update('new-01', {'cpu': 99}, timestamp=1000.0)
+    decisions = fleet.evaluate(now=1010.0, max_age=60)
+    assert [(host, key) for host, _, key, *_ in decisions] == [('new-01', 'cpu')]
+
+
+def test_windows_follow_agent_cadence():
+    """
+    Oyna matritsalari agregatorning check_interval i emas, agentlar namunalari
+    oralig'i (aggregator_sample_interval yoki kuzatilgan oraliq) bo'yicha
+    """
+    try:
+        from core.fleet import FleetState
+    except ImportError:
+        return
+
+    for overrides, width in (({'aggregator_sample_interval': 10}, 14), ({}, 4)):
+        fleet = FleetState(make_config(check_interval=60, cpu_condition='avg 2m', **overrides), logger)
+        assert fleet.rings['cpu'][1].shape[1] == width
+        decisions = []
+        for index in range(20):
+            fleet.update('app-01', {'cpu': 99}, timestamp=1000.0 + index * 10)
+            decisions = fleet.evaluate()
+        assert ('app-01', 'cpu', True) in [(host, key, triggered) for host, _, key, _, _, triggered, _, _ in decisions]
+        # "avg 2m" dagi 12 namuna sig'adi
+        assert fleet.rings['cpu'][1].shape[1] >= 13
+
+
+def test_summary():
+    """
+    Persentillar numpy bilan, CPU bo'yicha top-N esa to'liq saralash bilan mos keladi
+    """
+    try:
+        import numpy as np
+        from core.fleet import FleetState, summarize_snapshots
+    except ImportError:
+        return
+
+    random.seed(5)
+    shards = [FleetState(make_config(), logger, capacity=8) for _ in range(3)]
+    samples = {}
+    for index in range(300):
+        host = f"db-{index:03d}"
+        metrics = random_metrics()
+        samples[host] = metrics
+        shards[index % 3].update(host, metrics, timestamp=1000.0)
+
+    summary = summarize_snapshots([shard.snapshot() for shard in shards], top=5)
+    assert summary['hosts'] == 300
+    cpu = np.array([metrics['cpu'] for metrics in samples.values()])
+    for q in (50, 90, 99):
+        assert abs(summary['percentiles']['cpu'][f"p{q}"] - np.percentile(cpu, q)) < 1e-9
+    expected = sorted(samples.items(), key=lambda item: -item[1]['cpu'])[:5]
+    assert summary['top_cpu'] == [(host, metrics['cpu']) for host, metrics in expected]
+
+    # Bitta shard va bo'sh park
+    assert shards[0].summary(top=1)['hosts'] == 100
+    assert summarize_snapshots([], top=5) == {'hosts': 0, 'percentiles': {}, 'top_cpu': []}
+
+
+if __name__ == "__main__":
+    test_matches_per_host_windows()
+    test_max_age_skips_backfill()
+    test_windows_follow_agent_cadence()
+    test_summary()
+    print("Park holati testlari muvaffaqiyatli yakunlandi!")
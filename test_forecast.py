@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Disk to'lish bashoratini test qilish uchun skript
+"""
+
+import os
+import sys
+import logging
+
+# Modullarni import qilish
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from core.forecast import DiskForecaster, LinearTrend, format_eta
+from core.rules import evaluate_alerts
+from core.formatter import AlertFormatter
+
+logger = logging.getLogger('forecast_test')
+
+GB = 1024 ** 3
+
+
+def test_linear_trend_slope():
+    """
+    Gorizontdan chiqqan namunalar regressiyaga ta'sir qilmasligini tekshirish
+    """
+    trend = LinearTrend(horizon_seconds=100, capacity=50)
+    # Avval tez o'sish, keyin 2 birlik/soniya
+    for t in range(0, 100, 10):
+        trend.add(t * 50, t)
+    for t in range(100, 300, 10):
+        trend.add(10000 + t * 2, t)
+
+    assert abs(trend.slope() - 2.0) < 1e-6
+
+
+def test_trend_keeps_horizon_with_fast_samples():
+    """
+    Namunalar check_interval dan tez kelsa ham trend butun gorizontni saqlashi
+    """
+    config = {'disk_forecast_horizon': 3600, 'check_interval': 60}
+    forecaster = DiskForecaster(config, logger)
+    for i in range(1440):
+        forecaster.update('/', 50 * GB + i * 1024, 50 * GB, timestamp=i * 5)
+
+    trend = forecaster.trends['/']
+    assert trend.span() >= 3595
+    assert abs(trend.slope() - 1024 / 5) < 1e-6
+
+
+def test_disk_eta_alert():
+    """
+    Soatiga 1G o'sadigan 100G diskda ETA ni tekshirish (bo'sh joy bo'yicha)
+    """
+    config = {
+        'disk_forecast_enabled': True,
+        'disk_forecast_mounts': '/data',
+        'disk_forecast_horizon': 3600,
+        'disk_forecast_hours': 24,
+        'disk_forecast_min_samples': 5,
+        'check_interval': 60,
+    }
+    forecaster = DiskForecaster(config, logger)
+    for minute in range(30):
+        # 100G disk, 5G root uchun ajratilgan: bo'sh joy total - used dan 5G kam
+        used = 80 * GB + minute * GB / 60
+        forecaster.update('/data', used, 100 * GB - used - 5 * GB, timestamp=minute * 60)
+
+    prediction = forecaster.forecast('/data')
+    assert prediction is not None
+    assert abs(prediction['eta_seconds'] / 3600 - (15 - 29 / 60)) < 0.01
+    assert [mount for mount, _ in forecaster.due_alerts()] == ['/data']
+    assert forecaster.describe('/data').startswith("full in 14h")
+    assert format_eta(2 * 86400 + 5 * 3600) == "2d 5h"
+
+
+class RecordingAlertManager:
+    def __init__(self):
+        self.sent = []
+        self.resolved = []
+
+    def format_and_send_metric_alert(self, metric_type, usage_value, database=None, system_info=None,
+                                     current_value=None, threshold=None, alert_title=None, severity=None, alert_key=None,
+                                     mount=None):
+        self.sent.append((metric_type, usage_value, alert_key))
+
+    def resolve_metric_alert(self, metric_type, usage_value, system_info=None, alert_title=None, alert_key=None):
+        self.resolved.append((metric_type, usage_value, alert_key))
+
+
+class NoWindows:
+    def check(self, metric_key, value, threshold, timestamp=None):
+        return value >= threshold, value, threshold
+
+
+class NoAnomalies:
+    baselines = {}
+
+    def update(self, metric_key, value, timestamp=None):
+        return None
+
+
+def make_mount_forecaster():
+    """
+    /data va /var tez to'layotgan, / esa o'zgarmaydigan uchta mount bashoratchisi
+    """
+    config = {
+        'disk_forecast_enabled': True,
+        'disk_forecast_mounts': '/, /data, /var',
+        'disk_forecast_horizon': 3600,
+        'disk_forecast_hours': 24,
+        'disk_forecast_min_samples': 5,
+        'check_interval': 60,
+        'monitor_disk': True,
+    }
+    forecaster = DiskForecaster(config, logger)
+    for minute in range(30):
+        forecaster.update('/', 40 * GB, 60 * GB, timestamp=minute * 60)
+        forecaster.update('/data', 80 * GB + minute * GB / 60, 20 * GB - minute * GB / 60, timestamp=minute * 60)
+        forecaster.update('/var', 50 * GB + minute * GB / 60, 10 * GB - minute * GB / 60, timestamp=minute * 60)
+    return config, forecaster
+
+
+def test_due_alerts_per_mount():
+    """
+    Har bir mount o'z interval kaliti va o'z band foizi bilan alert qilinadi yoki yopiladi
+    """
+    config, forecaster = make_mount_forecaster()
+    manager = RecordingAlertManager()
+    evaluate_alerts(config, {'ram': 10, 'disk': 40.0}, {'hostname': 'web-01'}, manager, NoWindows(), NoAnomalies(),
+                    disk_forecaster=forecaster, timestamp=29 * 60)
+    assert [(usage_value.split(' ')[:2], alert_key) for _, usage_value, alert_key in manager.sent] == [
+        (['80.5%', '(/data'], 'disk_/data'), (['84.1%', '(/var'], 'disk_/var')]
+    assert ('Disk', '40.0%', 'disk_/') in manager.resolved
+
+
+class DiskMonitor:
+    def check_disk_usage(self):
+        return 40.0
+
+
+def test_alert_shows_only_alerting_mount():
+    """
+    Disk alerti xabarida faqat alert berayotgan mount'ning bashorati ko'rsatiladi
+    """
+    config, forecaster = make_mount_forecaster()
+    formatter = AlertFormatter(config, logger, DiskMonitor(), forecaster)
+    for alert_format in ('HTML', 'TEXT'):
+        message = formatter.format_metric_alert('Disk', '84.1%', alert_format, None, {'hostname': 'web-01'}, mount='/var')
+        assert "/var full in" in message and "/data full in" not in message
+
+
+if __name__ == "__main__":
+    test_linear_trend_slope()
+    test_trend_keeps_horizon_with_fast_samples()
+    test_disk_eta_alert()
+    test_due_alerts_per_mount()
+    test_alert_shows_only_alerting_mount()
+    print("Bashorat testlari muvaffaqiyatli yakunlandi!")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Agent ichki histogrammalarini test qilish uchun skript
+"""
+
+import os
+import sys
+import threading
+
+# Modullarni import qilish
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from utils.histogram import Histogram, timed
+from utils.exporter import render
+
+
+def test_per_thread_shards_merge():
+    """
+    Oqimlar o'z shard'lariga yozadi, snapshot ularni birlashtiradi
+    """
+    histogram = Histogram('test_seconds', "test", buckets=(0.1, 1, 10), labelnames=('kind',), registry=[])
+    barrier = threading.Barrier(4)
+
+    def worker():
+        barrier.wait()
+        for _ in range(1000):
+            histogram.observe(0.5, 'a')
+        histogram.observe(0.1, 'a')
+        histogram.observe(100, 'a')
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    counts, total = histogram.labels('a').snapshot()
+    # le=0.1 chegarasi shu jumladan, 100 faqat +Inf da
+    assert counts == [4, 4004, 4004, 4008]
+    assert total == 4 * (500 + 0.1 + 100)
+    # Tugagan oqimlar shard'lari bazaga qo'shilgan
+    assert histogram.labels('a')._shards == []
+
+
+def test_dead_thread_shards_folded():
+    """
+    Qisqa umrli oqimlar (har scrape uchun yangi oqim) shard'lari to'planib qolmaydi
+    """
+    histogram = Histogram('test_scrape_seconds', "test", buckets=(1,), registry=[])
+    child = histogram.labels()
+    for _ in range(500):
+        thread = threading.Thread(target=histogram.observe, args=(0.5,))
+        thread.start()
+        thread.join()
+    histogram.observe(2)
+
+    # Faqat tirik (joriy) oqim shard'i qoladi, sonlar yo'qolmaydi
+    assert len(child._shards) <= 2
+    assert child.snapshot() == ([500, 501], 252.0)
+    assert len(child._shards) == 1
+
+
+def test_openmetrics_histogram_text():
+    """
+    OpenMetrics matni: _bucket/_count/_sum, le qiymatlari, counter nomlari va # EOF
+    """
+    histogram = Histogram('test_flush_seconds', "Yozish davomiyligi", buckets=(0.25, 1), labelnames=('backend',),
+                          registry=[])
+
+    @timed(histogram, 'sqlite')
+    def work():
+        return 42
+
+    assert work() == 42
+    histogram.observe(0.5, 'sqlite')
+
+    families = [histogram.family(), ('test_bytes', 'counter', "Baytlar", [('_total', (('interface', 'eth0'),), 7)])]
+    text = render(families, openmetrics=True).decode()
+    assert '# TYPE test_flush_seconds histogram\n' in text
+    assert 'test_flush_seconds_bucket{backend="sqlite",le="0.25"} 1\n' in text
+    assert 'test_flush_seconds_bucket{backend="sqlite",le="1.0"} 2\n' in text
+    assert 'test_flush_seconds_bucket{backend="sqlite",le="+Inf"} 2\n' in text
+    assert 'test_flush_seconds_count{backend="sqlite"} 2\n' in text
+    assert '# TYPE test_bytes counter\ntest_bytes_total{interface="eth0"} 7\n' in text
+    assert text.endswith('# EOF\n')
+
+    # Prometheus matn formatida counter TYPE qatori namuna nomida
+    plain = render(families).decode()
+    assert '# TYPE test_bytes_total counter\n' in plain and '# EOF' not in plain
+
+
+if __name__ == "__main__":
+    test_per_thread_shards_merge()
+    test_dead_thread_shards_folded()
+    test_openmetrics_histogram_text()
+    print("Histogramma testlari muvaffaqiyatli yakunlandi!")
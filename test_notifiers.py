@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Alert yuborish backendlari va AlertManager yetkazilish natijasini test qilish uchun skript
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import tempfile
+import threading
+
+# Modullarni import qilish
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from core.notifiers import Notifier, NotifierDispatcher
+from core.alerts import AlertManager
+from core.rules import evaluate_anomaly
+
+logger = logging.getLogger('notifiers_test')
+
+
+class RecordingNotifier(Notifier):
+    """
+    Har bir urinishni yozib boradigan backend: dastlabki `failures` urinish
+    muvaffaqiyatsiz, `gate` berilsa u ochilguncha kutadi
+    """
+    TYPE = 'recording'
+
+    def __init__(self, name, options, logger, failures=0, gate=None):
+        super().__init__(name, options, logger)
+        self.failures = failures
+        self.gate = gate
+        self.attempts = []
+
+    def send(self, alert):
+        self.attempts.append(time.monotonic())
+        if self.gate is not None:
+            self.gate.wait(5)
+        if len(self.attempts) <= self.failures:
+            raise ConnectionError("backend mavjud emas")
+        return True
+
+
+class FakeTelegram(Notifier):
+    """
+    Telegram backendi o'rnida: sendMessage ketma-ket message_id qaytaradi,
+    editMessageText `edit_fails` yoqilganda muvaffaqiyatsiz
+    """
+    TYPE = 'telegram'
+
+    def __init__(self, name, options, logger):
+        super().__init__(name, options, logger)
+        self.sent = []
+        self.edits = []
+        self.edit_fails = False
+
+    def send(self, alert):
+        if alert.get('edit_message_id'):
+            self.edits.append((alert['edit_message_id'], alert['message']))
+            return None if self.edit_fails else alert['edit_message_id']
+        self.sent.append((alert['title'], alert['severity']))
+        return 100 + len(self.sent)
+
+
+class FakeFormatter:
+    def format_metric_alert(self, metric_type, usage_value, alert_format, alert_title, system_info, mount=None):
+        return f"<b>{alert_title}</b>: {usage_value}"
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.alerts = []
+        self.stored = threading.Event()
+
+    def store_alert(self, alert_type, value, message, sent_successfully, system_info):
+        self.alerts.append((alert_type, value, sent_successfully, system_info['hostname']))
+        self.stored.set()
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def make_alert(severity='warning'):
+    return {'hostname': 'web-01', 'metric': 'CPU', 'value': '95%', 'severity': severity,
+            'title': 'CPU ALERT', 'message': '<b>CPU ALERT</b>: 95%', 'parse_mode': 'HTML', 'timestamp': time.time()}
+
+
+def make_dispatcher(directory, *notifiers):
+    """
+    Fayl backendi bilan dispatcher; berilgan backendlar uning o'rniga ishlatiladi
+    """
+    dispatcher = NotifierDispatcher({'notifiers': [{'name': 'log', 'type': 'file', 'severities': 'critical',
+                                                    'path': os.path.join(directory, 'alerts.ndjson')}]}, logger)
+    if notifiers:
+        dispatcher.close()
+        dispatcher.notifiers = list(notifiers)
+        for notifier in notifiers:
+            notifier.start()
+    return dispatcher
+
+
+def test_routing_by_severity():
+    """
+    Alert faqat severities ro'yxatiga mos backendlarga tarqatiladi
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        everything = RecordingNotifier('all', {}, logger)
+        dispatcher = make_dispatcher(tmp)
+        dispatcher.notifiers.append(everything)
+        everything.start()
+
+        assert set(dispatcher.dispatch(make_alert('warning'))) == {'all'}
+        futures = dispatcher.dispatch(make_alert('critical'))
+        assert set(futures) == {'log', 'all'}
+        assert futures['log'].result(5) is True
+        dispatcher.close()
+
+        with open(os.path.join(tmp, 'alerts.ndjson'), encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+        assert [record['severity'] for record in records] == ['critical']
+        assert records[0]['text'] == 'CPU ALERT: 95%'
+        assert len(everything.attempts) == 2
+
+
+def test_retry_backoff():
+    """
+    Muvaffaqiyatsiz urinishlar max_retries marta, har safar ikki baravar
+    uzayadigan kutish bilan qaytariladi
+    """
+    flaky = RecordingNotifier('flaky', {'max_retries': 3, 'retry_delay': 0.05}, logger, failures=2)
+    assert flaky.deliver(make_alert()) is True
+    first, second, third = flaky.attempts
+    assert second - first >= 0.05 and third - second >= 0.1
+
+    broken = RecordingNotifier('broken', {'max_retries': 2, 'retry_delay': 0.01}, logger, failures=10)
+    assert broken.deliver(make_alert()) is None
+    assert len(broken.attempts) == 2
+
+
+def test_queue_full_drops():
+    """
+    Navbat to'lganda alert tashlab yuboriladi va hisoblagich oshadi
+    """
+    gate = threading.Event()
+    slow = RecordingNotifier('slow', {'queue_size': 1}, logger, gate=gate)
+    slow.start()
+    try:
+        first = slow.submit(make_alert())
+        # Oqim birinchi alertni olguncha kutiladi, keyin navbatda bitta joy qoladi
+        while not slow.attempts:
+            time.sleep(0.01)
+        assert slow.submit(make_alert()) is not None
+        assert slow.submit(make_alert()) is None
+        assert slow.dropped == 1
+    finally:
+        gate.set()
+        slow.close()
+    assert first.result(5) is True
+
+
+def test_slow_backend_does_not_block_others():
+    """
+    Sekin yoki xato beradigan backend boshqa backendlarning yetkazishini kechiktirmaydi
+    """
+    gate = threading.Event()
+    slow = RecordingNotifier('slow', {}, logger, gate=gate)
+    broken = RecordingNotifier('broken', {'max_retries': 1}, logger, failures=10)
+    fast = RecordingNotifier('fast', {}, logger)
+    with tempfile.TemporaryDirectory() as tmp:
+        dispatcher = make_dispatcher(tmp, slow, broken, fast)
+        try:
+            futures = dispatcher.dispatch(make_alert())
+            assert futures['fast'].result(2) is True
+            assert futures['broken'].result(2) is None
+            assert not futures['slow'].done()
+        finally:
+            gate.set()
+            dispatcher.close()
+        assert futures['slow'].result(5) is True
+
+
+def test_stored_flag_reflects_delivery():
+    """
+    Bazaga yozilgan sent_successfully backendlarning haqiqiy natijasiga teng;
+    hech biri yetkazmasa alert vaqti bekor qilinadi (keyingi tekshiruv qayta yuboradi)
+    """
+    config = {'alert_mode': 'continuous', 'min_alert_interval': 300}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backends, expected in (((RecordingNotifier('broken', {'max_retries': 1}, logger, failures=10),), False),
+                                   ((RecordingNotifier('broken', {'max_retries': 1}, logger, failures=10),
+                                     RecordingNotifier('ok', {}, logger)), True)):
+            manager = AlertManager(config, logger, FakeFormatter(), notifiers=make_dispatcher(tmp, *backends))
+            database = FakeDatabase()
+            try:
+                delivered = manager.format_and_send_metric_alert('CPU', '95%', database, {'hostname': 'web-01'})
+                assert delivered.result(5) is expected
+                assert database.stored.wait(5)
+                assert database.alerts == [('CPU', '95%', expected, 'web-01')]
+                wait_until(lambda: ('cpu' in manager.last_alert_times) is expected)
+            finally:
+                manager.close()
+
+        # Mos backend bo'lmasa alert yuborilmagan deb yoziladi
+        manager = AlertManager(config, logger, FakeFormatter(), notifiers=make_dispatcher(tmp))
+        database = FakeDatabase()
+        assert manager.format_and_send_metric_alert('CPU', '95%', database, {'hostname': 'web-01'}) is False
+        assert database.alerts == [('CPU', '95%', False, 'web-01')]
+        manager.close()
+
+
+def test_incident_open_edit_resolve():
+    """
+    continuous rejimda birinchi alert yangi xabar ochadi, keyingilari uni tahrirlaydi,
+    tahrirlash muvaffaqiyatsiz bo'lsa incident tashlanib yangi xabar yuboriladi,
+    normal holatda esa incident RESOLVED xabari bilan yopiladi
+    """
+    config = {'alert_mode': 'continuous', 'min_alert_interval': 0}
+    telegram = FakeTelegram('telegram', {'max_retries': 1}, logger)
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = AlertManager(config, logger, FakeFormatter(), notifiers=make_dispatcher(tmp, telegram))
+        system_info = {'hostname': 'web-01'}
+        try:
+            # Ochish
+            assert manager.format_and_send_metric_alert('CPU', '91%', None, system_info, current_value=91).result(5)
+            assert telegram.sent == [('🚨 CPU ALERT', 'warning')]
+            incident = manager.incidents['cpu:🚨 CPU ALERT']
+            assert incident['future'].result(5) == 101
+
+            # Tahrirlash (peak saqlanadi)
+            assert manager.format_and_send_metric_alert('CPU', '97%', None, system_info, current_value=97) is True
+            assert manager.format_and_send_metric_alert('CPU', '93%', None, system_info, current_value=93) is True
+            wait_until(lambda: len(telegram.edits) == 2)
+            assert [message_id for message_id, _ in telegram.edits] == [101, 101]
+            assert 'Current: 93%' in telegram.edits[1][1] and 'Peak: 97%' in telegram.edits[1][1]
+            assert len(telegram.sent) == 1
+
+            # Tahrirlash muvaffaqiyatsiz - incident tashlanadi, keyingi alert yangi xabar yuboradi
+            telegram.edit_fails = True
+            assert manager.format_and_send_metric_alert('CPU', '95%', None, system_info, current_value=95) is True
+            wait_until(lambda: not manager.incidents)
+            assert manager.format_and_send_metric_alert('CPU', '96%', None, system_info, current_value=96).result(5)
+            assert len(telegram.sent) == 2
+            assert manager.incidents['cpu:🚨 CPU ALERT']['future'].result(5) == 102
+
+            # Yopish
+            assert manager.resolve_metric_alert('CPU', '40%', system_info) is True
+            wait_until(lambda: len(telegram.sent) == 3)
+            assert telegram.sent[-1] == ('RESOLVED: 🚨 CPU ALERT', 'info')
+            assert not manager.incidents and 'cpu' not in manager.last_alert_times
+            assert manager.resolve_metric_alert('CPU', '40%', system_info) is False
+        finally:
+            manager.close()
+
+
+class FakeDetector:
+    """
+    Har bir qiymatni anomaliya deb hisoblaydigan detektor
+    """
+    baselines = {'cpu': None}
+
+    def update(self, metric_key, value, timestamp=None):
+        return {'value': value}
+
+    def describe(self, anomaly, unit='%'):
+        return " (anomaliya)"
+
+
+def test_anomaly_alert_has_own_interval():
+    """
+    Anomaliya alerti threshold alerti bilan umumiy interval kalitini ishlatmaydi
+    """
+    telegram = FakeTelegram('telegram', {'max_retries': 1}, logger)
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = AlertManager({'alert_mode': 'threshold_cross'}, logger, FakeFormatter(),
+                               notifiers=make_dispatcher(tmp, telegram))
+        try:
+            assert manager.format_and_send_metric_alert('CPU', '95%', None, {'hostname': 'web-01'}).result(5)
+            for _ in range(2):
+                evaluate_anomaly('CPU', 'cpu', 95, '%', '95%', manager, FakeDetector(), system_info={'hostname': 'web-01'})
+            wait_until(lambda: len(telegram.sent) == 2)
+            assert telegram.sent == [('🚨 CPU ALERT', 'warning'), ('📈 CPU ANOMALY', 'warning')]
+            assert set(manager.last_alert_times) == {'cpu', 'cpu_anomaly'}
+            # Threshold alerti hali interval ichida
+            assert manager.format_and_send_metric_alert('CPU', '96%', None, {'hostname': 'web-01'}) is False
+        finally:
+            manager.close()
+
+
+if __name__ == "__main__":
+    test_routing_by_severity()
+    test_retry_backoff()
+    test_queue_full_drops()
+    test_slow_backend_does_not_block_others()
+    test_stored_flag_reflects_delivery()
+    test_incident_open_edit_resolve()
+    test_anomaly_alert_has_own_interval()
+    print("Notifier testlari muvaffaqiyatli yakunlandi!")
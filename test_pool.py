@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ulanishlar puli, qayta ulanish va ommaviy yozish yordamchilarini test qilish uchun skript
+"""
+
+import os
+import sys
+import sqlite3
+import logging
+
+# Modullarni import qilish
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from utils.pool import ConnectionPool, DatabaseUnavailable
+from utils.bulk import copy_value, execute_multirow, multirow_statement
+from utils.database import Database, insert_statement
+from utils.rollups import upsert_statement
+
+logger = logging.getLogger('pool_test')
+
+
+def test_reconnect_with_backoff():
+    """
+    Ulanib bo'lmaganda backoff davomida tarmoqqa murojaat qilinmasligi va keyin tiklanishi
+    """
+    attempts = []
+    down = [True]
+
+    def connect():
+        attempts.append(1)
+        if down[0]:
+            raise sqlite3.OperationalError("connection refused")
+        return sqlite3.connect(':memory:')
+
+    pool = ConnectionPool({'db_pool_size': 1, 'db_reconnect_initial': 60}, logger, connect)
+    for _ in range(3):
+        try:
+            with pool.connection():
+                pass
+        except DatabaseUnavailable:
+            continue
+        raise AssertionError("DatabaseUnavailable kutilgan edi")
+    # Ikkinchi va uchinchi chaqiruv backoff tufayli connect ni chaqirmaydi
+    assert len(attempts) == 1
+
+    down[0] = False
+    pool._retry_at = 0
+    with pool.connection() as conn:
+        assert conn.execute("SELECT 1").fetchone() == (1,)
+    assert len(attempts) == 2 and pool._failures == 0
+    pool.close()
+
+
+def test_broken_connection_is_replaced():
+    """
+    Uzilish xatoligidan keyin ulanish tashlanishi va sog'liq tekshiruvi
+    """
+    opened = []
+
+    def connect():
+        conn = sqlite3.connect(':memory:')
+        opened.append(conn)
+        return conn
+
+    pool = ConnectionPool({'db_pool_size': 1, 'db_pool_ping_interval': 0}, logger, connect)
+    try:
+        with pool.connection():
+            raise sqlite3.OperationalError("server closed the connection unexpectedly")
+    except sqlite3.OperationalError:
+        pass
+    with pool.connection() as conn:
+        assert conn is opened[1]
+
+    # Yopilgan (ping javob bermaydigan) ulanish almashtiriladi
+    opened[1].close()
+    with pool.connection() as conn:
+        assert conn is opened[2]
+
+    # Oddiy xatolikda ulanish pulda qoladi
+    try:
+        with pool.connection():
+            raise ValueError("noto'g'ri parametr")
+    except ValueError:
+        pass
+    with pool.connection() as conn:
+        assert conn is opened[2]
+    pool.close()
+
+
+def test_multirow_insert():
+    """
+    Ko'p qatorli INSERT so'rovi (MySQL upsert va oddiy INSERT)
+    """
+    sql = upsert_statement('mysql', '%s', 'metrics_1m')
+    statement = multirow_statement(sql, 3)
+    assert statement.count('(%s, %s, %s, %s, %s, %s, %s, %s)') == 3
+    assert 'ON DUPLICATE KEY UPDATE' in statement
+
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE t (a INTEGER, b TEXT)")
+    execute_multirow(conn.cursor(), "INSERT INTO t (a, b) VALUES (?, ?)", [(i, str(i)) for i in range(1234)], 500)
+    assert conn.execute("SELECT COUNT(*), SUM(a) FROM t").fetchone() == (1234, sum(range(1234)))
+    conn.close()
+
+
+def test_postgresql_copy():
+    """
+    PostgreSQL da xom metrikalar COPY bilan yozilishi
+    """
+    class Cursor:
+        def copy_expert(self, sql, buffer):
+            self.sql = sql
+            self.data = buffer.read()
+
+    assert copy_value(None) == '\\N' and copy_value(True) == 't'
+    assert copy_value('a\tb\\c\nd') == 'a\\tb\\\\c\\nd'
+
+    database = Database({'db_enabled': False, 'db_type': 'postgresql'}, logger)
+    cursor = Cursor()
+    rows = [('2024-01-01 00:00:00', 'web-01', '10.0.0.1', 1.5, 2.0, 3.0, 0.0, 0.1, 0.0, 0.0, None)]
+    database._bulk_insert(cursor, insert_statement('postgresql', 'metrics', ()), rows, table='metrics')
+    assert cursor.sql.startswith("COPY metrics (timestamp, hostname")
+    assert cursor.data == '2024-01-01 00:00:00\tweb-01\t10.0.0.1\t1.5\t2.0\t3.0\t0.0\t0.1\t0.0\t0.0\t\\N\n'
+
+
+if __name__ == "__main__":
+    test_reconnect_with_backoff()
+    test_broken_connection_is_replaced()
+    test_multirow_insert()
+    test_postgresql_copy()
+    print("Ulanishlar puli testlari muvaffaqiyatli yakunlandi!")
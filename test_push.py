@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Push chiqishini (StatsD/Graphite/InfluxDB) test qilish uchun skript
+"""
+
+import os
+import sys
+import time
+import socket
+import logging
+import threading
+
+# Modullarni import qilish
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from utils.push import PushEmitter, serialize
+
+logger = logging.getLogger('push_test')
+
+FAMILIES = [
+    ('system_monitor_ram_usage_percent', 'gauge', "RAM", [('', (), 51.5)]),
+    ('system_monitor_filesystem_free_bytes', 'gauge', "Bo'sh joy",
+     [('', (('mountpoint', '/mnt/a b'), ('device', '/dev/sdb1')), 9)]),
+    ('system_monitor_network_receive_bytes', 'counter', "Qabul",
+     [('_total', (('interface', 'eth%d' % index),), 1000 + index) for index in range(40)]),
+]
+
+
+def test_serialize_protocols():
+    """
+    Uchala protokol formati, ekranlash va yo'l qismlari
+    """
+    statsd = serialize(FAMILIES, 'statsd', 'web-01', 1700000000.5, 'servers')
+    assert statsd[0] == b'servers.web-01.ram_usage_percent:51.5|g\n'
+    assert statsd[1] == b'servers.web-01.filesystem_free_bytes._mnt_a_b._dev_sdb1:9|g\n'
+
+    graphite = serialize(FAMILIES, 'graphite', 'web-01', 1700000000.5)
+    assert graphite[2] == b'web-01.network_receive_bytes_total.eth0 1000 1700000000\n'
+
+    influx = serialize(FAMILIES, 'influx', 'web 01', 1700000000.5)
+    assert influx[0] == b'system_monitor_ram_usage_percent,host=web\\ 01 value=51.5 1700000000500000000\n'
+    assert influx[1].startswith(b'system_monitor_filesystem_free_bytes,host=web\\ 01,mountpoint=/mnt/a\\ b,')
+    assert len(serialize([('x', 'gauge', '', [('', (), float('nan'))])], 'influx', 'h', 0)) == 0
+
+
+def test_udp_packs_datagrams_up_to_mtu():
+    """
+    StatsD UDP: qatorlar mtu gacha datagramlarga joylanadi, socket qayta ishlatiladi
+    """
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(('127.0.0.1', 0))
+    receiver.settimeout(2)
+    pusher = PushEmitter({'push_protocol': 'statsd', 'push_transport': 'udp', 'push_host': '127.0.0.1',
+                          'push_port': receiver.getsockname()[1], 'push_mtu': 256}, logger)
+    try:
+        pusher.emit(FAMILIES, 'h', time.time())
+        first_socket = pusher._socket
+        pusher.emit(FAMILIES, 'h', time.time())
+        assert pusher._socket is first_socket
+
+        lines = []
+        while len(lines) < 2 * 42:
+            datagram = receiver.recv(65535)
+            assert len(datagram) <= 256 and not datagram.endswith(b'\n')
+            lines.extend(datagram.split(b'\n'))
+        assert lines[0] == b'h.ram_usage_percent:51.5|g'
+        assert pusher.writes < len(lines) and pusher.sent_lines == 84 and pusher.dropped_lines == 0
+    finally:
+        pusher.close()
+        receiver.close()
+
+
+def test_tcp_batches_and_counts_drops():
+    """
+    Graphite TCP: navbat bitta yozuvda yuboriladi; qabul qiluvchi yo'qligida navbat chegaralanadi
+    """
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind(('127.0.0.1', 0))
+    server.listen(1)
+    received = []
+
+    def accept():
+        conn, _ = server.accept()
+        with conn:
+            while True:
+                data = conn.recv(65536)
+                if not data:
+                    break
+                received.append(data)
+
+    thread = threading.Thread(target=accept)
+    thread.start()
+    pusher = PushEmitter({'push_protocol': 'graphite', 'push_transport': 'tcp', 'push_host': '127.0.0.1',
+                          'push_port': server.getsockname()[1], 'push_flush_interval': 0.2}, logger)
+    for _ in range(3):
+        pusher.emit(FAMILIES, 'h', 1700000000)
+    pusher.close()
+    thread.join(5)
+    server.close()
+    lines = b''.join(received).splitlines()
+    assert len(lines) == 3 * 42 and lines[0] == b'h.ram_usage_percent 51.5 1700000000'
+    assert pusher.writes == 1 and pusher.connects == 1 and pusher.dropped_lines == 0
+
+    # Band qilinmagan port: yozuvchi ulana olmaydi, navbat push_queue_lines dan oshmaydi
+    probe = socket.socket()
+    probe.bind(('127.0.0.1', 0))
+    port = probe.getsockname()[1]
+    probe.close()
+    pusher = PushEmitter({'push_protocol': 'influx', 'push_transport': 'tcp', 'push_host': '127.0.0.1',
+                          'push_port': port, 'push_flush_interval': 0.05, 'push_queue_lines': 50,
+                          'push_timeout': 0.5}, logger)
+    for _ in range(5):
+        pusher.emit(FAMILIES, 'h', 1700000000)
+    time.sleep(0.2)
+    assert pusher.pending() <= 50 and pusher.backpressure > 0
+    pusher.close()
+    assert pusher.sent_lines == 0 and pusher.dropped_lines == 5 * 42
+    families = {name: samples for name, _, _, samples in pusher.families()}
+    assert families['system_monitor_push_dropped_lines'][0][2] == 210
+
+
+if __name__ == "__main__":
+    test_serialize_protocols()
+    test_udp_packs_datagrams_up_to_mtu()
+    test_tcp_batches_and_counts_drops()
+    print("Push chiqishi testlari muvaffaqiyatli yakunlandi!")
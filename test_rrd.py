@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Aylanma arxiv (db_type = rrd) ni test qilish uchun skript
+"""
+
+import os
+import sys
+import logging
+import datetime
+import tempfile
+
+# Modullarni import qilish
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from utils.database import Database
+from utils.rrd import parse_archives
+
+logger = logging.getLogger('rrd_test')
+
+START = datetime.datetime(2024, 1, 1)
+
+
+def make_rows(minutes, offset=0):
+    rows = []
+    for minute in range(offset, offset + minutes):
+        for second in (0, 30):
+            timestamp = (START + datetime.timedelta(minutes=minute, seconds=second)).strftime('%Y-%m-%d %H:%M:%S')
+            rows.append((timestamp, 'edge-01', '10.0.0.5', 40.0, float(minute * 2 + second // 30),
+                         None, 0.0, 0.5, 1.0, 2.0, None))
+    return rows
+
+
+def test_parse_archives():
+    """
+    Arxivlar sozlamasini tahlil qilish
+    """
+    assert parse_archives("1h:90d, 1m:1d") == [(60, 1440), (3600, 2160)]
+    for text in ("", "1m", "1h:1m"):
+        try:
+            parse_archives(text)
+        except ValueError:
+            continue
+        raise AssertionError(f"{text!r} rad etilishi kerak edi")
+
+
+def test_fixed_size_and_consolidation():
+    """
+    Fayl hajmi o'zgarmasligi, konsolidatsiya funksiyalari va arxiv tanlash
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        config = {'db_enabled': True, 'db_type': 'rrd', 'db_rrd_path': tmp,
+                  'db_rrd_archives': '1m:10m, 5m:1h'}
+        database = Database(config, logger)
+        database._write_metrics(make_rows(1))
+        path = os.path.join(tmp, 'edge-01.rrd')
+        size = os.path.getsize(path)
+
+        # Bir necha aylana yozilganda ham hajm o'zgarmaydi
+        database._write_metrics(make_rows(179, offset=1))
+        assert os.path.getsize(path) == size
+
+        end = START + datetime.timedelta(hours=3)
+        recent = START + datetime.timedelta(minutes=170)
+        # 1 daqiqalik arxiv: har bir bucket'da 2 ta namuna (cpu = 2m, 2m + 1)
+        values = dict(database.query_range('cpu', 'edge-01', recent, end, 60, 'avg'))
+        assert len(values) == 10 and values[recent] == 340.5
+        assert dict(database.query_range('cpu', None, recent, end, 60, 'max'))[recent] == 341.0
+        assert dict(database.query_range('cpu', 'edge-01', recent, end, 60, 'count'))[recent] == 2
+        assert dict(database.query_range('cpu', 'edge-01', recent, end, 600, 'last'))[recent] == 359.0
+        # Bo'sh (None) metrika yozilmaydi
+        assert list(database.query_range('disk', 'edge-01', recent, end, 60, 'avg')) == []
+
+        # 10 daqiqadan eskisi faqat 5 daqiqalik arxivda qolgan
+        older = START + datetime.timedelta(minutes=150)
+        five_minute = list(database.query_range('cpu', 'edge-01', older, end, 60, 'min'))
+        assert five_minute[0] == (older, 300.0)
+        assert five_minute[1][0] - five_minute[0][0] == datetime.timedelta(minutes=5)
+
+        # Halqadan chiqib ketgan (bir soatdan eski) bucket'lar qaytarilmaydi
+        assert list(database.query_range('cpu', 'edge-01', START, START + datetime.timedelta(hours=1), 300, 'avg')) == []
+        database.close()
+
+        # Qayta ochilganda ma'lumot saqlanib qoladi
+        database = Database(config, logger)
+        assert dict(database.query_range('cpu', 'edge-01', recent, end, 60, 'avg'))[recent] == 340.5
+        database.close()
+
+
+if __name__ == "__main__":
+    test_parse_archives()
+    test_fixed_size_and_consolidation()
+    print("RRD testlari muvaffaqiyatli yakunlandi!")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Normallashtirilgan sxema va ko'chirish vositasini test qilish uchun skript
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import logging
+import datetime
+import tempfile
+
+# Modullarni import qilish
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from utils.database import Database, DIALECTS
+from utils.schema import migrate_to_normalized, purge_samples, to_local_epoch
+
+logger = logging.getLogger('schema_test')
+
+START = datetime.datetime(2024, 1, 1)
+
+
+def sample_rows(count, hostname='host-a', ip='10.0.0.1'):
+    rows = []
+    for minute in range(count):
+        timestamp = (START + datetime.timedelta(minutes=minute)).strftime('%Y-%m-%d %H:%M:%S')
+        rows.append((timestamp, hostname, ip, 50.0, float(minute), 0.0, 0.0, 0.0, 0.0, 0.0, None))
+    return rows
+
+
+def test_normalized_writes_and_query():
+    """
+    Normallashtirilgan sxemaga yozish, takroriy qatorlar va query_range
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'metrics.db')
+        config = {'db_enabled': True, 'db_type': 'sqlite', 'db_path': db_path, 'db_schema': 'normalized',
+                  'db_retention_raw': '0', 'db_rollups_enabled': False}
+        database = Database(config, logger)
+        rows = sample_rows(20)
+        database._write_metrics(rows[:10])
+        # Spill qayta yuklanganda bir xil (host_id, ts) qayta keladi
+        database._write_metrics(rows[5:] + sample_rows(3, hostname='host-b', ip='10.0.0.2'))
+        assert database.store_alert('CPU', '95%', 'test', True, {'hostname': 'host-a'})
+
+        assert database.query("SELECT COUNT(*) FROM metric_samples") == [(23,)]
+        assert database.query("SELECT hostname, ip_address FROM hosts ORDER BY host_id") == [
+            ('host-a', '10.0.0.1'), ('host-b', '10.0.0.2')]
+        assert database.query("SELECT host_id, alert_type FROM alert_events") == [(1, 'CPU')]
+
+        end = START + datetime.timedelta(minutes=20)
+        buckets = list(database.query_range('cpu', 'host-a', START, end, 300, 'avg'))
+        assert buckets == [(START + datetime.timedelta(minutes=5 * i), 5 * i + 2.0) for i in range(4)]
+        last = list(database.query_range('cpu', 'host-a', START, end, 300, 'last'))
+        assert [value for _, value in last] == [4.0, 9.0, 14.0, 19.0]
+        assert list(database.query_range('cpu', 'other', START, end, 300)) == []
+        database.close()
+
+
+def test_normalized_buckets_match_rollups():
+    """
+    UTC dan farqli vaqt zonasida xom metric_samples va rollup jadvallari bir xil
+    (mahalliy yarim tunda boshlanadigan) kunlik bucket'larni qaytaradi
+    """
+    saved = os.environ.get('TZ')
+    os.environ['TZ'] = 'Asia/Tashkent'
+    time.tzset()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            config = {'db_enabled': True, 'db_type': 'sqlite', 'db_path': os.path.join(tmp, 'metrics.db'),
+                      'db_schema': 'normalized', 'db_retention_raw': '0'}
+            database = Database(config, logger)
+            rows = [((START + datetime.timedelta(hours=hour)).strftime('%Y-%m-%d %H:%M:%S'), 'host-a', '10.0.0.1',
+                     50.0, float(hour), 0.0, 0.0, 0.0, 0.0, 0.0, None) for hour in range(48)]
+            database._write_metrics(rows)
+
+            end = START + datetime.timedelta(days=2)
+            rollup = list(database.query_range('cpu', 'host-a', START, end, 86400, 'avg'))
+            database.rollups_enabled = False
+            raw = list(database.query_range('cpu', 'host-a', START, end, 86400, 'avg'))
+            database.close()
+    finally:
+        if saved is None:
+            os.environ.pop('TZ', None)
+        else:
+            os.environ['TZ'] = saved
+        time.tzset()
+
+    assert rollup == raw == [(START, 11.5), (START + datetime.timedelta(days=1), 35.5)]
+
+
+def test_migrate_from_legacy():
+    """
+    Eski jadvallardan batch'lab ko'chirish, to'xtatilgandan keyin davom ettirish va eski jadvallarni o'chirish
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'metrics.db')
+        legacy = Database({'db_enabled': True, 'db_type': 'sqlite', 'db_path': db_path,
+                           'db_retention_raw': '0'}, logger)
+        legacy._write_metrics(sample_rows(25) + sample_rows(5, hostname='host-b', ip='10.0.0.2'))
+        legacy.store_alert('RAM', '91%', 'test', False, {'hostname': 'host-b'})
+        legacy.close()
+
+        conn = sqlite3.connect(db_path)
+        # Birinchi ishga tushish 10-qatordan keyin "uzildi"
+        conn.execute("CREATE TABLE schema_migrations (name TEXT PRIMARY KEY, last_id INTEGER NOT NULL)")
+        migrate_to_normalized(conn, 'sqlite', DIALECTS['sqlite'], logger, batch_size=10)
+        conn.execute("DELETE FROM metric_samples WHERE ts >= ?", (to_local_epoch('2024-01-01 00:10:00'),))
+        conn.execute("UPDATE schema_migrations SET last_id = 10 WHERE name = 'metrics'")
+        conn.commit()
+
+        migrated = migrate_to_normalized(conn, 'sqlite', DIALECTS['sqlite'], logger, batch_size=10)
+        assert migrated == {'metrics': 20, 'alerts': 0}
+        assert conn.execute("SELECT COUNT(*) FROM metric_samples").fetchone()[0] == 30
+        assert conn.execute(
+            "SELECT s.ts, s.cpu_usage FROM metric_samples s JOIN hosts h USING (host_id) "
+            "WHERE h.hostname = 'host-a' ORDER BY s.ts DESC LIMIT 1").fetchone() == (
+            to_local_epoch('2024-01-01 00:24:00'), 24.0)
+        assert conn.execute("SELECT message FROM alert_events").fetchall() == [('test',)]
+
+        migrate_to_normalized(conn, 'sqlite', DIALECTS['sqlite'], logger, drop_legacy=True)
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        assert 'metrics' not in tables and 'alerts' not in tables and 'metric_samples' in tables
+
+        # Har bir xost uchun (host_id, ts) oralig'ida o'chirish
+        cutoff = to_local_epoch('2024-01-01 00:20:00')
+        assert purge_samples(conn, 'sqlite', cutoff, batch_size=7, max_batches=10) == 25
+        assert conn.execute("SELECT COUNT(*) FROM metric_samples").fetchone()[0] == 5
+        conn.close()
+
+
+if __name__ == "__main__":
+    test_normalized_writes_and_query()
+    test_normalized_buckets_match_rollups()
+    test_migrate_from_legacy()
+    print("Sxema testlari muvaffaqiyatli yakunlandi!")
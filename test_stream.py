@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Agent -> agregator oqimini test qilish uchun skript
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import logging
+import tempfile
+
+# Modullarni import qilish
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from config.config_loader import ConfigLoader
+from core.aggregator import Aggregator, HashRing
+from utils.stream import PROTOCOL_VERSION, StreamAgent, encode_message, read_message
+
+logger = logging.getLogger('stream_test')
+
+
+def make_config(alerts_path, port=0):
+    config = ConfigLoader(os.path.join(os.path.dirname(alerts_path), 'missing.conf'), logger).get_config()
+    config.update({
+        'notifiers': [{'name': 'file', 'type': 'file', 'path': alerts_path}],
+        'alert_mode': 'continuous', 'min_alert_interval': 0, 'ram_threshold': 80,
+        'aggregator_address': '127.0.0.1', 'aggregator_port': port, 'aggregator_token': 'secret',
+        'agent_aggregator_host': '127.0.0.1', 'agent_aggregator_port': port, 'agent_token': 'secret',
+        'agent_timeout': 5,
+    })
+    return config
+
+
+def wait_for(condition, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_agent_backfill_and_central_alerts():
+    """
+    Agregator ishlamay turganda yig'ilgan namunalar qayta ulangach yetkaziladi,
+    alert agregatorda agent xosti nomi bilan yuboriladi
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        probe = socket.socket()
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+        probe.close()
+
+        alerts_path = os.path.join(tmp, 'alerts.ndjson')
+        config = make_config(alerts_path, port)
+        agent = StreamAgent(dict(config, agent_hostname='web-01'), logger)
+        system_info = {'hostname': 'web-01', 'ip': '10.0.0.5'}
+        now = time.time()
+        for index in range(5):
+            agent.send({'ram': 40.0 + index, 'cpu': 5.0, 'network': [0, 0]}, system_info, now - 5 + index)
+        assert agent.pending() == 5
+
+        aggregator = Aggregator(config, logger)
+        try:
+            assert wait_for(lambda: agent.pending() == 0)
+            state = aggregator.hosts['web-01']
+            assert aggregator.samples == 5 and state.last_seq == 5 and aggregator.duplicates == 0
+
+            agent.send({'ram': 95.0, 'cpu': 5.0, 'network': [0, 0]}, system_info, time.time())
+            assert wait_for(lambda: agent.pending() == 0 and os.path.exists(alerts_path))
+            assert wait_for(lambda: os.path.getsize(alerts_path) > 0)
+            with open(alerts_path) as f:
+                alert = json.loads(f.readline())
+            assert alert['hostname'] == 'web-01' and alert['metric'] == 'RAM' and alert['value'].startswith('95.0%')
+
+            # Takror (tasdig'i yo'qolgan namuna) qayta ishlanmaydi, ammo tasdiqlanadi
+            with socket.create_connection(('127.0.0.1', port)) as sock:
+                stream = sock.makefile('rwb')
+                stream.write(encode_message({'type': 'hello', 'version': PROTOCOL_VERSION, 'host': 'web-01',
+                                             'session': agent.session, 'token': 'secret'}))
+                stream.write(encode_message({'type': 'sample', 'seq': 6, 'ts': time.time(), 'metrics': {}}))
+                stream.flush()
+                welcome = read_message(stream)
+                assert welcome['last_seq'] == 6 and welcome['format'] == 'json'
+                assert read_message(stream) == {'type': 'ack', 'seq': 6}
+            assert aggregator.duplicates == 1 and aggregator.samples == 6
+        finally:
+            agent.close()
+            aggregator.close()
+
+
+def test_json_wire_format():
+    """
+    agent_wire_format = json bo'lsa namunalar JSON qatorlarida yetkaziladi
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        aggregator = Aggregator(make_config(os.path.join(tmp, 'alerts.ndjson')), logger)
+        agent = StreamAgent(dict(make_config(tmp + '/x', aggregator.port), agent_wire_format='json',
+                                 agent_hostname='db-01'), logger)
+        try:
+            agent.send({'ram': 12.5, 'network': [1.0, 2.0]}, {'hostname': 'db-01', 'ip': ''}, time.time())
+            assert wait_for(lambda: agent.pending() == 0)
+            assert aggregator.shards[0].hosts['db-01'].monitor.metrics == {'ram': 12.5, 'network': [1.0, 2.0]}
+        finally:
+            agent.close()
+            aggregator.close()
+
+
+def test_sharded_worker_processes():
+    """
+    aggregator_workers > 0 bo'lsa xostlar izchil xesh bo'yicha shard jarayonlariga taqsimlanadi
+    """
+    ring = HashRing(range(4))
+    hosts = [f'node-{index}' for index in range(1000)]
+    before = {host: ring.node(host) for host in hosts}
+    assert all(list(before.values()).count(node) > 150 for node in range(4))
+    # Shard qo'shilganda faqat yangi shardga o'tgan xostlar ko'chadi
+    moved = [host for host in hosts if HashRing(range(5)).node(host) != before[host]]
+    assert len(moved) < 350 and all(HashRing(range(5)).node(host) == 4 for host in moved)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        alerts_path = os.path.join(tmp, 'alerts.ndjson')
+        config = dict(make_config(alerts_path), aggregator_workers=2)
+        aggregator = Aggregator(config, logger)
+        agents = []
+        try:
+            for index in range(4):
+                host = f'app-{index}'
+                agent = StreamAgent(dict(make_config(tmp + '/x', aggregator.port), agent_hostname=host), logger)
+                agents.append(agent)
+                for step in range(3):
+                    ram = 97.0 if index == 2 and step == 2 else 30.0
+                    agent.send({'ram': ram, 'network': [0, 0]}, {'hostname': host, 'ip': ''}, time.time())
+            assert wait_for(lambda: all(agent.pending() == 0 for agent in agents))
+            assert aggregator.samples == 12 and aggregator.duplicates == 0
+            assert sorted(aggregator.hosts) == ['app-0', 'app-1', 'app-2', 'app-3']
+            assert all(state.last_seq == 3 and state.shard == aggregator.ring.node(host)
+                       for host, state in aggregator.hosts.items())
+            assert wait_for(lambda: os.path.exists(alerts_path) and os.path.getsize(alerts_path) > 0)
+            with open(alerts_path) as f:
+                alert = json.loads(f.readline())
+            assert alert['hostname'] == 'app-2' and alert['metric'] == 'RAM'
+        finally:
+            for agent in agents:
+                agent.close()
+            aggregator.close()
+        assert not any(shard.worker.is_alive() for shard in aggregator.shards)
+
+
+def test_silent_host_alert():
+    """
+    aggregator_silence_timeout ichida namuna kelmasa "xost jim" alerti yuboriladi,
+    namunalar qayta kelganda RESOLVED xabari
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        alerts_path = os.path.join(tmp, 'alerts.ndjson')
+        aggregator = Aggregator(dict(make_config(alerts_path), aggregator_silence_timeout=1), logger)
+        agent = StreamAgent(dict(make_config(tmp + '/x', aggregator.port), agent_hostname='cache-01'), logger)
+
+        def alerts():
+            if not os.path.exists(alerts_path):
+                return []
+            with open(alerts_path) as f:
+                return [json.loads(line) for line in f]
+
+        try:
+            system_info = {'hostname': 'cache-01', 'ip': '10.0.0.9'}
+            agent.send({'ram': 20.0, 'network': [0, 0]}, system_info, time.time())
+            assert wait_for(lambda: len(alerts()) == 1)
+            silent = alerts()[0]
+            assert silent['hostname'] == 'cache-01' and silent['metric'] == 'Heartbeat'
+            assert silent['title'] == "💀 HOST SILENT" and silent['severity'] == 'critical'
+            # Alert bir marta yuboriladi
+            time.sleep(1.5)
+            assert len(alerts()) == 1 and aggregator.silences == 1
+
+            agent.send({'ram': 21.0, 'network': [0, 0]}, system_info, time.time())
+            assert wait_for(lambda: len(alerts()) == 2)
+            resolved = alerts()[1]
+            assert resolved['title'] == "RESOLVED: 💀 HOST SILENT" and resolved['severity'] == 'info'
+        finally:
+            agent.close()
+            aggregator.close()
+
+
+def test_rejects_bad_token():
+    """
+    Noto'g'ri token bilan ulangan agent namunasi qabul qilinmaydi
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        aggregator = Aggregator(make_config(os.path.join(tmp, 'alerts.ndjson')), logger)
+        try:
+            agent = StreamAgent(dict(make_config(tmp + '/x', aggregator.port), agent_token='wrong'), logger)
+            agent.send({'ram': 99.0}, {'hostname': 'evil', 'ip': ''}, time.time())
+            time.sleep(0.3)
+            assert agent.pending() == 1 and aggregator.samples == 0 and not aggregator.hosts
+            agent.timeout = 0.1
+            agent.close()
+        finally:
+            aggregator.close()
+
+
+def window_alert(tmp, **overrides):
+    """
+    Agregator check_interval = 60, agent esa har 10 soniyada namuna yuboradi;
+    "avg 2m" CPU qoidasi bo'yicha alert kelishini kutish
+    """
+    alerts_path = os.path.join(tmp, 'alerts.ndjson')
+    config = dict(make_config(alerts_path), check_interval=60, cpu_condition='avg 2m', **overrides)
+    aggregator = Aggregator(config, logger)
+    agent = StreamAgent(dict(make_config(tmp + '/x', aggregator.port), agent_hostname='app-01'), logger)
+
+    def cpu_alerts():
+        if not os.path.exists(alerts_path):
+            return []
+        with open(alerts_path) as f:
+            return [alert for alert in map(json.loads, f) if alert['metric'] == 'CPU']
+
+    try:
+        system_info = {'hostname': 'app-01', 'ip': '10.0.0.7'}
+        now = time.time()
+        for index in range(20):
+            agent.send({'ram': 10.0, 'cpu': 99.0, 'network': [0, 0]}, system_info, now - 190 + index * 10)
+        assert wait_for(lambda: agent.pending() == 0)
+        return wait_for(cpu_alerts)
+    finally:
+        agent.close()
+        aggregator.close()
+
+
+def test_host_windows_follow_agent_cadence():
+    """
+    Xost oynalari agregatorning check_interval i emas, agent namunalari tezligi bo'yicha to'ladi
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        assert window_alert(tmp, aggregator_vectorized=False)
+
+
+def test_fleet_windows_follow_agent_cadence():
+    """
+    Vektorli (FleetState) rejimda ham oyna qoidalari agent namunalari tezligi bo'yicha to'ladi
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        assert window_alert(tmp, aggregator_vectorized=True)
+
+
+if __name__ == "__main__":
+    test_agent_backfill_and_central_alerts()
+    test_json_wire_format()
+    test_sharded_worker_processes()
+    test_silent_host_alert()
+    test_rejects_bad_token()
+    test_host_windows_follow_agent_cadence()
+    test_fleet_windows_follow_agent_cadence()
+    print("Agent/agregator testlari muvaffaqiyatli yakunlandi!")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Xabar shablonlari va ekran kengligi hisobini test qilish uchun skript
+"""
+
+import os
+import sys
+
+# Modullarni import qilish
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from core.templates import AlertTemplate, display_width
+
+
+def test_display_width():
+    """
+    Emoji, variation selector va keng belgilar kengligini tekshirish
+    """
+    assert display_width("RAM: 85%") == 8
+    assert display_width("🔥") == 2
+    assert display_width("🗓️") == 2
+    assert display_width("⚙️ Kernel:") == 10
+    assert display_width("日本") == 4
+    assert display_width("é") == 1
+
+
+def test_template_lines_aligned():
+    """
+    Barcha ramka qatorlari bir xil ekran kengligida bo'lishini tekshirish
+    """
+    template = AlertTemplate({'alert_format_width': 44})
+    lines = [
+        template.top_border,
+        template.title("🔥 CPU ALERT: 95%"),
+        template.field('date', '2024-01-01 00:00:00'),
+        template.static_field('hostname', 'web-01'),
+        template.static_field('kernel', '6.1.0'),
+        template.line("💾 Disk: 91% of 100G"),
+        template.no_data_line,
+        template.bottom_border,
+    ]
+    assert all(display_width(line) == 44 for line in lines)
+    # Statik qator keshdan qaytadi
+    assert template.static_field('hostname', 'web-01') is lines[3]
+
+
+if __name__ == "__main__":
+    test_display_width()
+    test_template_lines_aligned()
+    print("Shablon testlari muvaffaqiyatli yakunlandi!")
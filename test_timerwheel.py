@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ierarxik taymer g'ildiragini test qilish uchun skript
+"""
+
+import os
+import sys
+import math
+import random
+
+# Modullarni import qilish
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from utils.timerwheel import TimerWheel
+
+
+def test_matches_naive_deadlines():
+    """
+    Tasodifiy yangilash/bekor qilishlarda g'ildirak har bir kalitni aynan
+    muddati kelgan tickda qaytaradi (darajalararo tushish va juda uzoq muddatlar bilan)
+    """
+    random.seed(7)
+    # Kichik g'ildirak: 8 katak x 3 daraja = 512 tick, undan uzoq muddatlar ham bor
+    wheel = TimerWheel(now=1000.0, resolution=1.0, slots=8, levels=3)
+    deadlines = {}
+    now = 1000.0
+    for _ in range(3000):
+        now += random.choice((0, 0.5, 1, 1, 3, 17))
+        expired = wheel.advance(now)
+        due = {key for key, deadline in deadlines.items() if deadline <= math.floor(now)}
+        assert set(expired) == due and len(expired) == len(due)
+        for key in due:
+            del deadlines[key]
+
+        key = random.randrange(200)
+        if random.random() < 0.1:
+            assert wheel.cancel(key) == (key in deadlines)
+            deadlines.pop(key, None)
+        else:
+            deadline = now + random.choice((1, 5, 9, 70, 600, 2000)) * random.random()
+            wheel.schedule(key, deadline)
+            deadlines[key] = max(math.ceil(deadline), math.floor(now) + 1)
+        assert len(wheel) == len(deadlines)
+
+
+def test_idle_jump():
+    """
+    Kalit bo'lmasa uzoq vaqtga surish bir zumda bajariladi
+    """
+    wheel = TimerWheel(now=0.0)
+    assert wheel.advance(10 ** 9) == []
+    wheel.schedule('web-01', 10 ** 9 + 120)
+    assert wheel.advance(10 ** 9 + 119) == [] and 'web-01' in wheel
+    assert wheel.advance(10 ** 9 + 120) == ['web-01'] and 'web-01' not in wheel
+
+
+if __name__ == "__main__":
+    test_matches_naive_deadlines()
+    test_idle_jump()
+    print("Taymer g'ildiragi testlari muvaffaqiyatli yakunlandi!")
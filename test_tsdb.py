@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Siqilgan vaqt qatorlari omborini (tsdb) test qilish uchun skript
+"""
+
+import os
+import sys
+import math
+import logging
+import datetime
+import tempfile
+
+# Modullarni import qilish
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from utils.database import Database
+from utils.tsdb import Series, decode_block, encode_block
+
+logger = logging.getLogger('tsdb_test')
+
+
+def test_block_roundtrip():
+    """
+    Delta-of-delta va XOR siqishning yo'qotishsiz qaytishi
+    """
+    samples = [(1700000000, 42.5), (1700000060, 42.5), (1700000120, 43.1), (1700000181, 43.1),
+               (1700000181, -0.0), (1700009999, 1e300), (1700010000, float('inf')), (1700010060, 0.1)]
+    decoded = list(decode_block(encode_block(samples), len(samples)))
+    assert decoded == samples
+    assert math.copysign(1, decoded[4][1]) == -1
+
+    # Doimiy oraliq va o'zgarmas qiymat: har bir namunaga 2 bit
+    steady = [(1700000000 + 60 * i, 55.0) for i in range(1000)]
+    assert len(encode_block(steady)) <= 16 + 1000 * 2 // 8 + 1
+
+
+def test_store_and_query():
+    """
+    Database (db_type = tsdb) orqali yozish, qayta ochish va oraliq so'rovi
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        config = {'db_enabled': True, 'db_type': 'tsdb', 'db_tsdb_path': tmp,
+                  'db_tsdb_block_seconds': 3600, 'db_batch_size': 50}
+        start = datetime.datetime(2024, 1, 1)
+
+        database = Database(config, logger)
+        rows = []
+        for minute in range(180):
+            timestamp = (start + datetime.timedelta(minutes=minute)).strftime('%Y-%m-%d %H:%M:%S')
+            rows.append((timestamp, 'host-a', '10.0.0.1', 50.0, float(minute), 0.0, 0.0, 0.0, 0.0, 0.0, None))
+        database._write_metrics(rows[:150])
+        database.close()
+
+        # Qayta ochilganda ochiq blok .head faylidan davom etadi
+        database = Database(config, logger)
+        database._write_metrics(rows[150:])
+        series = database.store._series('host-a', 'cpu')
+        assert len(series.index) == 2 and len(series.head) == 60
+
+        hourly = list(database.query_range('cpu', 'host-a', start, start + datetime.timedelta(hours=3), 3600, 'avg'))
+        assert [value for _, value in hourly] == [29.5, 89.5, 149.5]
+        assert hourly[1][0] == start + datetime.timedelta(hours=1)
+        last = list(database.query_range('cpu', None, start + datetime.timedelta(minutes=90),
+                                         start + datetime.timedelta(minutes=100), 600, 'last'))
+        assert last == [(start + datetime.timedelta(minutes=90), 99.0)]
+        database.close()
+
+        # Eski bloklarni o'chirish
+        series = Series(os.path.join(tmp, 'host-a', 'cpu'), 3600)
+        assert series.purge(int(hourly[1][0].replace(tzinfo=datetime.timezone.utc).timestamp())) == 60
+        assert next(series.scan(0, 2 ** 40))[1] == 60.0
+
+
+def test_sanitized_hostname():
+    """
+    Fayl tizimi uchun tozalangan xost nomi: barcha xostlar so'rovi yozilayotgan
+    qatorning o'zini o'qiydi, hosts() esa asl nomni qaytaradi
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        config = {'db_enabled': True, 'db_type': 'tsdb', 'db_tsdb_path': tmp,
+                  'db_tsdb_block_seconds': 3600, 'db_batch_size': 50}
+        start = datetime.datetime(2024, 1, 1)
+        end = start + datetime.timedelta(minutes=10)
+
+        database = Database(config, logger)
+        rows = [((start + datetime.timedelta(minutes=minute)).strftime('%Y-%m-%d %H:%M:%S'), 'db/primary:5432',
+                 '10.0.0.2', 50.0, float(minute), 0.0, 0.0, 0.0, 0.0, 0.0, None) for minute in range(5)]
+        database._write_metrics(rows[:3])
+        assert list(database.query_range('cpu', None, start, end, 600, 'count')) == [(start, 3)]
+        # Barcha xostlar so'rovidan keyingi yozuvlar ham o'sha qatorga tushadi
+        database._write_metrics(rows[3:])
+        assert list(database.query_range('cpu', None, start, end, 600, 'count')) == [(start, 5)]
+        assert list(database.query_range('cpu', 'db/primary:5432', start, end, 600, 'count')) == [(start, 5)]
+        assert [name for name, metric in database.store.series if metric == 'cpu'] == ['db_primary_5432']
+        assert database.store.hosts() == ['db/primary:5432']
+        database.close()
+
+
+def test_retention_purges_idle_hosts():
+    """
+    Saqlash muddati jarayon boshlanganidan beri yozilmagan xostlarga ham qo'llanadi
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        config = {'db_enabled': True, 'db_type': 'tsdb', 'db_tsdb_path': tmp,
+                  'db_tsdb_block_seconds': 3600, 'db_batch_size': 50}
+        start = datetime.datetime(2024, 1, 1)
+        database = Database(config, logger)
+        rows = [((start + datetime.timedelta(minutes=minute)).strftime('%Y-%m-%d %H:%M:%S'), 'old-01',
+                 '10.0.0.3', 50.0, float(minute), 0.0, 0.0, 0.0, 0.0, 0.0, None) for minute in range(90)]
+        database._write_metrics(rows)
+        database.close()
+
+        # Qayta ishga tushgandan keyin old-01 yozilmaydi, faqat boshqa xost
+        database = Database(dict(config, db_retention_raw='1d', db_retention_interval=0), logger)
+        now = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        database._write_metrics([(now, 'new-01', '10.0.0.4', 50.0, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0, None)])
+        database.store.flush()
+        assert list(database.query_range('cpu', 'old-01', start, start + datetime.timedelta(hours=2), 3600, 'count')) == []
+        assert not os.path.getsize(os.path.join(tmp, 'old-01', 'cpu.head'))
+        assert ('new-01', 'cpu') in database.store.series
+        database.close()
+
+
+if __name__ == "__main__":
+    test_block_roundtrip()
+    test_store_and_query()
+    test_sanitized_hostname()
+    test_retention_purges_idle_hosts()
+    print("TSDB testlari muvaffaqiyatli yakunlandi!")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sirpanuvchi oyna qoidalarini test qilish uchun skript
+"""
+
+import os
+import sys
+import logging
+
+# Modullarni import qilish
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from core.windows import SlidingWindow, WindowRule, AlertWindows, parse_duration
+
+logger = logging.getLogger('windows_test')
+
+
+def test_sliding_window_stats():
+    """
+    Ring buffer va monoton deque statistikalarini tekshirish
+    """
+    window = SlidingWindow(window_seconds=30, max_samples=100)
+    values = [50, 90, 70, 95, 60]
+    for i, value in enumerate(values):
+        window.add(value, threshold=80, timestamp=i * 10)
+
+    # t=40 da oynada faqat t>10 namunalar qoladi: 70, 95, 60
+    assert len(window) == 3
+    assert window.max() == 95
+    assert window.min() == 60
+    assert abs(window.avg() - 75) < 1e-9
+    assert abs(window.ratio_above() - 1 / 3) < 1e-9
+
+
+def test_sample_window_capacity():
+    """
+    Namunalar soni bo'yicha oyna eski namunalarni chiqarishini tekshirish
+    """
+    window = SlidingWindow(max_samples=3)
+    for i, value in enumerate([10, 20, 30, 40]):
+        window.add(value, timestamp=i)
+
+    assert len(window) == 3
+    assert window.min() == 20
+    assert window.max() == 40
+
+
+def test_rule_parsing():
+    """
+    Qoida matnlarini tahlil qilish
+    """
+    assert parse_duration("5m") == 300
+    assert WindowRule.parse("avg 5m").window_seconds == 300
+    assert WindowRule.parse("max over 2m").agg == 'max'
+
+    rule = WindowRule.parse("ratio 80% 10 samples")
+    assert rule.samples == 10
+    assert abs(rule.ratio - 0.8) < 1e-9
+    assert rule.describe() == "80% of 10 samples"
+
+
+def test_spike_is_suppressed():
+    """
+    Bitta qisqa sakrash "avg" qoidasida alert yubormasligini tekshirish
+    """
+    config = {'check_interval': 60, 'cpu_condition': 'avg 5m'}
+    windows = AlertWindows(config, logger)
+
+    triggered = False
+    for i, value in enumerate([10, 10, 10, 10, 100]):
+        triggered, _, _ = windows.check('cpu', value, 90, timestamp=i * 60)
+    assert not triggered
+
+    for i in range(5, 10):
+        triggered, compared, threshold = windows.check('cpu', 100, 90, timestamp=i * 60)
+    assert triggered and compared >= threshold
+
+
+def test_fast_samples_warm_window():
+    """
+    Pull rejimida namunalar check_interval dan tez (yoki sekin) kelsa ham oyna to'lishi
+    """
+    config = {'check_interval': 60, 'cpu_condition': 'avg 5m'}
+    windows = AlertWindows(config, logger)
+
+    # Har 5 soniyada scrape: oyna 5 daqiqani to'liq qamrab olishi kerak
+    for i in range(200):
+        triggered, compared, _ = windows.check('cpu', 99, 90, timestamp=i * 5)
+    assert triggered and compared == 99
+    assert windows.windows['cpu'].span() >= 295
+
+    # Faqat prometheus_idle_interval (300 s) bo'yicha tekshiruvlar
+    windows = AlertWindows(config, logger)
+    for i in range(4):
+        triggered, _, _ = windows.check('cpu', 99, 90, timestamp=i * 300)
+    assert triggered
+
+
+if __name__ == "__main__":
+    test_sliding_window_stats()
+    test_sample_window_capacity()
+    test_rule_parsing()
+    test_spike_is_suppressed()
+    test_fast_samples_warm_window()
+    print("Oyna testlari muvaffaqiyatli yakunlandi!")
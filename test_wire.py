@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Agent oqimining binary formatini test qilish uchun skript
+"""
+
+import io
+import os
+import sys
+
+# Modullarni import qilish
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from utils.wire import (FRAME_SAMPLE, FRAME_ACK, KEYFRAME_INTERVAL, FrameReader, SampleDecoder, SampleEncoder,
+                        ack_frame, read_varint, unzigzag, write_varint, zigzag)
+
+SYSTEM_INFO = {'hostname': 'web-01', 'ip': '10.0.0.5', 'uptime': '3d 1h 5m', 'cpu': 'Xeon (8 cores)'}
+
+
+def test_varint_zigzag():
+    """
+    zigzag/varint chegaraviy qiymatlari
+    """
+    for value in (0, -1, 1, -64, 63, 300, -70000, 2 ** 40, -(2 ** 40)):
+        out = bytearray()
+        write_varint(out, zigzag(value))
+        decoded, offset = read_varint(memoryview(out), 0)
+        assert unzigzag(decoded) == value and offset == len(out)
+    out = bytearray()
+    write_varint(out, zigzag(-1))
+    assert bytes(out) == b'\x01'
+
+
+def test_delta_round_trip_over_stream():
+    """
+    Farqlar bilan kodlangan namunalar oqimdan memoryview orqali qayta tiklanadi
+    """
+    encoder = SampleEncoder()
+    stream = bytearray()
+    expected = []
+    for index in range(KEYFRAME_INTERVAL + 10):
+        metrics = {'ram': 55.0 + (index % 3) * 0.1, 'cpu': 20.25 - index * 0.5, 'disk': 61.0, 'swap': 0.0,
+                   'load': 1.5, 'network': [1.2, 0.4]}
+        info = dict(SYSTEM_INFO, uptime=f'3d 1h {5 + index // 60}m')
+        if index == 100:
+            metrics['temperature'] = 71
+        stream += encoder.encode(index + 1, 1700000000 + index * 10.5, metrics, info)
+        expected.append((metrics, info))
+
+    reader = FrameReader(io.BufferedReader(io.BytesIO(bytes(stream))))
+    decoder = SampleDecoder(list(encoder.schema))
+    sizes = []
+    for index, (metrics, info) in enumerate(expected):
+        kind, body = reader.read()
+        assert kind == FRAME_SAMPLE and isinstance(body, memoryview)
+        sizes.append(len(body))
+        message = decoder.decode(body)
+        assert message['seq'] == index + 1 and message['ts'] == 1700000000 + index * 10.5
+        assert message['system_info'] == info
+        for key, value in metrics.items():
+            if key == 'network':
+                assert message['metrics']['network'] == value
+            else:
+                assert abs(message['metrics'][key] - value) < 0.006, (key, message['metrics'][key], value)
+    assert reader.read() is None
+
+    # Kalit ramkalar: birinchi va KEYFRAME_INTERVAL-chi; oddiy farq ramkasi ixcham
+    assert sizes[0] > 60 and sizes[KEYFRAME_INTERVAL] > 60
+    assert sizes[1] <= 25
+
+
+def test_delta_without_keyframe_rejected():
+    """
+    Farq zanjiri kalit ramkasiz boshlansa (ulanish o'rtasi) xatolik
+    """
+    encoder = SampleEncoder()
+    encoder.encode(1, 0, {'ram': 1.0}, {})
+    delta = encoder.encode(2, 1, {'ram': 2.0}, {})
+    try:
+        SampleDecoder().decode(memoryview(delta)[5:])
+        assert False, "ValueError kutilgan edi"
+    except ValueError:
+        pass
+
+    reader = FrameReader(io.BytesIO(ack_frame(42) + ack_frame(7)[:3]))
+    kind, body = reader.read()
+    assert kind == FRAME_ACK and bytes(body) == b'\x00\x00\x00\x2a'
+    try:
+        reader.read()
+        assert False, "ValueError kutilgan edi"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    test_varint_zigzag()
+    test_delta_round_trip_over_stream()
+    test_delta_without_keyframe_rejected()
+    print("Binary format testlari muvaffaqiyatli yakunlandi!")
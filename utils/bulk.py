@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ommaviy yozish yordamchilari
+PostgreSQL uchun COPY va execute_values, MySQL uchun ko'p qatorli INSERT:
+har bir batch qatorlar soniga emas, bir nechta so'rovga teng bo'ladi
+"""
+
+import io
+import re
+from functools import lru_cache
+
+# INSERT ... VALUES (...) so'rovidagi bitta qator guruhi
+VALUES_GROUP = re.compile(r'VALUES\s*(\([^)]*\))', re.IGNORECASE)
+
+
+@lru_cache(maxsize=64)
+def multirow_statement(sql, count):
+    """
+    Bitta qatorli INSERT so'rovini count qatorli so'rovga aylantirish
+
+    ON DUPLICATE KEY UPDATE kabi qo'shimchalar o'zgarmaydi.
+
+    Args:
+        sql (str): INSERT ... VALUES (%s, ...) so'rovi
+        count (int): Qatorlar soni
+
+    Returns:
+        str: INSERT ... VALUES (...), (...), ... so'rovi
+    """
+    match = VALUES_GROUP.search(sql)
+    return sql[:match.start(1)] + ', '.join([match.group(1)] * count) + sql[match.end(1):]
+
+
+def execute_multirow(cursor, sql, rows, chunk_rows=500):
+    """
+    Qatorlarni ko'p qatorli INSERT bilan bo'laklab yozish (MySQL)
+
+    Args:
+        cursor: DB-API kursori
+        sql (str): Bitta qatorli INSERT so'rovi
+        rows (list): Parametrlar ro'yxati
+        chunk_rows (int): Bitta so'rovdagi maksimal qatorlar
+    """
+    for start in range(0, len(rows), chunk_rows):
+        chunk = rows[start:start + chunk_rows]
+        cursor.execute(multirow_statement(sql, len(chunk)), [value for row in chunk for value in row])
+
+
+def execute_values(cursor, sql, rows, page_size=500):
+    """
+    psycopg2.extras.execute_values orqali yozish (PostgreSQL, upsert'lar uchun)
+
+    Args:
+        cursor: psycopg2 kursori
+        sql (str): Bitta qatorli INSERT so'rovi
+        rows (list): Parametrlar ro'yxati
+        page_size (int): Bitta so'rovdagi maksimal qatorlar
+    """
+    from psycopg2.extras import execute_values as psycopg_execute_values
+
+    match = VALUES_GROUP.search(sql)
+    psycopg_execute_values(cursor, sql[:match.start(1)] + '%s' + sql[match.end(1):], rows,
+                           template=match.group(1), page_size=page_size)
+
+
+def copy_value(value):
+    """
+    Qiymatni COPY text formatiga aylantirish
+
+    Args:
+        value: Python qiymati
+
+    Returns:
+        str: COPY maydoni (NULL - \\N)
+    """
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def copy_rows(cursor, table, columns, rows):
+    """
+    Qatorlarni COPY FROM STDIN bilan yozish (PostgreSQL, xom metrikalar uchun)
+
+    Args:
+        cursor: psycopg2 kursori
+        table (str): Jadval nomi
+        columns (tuple): Ustunlar
+        rows (list): Qatorlar
+    """
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(copy_value(value) for value in row))
+        buffer.write('\n')
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
@@ -11,23 +11,292 @@ import sqlite3
 import datetime
 import json
 import os
+import itertools
+import threading
+import importlib
+from contextlib import contextmanager
+
+from utils.write_buffer import WriteBuffer
+from utils.sqlite_writer import SQLiteWriter, ReadPool
+from utils.rollups import RESOLUTIONS, ROLLUP_METRICS, RetentionPolicy, aggregate_rows, create_rollup_statements, upsert_statement
+from utils.query import DEFAULT_POINTS, build_range_query, collapse_last, epoch_to_datetime, validate_query
+from utils.tsdb import TimeSeriesStore, to_epoch, from_epoch
+from utils.rrd import RoundRobinStore
+from utils.pool import ConnectionPool
+from utils.bulk import copy_rows, execute_multirow, execute_values
+from utils.schema import (SAMPLE_COLUMNS, EVENT_COLUMNS, HostRegistry, create_normalized_statements,
+                          insert_ignore_statement, to_local_epoch)
+from utils.histogram import DB_FLUSH_SECONDS
+from core.windows import parse_duration
+
+# Jadval ustunlari (id dan tashqari) - barcha backendlar uchun umumiy
+METRIC_COLUMNS = (
+    'timestamp', 'hostname', 'ip_address', 'ram_usage', 'cpu_usage', 'disk_usage',
+    'swap_usage', 'load_average', 'network_rx', 'network_tx', 'extra_data'
+)
+ALERT_COLUMNS = ('timestamp', 'hostname', 'alert_type', 'value', 'message', 'sent_successfully')
+
+# Backendlar orasidagi farqlar: ustun turlari va parametr belgisi
+DIALECTS = {
+    'sqlite': {
+        'placeholder': '?',
+        'id': 'INTEGER PRIMARY KEY AUTOINCREMENT',
+        'timestamp': 'DATETIME',
+        'hostname': 'TEXT',
+        'ip_address': 'TEXT',
+        'alert_type': 'TEXT',
+        'value': 'TEXT',
+        'real': 'REAL',
+        'double': 'REAL',
+    },
+    'mysql': {
+        'placeholder': '%s',
+        'id': 'INT AUTO_INCREMENT PRIMARY KEY',
+        'timestamp': 'DATETIME',
+        'hostname': 'VARCHAR(255)',
+        'ip_address': 'VARCHAR(45)',
+        'alert_type': 'VARCHAR(50)',
+        'value': 'VARCHAR(100)',
+        'real': 'FLOAT',
+        'double': 'DOUBLE',
+    },
+    'postgresql': {
+        'placeholder': '%s',
+        'id': 'SERIAL PRIMARY KEY',
+        'timestamp': 'TIMESTAMP',
+        'hostname': 'VARCHAR(255)',
+        'ip_address': 'VARCHAR(45)',
+        'alert_type': 'VARCHAR(50)',
+        'value': 'VARCHAR(100)',
+        'real': 'FLOAT',
+        'double': 'DOUBLE PRECISION',
+    },
+}
+
+# Vaqt oralig'i so'rovlari uchun indekslar: (nom, jadval, ustunlar)
+INDEXES = (
+    ('idx_metrics_host_time', 'metrics', 'hostname, timestamp'),
+    ('idx_alerts_host_time', 'alerts', 'hostname, timestamp'),
+)
+
+# Oqimli so'rovlarda bir martada olinadigan qatorlar soni
+FETCH_SIZE = 1000
+
+# Ustun nomi -> metrics qatoridagi indeks (rollup hisoblash uchun)
+METRIC_COLUMN_INDEX = {column: index for index, column in enumerate(METRIC_COLUMNS)}
+
+# Backend nomlari log xabarlari uchun
+DB_TITLES = {'sqlite': 'SQLite', 'mysql': 'MySQL', 'postgresql': 'PostgreSQL'}
+
+# Server backendlari drayverlari: (modul, pip paketi, nomi)
+DRIVERS = {
+    'mysql': ('mysql.connector', 'mysql-connector-python', 'MySQL-connector-python'),
+    'postgresql': ('psycopg2', 'psycopg2-binary', 'Psycopg2'),
+}
+
+# SQL dan tashqari fayl omborlari: db_type -> klass
+FILE_STORES = {'tsdb': TimeSeriesStore, 'rrd': RoundRobinStore}
+
+# SQL backendlar uchun jadval tuzilishlari (utils.schema ga qarang)
+SCHEMAS = ('legacy', 'normalized')
+
+
+def create_table_statements(db_type):
+    """
+    Backend uchun CREATE TABLE so'rovlarini yaratish (rollup jadvallari bilan)
+
+    Args:
+        db_type (str): sqlite, mysql yoki postgresql
+
+    Returns:
+        list: CREATE TABLE so'rovlari
+    """
+    d = DIALECTS[db_type]
+    metrics_sql = f'''
+        CREATE TABLE IF NOT EXISTS metrics (
+            id {d['id']},
+            timestamp {d['timestamp']} NOT NULL,
+            hostname {d['hostname']} NOT NULL,
+            ip_address {d['ip_address']} NOT NULL,
+            ram_usage {d['real']},
+            cpu_usage {d['real']},
+            disk_usage {d['real']},
+            swap_usage {d['real']},
+            load_average {d['real']},
+            network_rx {d['real']},
+            network_tx {d['real']},
+            extra_data TEXT
+        )
+    '''
+    alerts_sql = f'''
+        CREATE TABLE IF NOT EXISTS alerts (
+            id {d['id']},
+            timestamp {d['timestamp']} NOT NULL,
+            hostname {d['hostname']} NOT NULL,
+            alert_type {d['alert_type']} NOT NULL,
+            value {d['value']} NOT NULL,
+            message TEXT,
+            sent_successfully BOOLEAN
+        )
+    '''
+    return [metrics_sql, alerts_sql] + create_rollup_statements(d)
+
+
+def insert_statement(db_type, table, columns):
+    """
+    Backend parametr belgisi bilan INSERT so'rovini yaratish
+
+    Args:
+        db_type (str): sqlite, mysql yoki postgresql
+        table (str): Jadval nomi
+        columns (tuple): Ustunlar
+
+    Returns:
+        str: INSERT so'rovi
+    """
+    placeholders = ', '.join([DIALECTS[db_type]['placeholder']] * len(columns))
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
 
 class Database:
     def __init__(self, config, logger):
         """
         Ma'lumotlar bazasi ulanishini ishga tushirish
-        
+
         Args:
             config (dict): Konfiguratsiya sozlamalari
             logger (logging.Logger): Log yozish uchun logger obyekti
         """
         self.config = config
         self.logger = logger
+        # SQLite (default rejim) ulanishi; MySQL/PostgreSQL ulanishlari puldan olinadi.
+        # Pull rejimida tekshiruvlar scrape oqimlarida bajariladi, shuning uchun
+        # SQLite ulanishi oqimlar orasida qulf bilan bo'lishiladi
         self.db_conn = None
-        self.db_cursor = None
-        
+        self._sqlite_lock = threading.RLock()
+        self.pool = None
+        self.driver = None
+        self._schema_ready = False
+        # SQLite performance rejimi: yagona yozuvchi oqim va o'qish puli
+        self.sqlite_writer = None
+        self.read_pool = None
+        # Fayl ombori (db_type = tsdb yoki rrd)
+        self.store = None
+        # Normallashtirilgan sxemada hostname -> host_id keshi
+        self.schema = config.get('db_schema', 'legacy')
+        self.hosts = None
+        self._cursor_ids = itertools.count(1)
+
+        # Metrikalar har tickda emas, batch bilan yoziladi; baza ishlamay
+        # turganda bufferda qoladi va to'xtashda spill fayliga saqlanadi
+        self.metrics_buffer = WriteBuffer(config, logger, self._write_metrics)
+        self.spill_path = config.get('db_spill_path', '/var/lib/system-monitor/metrics_spill.ndjson')
+
         if self.config['db_enabled']:
             self._init_database()
+            restored = self.metrics_buffer.load(self.spill_path)
+            if restored:
+                self.logger.info(f"Spill faylidan {restored} ta yozilmagan metrika qatori qayta yuklandi")
+
+    def _connect(self, db_type):
+        """
+        Backend'ga ulanish
+
+        Args:
+            db_type (str): sqlite, mysql yoki postgresql
+
+        Returns:
+            Connection: DB-API ulanish obyekti
+        """
+        if db_type == 'sqlite':
+            # Direktoriyani yaratish
+            db_dir = os.path.dirname(self.config['db_path'])
+            if db_dir and not os.path.exists(db_dir):
+                os.makedirs(db_dir, exist_ok=True)
+            return sqlite3.connect(self.config['db_path'], check_same_thread=False)
+
+        return self.driver.connect(
+            host=self.config['db_host'],
+            port=self.config['db_port'],
+            user=self.config['db_user'],
+            password=self.config['db_password'],
+            database=self.config['db_name']
+        )
+
+    def _load_driver(self, db_type):
+        """
+        Server backend drayverini import qilish
+
+        Args:
+            db_type (str): mysql yoki postgresql
+
+        Returns:
+            module: Drayver moduli (o'rnatilmagan bo'lsa None)
+        """
+        module, package, title = DRIVERS[db_type]
+        try:
+            return importlib.import_module(module)
+        except ImportError:
+            self.logger.error(f"{title} o'rnatilmagan. 'pip install {package}' buyrug'i bilan o'rnating.")
+            return None
+
+    def _open_pooled(self, db_type):
+        """
+        Pul uchun yangi ulanish; birinchi muvaffaqiyatli ulanishda jadvallar yaratiladi
+
+        Args:
+            db_type (str): mysql yoki postgresql
+
+        Returns:
+            Connection: DB-API ulanishi
+        """
+        conn = self._connect(db_type)
+        if not self._schema_ready:
+            try:
+                self._create_schema(conn, db_type)
+            except Exception:
+                conn.close()
+                raise
+            self._schema_ready = True
+        return conn
+
+    def _create_schema(self, conn, db_type):
+        """
+        Jadvallar va indekslarni yaratish
+
+        Args:
+            conn: DB-API ulanishi
+            db_type (str): sqlite, mysql yoki postgresql
+        """
+        cursor = conn.cursor()
+        try:
+            if self.schema == 'normalized':
+                statements = (create_normalized_statements(db_type, DIALECTS[db_type])
+                              + create_rollup_statements(DIALECTS[db_type]))
+                for statement in statements:
+                    cursor.execute(statement)
+            else:
+                for statement in create_table_statements(db_type):
+                    cursor.execute(statement)
+                self._create_indexes(cursor, db_type)
+            conn.commit()
+        finally:
+            cursor.close()
+
+    @contextmanager
+    def _connection(self):
+        """
+        Yozish/o'qish uchun ulanish: MySQL/PostgreSQL da puldan, SQLite da yagona ulanish
+
+        Yields:
+            Connection: DB-API ulanishi
+        """
+        if self.pool:
+            with self.pool.connection() as conn:
+                yield conn
+        else:
+            with self._sqlite_lock:
+                yield self.db_conn
 
     def _init_database(self):
         """
@@ -37,254 +306,287 @@ class Database:
         try:
             db_type = self.config['db_type']
             self.logger.info(f"Ma'lumotlar bazasi integratsiyasi yoqilgan: {db_type}")
-            
-            if db_type == 'sqlite':
-                # Direktoriyani yaratish
-                db_dir = os.path.dirname(self.config['db_path'])
-                if db_dir and not os.path.exists(db_dir):
-                    os.makedirs(db_dir, exist_ok=True)
-                
-                # SQLite ma'lumotlar bazasiga ulanish
-                self.db_conn = sqlite3.connect(self.config['db_path'])
-                self.db_cursor = self.db_conn.cursor()
-                
-                # Jadvallarni yaratish
-                self.db_cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS metrics (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        timestamp DATETIME NOT NULL,
-                        hostname TEXT NOT NULL,
-                        ip_address TEXT NOT NULL,
-                        ram_usage REAL,
-                        cpu_usage REAL,
-                        disk_usage REAL,
-                        swap_usage REAL,
-                        load_average REAL,
-                        network_rx REAL,
-                        network_tx REAL,
-                        extra_data TEXT
-                    )
-                ''')
-                
-                self.db_cursor.execute('''
-                    CREATE TABLE IF NOT EXISTS alerts (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        timestamp DATETIME NOT NULL,
-                        hostname TEXT NOT NULL,
-                        alert_type TEXT NOT NULL,
-                        value TEXT NOT NULL,
-                        message TEXT,
-                        sent_successfully BOOLEAN
-                    )
-                ''')
-                
-                self.db_conn.commit()
-                self.logger.info("SQLite ma'lumotlar bazasi muvaffaqiyatli ishga tushirildi")
-                
-            elif db_type == 'mysql':
-                try:
-                    import mysql.connector
-                    self.db_conn = mysql.connector.connect(
-                        host=self.config['db_host'],
-                        port=self.config['db_port'],
-                        user=self.config['db_user'],
-                        password=self.config['db_password'],
-                        database=self.config['db_name']
-                    )
-                    self.db_cursor = self.db_conn.cursor()
-                    
-                    # Jadvallarni yaratish
-                    self.db_cursor.execute('''
-                        CREATE TABLE IF NOT EXISTS metrics (
-                            id INT AUTO_INCREMENT PRIMARY KEY,
-                            timestamp DATETIME NOT NULL,
-                            hostname VARCHAR(255) NOT NULL,
-                            ip_address VARCHAR(45) NOT NULL,
-                            ram_usage FLOAT,
-                            cpu_usage FLOAT,
-                            disk_usage FLOAT,
-                            swap_usage FLOAT,
-                            load_average FLOAT,
-                            network_rx FLOAT,
-                            network_tx FLOAT,
-                            extra_data TEXT
-                        )
-                    ''')
-                    
-                    self.db_cursor.execute('''
-                        CREATE TABLE IF NOT EXISTS alerts (
-                            id INT AUTO_INCREMENT PRIMARY KEY,
-                            timestamp DATETIME NOT NULL,
-                            hostname VARCHAR(255) NOT NULL,
-                            alert_type VARCHAR(50) NOT NULL,
-                            value VARCHAR(100) NOT NULL,
-                            message TEXT,
-                            sent_successfully BOOLEAN
-                        )
-                    ''')
-                    
-                    self.db_conn.commit()
-                    self.logger.info("MySQL ma'lumotlar bazasi muvaffaqiyatli ishga tushirildi")
-                    
-                except ImportError:
-                    self.logger.error("MySQL-connector-python o'rnatilmagan. 'pip install mysql-connector-python' buyrug'i bilan o'rnating.")
+
+            if db_type in FILE_STORES:
+                self.store = FILE_STORES[db_type](self.config, self.logger)
+                return
+
+            if db_type not in DIALECTS:
+                self.logger.error(f"Noma'lum ma'lumotlar bazasi turi: {db_type}")
+                self.config['db_enabled'] = False
+                return
+
+            if self.schema not in SCHEMAS:
+                self.logger.error(f"Noma'lum sxema: {self.schema} (legacy yoki normalized bo'lishi kerak)")
+                self.config['db_enabled'] = False
+                return
+
+            placeholder = DIALECTS[db_type]['placeholder']
+            if self.schema == 'normalized':
+                # Xuddi shu (host_id, ts) qayta yozilsa (spill qayta yuklanganda) e'tiborsiz qoldiriladi
+                self.metrics_insert_sql = insert_ignore_statement(db_type, placeholder, 'metric_samples', SAMPLE_COLUMNS)
+                self.alerts_insert_sql = insert_statement(db_type, 'alert_events', EVENT_COLUMNS)
+                self.hosts = HostRegistry(db_type, placeholder)
+            else:
+                self.metrics_insert_sql = insert_statement(db_type, 'metrics', METRIC_COLUMNS)
+                self.alerts_insert_sql = insert_statement(db_type, 'alerts', ALERT_COLUMNS)
+            self.rollups_enabled = self.config.get('db_rollups_enabled', True)
+            self.rollup_upserts = [(name, upsert_statement(db_type, placeholder, table))
+                                   for name, table, _ in RESOLUTIONS]
+            self.retention = RetentionPolicy(self.config, self.logger, db_type, self.schema)
+
+            if db_type == 'sqlite' and self.config.get('db_sqlite_mode', 'default') == 'performance':
+                self._init_sqlite_performance()
+                return
+
+            if db_type in DRIVERS:
+                self.driver = self._load_driver(db_type)
+                if self.driver is None:
                     self.config['db_enabled'] = False
-                
-            elif db_type == 'postgresql':
+                    return
+                self.pool = ConnectionPool(self.config, self.logger, lambda: self._open_pooled(db_type))
                 try:
-                    import psycopg2
-                    self.db_conn = psycopg2.connect(
-                        host=self.config['db_host'],
-                        port=self.config['db_port'],
-                        user=self.config['db_user'],
-                        password=self.config['db_password'],
-                        database=self.config['db_name']
-                    )
-                    self.db_cursor = self.db_conn.cursor()
-                    
-                    # Jadvallarni yaratish
-                    self.db_cursor.execute('''
-                        CREATE TABLE IF NOT EXISTS metrics (
-                            id SERIAL PRIMARY KEY,
-                            timestamp TIMESTAMP NOT NULL,
-                            hostname VARCHAR(255) NOT NULL,
-                            ip_address VARCHAR(45) NOT NULL,
-                            ram_usage FLOAT,
-                            cpu_usage FLOAT,
-                            disk_usage FLOAT,
-                            swap_usage FLOAT,
-                            load_average FLOAT,
-                            network_rx FLOAT,
-                            network_tx FLOAT,
-                            extra_data TEXT
-                        );
-                    ''')
-                    
-                    self.db_cursor.execute('''
-                        CREATE TABLE IF NOT EXISTS alerts (
-                            id SERIAL PRIMARY KEY,
-                            timestamp TIMESTAMP NOT NULL,
-                            hostname VARCHAR(255) NOT NULL,
-                            alert_type VARCHAR(50) NOT NULL,
-                            value VARCHAR(100) NOT NULL,
-                            message TEXT,
-                            sent_successfully BOOLEAN
-                        );
-                    ''')
-                    
-                    self.db_conn.commit()
-                    self.logger.info("PostgreSQL ma'lumotlar bazasi muvaffaqiyatli ishga tushirildi")
-                    
-                except ImportError:
-                    self.logger.error("Psycopg2 o'rnatilmagan. 'pip install psycopg2-binary' buyrug'i bilan o'rnating.")
-                    self.config['db_enabled'] = False
-                
+                    # Birinchi ulanish jadvallarni yaratadi; baza hali ishlamayotgan
+                    # bo'lsa, metrikalar bufferda kutadi va ulanish keyinroq tiklanadi
+                    with self.pool.connection():
+                        pass
+                except Exception as e:
+                    self.logger.warning(f"{DB_TITLES[db_type]} hozircha mavjud emas, qayta ulanish davom etadi: {e}")
+                    return
             else:
-                self.logger.error(f"Noma'lum ma'lumotlar bazasi turi: {db_type}")
-                self.config['db_enabled'] = False
-                
+                self.db_conn = self._connect(db_type)
+                self._create_schema(self.db_conn, db_type)
+
+            self.logger.info(f"{DB_TITLES[db_type]} ma'lumotlar bazasi muvaffaqiyatli ishga tushirildi")
+
         except Exception as e:
             self.logger.error(f"Ma'lumotlar bazasini ishga tushirishda xatolik: {e}")
             self.config['db_enabled'] = False
 
-    def store_metrics(self, metrics, system_info):
+    def _init_sqlite_performance(self):
+        """
+        SQLite performance rejimi: WAL, yagona yozuvchi oqim va faqat o'qish puli
+        """
+        db_path = self.config['db_path']
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.sqlite_writer = SQLiteWriter(self.config, self.logger, db_path)
+        self.sqlite_writer.submit(lambda conn: self._create_schema(conn, 'sqlite')).result()
+        self.read_pool = ReadPool(self.config, self.logger, db_path)
+        self.logger.info("SQLite ma'lumotlar bazasi performance rejimida ishga tushirildi (WAL, yozuvchi oqim)")
+
+    def _create_indexes(self, cursor, db_type):
+        """
+        (hostname, timestamp) indekslarini yaratish
+
+        Args:
+            cursor: DB-API kursori
+            db_type (str): sqlite, mysql yoki postgresql
+        """
+        for name, table, columns in INDEXES:
+            if db_type == 'mysql':
+                # MySQL da CREATE INDEX IF NOT EXISTS yo'q
+                cursor.execute(
+                    "SELECT COUNT(*) FROM information_schema.statistics "
+                    "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s", (table, name))
+                if cursor.fetchone()[0]:
+                    continue
+                cursor.execute(f"CREATE INDEX {name} ON {table} ({columns})")
+            else:
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+
+    def _connected(self):
+        return (self.db_conn is not None or self.pool is not None or self.sqlite_writer is not None
+                or self.store is not None)
+
+    def _write_batch(self, conn, rows):
         """
-        Tizim metrikalarini ma'lumotlar bazasida saqlash
-        
+        Xom qatorlarni va ularning rollup'larini yozish (commit chaqiruvchida)
+
+        Args:
+            conn: DB-API ulanishi
+            rows (list): METRIC_COLUMNS tartibidagi qatorlar
+        """
+        cursor = conn.cursor()
+        try:
+            if self.hosts:
+                self._write_samples(cursor, rows)
+            else:
+                self._bulk_insert(cursor, self.metrics_insert_sql, rows, table='metrics')
+            if self.rollups_enabled:
+                rollups = aggregate_rows(rows, METRIC_COLUMN_INDEX)
+                for name, sql in self.rollup_upserts:
+                    if rollups[name]:
+                        self._bulk_insert(cursor, sql, rollups[name])
+        except Exception:
+            if self.hosts:
+                # Tranzaksiya bekor qilinsa, unda qo'shilgan xostlar ham yo'qoladi
+                self.hosts.forget()
+            raise
+        finally:
+            cursor.close()
+
+    def _write_samples(self, cursor, rows):
+        """
+        Buffer qatorlarini metric_samples ga yozish (hostname -> host_id, vaqt -> epoch)
+
+        Args:
+            cursor: DB-API kursori
+            rows (list): METRIC_COLUMNS tartibidagi qatorlar
+        """
+        samples = [(self.hosts.host_id(cursor, row[1], row[2]), to_local_epoch(row[0])) + tuple(row[3:])
+                   for row in rows]
+        # COPY takroriy kalitni o'tkazib yubora olmaydi, shuning uchun table berilmaydi
+        self._bulk_insert(cursor, self.metrics_insert_sql, samples)
+
+    def _bulk_insert(self, cursor, sql, rows, table=None):
+        """
+        Qatorlarni backend uchun eng tez usulda yozish
+
+        PostgreSQL: xom qatorlar COPY bilan, upsert'lar execute_values bilan;
+        MySQL: ko'p qatorli INSERT; SQLite: executemany (jarayon ichida, tarmoq yo'q).
+
+        Args:
+            cursor: DB-API kursori
+            sql (str): Bitta qatorli INSERT so'rovi
+            rows (list): Parametrlar ro'yxati
+            table (str, optional): Oddiy INSERT bo'lsa jadval nomi (COPY uchun)
+        """
+        db_type = self.config['db_type']
+        chunk_rows = int(self.config.get('db_insert_chunk_rows', 500))
+        if db_type == 'postgresql':
+            if table and self.config.get('db_pg_copy', True):
+                copy_rows(cursor, table, METRIC_COLUMNS, rows)
+            else:
+                execute_values(cursor, sql, rows, page_size=chunk_rows)
+        elif db_type == 'mysql':
+            execute_multirow(cursor, sql, rows, chunk_rows)
+        else:
+            cursor.executemany(sql, rows)
+
+    def _write_metrics(self, rows):
+        """
+        Buffer'dagi qatorlarni bitta tranzaksiyada executemany bilan yozish
+
+        1m/1h/1d rollup jadvallari shu tranzaksiyada inkremental yangilanadi,
+        muddati o'tgan qatorlar esa db_retention_interval da bir marta o'chiriladi.
+        Performance rejimida qatorlar yozuvchi oqimda yoziladi va natijasi
+        kutiladi: yozish muvaffaqiyatsiz bo'lsa istisno buffer'ga qaytadi va
+        qatorlar yo'qolmaydi.
+
+        Args:
+            rows (list): METRIC_COLUMNS tartibidagi qatorlar
+        """
+        db_type = self.config['db_type']
+        if self.store:
+            with DB_FLUSH_SECONDS.time(db_type):
+                self.store.append_rows(rows, METRIC_COLUMN_INDEX, ROLLUP_METRICS)
+                self.store.flush()
+            return
+
+        if self.sqlite_writer:
+            def write_job(conn):
+                # Navbatda kutish emas, yozuvchi oqimdagi yozish vaqti o'lchanadi
+                with DB_FLUSH_SECONDS.time(db_type):
+                    self._write_batch(conn, rows)
+            self.sqlite_writer.submit(write_job).result()
+            if self.retention.due():
+                # purge har batch'dan keyin commit qiladi - navbatdagi yozishlar
+                # tranzaksiyasining o'rtasida commit bo'lmasligi uchun alohida bajariladi
+                self.sqlite_writer.submit(self.retention.purge, exclusive=True)
+            return
+
+        # Baza ishlamayotgan bo'lsa DatabaseUnavailable darhol ko'tariladi va qatorlar bufferda qoladi
+        with self._connection() as conn:
+            try:
+                with DB_FLUSH_SECONDS.time(db_type):
+                    self._write_batch(conn, rows)
+                    conn.commit()
+            except Exception:
+                try:
+                    conn.rollback()
+                except Exception:
+                    pass
+                raise
+
+            if self.retention.due():
+                try:
+                    self.retention.purge(conn)
+                except Exception as e:
+                    self.logger.error(f"Eski qatorlarni o'chirishda xatolik: {e}")
+                    conn.rollback()
+
+    def _insert_alert(self, conn, params):
+        """
+        Bitta alertni yozish (commit chaqiruvchida)
+
+        Args:
+            conn: DB-API ulanishi
+            params (tuple): ALERT_COLUMNS tartibidagi qiymatlar
+        """
+        cursor = conn.cursor()
+        try:
+            if self.hosts:
+                try:
+                    host_id = self.hosts.host_id(cursor, params[1])
+                except Exception:
+                    self.hosts.forget()
+                    raise
+                params = (host_id, to_local_epoch(params[0])) + tuple(params[2:])
+            cursor.execute(self.alerts_insert_sql, params)
+        finally:
+            cursor.close()
+
+    def store_metrics(self, metrics, system_info, timestamp=None):
+        """
+        Tizim metrikalarini write-behind bufferga qo'shish
+
+        Qatorlar db_batch_size ga yetganda yoki db_flush_interval soniya o'tganda
+        bitta tranzaksiyada yoziladi.
+
         Args:
             metrics (dict): Tizim metrikalari lug‘ati
             system_info (dict): Tizim haqida ma'lumotlar lug‘ati
-            
+            timestamp (float, optional): Namuna vaqti (epoch; standart: joriy vaqt)
+
         Returns:
-            bool: Metrikalar muvaffaqiyatli saqlangan bo‘lsa True, aks holda False
+            bool: Metrikalar bufferga qabul qilingan bo‘lsa True, aks holda False
         """
         if not self.config['db_enabled']:
             return False
-        
+
         try:
             # Tarmoq metrikalarini ajratish
             network_rx, network_tx = 0.0, 0.0
             if 'network' in metrics and isinstance(metrics['network'], list) and len(metrics['network']) == 2:
                 network_rx, network_tx = metrics['network']
-            
+
             # Qo‘shimcha ma'lumotlarni tayyorlash
             extra_data = {}
             for key, value in metrics.items():
                 if key not in ['ram', 'cpu', 'disk', 'swap', 'load', 'network']:
                     extra_data[key] = value
-            
+
             extra_data_json = json.dumps(extra_data) if extra_data else None
-            timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            if self.config['db_type'] == 'sqlite':
-                self.db_cursor.execute('''
-                    INSERT INTO metrics (
-                        timestamp, hostname, ip_address, ram_usage, cpu_usage, disk_usage, 
-                        swap_usage, load_average, network_rx, network_tx, extra_data
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    timestamp,
-                    system_info['hostname'],
-                    system_info['ip'],
-                    metrics.get('ram', 0.0),
-                    metrics.get('cpu', 0.0),
-                    metrics.get('disk', 0.0),
-                    metrics.get('swap', 0.0),
-                    metrics.get('load', 0.0),
-                    network_rx,
-                    network_tx,
-                    extra_data_json
-                ))
-                
-                self.db_conn.commit()
-                
-            elif self.config['db_type'] == 'mysql':
-                self.db_cursor.execute('''
-                    INSERT INTO metrics (
-                        timestamp, hostname, ip_address, ram_usage, cpu_usage, disk_usage, 
-                        swap_usage, load_average, network_rx, network_tx, extra_data
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ''', (
-                    timestamp,
-                    system_info['hostname'],
-                    system_info['ip'],
-                    metrics.get('ram', 0.0),
-                    metrics.get('cpu', 0.0),
-                    metrics.get('disk', 0.0),
-                    metrics.get('swap', 0.0),
-                    metrics.get('load', 0.0),
-                    network_rx,
-                    network_tx,
-                    extra_data_json
-                ))
-                
-                self.db_conn.commit()
-                
-            elif self.config['db_type'] == 'postgresql':
-                self.db_cursor.execute('''
-                    INSERT INTO metrics (
-                        timestamp, hostname, ip_address, ram_usage, cpu_usage, disk_usage, 
-                        swap_usage, load_average, network_rx, network_tx, extra_data
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ''', (
-                    timestamp,
-                    system_info['hostname'],
-                    system_info['ip'],
-                    metrics.get('ram', 0.0),
-                    metrics.get('cpu', 0.0),
-                    metrics.get('disk', 0.0),
-                    metrics.get('swap', 0.0),
-                    metrics.get('load', 0.0),
-                    network_rx,
-                    network_tx,
-                    extra_data_json
-                ))
-                
-                self.db_conn.commit()
-            
-            self.logger.debug("Metrikalar ma'lumotlar bazasida muvaffaqiyatli saqlandi")
-            return True
-            
+            moment = datetime.datetime.now() if timestamp is None else datetime.datetime.fromtimestamp(timestamp)
+            timestamp = moment.strftime('%Y-%m-%d %H:%M:%S')
+
+            return self.metrics_buffer.add((
+                timestamp,
+                system_info['hostname'],
+                system_info['ip'],
+                metrics.get('ram', 0.0),
+                metrics.get('cpu', 0.0),
+                metrics.get('disk', 0.0),
+                metrics.get('swap', 0.0),
+                metrics.get('load', 0.0),
+                network_rx,
+                network_tx,
+                extra_data_json
+            ))
+
         except Exception as e:
             self.logger.error(f"Metrikalarni saqlashda xatolik: {e}")
             return False
@@ -292,82 +594,213 @@ class Database:
     def store_alert(self, alert_type, value, message, sent_successfully, system_info):
         """
         Alert ma'lumotlarini ma'lumotlar bazasida saqlash
-        
+
         Args:
             alert_type (str): Alert turi (masalan, 'RAM', 'CPU')
             value (str): Alert qiymati (masalan, '85%')
             message (str): Alert xabari mazmuni
             sent_successfully (bool): Alert muvaffaqiyatli yuborilganligi
             system_info (dict): Tizim haqida ma'lumotlar lug‘ati
-            
+
         Returns:
             bool: Alert muvaffaqiyatli saqlangan bo‘lsa True, aks holda False
         """
         if not self.config['db_enabled']:
             return False
-        
+
         try:
             timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            if self.config['db_type'] == 'sqlite':
-                self.db_cursor.execute('''
-                    INSERT INTO alerts (
-                        timestamp, hostname, alert_type, value, message, sent_successfully
-                    ) VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    timestamp,
-                    system_info['hostname'],
-                    alert_type,
-                    str(value),
-                    message,
-                    1 if sent_successfully else 0
-                ))
-                
-                self.db_conn.commit()
-                
-            elif self.config['db_type'] == 'mysql':
-                self.db_cursor.execute('''
-                    INSERT INTO alerts (
-                        timestamp, hostname, alert_type, value, message, sent_successfully
-                    ) VALUES (%s, %s, %s, %s, %s, %s)
-                ''', (
-                    timestamp,
-                    system_info['hostname'],
-                    alert_type,
-                    str(value),
-                    message,
-                    sent_successfully
-                ))
-                
-                self.db_conn.commit()
-                
-            elif self.config['db_type'] == 'postgresql':
-                self.db_cursor.execute('''
-                    INSERT INTO alerts (
-                        timestamp, hostname, alert_type, value, message, sent_successfully
-                    ) VALUES (%s, %s, %s, %s, %s, %s)
-                ''', (
-                    timestamp,
-                    system_info['hostname'],
-                    alert_type,
-                    str(value),
-                    message,
-                    sent_successfully
-                ))
-                
-                self.db_conn.commit()
-            
+
+            params = (
+                timestamp,
+                system_info['hostname'],
+                alert_type,
+                str(value),
+                message,
+                bool(sent_successfully)
+            )
+
+            # Alertlar kam uchraydi, shuning uchun darhol yoziladi
+            if self.store:
+                self.store.append_alert(dict(zip(ALERT_COLUMNS, params)))
+            elif self.sqlite_writer:
+                self.sqlite_writer.submit(lambda conn: self._insert_alert(conn, params))
+            else:
+                with self._connection() as conn:
+                    self._insert_alert(conn, params)
+                    conn.commit()
+
             self.logger.debug(f"Alert muvaffaqiyatli saqlandi: {alert_type}")
             return True
-            
+
         except Exception as e:
             self.logger.error(f"Alertni saqlashda xatolik: {e}")
             return False
 
+    def query(self, sql, params=()):
+        """
+        O'qish so'rovini bajarish
+
+        Performance rejimida so'rov faqat o'qish pulidagi ulanishda bajariladi,
+        shuning uchun tahliliy so'rovlar yozishni bloklamaydi.
+
+        Args:
+            sql (str): SELECT so'rovi (backend parametr belgisi bilan)
+            params (tuple): Parametrlar
+
+        Returns:
+            list: Natija qatorlari
+        """
+        if self.store:
+            self.logger.error(f"{self.config['db_type']} omborida SQL so'rovlari qo'llab-quvvatlanmaydi, query_range dan foydalaning")
+            return []
+        if self.read_pool:
+            return self.read_pool.query(sql, params)
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+    def _retention_seconds(self):
+        retention = {'raw': parse_duration(str(self.config.get('db_retention_raw', '0')))}
+        for name, _, _ in RESOLUTIONS:
+            retention[name] = parse_duration(str(self.config.get(f'db_retention_{name}', '0')))
+        return retention
+
+    def query_range(self, metric, host, start, end, step=None, agg='avg'):
+        """
+        Metrika qiymatlarini vaqt oralig'i bo'yicha qadamlarga bo'lib olish
+
+        Oraliq va qadamga qarab xom jadval yoki mos rollup jadvali tanlanadi,
+        agregatsiya SQL da bajariladi va natija generator orqali qatorma-qator
+        qaytariladi (PostgreSQL da server tomonidagi kursor), shuning uchun
+        bir necha haftalik tarix xotiraga to'liq yuklanmaydi.
+
+        Args:
+            metric (str): ram, cpu, disk, swap, load, network_rx yoki network_tx
+            host (str): Xost nomi (None - barcha xostlar)
+            start (datetime): Boshlanish (shu jumladan)
+            end (datetime): Tugash (shu jumladan emas)
+            step (int, optional): Qadam soniyada (standart: oraliqdan hisoblanadi)
+            agg (str): avg, min, max, sum, count yoki last
+
+        Yields:
+            tuple: (bucket boshi datetime, qiymat)
+        """
+        if not self.config['db_enabled'] or not self._connected():
+            return
+
+        if self.store:
+            validate_query(metric, agg)
+            if not step:
+                step = max(1, int((end - start).total_seconds() // DEFAULT_POINTS))
+            for bucket, value in self.store.query_range(metric, host, to_epoch(start), to_epoch(end), int(step), agg):
+                yield from_epoch(bucket), value
+            return
+
+        db_type = self.config['db_type']
+        sql, params, resolution, step = build_range_query(
+            db_type, DIALECTS[db_type]['placeholder'], metric, host, start, end, step, agg,
+            self._retention_seconds(), self.rollups_enabled, self.schema)
+        self.logger.debug(f"query_range: {metric} {resolution} jadvalidan, qadam {step}s")
+
+        rows = self._stream(sql, params)
+        if agg == 'last':
+            rows = collapse_last(rows)
+        for bucket, value in rows:
+            yield epoch_to_datetime(db_type, bucket), value
+
+    def _stream(self, sql, params):
+        """
+        So'rov natijasini FETCH_SIZE lik bo'laklarda qaytarish
+
+        Args:
+            sql (str): SELECT so'rovi
+            params (tuple): Parametrlar
+
+        Yields:
+            tuple: Natija qatori
+        """
+        if self.read_pool:
+            with self.read_pool.connection() as conn:
+                cursor = conn.execute(sql, params)
+                yield from self._fetch_chunks(cursor)
+            return
+
+        with self._connection() as conn:
+            if self.config['db_type'] == 'postgresql':
+                # Server tomonidagi (nomlangan) kursor - natija bo'laklab uzatiladi
+                cursor = conn.cursor(name=f"query_range_{next(self._cursor_ids)}")
+                cursor.itersize = FETCH_SIZE
+            else:
+                cursor = conn.cursor()
+            try:
+                cursor.execute(sql, params)
+                yield from self._fetch_chunks(cursor)
+            finally:
+                cursor.close()
+                if self.config['db_type'] == 'postgresql':
+                    # Nomlangan kursor tranzaksiyasini yakunlash
+                    conn.rollback()
+
+    @staticmethod
+    def _fetch_chunks(cursor):
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            yield from rows
+
+    def request_flush(self):
+        """
+        Metrika bufferini keyingi tickda yozishni so'rash (signal handler uchun)
+        """
+        self.metrics_buffer.request_flush()
+
+    def flush(self):
+        """
+        Buffer'dagi metrikalarni darhol yozish
+
+        Returns:
+            bool: Muvaffaqiyatli bo'lsa True
+        """
+        if not self.config['db_enabled'] or not self._connected():
+            return False
+        return self.metrics_buffer.flush()
+
     def close(self):
         """
-        Ma'lumotlar bazasi ulanishini yopish
+        Buffer'ni yozib, ma'lumotlar bazasi ulanishini yopish
         """
-        if self.db_conn:
-            self.db_conn.close()
-            self.logger.info("Ma'lumotlar bazasi ulanishi yopildi")
\ No newline at end of file
+        if not self._connected():
+            return
+
+        self.flush()
+        if len(self.metrics_buffer):
+            # Keyingi ishga tushishda qayta yuklanadi
+            try:
+                saved = self.metrics_buffer.save(self.spill_path)
+                self.logger.warning(f"{saved} ta yozilmagan metrika qatori spill fayliga saqlandi: {self.spill_path}")
+            except Exception as e:
+                self.logger.error(f"{len(self.metrics_buffer)} ta metrika qatori yozilmay qoldi (spill xatoligi: {e})")
+
+        if self.store:
+            self.store.close()
+            self.store = None
+        elif self.sqlite_writer:
+            # Navbatdagi yozishlar bajarilib bo'lgach oqim to'xtaydi
+            self.sqlite_writer.close()
+            self.sqlite_writer = None
+            self.read_pool.close()
+            self.read_pool = None
+        elif self.pool:
+            self.pool.close()
+            self.pool = None
+        else:
+            with self._sqlite_lock:
+                self.db_conn.close()
+                self.db_conn = None
+        self.logger.info("Ma'lumotlar bazasi ulanishi yopildi")
@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Metrikalar tarixini ommaviy eksport qilish (NDJSON, CSV yoki Parquet)
+Qatorlar bazadan kalit bo'yicha sahifalab (keyset) o'qiladi va generatorlar
+zanjiri orqali faylga oqim bilan yoziladi, shuning uchun xotira sarfi
+oraliq hajmiga bog'liq emas. Har checkpoint_rows qatordan keyin yozilgan
+qism yopilib, holat <fayl>.checkpoint fayliga saqlanadi - to'xtatilgan
+eksport keyingi ishga tushishda shu joydan davom etadi
+"""
+
+import io
+import os
+import csv
+import gzip
+import json
+import datetime
+
+from utils.database import DIALECTS
+from utils.schema import SAMPLE_VALUE_COLUMNS
+
+# Eksport fayllaridagi ustunlar (ikkala sxemada ham bir xil)
+EXPORT_COLUMNS = ('timestamp', 'hostname', 'ip_address') + SAMPLE_VALUE_COLUMNS
+
+FORMATS = ('ndjson', 'csv', 'parquet')
+COMPRESSIONS = ('none', 'gzip', 'zstd')
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Sahifalash kaliti ustunlari va boshlang'ich qiymati
+KEYSETS = {
+    'legacy': (0,),
+    'normalized': (0, 0),
+}
+
+
+def chunk_query(schema, placeholder, host, chunk_rows):
+    """
+    Bitta sahifa uchun SELECT so'rovini yaratish
+
+    Legacy sxemada qatorlar id bo'yicha, normallashtirilgan sxemada
+    birlamchi kalit (host_id, ts) bo'yicha o'qiladi. Birinchi ustunlar -
+    keyingi sahifa kaliti.
+
+    Args:
+        schema (str): legacy yoki normalized
+        placeholder (str): Parametr belgisi
+        host (str): Xost nomi (None - barcha xostlar)
+        chunk_rows (int): Sahifa hajmi
+
+    Returns:
+        tuple: (sql, kalit ustunlari soni)
+    """
+    p = placeholder
+    values = ', '.join(SAMPLE_VALUE_COLUMNS)
+    if schema == 'normalized':
+        sql = (f"SELECT s.host_id, s.ts, h.hostname, h.ip_address, "
+               f"{', '.join('s.' + column for column in SAMPLE_VALUE_COLUMNS)} "
+               f"FROM metric_samples s JOIN hosts h ON h.host_id = s.host_id "
+               f"WHERE (s.host_id > {p} OR (s.host_id = {p} AND s.ts > {p})) AND s.ts >= {p} AND s.ts < {p}")
+        if host:
+            sql += f" AND h.hostname = {p}"
+        return sql + f" ORDER BY s.host_id, s.ts LIMIT {int(chunk_rows)}", 2
+
+    sql = (f"SELECT id, timestamp, hostname, ip_address, {values} FROM metrics "
+           f"WHERE id > {p} AND timestamp >= {p} AND timestamp < {p}")
+    if host:
+        sql += f" AND hostname = {p}"
+    return sql + f" ORDER BY id LIMIT {int(chunk_rows)}", 1
+
+
+def iter_chunks(database, placeholder, schema, start, end, host=None, chunk_rows=5000, after=None):
+    """
+    Qatorlarni sahifalab o'qish
+
+    Har bir sahifa alohida qisqa so'rov bilan olinadi (uzoq ochiq kursor
+    yoki tranzaksiya yo'q), keyingi sahifa oldingisining oxirgi kalitidan
+    boshlanadi.
+
+    Args:
+        database (Database): Ma'lumotlar bazasi
+        placeholder (str): Parametr belgisi
+        schema (str): legacy yoki normalized
+        start (datetime): Boshlanish (shu jumladan)
+        end (datetime): Tugash (shu jumladan emas)
+        host (str, optional): Xost nomi
+        chunk_rows (int): Sahifa hajmi
+        after (list, optional): Checkpoint'dagi oxirgi kalit
+
+    Yields:
+        tuple: (EXPORT_COLUMNS tartibidagi qatorlar ro'yxati, oxirgi kalit)
+    """
+    sql, key_size = chunk_query(schema, placeholder, host, chunk_rows)
+    key = list(after or KEYSETS[schema])
+    if schema == 'normalized':
+        bounds = [int(start.timestamp()), int(end.timestamp())]
+    else:
+        bounds = [start.strftime(TIMESTAMP_FORMAT), end.strftime(TIMESTAMP_FORMAT)]
+    tail = [host] if host else []
+
+    while True:
+        if key_size == 2:
+            params = [key[0], key[0], key[1]] + bounds + tail
+        else:
+            params = [key[0]] + bounds + tail
+        rows = database.query(sql, tuple(params))
+        if not rows:
+            return
+        key = list(rows[-1][:key_size])
+        yield [export_row(row, schema) for row in rows], key
+        if len(rows) < chunk_rows:
+            return
+
+
+def export_row(row, schema):
+    """
+    Baza qatorini EXPORT_COLUMNS tartibiga keltirish (vaqt - mahalliy vaqt satri)
+
+    Args:
+        row (tuple): chunk_query natijasi qatori
+        schema (str): legacy yoki normalized
+
+    Returns:
+        tuple: Eksport qatori
+    """
+    timestamp = row[1]
+    if schema == 'normalized':
+        timestamp = datetime.datetime.fromtimestamp(timestamp).strftime(TIMESTAMP_FORMAT)
+    elif isinstance(timestamp, datetime.datetime):
+        timestamp = timestamp.strftime(TIMESTAMP_FORMAT)
+    else:
+        timestamp = str(timestamp)[:19]
+    return (timestamp,) + tuple(row[2:])
+
+
+class TextSink:
+    def __init__(self, path, fmt, compression, logger):
+        """
+        NDJSON/CSV fayliga yozuvchi (ixtiyoriy gzip yoki zstd siqish bilan)
+
+        Har bir checkpoint'gacha yozilgan qism alohida gzip a'zosi / zstd
+        freymi sifatida yopiladi. Ko'p a'zoli gzip va ko'p freymli zstd
+        fayllarni zcat/zstdcat va Python gzip moduli bitta oqim sifatida o'qiydi.
+
+        Args:
+            path (str): Chiqish fayli
+            fmt (str): ndjson yoki csv
+            compression (str): none, gzip yoki zstd
+            logger (logging.Logger): Log yozish uchun logger obyekti
+
+        Raises:
+            ImportError: zstd uchun zstandard o'rnatilmagan
+        """
+        self.path = path
+        self.fmt = fmt
+        self.compression = compression
+        self.logger = logger
+        self._zstd = None
+        if compression == 'zstd':
+            try:
+                import zstandard
+            except ImportError:
+                logger.error("zstandard o'rnatilmagan. 'pip install zstandard' buyrug'i bilan o'rnating.")
+                raise
+            self._zstd = zstandard.ZstdCompressor(level=3)
+        self._file = None
+        self._stream = None
+
+    def open(self, state=None):
+        """
+        Faylni ochish
+
+        Args:
+            state (int, optional): Checkpoint'dagi fayl hajmi - undan keyingi
+                (yopilmagan qismdagi) baytlar kesib tashlanadi
+        """
+        if state is None:
+            self._file = open(self.path, 'wb')
+            if self.fmt == 'csv':
+                self._begin()
+                self._stream.write(self._csv_text([EXPORT_COLUMNS]))
+        else:
+            self._file = open(self.path, 'r+b')
+            self._file.truncate(state)
+            self._file.seek(state)
+
+    def _begin(self):
+        if self.compression == 'gzip':
+            self._stream = gzip.GzipFile(fileobj=self._file, mode='wb', compresslevel=6)
+        elif self._zstd:
+            self._stream = self._zstd.stream_writer(self._file, closefd=False)
+        else:
+            self._stream = self._file
+
+    @staticmethod
+    def _csv_text(rows):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerows(rows)
+        return buffer.getvalue().encode('utf-8')
+
+    @staticmethod
+    def _ndjson_text(rows):
+        lines = []
+        for row in rows:
+            record = dict(zip(EXPORT_COLUMNS, row))
+            if record['extra_data']:
+                try:
+                    record['extra_data'] = json.loads(record['extra_data'])
+                except (TypeError, ValueError):
+                    pass
+            lines.append(json.dumps(record, ensure_ascii=False))
+        lines.append('')
+        return '\n'.join(lines).encode('utf-8')
+
+    def write(self, rows):
+        """
+        Qatorlarni yozish
+
+        Args:
+            rows (list): EXPORT_COLUMNS tartibidagi qatorlar
+        """
+        if self._stream is None:
+            self._begin()
+        self._stream.write(self._csv_text(rows) if self.fmt == 'csv' else self._ndjson_text(rows))
+
+    def commit(self):
+        """
+        Joriy qismni yopib, diskka yozish
+
+        Returns:
+            int: Checkpoint holati (fayl hajmi)
+        """
+        if self._stream is not None and self._stream is not self._file:
+            self._stream.close()
+        self._stream = None
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return self._file.tell()
+
+    def close(self):
+        """
+        Faylni yopish (yopilmagan qism saqlanmaydi)
+        """
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class ParquetSink:
+    def __init__(self, path, compression, logger):
+        """
+        Parquet yozuvchi: path direktoriyasidagi part-NNNNN.parquet fayllari
+
+        Parquet fayli oxiridagi metadata yozilmaguncha yaroqsiz, shuning uchun
+        har bir checkpoint alohida fayl sifatida yopiladi; direktoriya
+        pyarrow.dataset / pandas.read_parquet uchun bitta jadval.
+
+        Args:
+            path (str): Chiqish direktoriyasi
+            compression (str): none, gzip yoki zstd (Parquet ichki siqishi)
+            logger (logging.Logger): Log yozish uchun logger obyekti
+
+        Raises:
+            ImportError: pyarrow o'rnatilmagan
+        """
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            logger.error("pyarrow o'rnatilmagan. 'pip install pyarrow' buyrug'i bilan o'rnating.")
+            raise
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.path = path
+        self.compression = compression
+        self.logger = logger
+        self.schema = pyarrow.schema(
+            [('timestamp', pyarrow.timestamp('s')), ('hostname', pyarrow.string()), ('ip_address', pyarrow.string())]
+            + [(column, pyarrow.float64()) for column in SAMPLE_VALUE_COLUMNS[:-1]]
+            + [('extra_data', pyarrow.string())])
+        self.parts = 0
+        self._writer = None
+
+    def _part_path(self, index):
+        return os.path.join(self.path, f"part-{index:05d}.parquet")
+
+    def open(self, state=None):
+        """
+        Direktoriyani tayyorlash
+
+        Args:
+            state (int, optional): Checkpoint'dagi yopilgan fayllar soni
+        """
+        os.makedirs(self.path, exist_ok=True)
+        self.parts = state or 0
+        for name in os.listdir(self.path):
+            # Oldingi ishga tushishning yopilmagan qismi yoki (yangi eksportda) eski fayllar
+            if name.endswith('.tmp') or (state is None and name.startswith('part-') and name.endswith('.parquet')):
+                os.remove(os.path.join(self.path, name))
+
+    def write(self, rows):
+        """
+        Qatorlarni bitta row group sifatida yozish
+
+        Args:
+            rows (list): EXPORT_COLUMNS tartibidagi qatorlar
+        """
+        if self._writer is None:
+            self._writer = self.pq.ParquetWriter(self._part_path(self.parts) + '.tmp', self.schema,
+                                                 compression=self.compression)
+        columns = list(zip(*rows))
+        arrays = [self.pa.array([datetime.datetime.strptime(value, TIMESTAMP_FORMAT) for value in columns[0]],
+                                type=self.pa.timestamp('s'))]
+        arrays += [self.pa.array(values, type=field.type) for values, field in zip(columns[1:], list(self.schema)[1:])]
+        self._writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def commit(self):
+        """
+        Joriy faylni yopish
+
+        Returns:
+            int: Checkpoint holati (yopilgan fayllar soni)
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            os.replace(self._part_path(self.parts) + '.tmp', self._part_path(self.parts))
+            self.parts += 1
+        return self.parts
+
+    def close(self):
+        """
+        Yopilmagan faylni tashlab ketish
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def load_checkpoint(path):
+    """
+    Checkpoint faylini o'qish
+
+    Args:
+        path (str): Checkpoint fayli
+
+    Returns:
+        dict: Holat yoki None (fayl yo'q)
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_checkpoint(path, checkpoint):
+    """
+    Checkpoint faylini atomik saqlash
+
+    Args:
+        path (str): Checkpoint fayli
+        checkpoint (dict): Holat
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def export_metrics(database, logger, output, fmt='ndjson', compression='none', start=None, end=None,
+                   host=None, chunk_rows=5000, checkpoint_rows=100000):
+    """
+    Metrikalar tarixini faylga eksport qilish
+
+    output.checkpoint fayli mavjud bo'lsa, eksport uning parametrlari
+    (vaqt oralig'i, xost, format) bilan oxirgi saqlangan joydan davom etadi.
+
+    Args:
+        database (Database): SQL ma'lumotlar bazasi
+        logger (logging.Logger): Log yozish uchun logger obyekti
+        output (str): Chiqish fayli (parquet uchun direktoriya)
+        fmt (str): ndjson, csv yoki parquet
+        compression (str): none, gzip yoki zstd
+        start (datetime): Boshlanish (shu jumladan)
+        end (datetime): Tugash (shu jumladan emas)
+        host (str, optional): Xost nomi
+        chunk_rows (int): Bitta so'rovdagi qatorlar
+        checkpoint_rows (int): Checkpoint'lar orasidagi qatorlar
+
+    Returns:
+        int: Jami eksport qilingan qatorlar (oldingi ishga tushishlar bilan)
+
+    Raises:
+        ValueError: Noto'g'ri format yoki siqish turi
+        ImportError: Parquet/zstd uchun kutubxona o'rnatilmagan
+    """
+    checkpoint_path = output + '.checkpoint'
+    checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint:
+        fmt, compression, host = checkpoint['format'], checkpoint['compression'], checkpoint['host']
+        start = datetime.datetime.strptime(checkpoint['start'], TIMESTAMP_FORMAT)
+        end = datetime.datetime.strptime(checkpoint['end'], TIMESTAMP_FORMAT)
+        logger.info(f"Checkpoint topildi: {checkpoint['rows']} ta qatordan keyin davom ettirilmoqda")
+    else:
+        if fmt not in FORMATS:
+            raise ValueError(f"Noma'lum format: {fmt} ({', '.join(FORMATS)})")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Noma'lum siqish turi: {compression} ({', '.join(COMPRESSIONS)})")
+        checkpoint = {
+            'format': fmt, 'compression': compression, 'host': host,
+            'start': start.strftime(TIMESTAMP_FORMAT), 'end': end.strftime(TIMESTAMP_FORMAT),
+            'schema': database.schema, 'key': None, 'rows': 0, 'state': None,
+        }
+
+    if fmt == 'parquet':
+        sink = ParquetSink(output, compression, logger)
+    else:
+        sink = TextSink(output, fmt, compression, logger)
+    sink.open(checkpoint['state'])
+
+    pending = 0
+    try:
+        chunks = iter_chunks(database, DIALECTS[database.config['db_type']]['placeholder'], checkpoint['schema'],
+                             start, end, host, chunk_rows, checkpoint['key'])
+        for rows, key in chunks:
+            sink.write(rows)
+            pending += len(rows)
+            checkpoint['key'] = key
+            if pending >= checkpoint_rows:
+                checkpoint['state'] = sink.commit()
+                checkpoint['rows'] += pending
+                pending = 0
+                save_checkpoint(checkpoint_path, checkpoint)
+                logger.info(f"{checkpoint['rows']} ta qator eksport qilindi")
+        sink.commit()
+        checkpoint['rows'] += pending
+    finally:
+        sink.close()
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return checkpoint['rows']
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Prometheus /metrics eksporteri
+Exposition matni har bir tekshiruvda bir marta tayyorlanadi va oddiy hamda
+gzip ko'rinishida keshlanadi; HTTP oqimi har bir scrape'da faqat tayyor
+baytlarni yuboradi - metrikalar qayta yig'ilmaydi va matn qayta yaratilmaydi.
+Pull rejimida (prometheus_collect = scrape) tekshiruvni scrape boshlaydi:
+kesh prometheus_min_age dan eski bo'lsa, bitta yig'ish bajariladi va
+bir vaqtdagi boshqa scrape'lar shu yig'ishning natijasini kutadi.
+Accept sarlavhasida application/openmetrics-text bo'lsa, OpenMetrics 1.0
+matni beriladi (ikkala format ham har tayyorlashda keshlanadi)
+"""
+
+import gzip
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils import histogram
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+BACKSLASH = '\\'
+NEWLINE = '\n'
+
+# Metrika nomlari prefiksi
+PREFIX = 'system_monitor'
+
+# (kalit, nom, yordam matni) - asosiy sikldagi metrikalar
+CORE_GAUGES = (
+    ('ram', 'ram_usage_percent', "RAM foydalanish foizi"),
+    ('cpu', 'cpu_usage_percent', "CPU foydalanish foizi (barcha yadrolar)"),
+    ('disk', 'disk_usage_percent', "disk_path dagi disk foydalanish foizi"),
+    ('swap', 'swap_usage_percent', "Swap foydalanish foizi"),
+    ('load', 'load_percent', "1 daqiqalik load average yadro boshiga, foizda"),
+)
+
+
+def escape_label(value):
+    """
+    Label qiymatini exposition formati uchun ekranlash
+
+    Args:
+        value: Label qiymati
+
+    Returns:
+        str: Ekranlangan qiymat
+    """
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_value(value):
+    """
+    Sonni exposition formatida yozish
+
+    Args:
+        value (float): Qiymat
+
+    Returns:
+        str: Matn (NaN, +Inf, -Inf maxsus qiymatlari bilan)
+    """
+    if value is None:
+        return 'NaN'
+    value = float(value)
+    if value != value:
+        return 'NaN'
+    if value in (float('inf'), float('-inf')):
+        return '+Inf' if value > 0 else '-Inf'
+    if value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def render(families, openmetrics=False):
+    """
+    Metrika oilalarini exposition matniga aylantirish
+
+    Counter oilalari nomi _total suffiksisiz beriladi (namunalar suffiksi
+    '_total'): OpenMetrics da TYPE qatori asosiy nomda, Prometheus matn
+    formatida esa namuna nomida yoziladi.
+
+    Args:
+        families (list): (nom, tur, yordam matni, [(suffiks, labellar, qiymat), ...]) ro'yxati;
+            labellar - (nom, qiymat) juftliklari tuple'i
+        openmetrics (bool): OpenMetrics 1.0 formati (oxirida # EOF)
+
+    Returns:
+        bytes: UTF-8 matn
+    """
+    lines = []
+    for name, metric_type, help_text, samples in families:
+        if not samples:
+            continue
+        header = name if openmetrics or metric_type != 'counter' else name + '_total'
+        lines.append(f"# HELP {header} {help_text.replace(BACKSLASH, BACKSLASH * 2).replace(NEWLINE, BACKSLASH + 'n')}")
+        lines.append(f"# TYPE {header} {metric_type}")
+        for suffix, labels, value in samples:
+            if labels:
+                label_text = ','.join(f'{key}="{escape_label(label)}"' for key, label in labels)
+                lines.append(f"{name}{suffix}{{{label_text}}} {format_value(value)}")
+            else:
+                lines.append(f"{name}{suffix} {format_value(value)}")
+    if openmetrics:
+        lines.append('# EOF')
+    lines.append('')
+    return '\n'.join(lines).encode('utf-8')
+
+
+def build_families(metrics, system_info, monitor, timestamp=None):
+    """
+    Tekshiruv natijalaridan metrika oilalarini tuzish
+
+    Asosiy foizlar sikldagi qiymatlardan olinadi; yadrolar, mount'lar va
+    interfeyslar bo'yicha qiymatlar shu yerda, tekshiruvga bir marta yig'iladi.
+
+    Args:
+        metrics (dict): Asosiy sikldagi metrikalar (network - [rx, tx] Mbps)
+        system_info (dict): Tizim ma'lumotlari (hostname, ip)
+        monitor (SystemMonitor): Tizim monitori
+        timestamp (float, optional): Tekshiruv vaqti (epoch)
+
+    Returns:
+        list: render() uchun metrika oilalari
+    """
+    families = [
+        (f'{PREFIX}_info', 'gauge', "Agent haqida ma'lumot (qiymat har doim 1)",
+         [('', (('hostname', system_info.get('hostname', '')), ('ip', system_info.get('ip', ''))), 1)]),
+        (f'{PREFIX}_last_update_timestamp_seconds', 'gauge', "Oxirgi tekshiruv vaqti (epoch)",
+         [('', (), timestamp or time.time())]),
+    ]
+    for key, name, help_text in CORE_GAUGES:
+        if key in metrics:
+            families.append((f'{PREFIX}_{name}', 'gauge', help_text, [('', (), metrics[key])]))
+
+    network = metrics.get('network')
+    if isinstance(network, (list, tuple)) and len(network) == 2:
+        families.append((f'{PREFIX}_network_receive_mbps', 'gauge', "network_interface qabul tezligi (Mbps)",
+                         [('', (), network[0])]))
+        families.append((f'{PREFIX}_network_transmit_mbps', 'gauge', "network_interface uzatish tezligi (Mbps)",
+                         [('', (), network[1])]))
+
+    cores = monitor.get_cpu_per_core()
+    families.append((f'{PREFIX}_cpu_core_usage_percent', 'gauge', "Yadro bo'yicha CPU foydalanish foizi",
+                     [('', (('core', str(index)),), value) for index, value in enumerate(cores)]))
+
+    size, used, free = [], [], []
+    for mount, device, fstype, total, used_bytes, free_bytes in monitor.get_filesystems():
+        labels = (('mountpoint', mount), ('device', device), ('fstype', fstype))
+        size.append(('', labels, total))
+        used.append(('', labels, used_bytes))
+        free.append(('', labels, free_bytes))
+    families.append((f'{PREFIX}_filesystem_size_bytes', 'gauge', "Fayl tizimi hajmi (bayt)", size))
+    families.append((f'{PREFIX}_filesystem_used_bytes', 'gauge', "Fayl tizimida band joy (bayt)", used))
+    families.append((f'{PREFIX}_filesystem_free_bytes', 'gauge', "Fayl tizimida bo'sh joy (bayt)", free))
+
+    counters = sorted(monitor.get_interface_counters().items())
+    for field, name, help_text in (
+            ('bytes_recv', 'network_receive_bytes', "Interfeys qabul qilgan baytlar"),
+            ('bytes_sent', 'network_transmit_bytes', "Interfeys uzatgan baytlar"),
+            ('errin', 'network_receive_errors', "Interfeys qabul xatoliklari"),
+            ('errout', 'network_transmit_errors', "Interfeys uzatish xatoliklari")):
+        families.append((f'{PREFIX}_{name}', 'counter', help_text,
+                         [('_total', (('interface', interface),), getattr(stats, field)) for interface, stats in counters]))
+    return families
+
+
+class PrometheusExporter:
+    def __init__(self, config, logger, collect=None):
+        """
+        /metrics HTTP serverini fon oqimida ishga tushirish
+
+        Args:
+            config (dict): Konfiguratsiya sozlamalari
+            logger (logging.Logger): Log yozish uchun logger obyekti
+            collect (callable, optional): Pull rejimida tekshiruvni bajaruvchi
+                funksiya (oxirida update() ni chaqiradi); None - tekshiruvlar
+                asosiy siklda
+
+        Raises:
+            OSError: Portni band qilib bo'lmadi
+        """
+        self.logger = logger
+        self.address = config.get('prometheus_address', '0.0.0.0')
+        self.port = int(config.get('prometheus_port', 9090))
+        # {openmetrics: (oddiy matn, gzip)} - bitta havola bilan almashtiriladi, o'qish qulfsiz
+        self._cache = {False: (b'', gzip.compress(b'')), True: (b'# EOF\n', gzip.compress(b'# EOF\n'))}
+        self.scrapes = 0
+
+        # Pull rejimi: yig'ish holati (single-flight)
+        self.collect = collect
+        self.min_age = float(config.get('prometheus_min_age', 5))
+        self.collections = 0
+        self._flight = threading.Condition()
+        self._collecting = False
+        self._collected_at = None
+
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                exporter._serve(self)
+
+            def log_message(self, format, *args):
+                exporter.logger.debug(f"Prometheus {self.address_string()}: {format % args}")
+
+        self._server = ThreadingHTTPServer((self.address, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='prometheus-exporter', daemon=True)
+        self._thread.start()
+        self.logger.info(f"Prometheus eksporteri ishga tushdi: http://{self.address}:{self.port}/metrics")
+
+    def update(self, families):
+        """
+        Exposition matnini qayta tayyorlash (tekshiruvga bir marta)
+
+        Agentning ichki histogrammalari shu yerda oqimlar bo'yicha birlashtirilib qo'shiladi.
+
+        Args:
+            families (list): render() uchun metrika oilalari
+        """
+        families = list(families) + histogram.families()
+        cache = {}
+        for openmetrics in (False, True):
+            body = render(families, openmetrics)
+            cache[openmetrics] = (body, gzip.compress(body, compresslevel=6))
+        self._cache = cache
+
+    def age(self):
+        """
+        Oxirgi yig'ishdan beri o'tgan vaqt
+
+        Returns:
+            float: Soniya (hali yig'ilmagan bo'lsa cheksiz)
+        """
+        collected_at = self._collected_at
+        if collected_at is None:
+            return float('inf')
+        return time.monotonic() - collected_at
+
+    def refresh(self, max_age=None):
+        """
+        Kesh max_age dan eski bo'lsa tekshiruvni bajarish (single-flight)
+
+        Yig'ish davom etayotgan bo'lsa, yangisi boshlanmaydi - chaqiruvchi
+        o'sha yig'ish tugashini kutadi va uning natijasidan foydalanadi.
+
+        Args:
+            max_age (float, optional): Keshning maksimal yoshi (standart: prometheus_min_age)
+
+        Returns:
+            bool: Shu chaqiruv yig'ishni bajargan bo'lsa True
+        """
+        if self.collect is None:
+            return False
+        max_age = self.min_age if max_age is None else max_age
+        with self._flight:
+            if self._collecting:
+                while self._collecting:
+                    self._flight.wait()
+                return False
+            if self.age() < max_age:
+                return False
+            self._collecting = True
+
+        try:
+            self.collect()
+        except Exception as e:
+            # Eski kesh berilishda davom etadi
+            self.logger.error(f"Scrape bo'yicha tekshiruvda xatolik: {e}", exc_info=True)
+        finally:
+            with self._flight:
+                self._collecting = False
+                self._collected_at = time.monotonic()
+                self.collections += 1
+                self._flight.notify_all()
+        return True
+
+    def _serve(self, request):
+        if request.path.split('?', 1)[0] != '/metrics':
+            request.send_error(404)
+            return
+        self.refresh()
+        openmetrics = 'application/openmetrics-text' in request.headers.get('Accept', '')
+        body, gzipped = self._cache[openmetrics]
+        use_gzip = 'gzip' in request.headers.get('Accept-Encoding', '')
+        payload = gzipped if use_gzip else body
+        request.send_response(200)
+        request.send_header('Content-Type', OPENMETRICS_CONTENT_TYPE if openmetrics else CONTENT_TYPE)
+        if use_gzip:
+            request.send_header('Content-Encoding', 'gzip')
+        request.send_header('Content-Length', str(len(payload)))
+        request.end_headers()
+        self.scrapes += 1
+        request.wfile.write(payload)
+
+    def close(self):
+        """
+        HTTP serverini to'xtatish
+        """
+        try:
+            self._server.shutdown()
+            self._server.server_close()
+        except Exception as e:
+            self.logger.error(f"Prometheus eksporterini to'xtatishda xatolik: {e}")
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Agent ichki ko'rsatkichlari uchun qat'iy bucket'li histogrammalar
+Har bir oqim o'z hisoblagichlariga (shard) yozadi - observe() qulfsiz;
+shard'lar exposition matni tayyorlanayotganda birlashtiriladi, tugagan oqimlarniki
+esa bitta bazaviy hisoblagichga qo'shib yuboriladi
+"""
+
+import time
+import weakref
+import threading
+from bisect import bisect_left
+from functools import wraps
+from contextlib import contextmanager
+
+# Kechikishlar uchun bucket'lar (soniya)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Tick kechikishi (jitter) uchun bucket'lar (soniya)
+JITTER_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60)
+
+# Yaratilgan barcha histogrammalar (eksporter uchun)
+REGISTRY = []
+
+
+class HistogramChild:
+    def __init__(self, buckets):
+        """
+        Bitta label to'plami uchun oqimlar bo'yicha hisoblagichlar
+
+        Args:
+            buckets (tuple): O'sish tartibidagi yuqori chegaralar (+Inf dan tashqari)
+        """
+        self.buckets = buckets
+        self._local = threading.local()
+        # (oqimga weakref, shard); tugagan oqimlar shard'lari _base ga qo'shilib o'chiriladi
+        self._shards = []
+        self._base = [0] * (len(buckets) + 1) + [0.0]
+        self._lock = threading.Lock()
+
+    def _fold_dead(self):
+        """
+        Tugagan oqimlar shard'larini _base ga qo'shish va ro'yxatdan chiqarish
+        (ThreadingHTTPServer har scrape uchun yangi oqim ochadi); self._lock ostida chaqiriladi
+        """
+        alive = []
+        for owner, shard in self._shards:
+            thread = owner()
+            if thread is not None and thread.is_alive():
+                alive.append((owner, shard))
+                continue
+            for index, value in enumerate(shard):
+                self._base[index] += value
+        self._shards = alive
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            # [bucket'lar bo'yicha sonlar (+Inf bilan)..., yig'indi]; qulf faqat oqimning birinchi yozuvida
+            shard = [0] * (len(self.buckets) + 1) + [0.0]
+            with self._lock:
+                self._fold_dead()
+                self._shards.append((weakref.ref(threading.current_thread()), shard))
+            self._local.shard = shard
+        return shard
+
+    def observe(self, value):
+        """
+        Qiymatni qayd etish (faqat joriy oqim shard'iga yoziladi)
+
+        Args:
+            value (float): Qiymat
+        """
+        shard = self._shard()
+        shard[bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+
+    def snapshot(self):
+        """
+        Barcha oqimlar shard'larini birlashtirish
+
+        Returns:
+            tuple: (kumulyativ sonlar ro'yxati - oxirgisi +Inf, yig'indi)
+        """
+        with self._lock:
+            self._fold_dead()
+            shards = [shard for _, shard in self._shards]
+            shards.append(list(self._base))
+        counts = [0] * (len(self.buckets) + 1)
+        total = 0.0
+        for shard in shards:
+            for index in range(len(counts)):
+                counts[index] += shard[index]
+            total += shard[-1]
+        cumulative = 0
+        for index, count in enumerate(counts):
+            cumulative += count
+            counts[index] = cumulative
+        return counts, total
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=LATENCY_BUCKETS, labelnames=(), registry=REGISTRY):
+        """
+        Histogrammani yaratish va ro'yxatga qo'shish
+
+        Args:
+            name (str): Metrika nomi
+            help_text (str): HELP matni
+            buckets (tuple): Bucket yuqori chegaralari
+            labelnames (tuple): Label nomlari
+            registry (list): Eksport qilinadigan histogrammalar ro'yxati
+        """
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(float(bucket) for bucket in buckets))
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        registry.append(self)
+
+    def labels(self, *values):
+        """
+        Label qiymatlari uchun hisoblagichlar
+
+        Args:
+            *values: labelnames tartibidagi qiymatlar
+
+        Returns:
+            HistogramChild: Hisoblagichlar
+        """
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, HistogramChild(self.buckets))
+        return child
+
+    def observe(self, value, *labels):
+        """
+        Qiymatni qayd etish
+
+        Args:
+            value (float): Qiymat
+            *labels: Label qiymatlari
+        """
+        self.labels(*labels).observe(value)
+
+    @contextmanager
+    def time(self, *labels):
+        """
+        Blok davomiyligini qayd etish (xatolik bo'lsa ham)
+
+        Args:
+            *labels: Label qiymatlari
+        """
+        child = self.labels(*labels)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            child.observe(time.perf_counter() - start)
+
+    def family(self):
+        """
+        Eksporter uchun metrika oilasi
+
+        Returns:
+            tuple: (nom, 'histogram', yordam matni, [(suffiks, labellar, qiymat), ...])
+        """
+        with self._lock:
+            children = sorted(self._children.items())
+        bounds = [format_bound(bucket) for bucket in self.buckets] + ['+Inf']
+        samples = []
+        for values, child in children:
+            labels = tuple(zip(self.labelnames, values))
+            counts, total = child.snapshot()
+            for bound, count in zip(bounds, counts):
+                samples.append(('_bucket', labels + (('le', bound),), count))
+            samples.append(('_count', labels, counts[-1]))
+            samples.append(('_sum', labels, total))
+        return self.name, 'histogram', self.help_text, samples
+
+
+def format_bound(bucket):
+    """
+    Bucket chegarasini le label qiymatiga aylantirish (OpenMetrics: 1.0, 0.25)
+
+    Args:
+        bucket (float): Chegara
+
+    Returns:
+        str: le qiymati
+    """
+    return repr(float(bucket))
+
+
+def timed(histogram, *labels):
+    """
+    Funksiya davomiyligini histogrammaga yozuvchi dekorator
+
+    Args:
+        histogram (Histogram): Histogramma
+        *labels: Label qiymatlari
+
+    Returns:
+        callable: Dekorator
+    """
+    def decorator(fn):
+        child = histogram.labels(*labels)
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def families():
+    """
+    Barcha histogrammalarning metrika oilalari
+
+    Returns:
+        list: render() uchun metrika oilalari
+    """
+    return [histogram.family() for histogram in REGISTRY]
+
+
+# Agentning o'z ko'rsatkichlari
+NOTIFY_SECONDS = Histogram(
+    'system_monitor_notify_send_seconds', "Alertni backendga bir marta yuborish davomiyligi (telegram, webhook, ...)",
+    labelnames=('notifier',))
+DB_FLUSH_SECONDS = Histogram(
+    'system_monitor_db_flush_seconds', "Metrikalar bufferini bazaga yozish davomiyligi", labelnames=('backend',))
+COLLECTOR_SECONDS = Histogram(
+    'system_monitor_collector_seconds', "Tizim metrikasini yig'ish davomiyligi", labelnames=('collector',))
+TICK_JITTER_SECONDS = Histogram(
+    'system_monitor_tick_jitter_seconds', "Tekshiruvning rejalashtirilgan vaqtdan kechikishi", JITTER_BUCKETS)
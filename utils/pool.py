@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+MySQL/PostgreSQL ulanishlar puli
+Sog'liqni tekshirish (ping), uzilgan ulanishlarni almashtirish va baza
+ishlamay qolganda eksponensial kutish (backoff) bilan qayta ulanish
+"""
+
+import time
+import random
+import threading
+from contextlib import contextmanager
+
+# Ulanish uzilganini bildiruvchi DB-API xatolik sinflari (mysql.connector va psycopg2 da bir xil nomlangan)
+DISCONNECT_ERRORS = ('OperationalError', 'InterfaceError')
+
+
+class DatabaseUnavailable(Exception):
+    """
+    Baza vaqtincha mavjud emas (qayta ulanish vaqti hali kelmagan yoki pulda bo'sh ulanish yo'q)
+    """
+
+
+class ConnectionPool:
+    def __init__(self, config, logger, connect):
+        """
+        Ulanishlar pulini sozlash (ulanishlar kerak bo'lganda ochiladi)
+
+        Args:
+            config (dict): Konfiguratsiya sozlamalari
+            logger (logging.Logger): Log yozish uchun logger obyekti
+            connect (callable): Yangi DB-API ulanishini qaytaruvchi funksiya
+        """
+        self.logger = logger
+        self.connect = connect
+        self.size = max(1, int(config.get('db_pool_size', 2)))
+        self.timeout = float(config.get('db_pool_timeout', 10))
+        self.ping_interval = float(config.get('db_pool_ping_interval', 30))
+        self.backoff_initial = float(config.get('db_reconnect_initial', 1))
+        self.backoff_max = float(config.get('db_reconnect_max', 300))
+
+        self._idle = []
+        self._created = 0
+        self._cond = threading.Condition()
+        self._failures = 0
+        self._retry_at = 0.0
+
+    def _open(self):
+        """
+        Yangi ulanish ochish (backoff vaqti tugamagan bo'lsa tarmoqqa murojaat qilinmaydi)
+
+        Returns:
+            Connection: DB-API ulanishi
+
+        Raises:
+            DatabaseUnavailable: Ulanib bo'lmadi
+        """
+        now = time.monotonic()
+        if now < self._retry_at:
+            raise DatabaseUnavailable(f"qayta ulanishga {self._retry_at - now:.0f} soniya qoldi")
+
+        try:
+            conn = self.connect()
+            if conn is None:
+                raise DatabaseUnavailable("ulanish ochilmadi")
+        except Exception as e:
+            self._failures += 1
+            delay = min(self.backoff_max, self.backoff_initial * 2 ** (self._failures - 1))
+            # Ko'p agentlar bir vaqtda qayta ulanmasligi uchun tasodifiy siljish
+            delay *= random.uniform(0.5, 1.0)
+            self._retry_at = time.monotonic() + delay
+            message = f"Ma'lumotlar bazasiga ulanib bo'lmadi ({self._failures}-urinish): {e}; keyingisi {delay:.0f} soniyadan keyin"
+            if self._failures == 1:
+                self.logger.error(message)
+            else:
+                self.logger.warning(message)
+            raise DatabaseUnavailable(str(e)) from e
+
+        if self._failures:
+            self.logger.info(f"Ma'lumotlar bazasi bilan aloqa tiklandi ({self._failures} urinishdan keyin)")
+            self._failures = 0
+        return conn
+
+    def _ping(self, conn):
+        try:
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            finally:
+                cursor.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_broken(self, conn, error):
+        if any(cls.__name__ in DISCONNECT_ERRORS for cls in type(error).__mro__):
+            return True
+        try:
+            conn.rollback()
+            return False
+        except Exception:
+            return True
+
+    def _acquire(self):
+        deadline = time.monotonic() + self.timeout
+        conn = None
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn, last_used = self._idle.pop()
+                    break
+                if self._created < self.size:
+                    # Slot band qilinadi, ulanish qulfdan tashqarida ochiladi
+                    self._created += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise DatabaseUnavailable("pulda bo'sh ulanish yo'q")
+                self._cond.wait(remaining)
+
+        if conn is not None:
+            # Uzoq ishlatilmagan ulanish (idle timeout, baza qayta ishga tushishi) tekshiriladi
+            if time.monotonic() - last_used < self.ping_interval or self._ping(conn):
+                return conn
+            self.logger.info("Ma'lumotlar bazasi ulanishi javob bermadi, yangisi ochilmoqda")
+            self._close_quietly(conn)
+
+        try:
+            return self._open()
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, conn, broken=False):
+        if broken:
+            self._close_quietly(conn)
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        Puldan ulanish olish
+
+        Blok ichida ulanish uzilganini bildiruvchi xatolik yuz bersa, ulanish
+        yopiladi va keyingi chaqiruvda yangisi ochiladi; boshqa xatoliklarda
+        tranzaksiya bekor qilinib, ulanish pulga qaytariladi.
+
+        Yields:
+            Connection: DB-API ulanishi
+
+        Raises:
+            DatabaseUnavailable: Baza vaqtincha mavjud emas
+        """
+        conn = self._acquire()
+        broken = False
+        try:
+            yield conn
+        except Exception as e:
+            broken = self._is_broken(conn, e)
+            raise
+        finally:
+            self._release(conn, broken)
+
+    def close(self):
+        """
+        Puldagi barcha bo'sh ulanishlarni yopish
+        """
+        with self._cond:
+            for conn, _ in self._idle:
+                self._close_quietly(conn)
+            self._created -= len(self._idle)
+            self._idle = []
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Push chiqishi: StatsD, Graphite plaintext va InfluxDB line protocol
+Har bir tekshiruv natijasi (exporter.build_families oilalari) tanlangan
+protokol qatorlariga aylantiriladi va bitta qayta ishlatiladigan socket
+orqali yuboriladi:
+- UDP: qatorlar push_mtu baytgacha bitta datagramga joylanadi; socket
+  bloklanmaydi, yuborib bo'lmagan datagram qatorlari tashlab yuboriladi
+- TCP: qatorlar chegaralangan navbatga tushadi, fon oqimi ularni
+  push_flush_interval da (yoki push_batch_bytes to'lganda) bitta yozuvda
+  yuboradi; ulanish uzilsa qayta ulanadi, navbat to'lsa eng eskilari tashlanadi
+"""
+
+import re
+import time
+import socket
+import threading
+from collections import deque
+
+from utils.exporter import PREFIX, format_value
+
+PROTOCOLS = ('statsd', 'graphite', 'influx')
+TRANSPORTS = ('udp', 'tcp')
+
+# Protokollarning standart portlari
+DEFAULT_PORTS = {'statsd': 8125, 'graphite': 2003, 'influx': 8089}
+
+# Qayta ulanish kutishining yuqori chegarasi (soniya)
+MAX_BACKOFF = 30
+
+_PATH_UNSAFE = re.compile(r'[^A-Za-z0-9_\-]')
+
+
+def path_part(value):
+    """
+    Qiymatni Graphite/StatsD nuqtali yo'l qismiga aylantirish
+
+    Args:
+        value: Label qiymati yoki nom
+
+    Returns:
+        str: Faqat harf, raqam, '_' va '-' dan iborat qism
+    """
+    return _PATH_UNSAFE.sub('_', str(value)) or '_'
+
+
+def influx_escape(value, quote_equals=True):
+    """
+    InfluxDB line protocol uchun nom/teg qiymatini ekranlash
+
+    Args:
+        value: Qiymat
+        quote_equals (bool): '=' ni ham ekranlash (teg kalit va qiymatlari uchun)
+
+    Returns:
+        str: Ekranlangan matn
+    """
+    value = str(value).replace('\\', '\\\\').replace(',', '\\,').replace(' ', '\\ ')
+    return value.replace('=', '\\=') if quote_equals else value
+
+
+def serialize(families, protocol, host, timestamp, prefix=''):
+    """
+    Metrika oilalarini protokol qatorlariga aylantirish
+
+    NaN qiymatlar tashlab yuboriladi (protokollarning hech biri ularni
+    bir xil tushunmaydi). Counter'lar ham joriy qiymati bilan yuboriladi:
+    StatsD da gauge (|g) sifatida, chunki agent farqlarni emas, jami
+    qiymatni biladi.
+
+    Args:
+        families (list): (nom, tur, yordam matni, [(suffiks, labellar, qiymat), ...]) ro'yxati
+        protocol (str): statsd, graphite yoki influx
+        host (str): Xost nomi (yo'lga yoki host tegiga qo'shiladi)
+        timestamp (float): Tekshiruv vaqti (epoch)
+        prefix (str): Graphite/StatsD yo'li prefiksi
+
+    Returns:
+        list: '\\n' bilan tugaydigan bytes qatorlar
+    """
+    lines = []
+    head = '.'.join(part for part in (prefix.strip('.'), path_part(host) if host else '') if part)
+    for name, metric_type, help_text, samples in families:
+        for suffix, labels, value in samples:
+            text = format_value(value)
+            if text == 'NaN':
+                continue
+            metric = name[len(PREFIX) + 1:] if name.startswith(PREFIX + '_') else name
+            if protocol == 'influx':
+                tags = ''.join(f',{influx_escape(key)}={influx_escape(label)}'
+                               for key, label in (('host', host),) + tuple(labels) if label != '')
+                line = (f"{influx_escape(name + suffix, False)}{tags} value={text} "
+                        f"{int(timestamp * 1e9)}")
+            else:
+                path = '.'.join([path_part(metric + suffix)] + [path_part(label) for key, label in labels])
+                if head:
+                    path = f'{head}.{path}'
+                if protocol == 'graphite':
+                    line = f"{path} {text} {int(timestamp)}"
+                elif text.startswith('-'):
+                    # StatsD da "-5|g" farq sifatida o'qiladi - avval 0 ga tushiriladi
+                    lines.append(f"{path}:0|g\n".encode('utf-8'))
+                    line = f"{path}:{text}|g"
+                else:
+                    line = f"{path}:{text}|g"
+            lines.append((line + '\n').encode('utf-8'))
+    return lines
+
+
+def pack_datagrams(lines, mtu, strip_newline=False):
+    """
+    Qatorlarni mtu baytdan oshmaydigan datagramlarga joylash
+
+    mtu dan uzun qator o'zi alohida datagram bo'ladi.
+
+    Args:
+        lines (list): '\\n' bilan tugaydigan bytes qatorlar
+        mtu (int): Datagram foydali yukining maksimal hajmi
+        strip_newline (bool): Oxirgi qatordagi '\\n' ni olib tashlash (StatsD)
+
+    Yields:
+        tuple: (datagram baytlari, qatorlar soni)
+    """
+    chunk, size = [], 0
+    for line in lines:
+        if chunk and size + len(line) > mtu:
+            datagram = b''.join(chunk)
+            yield (datagram[:-1] if strip_newline else datagram), len(chunk)
+            chunk, size = [], 0
+        chunk.append(line)
+        size += len(line)
+    if chunk:
+        datagram = b''.join(chunk)
+        yield (datagram[:-1] if strip_newline else datagram), len(chunk)
+
+
+class PushEmitter:
+    def __init__(self, config, logger):
+        """
+        Push chiqishini sozlash (TCP da fon yozuvchi oqimni ishga tushirish)
+
+        Args:
+            config (dict): Konfiguratsiya sozlamalari
+            logger (logging.Logger): Log yozish uchun logger obyekti
+
+        Raises:
+            ValueError: Noma'lum protokol yoki transport
+        """
+        self.logger = logger
+        self.protocol = config.get('push_protocol', 'statsd')
+        self.transport = config.get('push_transport', 'udp')
+        if self.protocol not in PROTOCOLS:
+            raise ValueError(f"Noma'lum push protokoli: {self.protocol} ({', '.join(PROTOCOLS)})")
+        if self.transport not in TRANSPORTS:
+            raise ValueError(f"Noma'lum push transporti: {self.transport} ({', '.join(TRANSPORTS)})")
+        self.host = config.get('push_host', '127.0.0.1')
+        self.port = int(config.get('push_port', 0)) or DEFAULT_PORTS[self.protocol]
+        self.prefix = config.get('push_prefix', '')
+        self.mtu = int(config.get('push_mtu', 1432))
+        self.flush_interval = float(config.get('push_flush_interval', 1.0))
+        self.batch_bytes = int(config.get('push_batch_bytes', 65536))
+        self.queue_lines = int(config.get('push_queue_lines', 100000))
+        self.timeout = float(config.get('push_timeout', 5))
+
+        # Hisoblagichlar (families() orqali eksport qilinadi)
+        self.sent_lines = 0
+        self.sent_bytes = 0
+        self.writes = 0
+        self.dropped_lines = 0
+        self.backpressure = 0
+        self.connects = 0
+
+        self._socket = None
+        self._cond = threading.Condition()
+        self._pending = deque()
+        self._pending_bytes = 0
+        self._closing = False
+        self._thread = None
+        if self.transport == 'tcp':
+            self._thread = threading.Thread(target=self._run, name='push-writer', daemon=True)
+            self._thread.start()
+        self.logger.info(f"Push chiqishi: {self.protocol} {self.transport}://{self.host}:{self.port}")
+
+    def emit(self, families, host, timestamp):
+        """
+        Tekshiruv natijasini yuborish (TCP da navbatga qo'yish)
+
+        Args:
+            families (list): Metrika oilalari
+            host (str): Xost nomi
+            timestamp (float): Tekshiruv vaqti (epoch)
+        """
+        lines = serialize(families, self.protocol, host, timestamp, self.prefix)
+        if self.transport == 'udp':
+            self._send_udp(lines)
+        else:
+            self._enqueue(lines)
+
+    def _connect(self):
+        family, kind, proto, _, address = socket.getaddrinfo(
+            self.host, self.port, 0, socket.SOCK_DGRAM if self.transport == 'udp' else socket.SOCK_STREAM)[0]
+        sock = socket.socket(family, kind, proto)
+        try:
+            if self.transport == 'udp':
+                # Ulangan UDP socket: har datagramda manzil qidirilmaydi
+                sock.connect(address)
+                sock.setblocking(False)
+            else:
+                sock.settimeout(self.timeout)
+                sock.connect(address)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _send_udp(self, lines):
+        if self._socket is None:
+            try:
+                self._socket = self._connect()
+            except OSError as e:
+                self.dropped_lines += len(lines)
+                self.logger.warning(f"Push UDP socketini ochib bo'lmadi: {e}")
+                return
+        for datagram, count in pack_datagrams(lines, self.mtu, self.protocol == 'statsd'):
+            try:
+                self._socket.send(datagram)
+                self.sent_lines += count
+                self.sent_bytes += len(datagram)
+                self.writes += 1
+            except (BlockingIOError, InterruptedError):
+                # Socket buferi to'la - kutmasdan tashlab yuboriladi
+                self.backpressure += 1
+                self.dropped_lines += count
+            except OSError as e:
+                # Masalan, qabul qiluvchi yo'q (ICMP port unreachable)
+                self.dropped_lines += count
+                self.logger.debug(f"Push datagramini yuborib bo'lmadi: {e}")
+
+    def _enqueue(self, lines):
+        with self._cond:
+            for line in lines:
+                if len(self._pending) >= self.queue_lines:
+                    # Navbat to'la - yozuvchi ulgurmayapti, eng eski qator tashlanadi
+                    self._pending_bytes -= len(self._pending.popleft())
+                    self.dropped_lines += 1
+                    self.backpressure += 1
+                self._pending.append(line)
+                self._pending_bytes += len(line)
+            self._cond.notify()
+
+    def _take_batch(self):
+        """
+        Navbatdan yuboriladigan qatorlarni olish (flush_interval yoki batch_bytes kutiladi)
+
+        Returns:
+            list: Qatorlar (yopilish paytida navbat bo'sh bo'lsa None)
+        """
+        with self._cond:
+            deadline = None
+            while not self._closing and self._pending_bytes < self.batch_bytes:
+                if not self._pending:
+                    deadline = None
+                    self._cond.wait()
+                    continue
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            if not self._pending:
+                return None
+            batch, size = [], 0
+            while self._pending and (not batch or size + len(self._pending[0]) <= self.batch_bytes):
+                line = self._pending.popleft()
+                batch.append(line)
+                size += len(line)
+            self._pending_bytes -= size
+            return batch
+
+    def _requeue(self, batch):
+        with self._cond:
+            # Yuborilmagan qatorlar navbat boshiga qaytadi; sig'masa eskilari tashlanadi
+            room = max(0, self.queue_lines - len(self._pending))
+            dropped = len(batch) - min(room, len(batch))
+            for line in reversed(batch[dropped:]):
+                self._pending.appendleft(line)
+                self._pending_bytes += len(line)
+            self.dropped_lines += dropped
+
+    def _run(self):
+        backoff = 1
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            payload = b''.join(batch)
+            try:
+                if self._socket is None:
+                    self._socket = self._connect()
+                    self.connects += 1
+                self._socket.sendall(payload)
+                self.sent_lines += len(batch)
+                self.sent_bytes += len(payload)
+                self.writes += 1
+                backoff = 1
+            except OSError as e:
+                self.logger.warning(f"Push TCP yozishda xatolik ({self.host}:{self.port}): {e}")
+                self._close_socket()
+                if self._closing:
+                    with self._cond:
+                        self.dropped_lines += len(batch) + len(self._pending)
+                        self._pending.clear()
+                        self._pending_bytes = 0
+                    return
+                self._requeue(batch)
+                with self._cond:
+                    self._cond.wait_for(lambda: self._closing, backoff)
+                backoff = min(backoff * 2, MAX_BACKOFF)
+
+    def _close_socket(self):
+        if self._socket is not None:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+            self._socket = None
+
+    def pending(self):
+        """
+        Navbatda turgan qatorlar soni
+
+        Returns:
+            int: Qatorlar soni (UDP da har doim 0)
+        """
+        return len(self._pending)
+
+    def families(self):
+        """
+        Push chiqishi hisoblagichlari (exporter va push uchun metrika oilalari)
+
+        Returns:
+            list: render() / emit() uchun metrika oilalari
+        """
+        labels = (('protocol', self.protocol), ('transport', self.transport))
+        return [
+            (f'{PREFIX}_push_sent_lines', 'counter', "Yuborilgan push qatorlari", [('_total', labels, self.sent_lines)]),
+            (f'{PREFIX}_push_sent_bytes', 'counter', "Yuborilgan push baytlari", [('_total', labels, self.sent_bytes)]),
+            (f'{PREFIX}_push_dropped_lines', 'counter', "Tashlab yuborilgan push qatorlari",
+             [('_total', labels, self.dropped_lines)]),
+            (f'{PREFIX}_push_backpressure_events', 'counter',
+             "Socket yoki navbat to'lganligi sababli qator tashlangan holatlar", [('_total', labels, self.backpressure)]),
+            (f'{PREFIX}_push_pending_lines', 'gauge', "TCP navbatida kutayotgan qatorlar",
+             [('', labels, self.pending())]),
+        ]
+
+    def close(self):
+        """
+        Navbatdagi qatorlarni yuborib, socketni yopish
+        """
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(self.timeout + self.flush_interval)
+        self._close_socket()
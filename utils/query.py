@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Vaqt oralig'i bo'yicha so'rovlar moduli
+Mos rollup darajasini tanlash, agregatsiyani SQL ga topshirish va natijani oqim sifatida qaytarish
+"""
+
+import datetime
+
+from core.windows import parse_duration
+from utils.rollups import RESOLUTIONS, RESOLUTION_SECONDS, ROLLUP_METRICS, TIMESTAMP_FORMAT
+
+AGGREGATES = ('avg', 'min', 'max', 'sum', 'count', 'last')
+
+# Metrika nomi -> metrics jadvalidagi ustun
+METRIC_COLUMN = dict(ROLLUP_METRICS)
+
+# Qadam berilmaganda so'rov davomida qaytariladigan taxminiy nuqtalar soni
+DEFAULT_POINTS = 500
+
+# Bucket'lar barcha jadvallarda mahalliy "devor soati" bo'yicha hisoblanadi:
+# zonasiz mahalliy vaqt UTC deb olingan epoch (kunlik bucket mahalliy yarim tunda boshlanadi)
+
+# Zonasiz vaqt ustunini (xom metrics va rollup jadvallari) devor soati epoch'iga aylantirish
+EPOCH_SQL = {
+    'sqlite': "CAST(strftime('%s', {column}) AS INTEGER)",
+    'mysql': "TIMESTAMPDIFF(SECOND, '1970-01-01 00:00:00', {column})",
+    'postgresql': "EXTRACT(EPOCH FROM {column})",
+}
+
+# Normallashtirilgan metric_samples.ts (haqiqiy epoch) ni devor soati epoch'iga aylantirish
+LOCAL_EPOCH_SQL = {
+    'sqlite': "CAST(strftime('%s', {column}, 'unixepoch', 'localtime') AS INTEGER)",
+    'mysql': "TIMESTAMPDIFF(SECOND, '1970-01-01 00:00:00', FROM_UNIXTIME({column}))",
+    'postgresql': "EXTRACT(EPOCH FROM to_timestamp({column})::timestamp)",
+}
+
+# Epoch'ni qadamga yaxlitlash (SQLite da FLOOR har doim ham mavjud emas, butun bo'linish ishlatiladi)
+BUCKET_SQL = {
+    'sqlite': "({epoch} / {step}) * {step}",
+    'mysql': "FLOOR({epoch} / {step}) * {step}",
+    'postgresql': "FLOOR({epoch} / {step}) * {step}",
+}
+
+# Xom jadval uchun agregatsiya ifodalari
+RAW_AGGREGATES = {
+    'avg': "AVG({column})",
+    'min': "MIN({column})",
+    'max': "MAX({column})",
+    'sum': "SUM({column})",
+    'count': "COUNT({column})",
+}
+
+# Rollup jadvallari uchun agregatsiya ifodalari (avg aniq: yig'indi / soni)
+ROLLUP_AGGREGATES = {
+    'avg': "SUM(sum_value) / SUM(sample_count)",
+    'min': "MIN(min_value)",
+    'max': "MAX(max_value)",
+    'sum': "SUM(sum_value)",
+    'count': "SUM(sample_count)",
+}
+
+
+def parse_time(text, now=None):
+    """
+    So'rov vaqtini tahlil qilish
+
+    Args:
+        text (str): "now", nisbiy davomiylik ("7d" - 7 kun oldin) yoki
+            "YYYY-MM-DD [HH:MM[:SS]]"
+        now (datetime, optional): Joriy vaqt
+
+    Returns:
+        datetime: Vaqt
+    """
+    now = now or datetime.datetime.now()
+    text = text.strip()
+    if text.lower() == 'now':
+        return now
+    try:
+        return now - datetime.timedelta(seconds=parse_duration(text))
+    except ValueError:
+        pass
+    for fmt in (TIMESTAMP_FORMAT, '%Y-%m-%d %H:%M', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d'):
+        try:
+            return datetime.datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"Noto'g'ri vaqt: {text}")
+
+
+def validate_query(metric, agg):
+    """
+    Metrika va agregatsiya nomlarini tekshirish
+
+    Args:
+        metric (str): Metrika nomi
+        agg (str): Agregatsiya nomi
+
+    Raises:
+        ValueError: Noma'lum metrika yoki agregatsiya
+    """
+    if metric not in METRIC_COLUMN:
+        raise ValueError(f"Noma'lum metrika: {metric} ({', '.join(METRIC_COLUMN)})")
+    if agg not in AGGREGATES:
+        raise ValueError(f"Noma'lum agregatsiya: {agg} ({', '.join(AGGREGATES)})")
+
+
+def choose_resolution(start, end, step=None, retention=None, now=None, rollups=True):
+    """
+    So'rov uchun eng mos jadvalni tanlash
+
+    Qadamdan katta bo'lmagan eng yirik daraja tanlanadi; u so'rov boshini
+    saqlash muddati bo'yicha qamrab olmasa, keyingi yirikroq daraja olinadi.
+
+    Args:
+        start (datetime): Boshlanish
+        end (datetime): Tugash
+        step (int, optional): Qadam (soniya); berilmasa oraliqdan hisoblanadi
+        retention (dict, optional): Daraja nomi ('raw', '1m', ...) -> saqlash muddati (soniya, 0 - cheksiz)
+        now (datetime, optional): Joriy vaqt
+        rollups (bool): Rollup jadvallari yuritilmasa False (faqat xom jadval)
+
+    Returns:
+        tuple: (daraja nomi, jadval, qadam soniyada)
+    """
+    if not step:
+        step = max(1, int((end - start).total_seconds() // DEFAULT_POINTS))
+
+    levels = [('raw', 'metrics', 1)]
+    if rollups:
+        levels += [(name, table, RESOLUTION_SECONDS[name]) for name, table, _ in RESOLUTIONS]
+    candidates = [level for level in levels if level[2] <= step] or levels[:1]
+    chosen = candidates[-1]
+
+    if retention:
+        now = now or datetime.datetime.now()
+        for level in levels[levels.index(chosen):]:
+            keep = retention.get(level[0], 0)
+            chosen = level
+            if not keep or start >= now - datetime.timedelta(seconds=keep):
+                break
+
+    # Qadam darajadan kichik bo'lishi mumkin emas
+    return chosen[0], chosen[1], max(step, chosen[2])
+
+
+def build_range_query(db_type, placeholder, metric, host, start, end, step, agg, retention=None, rollups=True,
+                      schema='legacy'):
+    """
+    Vaqt oralig'i so'rovini yaratish
+
+    Args:
+        db_type (str): sqlite, mysql yoki postgresql
+        placeholder (str): Parametr belgisi
+        metric (str): Metrika (ram, cpu, disk, swap, load, network_rx, network_tx)
+        host (str): Xost nomi (None - barcha xostlar)
+        start (datetime): Boshlanish (shu jumladan)
+        end (datetime): Tugash (shu jumladan emas)
+        step (int): Qadam (soniya, None - avtomatik)
+        agg (str): avg, min, max, sum, count yoki last
+        retention (dict, optional): Saqlash muddatlari (choose_resolution ga qarang)
+        rollups (bool): Rollup jadvallari yuritilmasa False
+        schema (str): legacy yoki normalized (xom namunalar metric_samples da, vaqt - epoch)
+
+    Returns:
+        tuple: (sql, params, daraja nomi, qadam)
+    """
+    validate_query(metric, agg)
+    resolution, table, step = choose_resolution(start, end, step, retention, rollups=rollups)
+
+    normalized = resolution == 'raw' and schema == 'normalized'
+    if resolution == 'raw':
+        if normalized:
+            table = 'metric_samples'
+        time_column = 'ts' if normalized else 'timestamp'
+        value_column = METRIC_COLUMN[metric]
+        last_column = value_column
+        aggregates = RAW_AGGREGATES
+        conditions = []
+        params = []
+    else:
+        time_column = 'bucket'
+        value_column = METRIC_COLUMN[metric]
+        last_column = 'last_value'
+        aggregates = ROLLUP_AGGREGATES
+        conditions = [f"metric = {placeholder}"]
+        params = [metric]
+
+    if host and normalized:
+        conditions.append(f"host_id = (SELECT host_id FROM hosts WHERE hostname = {placeholder})")
+        params.append(host)
+    elif host:
+        conditions.append(f"hostname = {placeholder}")
+        params.append(host)
+    conditions.append(f"{time_column} >= {placeholder}")
+    conditions.append(f"{time_column} < {placeholder}")
+    if normalized:
+        # Zonasiz vaqt mahalliy vaqt sifatida epoch'ga aylantiriladi
+        params += [int(start.timestamp()), int(end.timestamp())]
+        epoch = LOCAL_EPOCH_SQL[db_type].format(column=time_column)
+    else:
+        params += [start.strftime(TIMESTAMP_FORMAT), end.strftime(TIMESTAMP_FORMAT)]
+        epoch = EPOCH_SQL[db_type].format(column=time_column)
+
+    bucket = BUCKET_SQL[db_type].format(epoch=epoch, step=int(step))
+    where = ' AND '.join(conditions)
+
+    if agg == 'last':
+        # Oxirgi qiymat Python tomonida tartiblangan oqimdan olinadi
+        sql = (f"SELECT {bucket} AS bucket_epoch, {last_column} FROM {table} "
+               f"WHERE {where} ORDER BY {time_column}")
+    else:
+        expression = aggregates[agg].format(column=value_column)
+        sql = (f"SELECT {bucket} AS bucket_epoch, {expression} FROM {table} "
+               f"WHERE {where} GROUP BY bucket_epoch ORDER BY bucket_epoch")
+    return sql, tuple(params), resolution, step
+
+
+def epoch_to_datetime(db_type, epoch):
+    """
+    SQL da hisoblangan bucket epoch'ini saqlangan vaqt bilan bir xil ko'rinishga qaytarish
+
+    Bucket epoch'i barcha backend va jadvallarda devor soati bo'yicha
+    (EPOCH_SQL, LOCAL_EPOCH_SQL), shuning uchun u zonasiz mahalliy vaqtga
+    UTC sifatida qaytariladi.
+
+    Args:
+        db_type (str): sqlite, mysql yoki postgresql
+        epoch (float): Bucket boshi
+
+    Returns:
+        datetime: Bucket boshi
+    """
+    return datetime.datetime.fromtimestamp(int(epoch), datetime.timezone.utc).replace(tzinfo=None)
+
+
+def collapse_last(rows):
+    """
+    Tartiblangan (bucket, qiymat) oqimidan har bir bucket'ning oxirgi qiymatini olish
+
+    Args:
+        rows (iterable): (bucket_epoch, qiymat) qatorlari
+
+    Yields:
+        tuple: (bucket_epoch, oxirgi qiymat)
+    """
+    current = None
+    value = None
+    for bucket, row_value in rows:
+        if current is not None and bucket != current:
+            yield current, value
+        current = bucket
+        value = row_value
+    if current is not None:
+        yield current, value
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Oxirgi namunalarning xotiraga akslantirilgan (mmap) halqa fayli
+Agent har bir tekshiruvda namunani qat'iy tuzilishdagi faylga yozadi, boshqa
+mahalliy jarayonlar (health-check skriptlari, TUI, sidecar eksporter) uni
+mmap qilib, metrikalarni qayta yig'masdan va bazaga murojaat qilmasdan o'qiydi
+
+Fayl tuzilishi (little-endian, barcha maydonlar 8 baytga tekislangan):
+
+    Sarlavha (HEADER_SIZE = 512 bayt)
+        0   8s   magic (b'SMRING\\x00\\x01')
+        8   u32  versiya
+        12  u32  sarlavha hajmi
+        16  u32  slot hajmi
+        20  u32  slotlar soni
+        24  u32  maydonlar soni
+        32  u64  yozilgan namunalar soni (write_count)
+        40  u64  yozuvchi PID
+        48  f64  fayl yaratilgan vaqt (epoch)
+        56  64s  xost nomi
+        120 256s maydon nomlari (vergul bilan)
+
+    Slotlar (sarlavhadan keyin, slotlar soni marta)
+        0   u64  seq - n-namuna yozilayotganda 2n+1, yozib bo'lingach 2n+2
+        8   f64  maydonlar (birinchisi - vaqt)
+
+n-namuna n % slotlar slotida turadi. O'quvchi slot seq qiymatini qiymatlardan
+oldin va keyin o'qiydi; ikkalasi ham 2n+2 ga teng bo'lmasa, namuna yozilish
+jarayonida yoki ustidan yozilgan (seqlock). O'qish tizim chaqiruvisiz,
+to'g'ridan-to'g'ri akslantirilgan xotiradan bajariladi.
+
+Bu fayl loyihaning boshqa modullariga bog'liq emas - uni alohida nusxalab
+o'quvchi kutubxona sifatida ishlatish mumkin:
+
+    python3 ring.py /dev/shm/system-monitor.ring -n 10
+"""
+
+import os
+import sys
+import mmap
+import time
+import socket
+import struct
+import argparse
+from collections import namedtuple
+
+MAGIC = b'SMRING\x00\x01'
+VERSION = 1
+HEADER_SIZE = 512
+
+HEADER = struct.Struct('<8sIIIII')
+WRITE_COUNT = struct.Struct('<Q')
+WRITE_COUNT_OFFSET = 32
+WRITER = struct.Struct('<Qd64s256s')
+WRITER_OFFSET = 40
+SEQ = struct.Struct('<Q')
+
+# Namuna maydonlari (birinchisi har doim vaqt)
+FIELDS = ('timestamp', 'ram', 'cpu', 'disk', 'swap', 'load', 'network_rx', 'network_tx')
+
+# O'quvchi yozuvchi bilan to'qnashganda qayta urinishlar soni
+READ_RETRIES = 16
+
+
+class RingWriter:
+    def __init__(self, config, logger):
+        """
+        Halqa faylini yaratish va xotiraga akslantirish
+
+        Fayl avval vaqtinchalik nom bilan to'liq hajmda tayyorlanadi va atomik
+        almashtiriladi, shuning uchun o'quvchilar hech qachon yarim tayyor
+        sarlavhani ko'rmaydi. Eski faylni akslantirgan o'quvchilar
+        RingReader.stale() orqali yangisiga o'tadi.
+
+        Args:
+            config (dict): Konfiguratsiya sozlamalari
+            logger (logging.Logger): Log yozish uchun logger obyekti
+        """
+        self.logger = logger
+        self.path = config.get('ring_path', '/dev/shm/system-monitor.ring')
+        self.slots = max(2, int(config.get('ring_slots', 1024)))
+        self.fields = FIELDS
+        self.values = struct.Struct(f'<{len(self.fields)}d')
+        self.slot_size = SEQ.size + self.values.size
+        self.count = 0
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        size = HEADER_SIZE + self.slots * self.slot_size
+        with open(tmp_path, 'wb') as f:
+            f.truncate(size)
+        self._file = open(tmp_path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), size)
+
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, HEADER_SIZE, self.slot_size, self.slots, len(self.fields))
+        WRITER.pack_into(self._map, WRITER_OFFSET, os.getpid(), time.time(),
+                         socket.gethostname().encode('utf-8')[:64], ','.join(self.fields).encode('ascii'))
+        os.replace(tmp_path, self.path)
+        self.logger.info(f"Namunalar halqa fayli: {self.path} ({self.slots} slot)")
+
+    def publish(self, metrics, timestamp=None):
+        """
+        Namunani keyingi slotga yozish
+
+        Args:
+            metrics (dict): Asosiy sikldagi metrikalar (network - [rx, tx])
+            timestamp (float, optional): Namuna vaqti (epoch)
+        """
+        network = metrics.get('network') or (None, None)
+        sample = (timestamp or time.time(), metrics.get('ram'), metrics.get('cpu'), metrics.get('disk'),
+                  metrics.get('swap'), metrics.get('load'), network[0], network[1])
+        values = [float('nan') if value is None else float(value) for value in sample]
+
+        n = self.count
+        offset = HEADER_SIZE + (n % self.slots) * self.slot_size
+        # Toq seq - slot yozilmoqda
+        SEQ.pack_into(self._map, offset, 2 * n + 1)
+        self.values.pack_into(self._map, offset + SEQ.size, *values)
+        SEQ.pack_into(self._map, offset, 2 * n + 2)
+        self.count = n + 1
+        WRITE_COUNT.pack_into(self._map, WRITE_COUNT_OFFSET, self.count)
+
+    def close(self):
+        """
+        Akslantirishni yopish (fayl oxirgi namunalar bilan qoladi)
+        """
+        try:
+            self._map.close()
+            self._file.close()
+        except Exception as e:
+            self.logger.error(f"Halqa faylini yopishda xatolik: {e}")
+
+
+class RingReader:
+    def __init__(self, path='/dev/shm/system-monitor.ring'):
+        """
+        Halqa faylini faqat o'qish uchun akslantirish
+
+        Args:
+            path (str): Halqa fayli
+
+        Raises:
+            ValueError: Fayl halqa fayli emas yoki versiyasi mos kelmaydi
+        """
+        self.path = path
+        self._open()
+
+    def _open(self):
+        with open(self.path, 'rb') as f:
+            self._inode = os.fstat(f.fileno()).st_ino
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, header_size, self.slot_size, self.slots, field_count = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"{self.path} halqa fayli emas yoki versiyasi mos emas")
+        self._base = header_size
+        self.pid, self.created, hostname, fields = WRITER.unpack_from(self._map, WRITER_OFFSET)
+        self.hostname = hostname.rstrip(b'\x00').decode('utf-8', 'replace')
+        self.fields = tuple(fields.rstrip(b'\x00').decode('ascii').split(','))[:field_count]
+        self._values = struct.Struct(f'<{field_count}d')
+        self.Sample = namedtuple('Sample', ('seq',) + self.fields)
+
+    @property
+    def count(self):
+        """
+        Yozuvchi chop etgan namunalar soni
+        """
+        return WRITE_COUNT.unpack_from(self._map, WRITE_COUNT_OFFSET)[0]
+
+    def read(self, n):
+        """
+        n-namunani o'qish
+
+        Args:
+            n (int): Namuna tartib raqami (0 dan)
+
+        Returns:
+            Sample: Namuna yoki None (hali yozilmagan, yozilmoqda yoki ustidan yozilgan)
+        """
+        offset = self._base + (n % self.slots) * self.slot_size
+        expected = 2 * n + 2
+        if SEQ.unpack_from(self._map, offset)[0] != expected:
+            return None
+        values = self._values.unpack_from(self._map, offset + SEQ.size)
+        if SEQ.unpack_from(self._map, offset)[0] != expected:
+            return None
+        return self.Sample(n, *values)
+
+    def latest(self):
+        """
+        Eng oxirgi namuna
+
+        Returns:
+            Sample: Namuna yoki None (hali namuna yo'q)
+        """
+        for _ in range(READ_RETRIES):
+            count = self.count
+            if not count:
+                return None
+            sample = self.read(count - 1)
+            if sample is not None:
+                return sample
+        return None
+
+    def since(self, seq, limit=None):
+        """
+        seq dan boshlab yozilgan namunalar (tail -f uchun: keyingi chaqiruvga oxirgi seq + 1 beriladi)
+
+        Ustidan yozilgan (halqadan chiqib ketgan) namunalar o'tkazib yuboriladi.
+
+        Args:
+            seq (int): Birinchi kerakli namuna raqami
+            limit (int, optional): Maksimal namunalar soni
+
+        Returns:
+            list: Sample ro'yxati (eskidan yangiga)
+        """
+        count = self.count
+        first = max(seq, count - self.slots, 0)
+        if limit:
+            first = max(first, count - limit)
+        samples = []
+        for n in range(first, count):
+            sample = self.read(n)
+            if sample is not None:
+                samples.append(sample)
+        return samples
+
+    def history(self, limit=None):
+        """
+        Halqadagi oxirgi namunalar
+
+        Args:
+            limit (int, optional): Maksimal namunalar soni (standart: butun halqa)
+
+        Returns:
+            list: Sample ro'yxati (eskidan yangiga)
+        """
+        return self.since(0, limit)
+
+    def stale(self):
+        """
+        Yozuvchi qayta ishga tushib, faylni almashtirganligini tekshirish
+
+        Returns:
+            bool: Yangi fayl paydo bo'lgan bo'lsa True (reopen() chaqirish kerak)
+        """
+        try:
+            return os.stat(self.path).st_ino != self._inode
+        except FileNotFoundError:
+            return False
+
+    def reopen(self):
+        """
+        Almashtirilgan faylni qayta akslantirish
+        """
+        self._map.close()
+        self._open()
+
+    def close(self):
+        """
+        Akslantirishni yopish
+        """
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def main():
+    """
+    Halqadagi oxirgi namunalarni CSV ko'rinishida chiqarish
+    """
+    parser = argparse.ArgumentParser(description="System Monitor halqa faylini o'qish")
+    parser.add_argument('path', nargs='?', default='/dev/shm/system-monitor.ring', help='Halqa fayli')
+    parser.add_argument('-n', type=int, default=1, help='Namunalar soni (standart: 1)')
+    args = parser.parse_args()
+
+    try:
+        reader = RingReader(args.path)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    with reader:
+        print(','.join(('seq',) + reader.fields))
+        for sample in reader.history(args.n):
+            print(','.join(str(value) for value in sample))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
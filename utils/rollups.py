@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Metrikalarni ko'p darajali agregatsiya (rollup) va saqlash muddati moduli
+1 daqiqa, 1 soat va 1 kunlik jadvallar batch yozilganda inkremental yangilanadi
+"""
+
+import time
+import datetime
+
+from core.windows import parse_duration
+from utils.schema import purge_samples
+
+# (nom, jadval, bucket boshini hisoblash funksiyasi)
+RESOLUTIONS = (
+    ('1m', 'metrics_1m', lambda dt: dt.replace(second=0, microsecond=0)),
+    ('1h', 'metrics_1h', lambda dt: dt.replace(minute=0, second=0, microsecond=0)),
+    ('1d', 'metrics_1d', lambda dt: dt.replace(hour=0, minute=0, second=0, microsecond=0)),
+)
+
+# Resolutsiya uzunligi (soniya) - so'rovlar uchun mos jadvalni tanlashda ishlatiladi
+RESOLUTION_SECONDS = {'1m': 60, '1h': 3600, '1d': 86400}
+
+# Rollup metrika nomi -> metrics jadvalidagi ustun
+ROLLUP_METRICS = (
+    ('ram', 'ram_usage'),
+    ('cpu', 'cpu_usage'),
+    ('disk', 'disk_usage'),
+    ('swap', 'swap_usage'),
+    ('load', 'load_average'),
+    ('network_rx', 'network_rx'),
+    ('network_tx', 'network_tx'),
+)
+
+ROLLUP_COLUMNS = ('bucket', 'hostname', 'metric', 'min_value', 'max_value', 'sum_value', 'sample_count', 'last_value')
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Eski qatorlarni kichik batch'larda o'chirish so'rovlari
+PURGE_TEMPLATES = {
+    'sqlite': "DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} WHERE {column} < ? LIMIT ?)",
+    'mysql': "DELETE FROM {table} WHERE {column} < %s LIMIT %s",
+    'postgresql': "DELETE FROM {table} WHERE ctid IN (SELECT ctid FROM {table} WHERE {column} < %s LIMIT %s)",
+}
+
+
+def create_rollup_statements(dialect):
+    """
+    Rollup jadvallari uchun CREATE TABLE so'rovlari
+
+    Args:
+        dialect (dict): utils.database.DIALECTS dagi backend tavsifi
+
+    Returns:
+        list: CREATE TABLE so'rovlari
+    """
+    statements = []
+    for _, table, _ in RESOLUTIONS:
+        statements.append(f'''
+            CREATE TABLE IF NOT EXISTS {table} (
+                bucket {dialect['timestamp']} NOT NULL,
+                hostname {dialect['hostname']} NOT NULL,
+                metric {dialect['alert_type']} NOT NULL,
+                min_value {dialect['double']},
+                max_value {dialect['double']},
+                sum_value {dialect['double']},
+                sample_count INTEGER NOT NULL,
+                last_value {dialect['double']},
+                PRIMARY KEY (hostname, metric, bucket)
+            )
+        ''')
+    return statements
+
+
+def upsert_statement(db_type, placeholder, table):
+    """
+    Rollup qatorini mavjud bucket bilan birlashtiruvchi INSERT so'rovi
+
+    Args:
+        db_type (str): sqlite, mysql yoki postgresql
+        placeholder (str): Parametr belgisi
+        table (str): Rollup jadvali
+
+    Returns:
+        str: INSERT ... ON CONFLICT / ON DUPLICATE KEY so'rovi
+    """
+    values = ', '.join([placeholder] * len(ROLLUP_COLUMNS))
+    insert = f"INSERT INTO {table} ({', '.join(ROLLUP_COLUMNS)}) VALUES ({values})"
+
+    if db_type == 'mysql':
+        return insert + '''
+            ON DUPLICATE KEY UPDATE
+                min_value = LEAST(min_value, VALUES(min_value)),
+                max_value = GREATEST(max_value, VALUES(max_value)),
+                sum_value = sum_value + VALUES(sum_value),
+                sample_count = sample_count + VALUES(sample_count),
+                last_value = VALUES(last_value)
+        '''
+
+    return insert + f'''
+        ON CONFLICT (hostname, metric, bucket) DO UPDATE SET
+            min_value = CASE WHEN excluded.min_value < {table}.min_value THEN excluded.min_value ELSE {table}.min_value END,
+            max_value = CASE WHEN excluded.max_value > {table}.max_value THEN excluded.max_value ELSE {table}.max_value END,
+            sum_value = {table}.sum_value + excluded.sum_value,
+            sample_count = {table}.sample_count + excluded.sample_count,
+            last_value = excluded.last_value
+    '''
+
+
+def aggregate_rows(rows, column_index):
+    """
+    Batch'dagi xom qatorlarni har bir resolutsiya uchun bucket'larga yig'ish
+
+    Args:
+        rows (list): metrics jadvali qatorlari (vaqt tartibida)
+        column_index (dict): Ustun nomi -> qatordagi indeks
+
+    Returns:
+        dict: Resolutsiya nomi -> ROLLUP_COLUMNS tartibidagi qatorlar ro'yxati
+    """
+    ts_index = column_index['timestamp']
+    host_index = column_index['hostname']
+    metric_indexes = [(name, column_index[column]) for name, column in ROLLUP_METRICS]
+
+    result = {}
+    for name, _, floor in RESOLUTIONS:
+        buckets = {}
+        for row in rows:
+            timestamp = row[ts_index]
+            if isinstance(timestamp, str):
+                timestamp = datetime.datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+            elif isinstance(timestamp, (int, float)):
+                # Normallashtirilgan sxema: epoch soniya
+                timestamp = datetime.datetime.fromtimestamp(timestamp)
+            bucket = floor(timestamp).strftime(TIMESTAMP_FORMAT)
+            hostname = row[host_index]
+
+            for metric, index in metric_indexes:
+                value = row[index]
+                if value is None:
+                    continue
+                value = float(value)
+                key = (bucket, hostname, metric)
+                state = buckets.get(key)
+                if state is None:
+                    buckets[key] = [value, value, value, 1, value]
+                else:
+                    if value < state[0]:
+                        state[0] = value
+                    if value > state[1]:
+                        state[1] = value
+                    state[2] += value
+                    state[3] += 1
+                    state[4] = value
+
+        result[name] = [key + tuple(state) for key, state in buckets.items()]
+    return result
+
+
+class RetentionPolicy:
+    def __init__(self, config, logger, db_type, schema='legacy'):
+        """
+        Har bir resolutsiya uchun saqlash muddatini sozlash
+
+        Args:
+            config (dict): Konfiguratsiya sozlamalari
+            logger (logging.Logger): Log yozish uchun logger obyekti
+            db_type (str): sqlite, mysql yoki postgresql
+            schema (str): legacy yoki normalized (xom namunalar metric_samples jadvalida)
+        """
+        self.logger = logger
+        self.db_type = db_type
+        self.batch_size = max(1, int(config.get('db_purge_batch_size', 1000)))
+        self.max_batches = max(1, int(config.get('db_purge_max_batches', 50)))
+        self.interval = float(config.get('db_retention_interval', 3600))
+        self._last_run = None
+
+        # (jadval, vaqt ustuni, saqlash muddati soniyada); 0 - cheksiz
+        targets = [('metrics', 'timestamp', config.get('db_retention_raw', '0'))]
+        for name, table, _ in RESOLUTIONS:
+            targets.append((table, 'bucket', config.get(f'db_retention_{name}', '0')))
+
+        if schema == 'normalized':
+            # Epoch vaqtli metric_samples xost bo'yicha purge_samples bilan tozalanadi
+            targets[0] = ('metric_samples', None, targets[0][2])
+
+        self.targets = []
+        for table, column, retention in targets:
+            seconds = parse_duration(str(retention))
+            if seconds > 0:
+                sql = PURGE_TEMPLATES[db_type].format(table=table, column=column) if column else None
+                self.targets.append((table, sql, seconds))
+
+    def due(self, now=None):
+        """
+        Tozalash vaqti kelganligini tekshirish
+
+        Args:
+            now (float, optional): Monotonik vaqt
+
+        Returns:
+            bool: Tozalash kerak bo'lsa True
+        """
+        if not self.targets:
+            return False
+        now = time.monotonic() if now is None else now
+        if self._last_run is not None and now - self._last_run < self.interval:
+            return False
+        self._last_run = now
+        return True
+
+    def purge(self, conn, now=None):
+        """
+        Muddati o'tgan qatorlarni kichik batch'larda o'chirish (har batch alohida commit)
+
+        Args:
+            conn: DB-API ulanishi
+            now (datetime, optional): Joriy vaqt (test uchun)
+
+        Returns:
+            int: O'chirilgan qatorlar soni
+        """
+        now = now or datetime.datetime.now()
+        total = 0
+        cursor = conn.cursor()
+        try:
+            for table, sql, seconds in self.targets:
+                if sql is None:
+                    cutoff = int((now - datetime.timedelta(seconds=seconds)).timestamp())
+                    total += purge_samples(conn, self.db_type, cutoff, self.batch_size, self.max_batches)
+                    continue
+                cutoff = (now - datetime.timedelta(seconds=seconds)).strftime(TIMESTAMP_FORMAT)
+                for _ in range(self.max_batches):
+                    cursor.execute(sql, (cutoff, self.batch_size))
+                    deleted = cursor.rowcount
+                    conn.commit()
+                    total += max(0, deleted)
+                    if deleted < self.batch_size:
+                        break
+        finally:
+            cursor.close()
+
+        if total:
+            self.logger.info(f"Saqlash muddati o'tgan {total} ta qator o'chirildi")
+        return total
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Doimiy hajmli aylanma arxiv (RRD uslubida)
+Har bir xost uchun bitta fayl yaratilishda to'liq ajratiladi; har bir arxiv
+(qadam, qatorlar soni) halqa sifatida ishlaydi va yangilanish joyida, O(1)
+da yoziladi, shuning uchun diskdagi hajm hech qachon o'smaydi
+
+Fayl tuzilishi (little-endian):
+
+    Sarlavha (HEADER_SIZE = 4096 bayt)
+        0   8s   magic (b'SMRRD\\x00\\x00\\x01')
+        8   u32  versiya
+        12  u32  metrikalar soni
+        16  u32  arxivlar soni
+        20  u32  qator hajmi
+        24  i64  oxirgi yangilanish vaqti (epoch)
+        32  f64  yaratilgan vaqt
+        40  64s  xost nomi
+        104 256s metrika nomlari (vergul bilan)
+        360      arxivlar jadvali: (u32 qadam, u32 qatorlar, u64 offset) x arxivlar
+
+    Qator: i64 bucket boshi, keyin har bir metrika uchun
+        f64 soni, f64 yig'indi, f64 min, f64 max, f64 oxirgi
+
+Bucket t vaqt uchun (t // qadam) % qatorlar qatoriga tushadi. Qatorda
+saqlangan bucket boshi kutilganidan farq qilsa, qator eskirgan (bir aylana
+oldingi ma'lumot) hisoblanadi, shuning uchun alohida tozalash kerak emas.
+"""
+
+import os
+import re
+import json
+import mmap
+import time
+import struct
+
+from core.windows import parse_duration
+from utils.tsdb import to_epoch
+
+MAGIC = b'SMRRD\x00\x00\x01'
+VERSION = 1
+HEADER_SIZE = 4096
+
+HEADER = struct.Struct('<8sIIIIqd64s256s')
+LAST_UPDATE = struct.Struct('<q')
+LAST_UPDATE_OFFSET = 24
+ARCHIVE = struct.Struct('<IIQ')
+ARCHIVE_TABLE_OFFSET = 360
+MAX_ARCHIVES = (HEADER_SIZE - ARCHIVE_TABLE_OFFSET) // ARCHIVE.size
+
+# Har bir metrika uchun saqlanadigan qiymatlar: soni, yig'indi, min, max, oxirgi
+CONSOLIDATION_VALUES = 5
+
+DEFAULT_ARCHIVES = "1m:1d, 5m:7d, 1h:90d, 1d:1825d"
+
+
+def parse_archives(text):
+    """
+    Arxivlar ro'yxatini tahlil qilish
+
+    Args:
+        text (str): "qadam:davr" juftliklari vergul bilan, masalan "1m:1d, 1h:90d"
+
+    Returns:
+        list: (qadam soniya, qatorlar soni) qadam bo'yicha tartiblangan
+
+    Raises:
+        ValueError: Noto'g'ri format
+    """
+    archives = []
+    for item in text.split(','):
+        if not item.strip():
+            continue
+        step_text, _, span_text = item.partition(':')
+        step = parse_duration(step_text)
+        span = parse_duration(span_text)
+        if step <= 0 or span < step:
+            raise ValueError(f"Noto'g'ri arxiv: {item.strip()}")
+        archives.append((step, span // step))
+    if not archives or len(archives) > MAX_ARCHIVES:
+        raise ValueError(f"Arxivlar soni 1..{MAX_ARCHIVES} oralig'ida bo'lishi kerak: {text}")
+    return sorted(archives)
+
+
+class ArchiveFile:
+    def __init__(self, path, hostname, metrics, archives, logger):
+        """
+        Xost arxiv faylini ochish yoki oldindan ajratib yaratish
+
+        Mavjud fayl tuzilishi sozlamalardan farq qilsa, fayldagi tuzilish
+        ishlatiladi (uni o'zgartirish uchun faylni o'chirish kerak).
+
+        Args:
+            path (str): Fayl yo'li
+            hostname (str): Xost nomi
+            metrics (tuple): Metrika nomlari
+            archives (list): (qadam, qatorlar) ro'yxati
+            logger (logging.Logger): Log yozish uchun logger obyekti
+        """
+        self.path = path
+        self.logger = logger
+
+        if not os.path.exists(path):
+            self._create(hostname, metrics, archives)
+
+        self._file = open(path, 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, version, metric_count, archive_count, row_size, _, _, stored_host, names = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} RRD fayli emas yoki versiyasi mos emas")
+
+        self.hostname = stored_host.rstrip(b'\x00').decode('utf-8', 'replace')
+        self.metrics = tuple(names.rstrip(b'\x00').decode('ascii').split(','))[:metric_count]
+        self.metric_index = {name: i for i, name in enumerate(self.metrics)}
+        self.row = struct.Struct('<q' + 'd' * (CONSOLIDATION_VALUES * metric_count))
+        self.row_size = row_size
+        self.archives = [ARCHIVE.unpack_from(self._map, ARCHIVE_TABLE_OFFSET + i * ARCHIVE.size)
+                         for i in range(archive_count)]
+        if [archive[:2] for archive in self.archives] != [tuple(archive) for archive in archives]:
+            self.logger.warning(f"{path} arxivlari sozlamalardan farq qiladi, fayldagi tuzilish ishlatiladi")
+
+    def _create(self, hostname, metrics, archives):
+        row_size = struct.calcsize('<q' + 'd' * (CONSOLIDATION_VALUES * len(metrics)))
+        header = bytearray(HEADER_SIZE)
+        HEADER.pack_into(header, 0, MAGIC, VERSION, len(metrics), len(archives), row_size, 0, time.time(),
+                         hostname.encode('utf-8')[:64], ','.join(metrics).encode('ascii'))
+        offset = HEADER_SIZE
+        for i, (step, rows) in enumerate(archives):
+            ARCHIVE.pack_into(header, ARCHIVE_TABLE_OFFSET + i * ARCHIVE.size, step, rows, offset)
+            offset += rows * row_size
+
+        # Vaqtinchalik faylda to'liq ajratib, atomik almashtirish
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(header)
+            f.truncate(offset)
+            if hasattr(os, 'posix_fallocate'):
+                # Diskdagi bloklarni oldindan band qilish (keyinchalik ENOSPC bo'lmasligi uchun)
+                os.posix_fallocate(f.fileno(), 0, offset)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.logger.info(f"RRD fayli yaratildi: {self.path} ({offset} bayt)")
+
+    def update(self, ts, values):
+        """
+        Namunani barcha arxivlarga joyida qo'shish
+
+        Args:
+            ts (int): Epoch soniya
+            values (dict): Metrika nomi -> qiymat (None - o'tkazib yuboriladi)
+        """
+        if ts > self.last_update:
+            LAST_UPDATE.pack_into(self._map, LAST_UPDATE_OFFSET, ts)
+        for step, rows, base in self.archives:
+            bucket = ts - ts % step
+            offset = base + (bucket // step % rows) * self.row_size
+            row = list(self.row.unpack_from(self._map, offset))
+            if row[0] > bucket:
+                # Qatorda yangiroq ma'lumot bor - kechikkan namuna
+                continue
+            if row[0] != bucket:
+                row = [bucket] + [0.0] * (len(row) - 1)
+
+            for metric, value in values.items():
+                i = self.metric_index.get(metric)
+                if i is None or value is None:
+                    continue
+                position = 1 + i * CONSOLIDATION_VALUES
+                count, total, low, high, _ = row[position:position + CONSOLIDATION_VALUES]
+                if count:
+                    row[position:position + CONSOLIDATION_VALUES] = (
+                        count + 1, total + value, min(low, value), max(high, value), value)
+                else:
+                    row[position:position + CONSOLIDATION_VALUES] = (1.0, value, value, value, value)
+            self.row.pack_into(self._map, offset, *row)
+
+    @property
+    def last_update(self):
+        """
+        Oxirgi namuna vaqti (epoch, hali yozilmagan bo'lsa 0)
+        """
+        return LAST_UPDATE.unpack_from(self._map, LAST_UPDATE_OFFSET)[0]
+
+    def choose_archive(self, start, step):
+        """
+        So'rov uchun arxivni tanlash (rollup darajasini tanlash bilan bir xil qoida)
+
+        Qadamdan katta bo'lmagan eng yirik arxiv olinadi; u so'rov boshini
+        (oxirgi yangilanishdan hisoblaganda) qamrab olmasa, keyingi yirikroq
+        arxivga o'tiladi.
+
+        Args:
+            start (int): So'rov boshi (epoch)
+            step (int): So'ralgan qadam
+
+        Returns:
+            tuple: (qadam, qatorlar, offset)
+        """
+        candidates = [archive for archive in self.archives if archive[0] <= step] or self.archives[:1]
+        position = self.archives.index(candidates[-1])
+        latest = self.last_update
+        for archive in self.archives[position:]:
+            if start >= latest - archive[0] * archive[1]:
+                return archive
+        return self.archives[-1]
+
+    def read(self, metric, archive, start, end):
+        """
+        Arxivdan [start, end) oralig'idagi bucket'larni o'qish
+
+        Args:
+            metric (str): Metrika nomi
+            archive (tuple): choose_archive natijasi
+            start (int): Boshlanish (epoch)
+            end (int): Tugash (epoch)
+
+        Yields:
+            tuple: (bucket boshi, soni, yig'indi, min, max, oxirgi)
+        """
+        i = self.metric_index.get(metric)
+        if i is None or end <= start:
+            return
+        step, rows, base = archive
+        position = 1 + i * CONSOLIDATION_VALUES
+        last_bucket = (end - 1) - (end - 1) % step
+        # Halqadan tashqaridagi bucket'lar baribir eskirgan
+        bucket = max(start - start % step, last_bucket - (rows - 1) * step)
+        while bucket <= last_bucket:
+            row = self.row.unpack_from(self._map, base + (bucket // step % rows) * self.row_size)
+            if row[0] == bucket and row[position]:
+                yield (bucket,) + row[position:position + CONSOLIDATION_VALUES]
+            bucket += step
+
+    def flush(self):
+        """
+        O'zgarishlarni diskka yozish
+        """
+        self._map.flush()
+
+    def close(self):
+        """
+        Faylni yopish
+        """
+        try:
+            self._map.flush()
+            self._map.close()
+        except (ValueError, AttributeError):
+            pass
+        self._file.close()
+
+
+class RoundRobinStore:
+    def __init__(self, config, logger):
+        """
+        Aylanma arxivlar omborini ochish
+
+        Args:
+            config (dict): Konfiguratsiya sozlamalari
+            logger (logging.Logger): Log yozish uchun logger obyekti
+        """
+        self.config = config
+        self.logger = logger
+        self.path = config.get('db_rrd_path', '/var/lib/system-monitor/rrd')
+        self.archives = parse_archives(str(config.get('db_rrd_archives', DEFAULT_ARCHIVES)))
+        self.alert_log_bytes = int(config.get('db_rrd_alert_log_bytes', 1048576))
+        self.files = {}
+
+        os.makedirs(self.path, exist_ok=True)
+        layout = ', '.join(f"{step}s x {rows}" for step, rows in self.archives)
+        self.logger.info(f"RRD ombori ochildi: {self.path} ({layout})")
+
+    @staticmethod
+    def _safe_name(name):
+        return re.sub(r'[^A-Za-z0-9._-]', '_', name) or '_'
+
+    def _file(self, hostname, metrics=None):
+        name = self._safe_name(hostname)
+        archive = self.files.get(name)
+        if archive is None:
+            path = os.path.join(self.path, name + '.rrd')
+            if metrics is None and not os.path.exists(path):
+                return None
+            archive = self.files[name] = ArchiveFile(path, hostname, metrics or (), self.archives, self.logger)
+        return archive
+
+    def hosts(self):
+        """
+        Arxiv fayli bor xostlar
+
+        Returns:
+            list: Xost nomlari (fayl nomi ko'rinishida)
+        """
+        return sorted(name[:-4] for name in os.listdir(self.path) if name.endswith('.rrd'))
+
+    def append_rows(self, rows, column_index, metrics):
+        """
+        metrics jadvali qatorlarini arxivlarga yozish
+
+        Args:
+            rows (list): METRIC_COLUMNS tartibidagi qatorlar
+            column_index (dict): Ustun nomi -> indeks
+            metrics (tuple): (metrika nomi, ustun) juftliklari
+        """
+        names = tuple(name for name, _ in metrics)
+        for row in rows:
+            values = {name: (None if row[column_index[column]] is None else float(row[column_index[column]]))
+                      for name, column in metrics}
+            self._file(row[column_index['hostname']], names).update(to_epoch(row[column_index['timestamp']]), values)
+
+    def append_alert(self, alert):
+        """
+        Alertni alerts.ndjson fayliga qo'shish (hajm chegarasida bitta zaxira nusxaga aylantiriladi)
+
+        Args:
+            alert (dict): Alert ma'lumotlari
+        """
+        path = os.path.join(self.path, 'alerts.ndjson')
+        if os.path.exists(path) and os.path.getsize(path) >= self.alert_log_bytes:
+            os.replace(path, path + '.1')
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(alert, ensure_ascii=False) + '\n')
+
+    def flush(self):
+        """
+        Barcha arxiv fayllarini diskka yozish
+        """
+        for archive in self.files.values():
+            archive.flush()
+
+    def query_range(self, metric, host, start, end, step, agg):
+        """
+        Mos arxivdan qadamlar bo'yicha konsolidatsiya qilingan qiymatlar
+
+        Args:
+            metric (str): Metrika nomi
+            host (str): Xost nomi (None - barcha xostlar)
+            start (int): Boshlanish (epoch)
+            end (int): Tugash (epoch)
+            step (int): Qadam (soniya)
+            agg (str): avg, min, max, sum, count yoki last
+
+        Yields:
+            tuple: (bucket boshi epoch, qiymat)
+        """
+        buckets = {}
+        for hostname in ([host] if host else self.hosts()):
+            archive_file = self._file(hostname)
+            if archive_file is None:
+                continue
+            archive = archive_file.choose_archive(start, step)
+            effective = max(step, archive[0])
+            for bucket, count, total, low, high, last in archive_file.read(metric, archive, start, end):
+                key = bucket - bucket % effective
+                state = buckets.get(key)
+                if state is None:
+                    buckets[key] = [count, total, low, high, last]
+                else:
+                    state[0] += count
+                    state[1] += total
+                    state[2] = min(state[2], low)
+                    state[3] = max(state[3], high)
+                    state[4] = last
+
+        for key in sorted(buckets):
+            count, total, low, high, last = buckets[key]
+            yield key, {
+                'avg': total / count, 'min': low, 'max': high, 'sum': total, 'count': int(count), 'last': last,
+            }[agg]
+
+    def close(self):
+        """
+        Arxiv fayllarini yopish
+        """
+        for archive in self.files.values():
+            archive.close()
+        self.files = {}
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Normallashtirilgan ixcham sxema (db_schema = normalized)
+Xostlar alohida hosts jadvalida butun id bilan saqlanadi, vaqt butun epoch
+soniya, namunalar jadvali esa (host_id, ts) bo'yicha klasterlangan
+(SQLite da WITHOUT ROWID, MySQL InnoDB da birlamchi kalit). Eski sxemadan
+ko'chirish vositasi ham shu modulda
+"""
+
+import time
+import datetime
+
+# Normallashtirilgan jadvallardagi metrika ustunlari (eski metrics jadvali bilan bir xil nomlar)
+SAMPLE_VALUE_COLUMNS = ('ram_usage', 'cpu_usage', 'disk_usage', 'swap_usage',
+                        'load_average', 'network_rx', 'network_tx', 'extra_data')
+SAMPLE_COLUMNS = ('host_id', 'ts') + SAMPLE_VALUE_COLUMNS
+EVENT_COLUMNS = ('host_id', 'ts', 'alert_type', 'value', 'message', 'sent_successfully')
+
+# Backendga xos qismlar
+SCHEMA_DIALECTS = {
+    'sqlite': {'bigint': 'INTEGER', 'clustered': ' WITHOUT ROWID', 'insert_ignore': 'INSERT OR IGNORE INTO',
+               'conflict': ''},
+    'mysql': {'bigint': 'BIGINT', 'clustered': ' ENGINE=InnoDB', 'insert_ignore': 'INSERT IGNORE INTO',
+              'conflict': ''},
+    'postgresql': {'bigint': 'BIGINT', 'clustered': '', 'insert_ignore': 'INSERT INTO',
+                   'conflict': ' ON CONFLICT DO NOTHING'},
+}
+
+# Bitta xostning eski namunalarini batch'lab o'chirish (WITHOUT ROWID jadvalda rowid yo'q)
+PURGE_SAMPLES = {
+    'sqlite': "DELETE FROM metric_samples WHERE (host_id, ts) IN "
+              "(SELECT host_id, ts FROM metric_samples WHERE host_id = ? AND ts < ? LIMIT ?)",
+    'mysql': "DELETE FROM metric_samples WHERE host_id = %s AND ts < %s ORDER BY ts LIMIT %s",
+    'postgresql': "DELETE FROM metric_samples WHERE ctid IN "
+                  "(SELECT ctid FROM metric_samples WHERE host_id = %s AND ts < %s LIMIT %s)",
+}
+
+
+def create_normalized_statements(db_type, dialect):
+    """
+    Normallashtirilgan sxema uchun CREATE so'rovlari
+
+    Args:
+        db_type (str): sqlite, mysql yoki postgresql
+        dialect (dict): utils.database.DIALECTS dagi backend tavsifi
+
+    Returns:
+        list: CREATE TABLE / CREATE INDEX so'rovlari
+    """
+    s = SCHEMA_DIALECTS[db_type]
+    # MySQL da CREATE INDEX IF NOT EXISTS yo'q, indeks jadval bilan birga yaratiladi
+    inline_index = ',\n            INDEX idx_alert_events_host_ts (host_id, ts)' if db_type == 'mysql' else ''
+    statements = [
+        f'''
+        CREATE TABLE IF NOT EXISTS hosts (
+            host_id {dialect['id']},
+            hostname {dialect['hostname']} NOT NULL UNIQUE,
+            ip_address {dialect['ip_address']}
+        )
+        ''',
+        f'''
+        CREATE TABLE IF NOT EXISTS metric_samples (
+            host_id INTEGER NOT NULL,
+            ts {s['bigint']} NOT NULL,
+            ram_usage {dialect['real']},
+            cpu_usage {dialect['real']},
+            disk_usage {dialect['real']},
+            swap_usage {dialect['real']},
+            load_average {dialect['real']},
+            network_rx {dialect['real']},
+            network_tx {dialect['real']},
+            extra_data TEXT,
+            PRIMARY KEY (host_id, ts)
+        ){s['clustered']}
+        ''',
+        f'''
+        CREATE TABLE IF NOT EXISTS alert_events (
+            id {dialect['id']},
+            host_id INTEGER NOT NULL,
+            ts {s['bigint']} NOT NULL,
+            alert_type {dialect['alert_type']} NOT NULL,
+            value {dialect['value']} NOT NULL,
+            message TEXT,
+            sent_successfully BOOLEAN{inline_index}
+        )
+        ''',
+        f'''
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            name {dialect['alert_type']} PRIMARY KEY,
+            last_id {s['bigint']} NOT NULL
+        )
+        ''',
+    ]
+    if db_type != 'mysql':
+        statements.append("CREATE INDEX IF NOT EXISTS idx_alert_events_host_ts ON alert_events (host_id, ts)")
+    return statements
+
+
+def insert_ignore_statement(db_type, placeholder, table, columns):
+    """
+    Takroriy birlamchi kalitni e'tiborsiz qoldiruvchi INSERT so'rovi
+
+    Args:
+        db_type (str): sqlite, mysql yoki postgresql
+        placeholder (str): Parametr belgisi
+        table (str): Jadval nomi
+        columns (tuple): Ustunlar
+
+    Returns:
+        str: INSERT so'rovi
+    """
+    s = SCHEMA_DIALECTS[db_type]
+    values = ', '.join([placeholder] * len(columns))
+    return f"{s['insert_ignore']} {table} ({', '.join(columns)}) VALUES ({values}){s['conflict']}"
+
+
+def to_local_epoch(timestamp):
+    """
+    Eski sxemadagi vaqtni (mahalliy, zonasiz) epoch soniyaga aylantirish
+
+    Args:
+        timestamp (str|datetime|int): '%Y-%m-%d %H:%M:%S', datetime yoki epoch
+
+    Returns:
+        int: Epoch soniya
+    """
+    if isinstance(timestamp, (int, float)):
+        return int(timestamp)
+    if isinstance(timestamp, str):
+        timestamp = datetime.datetime.strptime(timestamp[:19], '%Y-%m-%d %H:%M:%S')
+    return int(time.mktime(timestamp.timetuple()))
+
+
+class HostRegistry:
+    def __init__(self, db_type, placeholder):
+        """
+        hostname -> host_id keshi (yangi xostlar birinchi uchraganda qo'shiladi)
+
+        Args:
+            db_type (str): sqlite, mysql yoki postgresql
+            placeholder (str): Parametr belgisi
+        """
+        p = placeholder
+        self._insert = insert_ignore_statement(db_type, p, 'hosts', ('hostname', 'ip_address'))
+        self._select = f"SELECT host_id, ip_address FROM hosts WHERE hostname = {p}"
+        self._update = f"UPDATE hosts SET ip_address = {p} WHERE host_id = {p}"
+        self._cache = {}
+
+    def host_id(self, cursor, hostname, ip_address=None):
+        """
+        Xost id sini olish (kerak bo'lsa yaratish, IP o'zgargan bo'lsa yangilash)
+
+        Args:
+            cursor: DB-API kursori (chaqiruvchining tranzaksiyasida)
+            hostname (str): Xost nomi
+            ip_address (str, optional): IP manzil
+
+        Returns:
+            int: host_id
+        """
+        cached = self._cache.get(hostname)
+        if cached is None:
+            cursor.execute(self._select, (hostname,))
+            row = cursor.fetchone()
+            if row is None:
+                cursor.execute(self._insert, (hostname, ip_address))
+                cursor.execute(self._select, (hostname,))
+                row = cursor.fetchone()
+            cached = self._cache[hostname] = [row[0], row[1]]
+        if ip_address and cached[1] != ip_address:
+            cursor.execute(self._update, (ip_address, cached[0]))
+            cached[1] = ip_address
+        return cached[0]
+
+    def forget(self):
+        """
+        Keshni tozalash (tranzaksiya bekor qilinganda yangi qo'shilgan id lar yo'qolishi mumkin)
+        """
+        self._cache = {}
+
+
+def purge_samples(conn, db_type, cutoff, batch_size, max_batches):
+    """
+    metric_samples dan eski namunalarni har bir xost bo'yicha (birlamchi kalit oralig'ida) o'chirish
+
+    Args:
+        conn: DB-API ulanishi
+        db_type (str): sqlite, mysql yoki postgresql
+        cutoff (int): Epoch soniya - undan oldingi namunalar o'chiriladi
+        batch_size (int): Bitta DELETE dagi qatorlar
+        max_batches (int): Bir xost uchun maksimal batch'lar
+
+    Returns:
+        int: O'chirilgan qatorlar soni
+    """
+    total = 0
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT host_id FROM hosts")
+        host_ids = [row[0] for row in cursor.fetchall()]
+        for host_id in host_ids:
+            for _ in range(max_batches):
+                cursor.execute(PURGE_SAMPLES[db_type], (host_id, cutoff, batch_size))
+                deleted = cursor.rowcount
+                conn.commit()
+                total += max(0, deleted)
+                if deleted < batch_size:
+                    break
+    finally:
+        cursor.close()
+    return total
+
+
+def _migration_state(cursor, placeholder, name):
+    cursor.execute(f"SELECT last_id FROM schema_migrations WHERE name = {placeholder}", (name,))
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def _save_migration_state(cursor, placeholder, name, last_id, exists):
+    if exists:
+        cursor.execute(f"UPDATE schema_migrations SET last_id = {placeholder} WHERE name = {placeholder}", (last_id, name))
+    else:
+        cursor.execute(f"INSERT INTO schema_migrations (name, last_id) VALUES ({placeholder}, {placeholder})", (name, last_id))
+
+
+def migrate_to_normalized(conn, db_type, dialect, logger, batch_size=5000, drop_legacy=False):
+    """
+    Eski metrics/alerts jadvallarini normallashtirilgan sxemaga ko'chirish
+
+    Qatorlar id bo'yicha batch'larda o'qiladi, har batch alohida commit
+    qilinadi va oxirgi ko'chirilgan id schema_migrations jadvalida saqlanadi,
+    shuning uchun to'xtatilgan ko'chirish qayta ishga tushirilganda davom etadi.
+
+    Args:
+        conn: DB-API ulanishi
+        db_type (str): sqlite, mysql yoki postgresql
+        dialect (dict): utils.database.DIALECTS dagi backend tavsifi
+        logger (logging.Logger): Log yozish uchun logger obyekti
+        batch_size (int): Bitta batch'dagi qatorlar
+        drop_legacy (bool): Tugagach eski jadvallarni o'chirish
+
+    Returns:
+        dict: Jadval nomi -> ko'chirilgan qatorlar soni
+    """
+    p = dialect['placeholder']
+    registry = HostRegistry(db_type, p)
+    cursor = conn.cursor()
+    for statement in create_normalized_statements(db_type, dialect):
+        cursor.execute(statement)
+    conn.commit()
+
+    plans = (
+        ('metrics',
+         "SELECT id, timestamp, hostname, ip_address, " + ', '.join(SAMPLE_VALUE_COLUMNS) + " FROM metrics",
+         insert_ignore_statement(db_type, p, 'metric_samples', SAMPLE_COLUMNS)),
+        ('alerts',
+         "SELECT id, timestamp, hostname, NULL, alert_type, value, message, sent_successfully FROM alerts",
+         f"INSERT INTO alert_events ({', '.join(EVENT_COLUMNS)}) VALUES ({', '.join([p] * len(EVENT_COLUMNS))})"),
+    )
+
+    migrated = {}
+    for table, select_sql, insert_sql in plans:
+        last_id = _migration_state(cursor, p, table)
+        state_exists = bool(last_id)
+        count = 0
+        while True:
+            cursor.execute(f"{select_sql} WHERE id > {p} ORDER BY id LIMIT {p}", (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            converted = []
+            for row in rows:
+                host_id = registry.host_id(cursor, row[2], row[3])
+                converted.append((host_id, to_local_epoch(row[1])) + tuple(row[4:]))
+            cursor.executemany(insert_sql, converted)
+            last_id = rows[-1][0]
+            _save_migration_state(cursor, p, table, last_id, state_exists)
+            state_exists = True
+            conn.commit()
+            count += len(rows)
+            logger.info(f"{table}: {count} ta qator ko'chirildi (oxirgi id {last_id})")
+        migrated[table] = count
+
+    if drop_legacy:
+        cursor.execute("DROP TABLE IF EXISTS metrics")
+        cursor.execute("DROP TABLE IF EXISTS alerts")
+        cursor.execute("DELETE FROM schema_migrations")
+        conn.commit()
+        if db_type == 'sqlite':
+            # Bo'shagan sahifalarni faylga qaytarish
+            conn.execute("VACUUM")
+        logger.info("Eski metrics va alerts jadvallari o'chirildi")
+    cursor.close()
+    return migrated
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+SQLite performance rejimi moduli
+WAL jurnali, yagona yozuvchi oqim (navbat orqali) va faqat o'qish uchun ulanishlar puli
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+from urllib.parse import quote
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+# Bitta tranzaksiyada bajariladigan navbatdagi vazifalar soni
+MAX_JOBS_PER_TRANSACTION = 256
+
+# PRAGMA synchronous uchun ruxsat etilgan qiymatlar
+SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+# Yozuvchi oqim to'xtashi uchun belgi
+_STOP = object()
+
+
+def apply_pragmas(conn, config, read_only=False):
+    """
+    Ulanishga performance rejimi PRAGMA'larini qo'llash
+
+    Args:
+        conn (sqlite3.Connection): SQLite ulanishi
+        config (dict): Konfiguratsiya sozlamalari
+        read_only (bool): O'qish ulanishi bo'lsa True (jurnal rejimi o'zgartirilmaydi)
+    """
+    conn.execute(f"PRAGMA busy_timeout = {int(config.get('db_sqlite_busy_timeout', 5000))}")
+    # Manfiy qiymat - KiB hisobida
+    conn.execute(f"PRAGMA cache_size = {-int(config.get('db_sqlite_cache_size_kb', 65536))}")
+    conn.execute(f"PRAGMA mmap_size = {int(config.get('db_sqlite_mmap_size', 268435456))}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    if not read_only:
+        conn.execute("PRAGMA journal_mode = WAL")
+        # WAL bilan NORMAL: commit'da fsync yo'q, faqat checkpoint'da
+        synchronous = str(config.get('db_sqlite_synchronous', 'NORMAL')).upper()
+        if synchronous not in SYNCHRONOUS_MODES:
+            synchronous = 'NORMAL'
+        conn.execute(f"PRAGMA synchronous = {synchronous}")
+
+
+class SQLiteWriter:
+    def __init__(self, config, logger, db_path):
+        """
+        Yagona yozuvchi oqimni ishga tushirish
+
+        Barcha yozishlar navbat orqali shu oqimga yuboriladi va faqat u yozish
+        ulanishiga ega. Navbatda yig'ilgan vazifalar bitta tranzaksiyada bajariladi.
+        sqlite3 bir xil SQL matni uchun tayyorlangan statementlarni ulanish
+        darajasida keshlaydi (cached_statements), shuning uchun so'rovlar
+        o'zgarmas satrlar sifatida qayta ishlatiladi.
+
+        Args:
+            config (dict): Konfiguratsiya sozlamalari
+            logger (logging.Logger): Log yozish uchun logger obyekti
+            db_path (str): Ma'lumotlar bazasi fayli
+        """
+        self.config = config
+        self.logger = logger
+        self.db_path = db_path
+
+        self._queue = queue.Queue(maxsize=int(config.get('db_writer_queue_size', 1024)))
+        self._ready = Future()
+        self._thread = threading.Thread(target=self._run, name='sqlite-writer', daemon=True)
+        self._thread.start()
+        # Ulanish ochilishidagi xatolik chaqiruvchiga qaytsin
+        self._ready.result()
+
+    def _run(self):
+        try:
+            conn = sqlite3.connect(self.db_path, cached_statements=int(self.config.get('db_sqlite_cached_statements', 256)))
+            apply_pragmas(conn, self.config)
+        except Exception as e:
+            self._ready.set_exception(e)
+            return
+        self._ready.set_result(True)
+
+        try:
+            while True:
+                job = self._queue.get()
+                if job is _STOP:
+                    break
+
+                jobs = [job]
+                stop = False
+                while len(jobs) < MAX_JOBS_PER_TRANSACTION:
+                    try:
+                        job = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job is _STOP:
+                        stop = True
+                        break
+                    jobs.append(job)
+
+                self._run_jobs(conn, jobs)
+                if stop:
+                    break
+        finally:
+            conn.close()
+
+    def _run_jobs(self, conn, jobs):
+        """
+        Vazifalarni umumiy tranzaksiyada bajarish; alohida (exclusive) vazifa
+        oldingi vazifalar commit qilingandan keyin o'z tranzaksiyasida bajariladi
+        """
+        batch = []
+        for job in jobs:
+            if job[2]:
+                if batch:
+                    self._execute(conn, batch)
+                    batch = []
+                self._execute(conn, [job])
+            else:
+                batch.append(job)
+        if batch:
+            self._execute(conn, batch)
+
+    def _execute(self, conn, jobs):
+        results = []
+        try:
+            for fn, _, _ in jobs:
+                results.append(fn(conn))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            if len(jobs) > 1:
+                # Bitta buzuq vazifa boshqalarini yo'qotmasligi uchun alohida qayta urinish
+                for job in jobs:
+                    self._execute(conn, [job])
+                return
+            self.logger.error(f"SQLite yozuvchi oqimida xatolik: {e}")
+            jobs[0][1].set_exception(e)
+            return
+
+        for (_, future, _), result in zip(jobs, results):
+            future.set_result(result)
+
+    def submit(self, fn, exclusive=False):
+        """
+        Yozish vazifasini navbatga qo'yish
+
+        Args:
+            fn (callable): Yozish ulanishini qabul qiluvchi funksiya
+            exclusive (bool): Vazifa o'zi commit qiladi (masalan, batch'lab o'chirish) -
+                boshqa vazifalar bilan bitta tranzaksiyaga qo'shilmaydi
+
+        Returns:
+            Future: Vazifa natijasi
+        """
+        future = Future()
+        self._queue.put((fn, future, exclusive))
+        return future
+
+    def executemany(self, sql, rows):
+        """
+        Bir nechta qatorni navbat orqali yozish
+
+        Args:
+            sql (str): INSERT so'rovi
+            rows (list): Parametrlar ro'yxati
+
+        Returns:
+            Future: Vazifa natijasi
+        """
+        return self.submit(lambda conn: conn.executemany(sql, rows).rowcount)
+
+    def execute(self, sql, params=()):
+        """
+        Bitta so'rovni navbat orqali bajarish
+
+        Args:
+            sql (str): SQL so'rovi
+            params (tuple): Parametrlar
+
+        Returns:
+            Future: Vazifa natijasi
+        """
+        return self.submit(lambda conn: conn.execute(sql, params).rowcount)
+
+    def close(self, timeout=30):
+        """
+        Navbatdagi barcha vazifalarni bajarib, oqimni to'xtatish
+
+        Args:
+            timeout (float): Kutish vaqti (soniya)
+        """
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                self.logger.warning("SQLite yozuvchi oqimi belgilangan vaqtda to'xtamadi")
+
+
+class ReadPool:
+    def __init__(self, config, logger, db_path):
+        """
+        Faqat o'qish uchun SQLite ulanishlari puli
+
+        WAL rejimida o'quvchilar yozuvchini bloklamaydi, shuning uchun dashboard va
+        tahliliy so'rovlar metrikalarni yozishni to'xtatib qo'ymaydi.
+
+        Args:
+            config (dict): Konfiguratsiya sozlamalari
+            logger (logging.Logger): Log yozish uchun logger obyekti
+            db_path (str): Ma'lumotlar bazasi fayli
+        """
+        self.config = config
+        self.logger = logger
+        self.db_path = db_path
+        self.size = max(1, int(config.get('db_read_pool_size', 4)))
+
+        self._pool = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def _open(self):
+        uri = f"file:{quote(os.path.abspath(self.db_path))}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False,
+                               cached_statements=int(self.config.get('db_sqlite_cached_statements', 256)))
+        apply_pragmas(conn, self.config, read_only=True)
+        return conn
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """
+        Puldan ulanish olish (kerak bo'lsa yangisi ochiladi)
+
+        Args:
+            timeout (float, optional): Bo'sh ulanishni kutish vaqti
+
+        Yields:
+            sqlite3.Connection: Faqat o'qish ulanishi
+        """
+        conn = None
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if self._created < self.size:
+                    self._created += 1
+                    try:
+                        conn = self._open()
+                    except Exception:
+                        self._created -= 1
+                        raise
+                    self._connections.append(conn)
+            if conn is None:
+                conn = self._pool.get(timeout=timeout)
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def query(self, sql, params=()):
+        """
+        O'qish so'rovini bajarish
+
+        Args:
+            sql (str): SELECT so'rovi
+            params (tuple): Parametrlar
+
+        Returns:
+            list: Natija qatorlari
+        """
+        with self.connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def close(self):
+        """
+        Puldagi barcha ulanishlarni yopish
+        """
+        with self._lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._connections = []
+            self._created = 0
+        self._pool = queue.LifoQueue()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Agent -> agregator oqimi
+Agent rejimida xost faqat metrikalarni yig'adi va har bir tekshiruv natijasini
+doimiy TCP (ixtiyoriy TLS) ulanish orqali markaziy agregatorga yuboradi.
+Xabarlar - bir qatorli JSON (har biri '\\n' bilan tugaydi):
+  agent -> agregator: hello {host, session, token}, sample {seq, ts, metrics, system_info}
+  agregator -> agent: welcome {last_seq}, ack {seq}, error {error}
+Tasdiqlanmagan namunalar agent navbatida (agent_backlog) turadi; ulanish
+uzilsa qayta ulangach ular qaytadan yuboriladi (backfill), agregator esa
+seq bo'yicha takrorlarni tashlab yuboradi.
+hello da agent qo'llaydigan formatlarni va sxemani yuboradi; agregator
+welcome da tanlanganini qaytaradi (binary/1 - utils/wire.py, yoki json)
+"""
+
+import ssl
+import json
+import uuid
+import socket
+import threading
+from collections import deque
+
+from utils.wire import (FORMAT_BINARY, FORMAT_JSON, SCHEMA, SCALE, FRAME_ACK, ACK, SampleEncoder, FrameReader)
+
+PROTOCOL_VERSION = 1
+
+# Bitta xabarning maksimal hajmi (bayt)
+MAX_MESSAGE_BYTES = 1048576
+
+# Qayta ulanish kutishining yuqori chegarasi (soniya)
+MAX_BACKOFF = 30
+
+
+def encode_message(message):
+    """
+    Xabarni uzatish uchun kodlash
+
+    Args:
+        message (dict): Xabar (type kaliti bilan)
+
+    Returns:
+        bytes: '\\n' bilan tugaydigan JSON qator
+    """
+    return json.dumps(message, separators=(',', ':'), ensure_ascii=False, default=str).encode('utf-8') + b'\n'
+
+
+def read_message(rfile):
+    """
+    Oqimdan bitta xabarni o'qish
+
+    Args:
+        rfile: Socket'ning binary fayl ko'rinishi
+
+    Returns:
+        dict: Xabar (ulanish yopilgan bo'lsa None)
+
+    Raises:
+        ValueError: Xabar juda katta yoki JSON emas
+    """
+    line = rfile.readline(MAX_MESSAGE_BYTES + 1)
+    if not line:
+        return None
+    if len(line) > MAX_MESSAGE_BYTES or not line.endswith(b'\n'):
+        raise ValueError("Xabar juda katta yoki to'liq emas")
+    return parse_message(line)
+
+
+def parse_message(line):
+    """
+    O'qilgan qatorni xabarga aylantirish
+
+    Args:
+        line (bytes): '\\n' bilan tugaydigan JSON qator
+
+    Returns:
+        dict: Xabar
+
+    Raises:
+        ValueError: JSON obyekt emas
+    """
+    message = json.loads(line)
+    if not isinstance(message, dict):
+        raise ValueError("Xabar JSON obyekt emas")
+    return message
+
+
+def tls_context(config, prefix, server_side=False):
+    """
+    Konfiguratsiyadan TLS kontekstini yaratish
+
+    Args:
+        config (dict): Konfiguratsiya sozlamalari
+        prefix (str): Kalitlar prefiksi ('agent' yoki 'aggregator')
+        server_side (bool): Agregator tomoni uchun
+
+    Returns:
+        ssl.SSLContext: TLS o'chirilgan bo'lsa None
+    """
+    if not config.get(f'{prefix}_tls', False):
+        return None
+    ca_file = config.get(f'{prefix}_tls_ca_file', '') or None
+    cert_file = config.get(f'{prefix}_tls_cert_file', '') or None
+    key_file = config.get(f'{prefix}_tls_key_file', '') or None
+    if server_side:
+        context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        context.load_cert_chain(cert_file, key_file)
+        if ca_file:
+            # Agentlardan mijoz sertifikati talab qilinadi (mTLS)
+            context.load_verify_locations(ca_file)
+            context.verify_mode = ssl.CERT_REQUIRED
+    else:
+        context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH, cafile=ca_file)
+        if cert_file:
+            context.load_cert_chain(cert_file, key_file)
+    return context
+
+
+class StreamAgent:
+    def __init__(self, config, logger):
+        """
+        Agregatorga yuboruvchi fon oqimini ishga tushirish
+
+        Args:
+            config (dict): Konfiguratsiya sozlamalari
+            logger (logging.Logger): Log yozish uchun logger obyekti
+        """
+        self.logger = logger
+        self.host = config.get('agent_aggregator_host', '127.0.0.1')
+        self.port = int(config.get('agent_aggregator_port', 9700))
+        self.token = config.get('agent_token', '')
+        self.backlog_size = int(config.get('agent_backlog', 10000))
+        self.timeout = float(config.get('agent_timeout', 10))
+        self.hostname = config.get('agent_hostname', '') or socket.gethostname()
+        self.context = tls_context(config, 'agent')
+        self.wire_format = config.get('agent_wire_format', FORMAT_BINARY)
+        if self.wire_format not in (FORMAT_BINARY, FORMAT_JSON):
+            raise ValueError(f"Noma'lum agent_wire_format: {self.wire_format} ({FORMAT_BINARY}, {FORMAT_JSON})")
+        # Har ishga tushishda yangi sessiya: agregator seq hisobini qaytadan boshlaydi
+        self.session = uuid.uuid4().hex
+
+        self.sent = 0
+        self.acked = 0
+        self.dropped = 0
+        self.connects = 0
+
+        self._cond = threading.Condition()
+        self._backlog = deque()
+        self._seq = 0
+        self._acked_seq = 0
+        self._socket = None
+        self._alive = False
+        self._closing = False
+        self._thread = threading.Thread(target=self._run, name='stream-agent', daemon=True)
+        self._thread.start()
+        self.logger.info(f"Agent rejimi: namunalar {self.host}:{self.port} agregatoriga yuboriladi"
+                         f"{' (TLS)' if self.context else ''}")
+
+    def send(self, metrics, system_info, timestamp):
+        """
+        Tekshiruv natijasini yuborish navbatiga qo'yish (kutmaydi)
+
+        Args:
+            metrics (dict): Metrikalar
+            system_info (dict): Tizim ma'lumotlari
+            timestamp (float): Tekshiruv vaqti (epoch)
+        """
+        with self._cond:
+            self._seq += 1
+            if len(self._backlog) >= self.backlog_size:
+                # Agregator uzoq vaqt yo'q - eng eski namuna tashlanadi
+                self._backlog.popleft()
+                self.dropped += 1
+            # Kodlash ulanishda bajariladi: binary farqlar har ulanishda kalit ramkadan boshlanadi
+            self._backlog.append((self._seq, timestamp, metrics, system_info))
+            self._cond.notify_all()
+
+    def pending(self):
+        """
+        Tasdiqlanmagan namunalar soni
+
+        Returns:
+            int: Namunalar soni
+        """
+        return len(self._backlog)
+
+    def _ack(self, seq):
+        with self._cond:
+            if seq <= self._acked_seq:
+                return
+            self._acked_seq = seq
+            while self._backlog and self._backlog[0][0] <= seq:
+                self._backlog.popleft()
+                self.acked += 1
+            self._cond.notify_all()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        try:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # Jim uzilgan ulanish (masalan, NAT) yopiq deb aniqlanishi uchun
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            if self.context:
+                sock = self.context.wrap_socket(sock, server_hostname=self.host)
+        except (OSError, ssl.SSLError):
+            sock.close()
+            raise
+        return sock
+
+    def _reader(self, rfile, wire_format):
+        frames = FrameReader(rfile) if wire_format == FORMAT_BINARY else None
+        try:
+            while True:
+                if frames:
+                    item = frames.read()
+                    if item is None:
+                        break
+                    kind, body = item
+                    if kind == FRAME_ACK and len(body) == ACK.size:
+                        self._ack(ACK.unpack_from(body)[0])
+                    continue
+                message = read_message(rfile)
+                if message is None:
+                    break
+                if message.get('type') == 'ack':
+                    self._ack(int(message.get('seq', 0)))
+                elif message.get('type') == 'error':
+                    self.logger.error(f"Agregator xatoligi: {message.get('error')}")
+                    break
+        except (OSError, ValueError) as e:
+            if not self._closing:
+                self.logger.warning(f"Agregatordan o'qishda xatolik: {e}")
+        finally:
+            with self._cond:
+                self._alive = False
+                self._cond.notify_all()
+
+    def _stream(self, sock):
+        """
+        Bitta ulanish: salomlashish, tasdiqlanmaganlarni qayta yuborish va yangi namunalar
+        """
+        rfile = sock.makefile('rb')
+        formats = [FORMAT_BINARY, FORMAT_JSON] if self.wire_format == FORMAT_BINARY else [FORMAT_JSON]
+        sock.sendall(encode_message({'type': 'hello', 'version': PROTOCOL_VERSION, 'host': self.hostname,
+                                     'session': self.session, 'token': self.token,
+                                     'formats': formats, 'schema': list(SCHEMA), 'scale': SCALE}))
+        reply = read_message(rfile)
+        if reply is None or reply.get('type') != 'welcome':
+            raise ValueError((reply or {}).get('error', "agregator ulanishni yopdi"))
+        # formats ni bilmaydigan agregator - JSON
+        wire_format = reply.get('format', FORMAT_JSON)
+        if wire_format not in formats:
+            raise ValueError(f"Agregator qo'llanmaydigan format tanladi: {wire_format}")
+        encoder = SampleEncoder() if wire_format == FORMAT_BINARY else None
+        # Agregator qayta ishlagan, ammo tasdig'i yo'qolgan namunalar qayta yuborilmaydi
+        self._ack(int(reply.get('last_seq', 0)))
+        sock.settimeout(None)
+
+        with self._cond:
+            self._alive = True
+        threading.Thread(target=self._reader, args=(rfile, wire_format), name='stream-agent-reader',
+                         daemon=True).start()
+
+        sent_seq = self._acked_seq
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: not self._alive or self._closing
+                                    or (self._backlog and self._backlog[-1][0] > sent_seq))
+                if not self._alive or self._closing:
+                    return
+                batch = [item for item in self._backlog if item[0] > sent_seq]
+                sent_seq = self._backlog[-1][0]
+            if encoder:
+                payload = b''.join(encoder.encode(*item) for item in batch)
+            else:
+                payload = b''.join(encode_message({'type': 'sample', 'seq': seq, 'ts': timestamp, 'metrics': metrics,
+                                                   'system_info': system_info})
+                                   for seq, timestamp, metrics, system_info in batch)
+            sock.sendall(payload)
+            self.sent += len(batch)
+
+    def _run(self):
+        backoff = 1
+        while not self._closing:
+            try:
+                sock = self._connect()
+            except (OSError, ssl.SSLError) as e:
+                self.logger.warning(f"Agregatorga ulanib bo'lmadi ({self.host}:{self.port}): {e}")
+            else:
+                self._socket = sock
+                self.connects += 1
+                backoff = 1
+                try:
+                    self._stream(sock)
+                except (OSError, ValueError) as e:
+                    if not self._closing:
+                        self.logger.warning(f"Agregator bilan aloqa uzildi: {e}")
+                finally:
+                    with self._cond:
+                        self._alive = False
+                    self._socket = None
+                    try:
+                        sock.shutdown(socket.SHUT_RDWR)
+                    except OSError:
+                        pass
+                    sock.close()
+            with self._cond:
+                self._cond.wait_for(lambda: self._closing, backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF)
+
+    def close(self):
+        """
+        Navbatdagi namunalar tasdiqlanishini kutib (agent_timeout gacha), ulanishni yopish
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: not self._backlog, self.timeout):
+                self.logger.warning(f"{len(self._backlog)} ta namuna agregatorga yetkazilmadi")
+            self._closing = True
+            self._cond.notify_all()
+        sock = self._socket
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._thread.join(self.timeout)
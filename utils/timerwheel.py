@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ierarxik taymer g'ildiragi (hierarchical timing wheel)
+Minglab kalitning muddatini (masalan, xost oxirgi marta ko'ringan vaqt +
+timeout) kuzatish: muddatni yangilash va bekor qilish O(1), vaqtni surish esa
+faqat muddati kelgan yoki pastki darajaga tushayotgan kalitlarga ishlaydi -
+barcha xostlarni har tickda ko'rib chiqish kerak emas.
+0-daraja `slots` ta tickni (resolution soniya) qamraydi, har keyingi daraja
+oldingisidan `slots` marta uzunroq; yuqori darajadagi katak navbati kelganda
+uning kalitlari pastki darajalarga qayta taqsimlanadi (cascade)
+"""
+
+import math
+
+# Standart: 1 soniyalik tick, 64 katak, 4 daraja (~194 kun)
+DEFAULT_RESOLUTION = 1.0
+DEFAULT_SLOTS = 64
+DEFAULT_LEVELS = 4
+
+
+class TimerWheel:
+    def __init__(self, now, resolution=DEFAULT_RESOLUTION, slots=DEFAULT_SLOTS, levels=DEFAULT_LEVELS):
+        """
+        Bo'sh g'ildirak yaratish
+
+        Args:
+            now (float): Joriy vaqt (monotonic soniya)
+            resolution (float): Bitta tick uzunligi (soniya)
+            slots (int): Har bir darajadagi kataklar soni
+            levels (int): Darajalar soni
+        """
+        self.resolution = float(resolution)
+        self.slots = int(slots)
+        self.levels = int(levels)
+        # Har bir daraja katagining tick'lardagi uzunligi: 1, slots, slots^2, ...
+        self._spans = [self.slots ** level for level in range(self.levels + 1)]
+        self._wheels = [[set() for _ in range(self.slots)] for _ in range(self.levels)]
+        # kalit -> (muddat tick'i, daraja, katak)
+        self._timers = {}
+        self._tick = int(now / self.resolution)
+
+    def __len__(self):
+        return len(self._timers)
+
+    def __contains__(self, key):
+        return key in self._timers
+
+    def _place(self, key, tick):
+        delta = tick - self._tick
+        level = 0
+        while level < self.levels - 1 and delta >= self._spans[level + 1]:
+            level += 1
+        # Eng katta oraliqdan uzoq muddat yuqori darajaning eng oxirgi katagida
+        # kutadi va pastga tushganda haqiqiy muddati bo'yicha qayta joylashadi
+        placed = min(tick, self._tick + self._spans[self.levels] - 1)
+        index = (placed // self._spans[level]) % self.slots
+        self._wheels[level][index].add(key)
+        self._timers[key] = (tick, level, index)
+
+    def schedule(self, key, deadline):
+        """
+        Kalit muddatini o'rnatish yoki yangilash
+
+        Args:
+            key: Kalit (masalan, xost nomi)
+            deadline (float): Muddat (monotonic soniya); o'tgan bo'lsa keyingi tickda tugaydi
+        """
+        self.cancel(key)
+        self._place(key, max(math.ceil(deadline / self.resolution), self._tick + 1))
+
+    def cancel(self, key):
+        """
+        Kalit muddatini bekor qilish
+
+        Args:
+            key: Kalit
+
+        Returns:
+            bool: Kalit g'ildirakda bo'lgan bo'lsa True
+        """
+        entry = self._timers.pop(key, None)
+        if entry is None:
+            return False
+        _, level, index = entry
+        self._wheels[level][index].discard(key)
+        return True
+
+    def advance(self, now):
+        """
+        G'ildirakni joriy vaqtgacha surish
+
+        Args:
+            now (float): Joriy vaqt (monotonic soniya)
+
+        Returns:
+            list: Muddati tugagan kalitlar (ular g'ildirakdan olib tashlanadi)
+        """
+        target = int(now / self.resolution)
+        expired = []
+        while self._tick < target:
+            if not self._timers:
+                self._tick = target
+                break
+            self._tick += 1
+            # Yuqori darajalar katagi navbati kelgan bo'lsa kalitlar pastga tushadi
+            for level in range(1, self.levels):
+                if self._tick % self._spans[level]:
+                    break
+                index = (self._tick // self._spans[level]) % self.slots
+                bucket = self._wheels[level][index]
+                if bucket:
+                    self._wheels[level][index] = set()
+                    for key in bucket:
+                        self._place(key, self._timers[key][0])
+            index = self._tick % self.slots
+            bucket = self._wheels[0][index]
+            if bucket:
+                self._wheels[0][index] = set()
+                for key in bucket:
+                    del self._timers[key]
+                expired.extend(bucket)
+        return expired
@@ -0,0 +1,606 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Siqilgan ustunli vaqt qatorlari ombori (Gorilla uslubida)
+Har bir (xost, metrika) qatori vaqt bo'yicha bloklarga bo'linadi: vaqtlar
+delta-of-delta, qiymatlar XOR usulida siqiladi, bloklar indeksi orqali
+oraliq boshiga to'g'ridan-to'g'ri o'tiladi
+"""
+
+import os
+import re
+import json
+import time
+import heapq
+import struct
+import bisect
+import calendar
+import datetime
+import threading
+
+# Blok indeksi yozuvi: birinchi vaqt, oxirgi vaqt, namunalar soni, fayldagi offset, uzunlik
+INDEX_ENTRY = struct.Struct('<qqIQI')
+# Ochiq (hali muhrlanmagan) blok namunasi: vaqt, qiymat
+HEAD_SAMPLE = struct.Struct('<qd')
+FLOAT = struct.Struct('>d')
+
+# delta-of-delta diapazonlari: (prefiks bitlari, prefiks uzunligi, qiymat bitlari)
+_DOD_BUCKETS = (
+    (0b10, 2, 7),
+    (0b110, 3, 9),
+    (0b1110, 4, 12),
+)
+_DOD_FALLBACK = (0b1111, 4, 32)
+
+# Xost katalogidagi asl xost nomi fayli (katalog nomi fayl tizimi uchun tozalangan)
+HOSTNAME_FILE = '.hostname'
+
+# Bit akkumulyatori bir martada baytlarga aylantiriladigan hajm
+_CHUNK_BITS = 512
+
+
+class BitWriter:
+    def __init__(self):
+        """
+        Bitlarni baytlarga yig'uvchi yozuvchi
+        """
+        self._bytes = bytearray()
+        self._acc = 0
+        self._bits = 0
+
+    def write(self, value, nbits):
+        """
+        Qiymatning quyi nbits bitini yozish
+
+        Args:
+            value (int): Qiymat
+            nbits (int): Bitlar soni
+        """
+        self._acc = (self._acc << nbits) | (value & ((1 << nbits) - 1))
+        self._bits += nbits
+        if self._bits >= _CHUNK_BITS:
+            # To'liq baytlarni bir martada chiqarish
+            rest = self._bits & 7
+            self._bytes += (self._acc >> rest).to_bytes(self._bits >> 3, 'big')
+            self._acc &= (1 << rest) - 1
+            self._bits = rest
+
+    def getvalue(self):
+        """
+        Yozilgan baytlar (oxirgi bayt nol bilan to'ldiriladi)
+
+        Returns:
+            bytes: Natija
+        """
+        padding = -self._bits % 8
+        return bytes(self._bytes) + (self._acc << padding).to_bytes((self._bits + padding) // 8, 'big')
+
+
+class BitReader:
+    def __init__(self, data):
+        """
+        Baytlardan bitlarni o'qish
+
+        Args:
+            data (bytes): Siqilgan blok
+        """
+        self._data = data
+        self._pos = 0
+        self._acc = 0
+        self._bits = 0
+
+    def read(self, nbits):
+        """
+        nbits bitni o'qish
+
+        Args:
+            nbits (int): Bitlar soni
+
+        Returns:
+            int: O'qilgan qiymat
+        """
+        if self._bits < nbits:
+            # Bir nechta baytlik bo'laklar bilan to'ldirish
+            chunk = self._data[self._pos:self._pos + _CHUNK_BITS // 8]
+            self._pos += len(chunk)
+            self._acc = (self._acc << (8 * len(chunk))) | int.from_bytes(chunk, 'big')
+            self._bits += 8 * len(chunk)
+            if self._bits < nbits:
+                raise EOFError("Blok oxiriga yetildi")
+        self._bits -= nbits
+        value = self._acc >> self._bits
+        self._acc &= (1 << self._bits) - 1
+        return value
+
+
+def encode_block(samples):
+    """
+    Namunalarni Gorilla usulida siqish
+
+    Birinchi vaqt va qiymat to'liq yoziladi. Keyingi vaqtlar delta-of-delta
+    (doimiy oraliqda har bir namunaga 1 bit), qiymatlar esa oldingisi bilan XOR
+    (o'zgarmagan qiymat uchun 1 bit) ko'rinishida saqlanadi.
+
+    Args:
+        samples (list): (vaqt epoch soniya, qiymat) juftliklari, vaqt bo'yicha tartiblangan
+
+    Returns:
+        bytes: Siqilgan blok
+    """
+    writer = BitWriter()
+    first_ts, first_value = samples[0]
+    writer.write(first_ts, 64)
+    previous_bits = int.from_bytes(FLOAT.pack(first_value), 'big')
+    writer.write(previous_bits, 64)
+
+    previous_ts = first_ts
+    previous_delta = 0
+    leading, trailing = 65, 0
+
+    for ts, value in samples[1:]:
+        # Vaqt: delta-of-delta
+        delta = ts - previous_ts
+        dod = delta - previous_delta
+        if dod == 0:
+            writer.write(0, 1)
+        else:
+            for prefix, prefix_bits, value_bits in _DOD_BUCKETS:
+                limit = 1 << (value_bits - 1)
+                if -limit < dod <= limit:
+                    break
+            else:
+                prefix, prefix_bits, value_bits = _DOD_FALLBACK
+            writer.write(prefix, prefix_bits)
+            writer.write(dod, value_bits)
+        previous_ts, previous_delta = ts, delta
+
+        # Qiymat: oldingi qiymat bilan XOR
+        bits = int.from_bytes(FLOAT.pack(value), 'big')
+        xor = bits ^ previous_bits
+        previous_bits = bits
+        if xor == 0:
+            writer.write(0, 1)
+            continue
+
+        new_leading = min(64 - xor.bit_length(), 31)
+        new_trailing = (xor & -xor).bit_length() - 1
+        if leading <= new_leading and trailing <= new_trailing:
+            # Mazmunli bitlar oldingi oyna ichida
+            writer.write(0b10, 2)
+            writer.write(xor >> trailing, 64 - leading - trailing)
+        else:
+            leading, trailing = new_leading, new_trailing
+            significant = 64 - leading - trailing
+            writer.write(0b11, 2)
+            writer.write(leading, 5)
+            # 64 bit uzunlik 6 bitga sig'maydi, 0 bilan ifodalanadi
+            writer.write(significant & 0x3F, 6)
+            writer.write(xor >> trailing, significant)
+
+    return writer.getvalue()
+
+
+def decode_block(data, count):
+    """
+    Siqilgan blokni namunalarga qaytarish
+
+    Args:
+        data (bytes): encode_block natijasi
+        count (int): Namunalar soni
+
+    Yields:
+        tuple: (vaqt, qiymat)
+    """
+    reader = BitReader(data)
+    ts = reader.read(64)
+    if ts >= 1 << 63:
+        ts -= 1 << 64
+    bits = reader.read(64)
+    yield ts, FLOAT.unpack(bits.to_bytes(8, 'big'))[0]
+
+    delta = 0
+    leading = trailing = 0
+    for _ in range(count - 1):
+        # Vaqt
+        if reader.read(1) == 0:
+            dod = 0
+        else:
+            value_bits = 32
+            for _, _, bucket_bits in _DOD_BUCKETS:
+                if reader.read(1) == 0:
+                    value_bits = bucket_bits
+                    break
+            dod = reader.read(value_bits)
+            if dod > 1 << (value_bits - 1):
+                dod -= 1 << value_bits
+        delta += dod
+        ts += delta
+
+        # Qiymat
+        if reader.read(1) == 1:
+            if reader.read(1) == 1:
+                leading = reader.read(5)
+                significant = reader.read(6) or 64
+                trailing = 64 - leading - significant
+            bits ^= reader.read(64 - leading - trailing) << trailing
+        yield ts, FLOAT.unpack(bits.to_bytes(8, 'big'))[0]
+
+
+def to_epoch(timestamp):
+    """
+    Saqlangan vaqtni (zonasiz) epoch soniyaga aylantirish
+
+    SQL backendlar bilan bir xil bucket chegaralari uchun zonasiz vaqt UTC sifatida olinadi.
+
+    Args:
+        timestamp (str|datetime): '%Y-%m-%d %H:%M:%S' yoki datetime
+
+    Returns:
+        int: Epoch soniya
+    """
+    if isinstance(timestamp, str):
+        timestamp = datetime.datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S')
+    return calendar.timegm(timestamp.timetuple())
+
+
+def from_epoch(epoch):
+    """
+    Epoch soniyani zonasiz datetime ga qaytarish (to_epoch ga teskari)
+
+    Args:
+        epoch (int): Epoch soniya
+
+    Returns:
+        datetime: Vaqt
+    """
+    return datetime.datetime.fromtimestamp(int(epoch), datetime.timezone.utc).replace(tzinfo=None)
+
+
+class Series:
+    def __init__(self, path, block_seconds):
+        """
+        Bitta (xost, metrika) qatori: .dat (bloklar), .idx (blok indeksi), .head (ochiq blok)
+
+        Args:
+            path (str): Fayllar prefiksi (kengaytmasiz)
+            block_seconds (int): Blok davomiyligi
+        """
+        self.path = path
+        self.block_seconds = block_seconds
+        self.index = []
+        self.head = []
+        self._head_dirty = False
+
+        if os.path.exists(path + '.idx'):
+            with open(path + '.idx', 'rb') as f:
+                data = f.read()
+            usable = len(data) - len(data) % INDEX_ENTRY.size
+            self.index = [INDEX_ENTRY.unpack_from(data, offset) for offset in range(0, usable, INDEX_ENTRY.size)]
+        if os.path.exists(path + '.dat') and self.index:
+            # Indeksga kirmay qolgan (yozish paytida uzilgan) baytlarni kesish
+            _, _, _, offset, length = self.index[-1]
+            if os.path.getsize(path + '.dat') > offset + length:
+                with open(path + '.dat', 'r+b') as f:
+                    f.truncate(offset + length)
+        if os.path.exists(path + '.head'):
+            with open(path + '.head', 'rb') as f:
+                data = f.read()
+            usable = len(data) - len(data) % HEAD_SAMPLE.size
+            self.head = [HEAD_SAMPLE.unpack_from(data, offset) for offset in range(0, usable, HEAD_SAMPLE.size)]
+        self.starts = [entry[0] for entry in self.index]
+
+    def append(self, ts, value):
+        """
+        Namunani ochiq blokka qo'shish (blok vaqti tugagan bo'lsa, u muhrlanadi)
+
+        Args:
+            ts (int): Epoch soniya
+            value (float): Qiymat
+
+        Returns:
+            bool: Namuna qabul qilinsa True (oxirgi vaqtdan oldingi namunalar tashlanadi)
+        """
+        latest = self.head[-1][0] if self.head else (self.index[-1][1] if self.index else None)
+        if latest is not None and ts < latest:
+            return False
+        if self.head and ts // self.block_seconds != self.head[0][0] // self.block_seconds:
+            self.seal()
+        self.head.append((ts, value))
+        self._head_dirty = True
+        return True
+
+    def seal(self):
+        """
+        Ochiq blokni siqib, .dat va .idx fayllariga qo'shish
+        """
+        if not self.head:
+            return
+        payload = encode_block(self.head)
+        offset = os.path.getsize(self.path + '.dat') if os.path.exists(self.path + '.dat') else 0
+        with open(self.path + '.dat', 'ab') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        entry = (self.head[0][0], self.head[-1][0], len(self.head), offset, len(payload))
+        with open(self.path + '.idx', 'ab') as f:
+            f.write(INDEX_ENTRY.pack(*entry))
+        self.index.append(entry)
+        self.starts.append(entry[0])
+        self.head = []
+        self._head_dirty = True
+
+    def flush_head(self):
+        """
+        Ochiq blokni .head fayliga atomik yozish (qayta ishga tushganda davom ettirish uchun)
+        """
+        if not self._head_dirty:
+            return
+        tmp_path = self.path + '.head.tmp'
+        with open(tmp_path, 'wb') as f:
+            for sample in self.head:
+                f.write(HEAD_SAMPLE.pack(*sample))
+        os.replace(tmp_path, self.path + '.head')
+        self._head_dirty = False
+
+    def scan(self, start, end):
+        """
+        [start, end) oralig'idagi namunalarni vaqt tartibida o'qish
+
+        Blok indeksi bo'yicha bisect bilan birinchi mos blokka o'tiladi.
+
+        Args:
+            start (int): Boshlanish (epoch)
+            end (int): Tugash (epoch, shu jumladan emas)
+
+        Yields:
+            tuple: (vaqt, qiymat)
+        """
+        position = max(0, bisect.bisect_right(self.starts, start) - 1)
+        if position < len(self.index):
+            with open(self.path + '.dat', 'rb') as f:
+                for first_ts, last_ts, count, offset, length in self.index[position:]:
+                    if first_ts >= end:
+                        break
+                    if last_ts < start:
+                        continue
+                    f.seek(offset)
+                    for ts, value in decode_block(f.read(length), count):
+                        if start <= ts < end:
+                            yield ts, value
+        for ts, value in list(self.head):
+            if start <= ts < end:
+                yield ts, value
+
+    def purge(self, cutoff):
+        """
+        Oxirgi vaqti cutoff dan oldingi bloklarni o'chirish (fayllar qayta yoziladi);
+        namuna kelmay qolgan xostning eskirgan ochiq bloki ham tashlanadi
+
+        Args:
+            cutoff (int): Epoch soniya
+
+        Returns:
+            int: O'chirilgan namunalar soni
+        """
+        removed = 0
+        if self.head and self.head[-1][0] < cutoff:
+            removed += len(self.head)
+            self.head = []
+            self._head_dirty = True
+            self.flush_head()
+
+        expired = 0
+        while expired < len(self.index) and self.index[expired][1] < cutoff:
+            expired += 1
+        if not expired:
+            return removed
+
+        removed += sum(entry[2] for entry in self.index[:expired])
+        kept = self.index[expired:]
+        base = kept[0][3] if kept else 0
+        with open(self.path + '.dat', 'rb') as f:
+            f.seek(base)
+            data = f.read()
+        with open(self.path + '.dat.tmp', 'wb') as f:
+            f.write(data)
+        with open(self.path + '.idx.tmp', 'wb') as f:
+            for first_ts, last_ts, count, offset, length in kept:
+                f.write(INDEX_ENTRY.pack(first_ts, last_ts, count, offset - base, length))
+        os.replace(self.path + '.dat.tmp', self.path + '.dat')
+        os.replace(self.path + '.idx.tmp', self.path + '.idx')
+
+        self.index = [(a, b, c, offset - base, length) for a, b, c, offset, length in kept]
+        self.starts = [entry[0] for entry in self.index]
+        return removed
+
+
+class TimeSeriesStore:
+    def __init__(self, config, logger):
+        """
+        Gorilla uslubidagi vaqt qatorlari omborini ochish
+
+        Args:
+            config (dict): Konfiguratsiya sozlamalari
+            logger (logging.Logger): Log yozish uchun logger obyekti
+        """
+        self.config = config
+        self.logger = logger
+        self.path = config.get('db_tsdb_path', '/var/lib/system-monitor/tsdb')
+        self.block_seconds = max(60, int(config.get('db_tsdb_block_seconds', 7200)))
+
+        from core.windows import parse_duration
+        self.retention = parse_duration(str(config.get('db_retention_raw', '0')))
+        self.purge_interval = float(config.get('db_retention_interval', 3600))
+        self._last_purge = None
+
+        os.makedirs(self.path, exist_ok=True)
+        self.series = {}
+        self._lock = threading.Lock()
+        self.logger.info(f"TSDB ombori ochildi: {self.path} (blok {self.block_seconds}s)")
+
+    @staticmethod
+    def _safe_name(name):
+        return re.sub(r'[^A-Za-z0-9._-]', '_', name) or '_'
+
+    def _series(self, hostname, metric, create=True):
+        # Kalit - katalog nomi: asl va tozalangan nom bir xil Series obyektiga tushadi
+        name = self._safe_name(hostname)
+        key = (name, metric)
+        series = self.series.get(key)
+        if series is None:
+            directory = os.path.join(self.path, name)
+            if not create and not os.path.isdir(directory):
+                return None
+            os.makedirs(directory, exist_ok=True)
+            hostname_path = os.path.join(directory, HOSTNAME_FILE)
+            if create and not os.path.exists(hostname_path):
+                with open(hostname_path, 'w', encoding='utf-8') as f:
+                    f.write(hostname)
+            series = self.series[key] = Series(os.path.join(directory, metric), self.block_seconds)
+        return series
+
+    def _directories(self):
+        return sorted(name for name in os.listdir(self.path) if os.path.isdir(os.path.join(self.path, name)))
+
+    def _metrics(self, name):
+        # Katalogdagi qatorlar: .dat/.idx/.head fayllari nomidan (vaqtinchalik .tmp lardan tashqari)
+        files = os.listdir(os.path.join(self.path, name))
+        return sorted({os.path.splitext(f)[0] for f in files if f.endswith(('.dat', '.idx', '.head'))})
+
+    def hosts(self):
+        """
+        Omborda ma'lumoti bor xostlar
+
+        Returns:
+            list: Asl xost nomlari (nom fayli bo'lmasa katalog nomi)
+        """
+        hosts = []
+        for name in self._directories():
+            try:
+                with open(os.path.join(self.path, name, HOSTNAME_FILE), encoding='utf-8') as f:
+                    hosts.append(f.read() or name)
+            except OSError:
+                hosts.append(name)
+        return hosts
+
+    def append_rows(self, rows, column_index, metrics):
+        """
+        metrics jadvali qatorlarini qatorlarga ajratib yozish
+
+        Args:
+            rows (list): METRIC_COLUMNS tartibidagi qatorlar
+            column_index (dict): Ustun nomi -> indeks
+            metrics (tuple): (metrika nomi, ustun) juftliklari
+        """
+        ts_index = column_index['timestamp']
+        host_index = column_index['hostname']
+        with self._lock:
+            for row in rows:
+                ts = to_epoch(row[ts_index])
+                for metric, column in metrics:
+                    value = row[column_index[column]]
+                    if value is not None:
+                        self._series(row[host_index], metric).append(ts, float(value))
+
+    def append_alert(self, alert):
+        """
+        Alertni alerts.ndjson fayliga qo'shish
+
+        Args:
+            alert (dict): Alert ma'lumotlari
+        """
+        with open(os.path.join(self.path, 'alerts.ndjson'), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(alert, ensure_ascii=False) + '\n')
+
+    def flush(self):
+        """
+        Ochiq bloklarni diskka yozish va kerak bo'lsa eski bloklarni o'chirish
+        """
+        with self._lock:
+            for series in self.series.values():
+                series.flush_head()
+
+            now = time.monotonic()
+            if self.retention and (self._last_purge is None or now - self._last_purge >= self.purge_interval):
+                self._last_purge = now
+                cutoff = calendar.timegm(datetime.datetime.now().timetuple()) - self.retention
+                # Jarayon boshlanganidan beri yozilmagan (jim qolgan) xostlar qatorlari ham
+                removed = 0
+                for name in self._directories():
+                    for metric in self._metrics(name):
+                        removed += self._series(name, metric, create=False).purge(cutoff)
+                if removed:
+                    self.logger.info(f"TSDB: saqlash muddati o'tgan {removed} ta namuna o'chirildi")
+
+    def scan(self, metric, host, start, end):
+        """
+        Bir yoki barcha xostlar namunalarini vaqt tartibida o'qish
+
+        Args:
+            metric (str): Metrika nomi
+            host (str): Xost nomi (None - barcha xostlar)
+            start (int): Boshlanish (epoch)
+            end (int): Tugash (epoch, shu jumladan emas)
+
+        Yields:
+            tuple: (vaqt, qiymat)
+        """
+        names = [host] if host else self._directories()
+        streams = []
+        # self.series ga qo'shish flush() dagi iteratsiya bilan bir qulf ostida
+        with self._lock:
+            for name in names:
+                series = self._series(name, metric, create=False)
+                if series is not None:
+                    streams.append(series.scan(start, end))
+        yield from heapq.merge(*streams)
+
+    def query_range(self, metric, host, start, end, step, agg):
+        """
+        Namunalarni qadamlar bo'yicha agregatsiya qilish (oqim sifatida)
+
+        Args:
+            metric (str): Metrika nomi
+            host (str): Xost nomi (None - barcha xostlar)
+            start (int): Boshlanish (epoch)
+            end (int): Tugash (epoch)
+            step (int): Qadam (soniya)
+            agg (str): avg, min, max, sum, count yoki last
+
+        Yields:
+            tuple: (bucket boshi epoch, qiymat)
+        """
+        bucket = None
+        total = count = 0
+        low = high = last = None
+
+        def result():
+            return {
+                'avg': total / count if count else None,
+                'min': low, 'max': high, 'sum': total, 'count': count, 'last': last,
+            }[agg]
+
+        for ts, value in self.scan(metric, host, start, end):
+            current = ts // step * step
+            if current != bucket:
+                if bucket is not None:
+                    yield bucket, result()
+                bucket = current
+                total = count = 0
+                low = high = None
+            total += value
+            count += 1
+            low = value if low is None or value < low else low
+            high = value if high is None or value > high else high
+            last = value
+        if bucket is not None:
+            yield bucket, result()
+
+    def close(self):
+        """
+        Ochiq bloklarni diskka yozish
+        """
+        with self._lock:
+            for series in self.series.values():
+                series.flush_head()
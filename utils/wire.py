@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Agent -> agregator oqimi uchun ixcham binary format (binary/1)
+Salomlashish (hello/welcome) JSON qatorlarida qoladi va formatni kelishadi;
+shundan keyin ikkala tomon ramkalar (frame) bilan almashadi:
+  ramka: !IB (tana uzunligi, turi) + tana
+  SAMPLE tanasi: !BIq (bayroqlar, seq, vaqt ms) + har bir sxema maydoni
+    uchun zigzag varint (kalit ramkada mutlaq qiymat, qolganlarida oldingi
+    namunadan farq) + [o'zgargan system_info kalitlari, JSON] + [qo'shimcha
+    metrikalar, JSON]
+  ACK tanasi: !I (seq)
+Qiymatlar 1/SCALE aniqlikdagi butun songa aylantiriladi. Farq zanjiri har bir
+ulanishda kalit ramkadan boshlanadi, shuning uchun backfill paytida qayta
+yuborilgan namunalar ham to'g'ri o'qiladi
+"""
+
+import json
+import struct
+
+FORMAT_BINARY = 'binary/1'
+FORMAT_JSON = 'json'
+
+# Sxema maydonlari (hello da yuboriladi, agregator shu tartibda o'qiydi)
+SCHEMA = ('ram', 'cpu', 'disk', 'swap', 'load', 'network_rx', 'network_tx')
+# Qiymatlar aniqligi: 0.01
+SCALE = 100
+
+FRAME_HEADER = struct.Struct('!IB')
+SAMPLE_HEADER = struct.Struct('!BIq')
+ACK = struct.Struct('!I')
+
+FRAME_SAMPLE = 1
+FRAME_ACK = 2
+
+FLAG_KEYFRAME = 0x01
+FLAG_SYSTEM_INFO = 0x02
+FLAG_EXTRA = 0x04
+
+# Shuncha namunadan keyin yana mutlaq qiymatlar yuboriladi
+KEYFRAME_INTERVAL = 256
+
+# Bitta ramka tanasining maksimal hajmi (bayt)
+MAX_FRAME_BYTES = 1048576
+
+
+def zigzag(value):
+    """
+    Ishorali sonni ishorasiz songa aylantirish (kichik manfiylar ham qisqa bo'ladi)
+
+    Args:
+        value (int): Son
+
+    Returns:
+        int: 0, -1, 1, -2, ... -> 0, 1, 2, 3, ...
+    """
+    return value << 1 if value >= 0 else ((-value) << 1) - 1
+
+
+def unzigzag(value):
+    """
+    zigzag() ning teskarisi
+
+    Args:
+        value (int): Ishorasiz son
+
+    Returns:
+        int: Ishorali son
+    """
+    return (value >> 1) ^ -(value & 1)
+
+
+def write_varint(out, value):
+    """
+    Ishorasiz sonni LEB128 varint ko'rinishida qo'shish
+
+    Args:
+        out (bytearray): Chiqish buferi
+        value (int): Ishorasiz son
+    """
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(view, offset):
+    """
+    Buferdan varint o'qish (nusxa olmasdan)
+
+    Args:
+        view (memoryview | bytes): Bufer
+        offset (int): Boshlanish
+
+    Returns:
+        tuple: (son, keyingi offset)
+
+    Raises:
+        ValueError: Varint bufer oxirida uzilgan
+    """
+    result = shift = 0
+    while True:
+        if offset >= len(view):
+            raise ValueError("Varint to'liq emas")
+        byte = view[offset]
+        offset += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, offset
+        shift += 7
+
+
+def frame(kind, body):
+    """
+    Ramka tuzish
+
+    Args:
+        kind (int): Ramka turi
+        body (bytes): Tana
+
+    Returns:
+        bytes: Sarlavha va tana
+    """
+    return FRAME_HEADER.pack(len(body), kind) + body
+
+
+def ack_frame(seq):
+    """
+    Tasdiq ramkasi
+
+    Args:
+        seq (int): Qayta ishlangan namuna raqami
+
+    Returns:
+        bytes: ACK ramkasi
+    """
+    return frame(FRAME_ACK, ACK.pack(seq))
+
+
+class SampleEncoder:
+    def __init__(self, schema=SCHEMA):
+        """
+        Bitta ulanish uchun namuna kodlovchisi (farqlar shu ulanish ichida hisoblanadi)
+
+        Args:
+            schema (tuple): Maydonlar tartibi
+        """
+        self.schema = tuple(schema)
+        self._previous = None
+        self._system_info = {}
+        self._count = 0
+
+    def encode(self, seq, timestamp, metrics, system_info):
+        """
+        Namunani SAMPLE ramkasiga aylantirish
+
+        Args:
+            seq (int): Namuna raqami
+            timestamp (float): Vaqt (epoch)
+            metrics (dict): Metrikalar (network - [rx, tx])
+            system_info (dict): Tizim ma'lumotlari
+
+        Returns:
+            bytes: Ramka
+        """
+        values = dict(metrics)
+        network = values.pop('network', None)
+        if isinstance(network, (list, tuple)) and len(network) == 2:
+            values['network_rx'], values['network_tx'] = network
+        current = [round(float(values.pop(field, 0) or 0) * SCALE) for field in self.schema]
+
+        keyframe = self._previous is None or self._count % KEYFRAME_INTERVAL == 0
+        flags = FLAG_KEYFRAME if keyframe else 0
+        changed = {key: value for key, value in (system_info or {}).items()
+                   if keyframe or self._system_info.get(key) != value}
+        if changed:
+            flags |= FLAG_SYSTEM_INFO
+        if values:
+            flags |= FLAG_EXTRA
+
+        body = bytearray(SAMPLE_HEADER.pack(flags, seq & 0xffffffff, int(timestamp * 1000)))
+        previous = self._previous if not keyframe else [0] * len(current)
+        for value, before in zip(current, previous):
+            write_varint(body, zigzag(value - before))
+        for flag, data in ((FLAG_SYSTEM_INFO, changed), (FLAG_EXTRA, values)):
+            if flags & flag:
+                blob = json.dumps(data, separators=(',', ':'), ensure_ascii=False, default=str).encode('utf-8')
+                write_varint(body, len(blob))
+                body += blob
+
+        self._previous = current
+        self._system_info.update(changed)
+        self._count += 1
+        return frame(FRAME_SAMPLE, bytes(body))
+
+
+class SampleDecoder:
+    def __init__(self, schema=SCHEMA):
+        """
+        Bitta ulanish uchun namuna dekoderi
+
+        Args:
+            schema (list): Agent hello da yuborgan maydonlar tartibi
+        """
+        self.schema = tuple(schema)
+        self._network = 'network_rx' in self.schema and 'network_tx' in self.schema
+        self._previous = [0] * len(self.schema)
+        self._system_info = {}
+        self._synced = False
+
+    def decode(self, view):
+        """
+        SAMPLE ramka tanasini o'qish
+
+        Tana (odatda ~30 bayt) bir marta bytes ga nusxalanadi: bytes indekslash
+        memoryview nikidan tezroq, varint'larning aksariyati esa bitta bayt
+        bo'lgani uchun shu holat alohida funksiya chaqiruvisiz o'qiladi.
+
+        Args:
+            view (memoryview): Ramka tanasi
+
+        Returns:
+            dict: sample xabari (seq, ts, metrics, system_info) - JSON formatidagi bilan bir xil
+
+        Raises:
+            ValueError: Tana buzilgan yoki farq zanjiri kalit ramkasiz boshlangan
+        """
+        if len(view) < SAMPLE_HEADER.size:
+            raise ValueError("SAMPLE ramkasi juda qisqa")
+        data = bytes(view)
+        flags, seq, millis = SAMPLE_HEADER.unpack_from(data)
+        offset = SAMPLE_HEADER.size
+        end = len(data)
+        keyframe = flags & FLAG_KEYFRAME
+        if not keyframe and not self._synced:
+            raise ValueError("Farq ramkasi kalit ramkadan oldin keldi")
+
+        current = []
+        append = current.append
+        for before in self._previous:
+            if offset >= end:
+                raise ValueError("Varint to'liq emas")
+            delta = data[offset]
+            if delta < 0x80:
+                offset += 1
+            else:
+                delta, offset = read_varint(data, offset)
+            delta = (delta >> 1) ^ -(delta & 1)
+            append(delta if keyframe else delta + before)
+        self._previous = current
+        self._synced = True
+
+        system_info = extra = None
+        if flags & (FLAG_SYSTEM_INFO | FLAG_EXTRA):
+            for flag in (FLAG_SYSTEM_INFO, FLAG_EXTRA):
+                if flags & flag:
+                    size, offset = read_varint(data, offset)
+                    if offset + size > end:
+                        raise ValueError("Ramka tanasi to'liq emas")
+                    blob = json.loads(data[offset:offset + size].decode('utf-8'))
+                    offset += size
+                    if flag == FLAG_SYSTEM_INFO:
+                        system_info = blob
+                    else:
+                        extra = blob
+
+        if keyframe:
+            self._system_info = {}
+        if system_info:
+            self._system_info.update(system_info)
+
+        metrics = {field: value / SCALE for field, value in zip(self.schema, current)}
+        if self._network:
+            metrics['network'] = [metrics.pop('network_rx'), metrics.pop('network_tx')]
+        if extra:
+            metrics.update(extra)
+        return {'type': 'sample', 'seq': seq, 'ts': millis / 1000.0, 'metrics': metrics,
+                'system_info': dict(self._system_info)}
+
+
+class FrameReader:
+    def __init__(self, rfile):
+        """
+        Oqimdan ramkalarni qayta ishlatiladigan buferga o'qish
+
+        Args:
+            rfile: Socket'ning binary fayl ko'rinishi (readinto bilan)
+        """
+        self.rfile = rfile
+        self._header = bytearray(FRAME_HEADER.size)
+        self._buffer = bytearray(4096)
+
+    def _fill(self, view):
+        got = 0
+        while got < len(view):
+            count = self.rfile.readinto(view[got:])
+            if not count:
+                if got == 0:
+                    return False
+                raise ValueError("Ramka to'liq emas")
+            got += count
+        return True
+
+    def read(self):
+        """
+        Keyingi ramkani o'qish
+
+        Qaytarilgan memoryview ichki buferga qaraydi va keyingi read()
+        chaqiruvigacha amal qiladi.
+
+        Returns:
+            tuple: (ramka turi, tana memoryview'i); ulanish yopilgan bo'lsa None
+
+        Raises:
+            ValueError: Ramka juda katta yoki uzilgan
+        """
+        if not self._fill(memoryview(self._header)):
+            return None
+        length, kind = FRAME_HEADER.unpack(self._header)
+        if length > MAX_FRAME_BYTES:
+            raise ValueError(f"Ramka juda katta: {length} bayt")
+        if len(self._buffer) < length:
+            self._buffer = bytearray(max(length, 2 * len(self._buffer)))
+        view = memoryview(self._buffer)[:length]
+        if length and not self._fill(view):
+            raise ValueError("Ramka to'liq emas")
+        return kind, view
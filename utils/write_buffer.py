@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Write-behind buffer moduli
+Metrika qatorlarini yig'ib, har N qator yoki T soniyada bitta tranzaksiyada yozish
+"""
+
+import os
+import json
+import time
+import threading
+from collections import deque
+
+# Buffer to'lganda qo'llaniladigan siyosatlar
+OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest')
+
+
+class WriteBuffer:
+    def __init__(self, config, logger, flush_callback):
+        """
+        Write-behind bufferni ishga tushirish
+
+        Args:
+            config (dict): Konfiguratsiya sozlamalari
+            logger (logging.Logger): Log yozish uchun logger obyekti
+            flush_callback (callable): Qatorlar ro'yxatini bitta tranzaksiyada yozuvchi
+                funksiya; xatolik bo'lsa istisno ko'taradi va qatorlar bufferda qoladi
+        """
+        self.logger = logger
+        self.flush_callback = flush_callback
+
+        self.batch_size = max(1, int(config.get('db_batch_size', 100)))
+        self.flush_interval = float(config.get('db_flush_interval', 30))
+        self.max_rows = max(self.batch_size, int(config.get('db_buffer_max_rows', 10000)))
+        self.overflow_policy = config.get('db_overflow_policy', 'drop_oldest')
+        if self.overflow_policy not in OVERFLOW_POLICIES:
+            self.logger.warning(f"Noma'lum db_overflow_policy: {self.overflow_policy}, drop_oldest ishlatiladi")
+            self.overflow_policy = 'drop_oldest'
+
+        self._rows = deque()
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._flush_requested = False
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add(self, row, now=None):
+        """
+        Qatorni bufferga qo'shish va kerak bo'lsa yozish
+
+        Args:
+            row (tuple): INSERT parametrlari
+            now (float, optional): Monotonik vaqt (test uchun)
+
+        Returns:
+            bool: Qator qabul qilingan bo'lsa True (drop_newest bilan tashlansa False)
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if len(self._rows) >= self.max_rows:
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 1000 == 0:
+                    self.logger.warning(f"Metrika bufferi to'ldi ({self.max_rows} qator), "
+                                        f"{self.overflow_policy} siyosati: jami {self.dropped} qator tashlandi")
+                if self.overflow_policy == 'drop_newest':
+                    return False
+                self._rows.popleft()
+            self._rows.append(row)
+
+            if (self._flush_requested or len(self._rows) >= self.batch_size
+                    or now - self._last_flush >= self.flush_interval):
+                self._flush_locked(now)
+        return True
+
+    def request_flush(self):
+        """
+        Keyingi qo'shishda bufferni yozishni so'rash (signal handler'dan xavfsiz chaqiriladi)
+        """
+        self._flush_requested = True
+
+    def flush(self):
+        """
+        Buffer'dagi barcha qatorlarni darhol yozish
+
+        Returns:
+            bool: Muvaffaqiyatli yozilgan (yoki buffer bo'sh) bo'lsa True
+        """
+        with self._lock:
+            return self._flush_locked(time.monotonic())
+
+    def _flush_locked(self, now):
+        self._last_flush = now
+        self._flush_requested = False
+        if not self._rows:
+            return True
+
+        rows = list(self._rows)
+        try:
+            self.flush_callback(rows)
+        except Exception as e:
+            # Qatorlar bufferda qoladi va keyingi flush'da qayta yoziladi
+            self.logger.error(f"Metrikalarni yozishda xatolik ({len(rows)} qator bufferda qoldi): {e}")
+            return False
+
+        for _ in range(len(rows)):
+            self._rows.popleft()
+        self.logger.debug(f"{len(rows)} ta metrika qatori bitta tranzaksiyada yozildi")
+        return True
+
+    def save(self, path):
+        """
+        Yozilmagan qatorlarni faylga saqlash (baza ishlamay turib dastur to'xtaganda)
+
+        Args:
+            path (str): Spill fayli (NDJSON)
+
+        Returns:
+            int: Saqlangan qatorlar soni
+        """
+        with self._lock:
+            if not self._rows:
+                return 0
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for row in self._rows:
+                    f.write(json.dumps(row, ensure_ascii=False) + '\n')
+            os.replace(tmp_path, path)
+            return len(self._rows)
+
+    def load(self, path):
+        """
+        save() bilan saqlangan qatorlarni buffer boshiga qaytarish va faylni o'chirish
+
+        Args:
+            path (str): Spill fayli (NDJSON)
+
+        Returns:
+            int: Qaytarilgan qatorlar soni
+        """
+        if not os.path.exists(path):
+            return 0
+        rows = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    rows.append(tuple(json.loads(line)))
+                except ValueError:
+                    continue
+        with self._lock:
+            room = max(0, self.max_rows - len(self._rows))
+            rows = rows[len(rows) - room:] if room < len(rows) else rows
+            self._rows.extendleft(reversed(rows))
+        os.remove(path)
+        return len(rows)